@@ -16,14 +16,44 @@ import json
 import logging
 import re
 import time
-import subprocess
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait, FIRST_COMPLETED
 from utils.event_bus import event_bus
+from utils.notify_outbox import outbox
+from brain.tools import resources_conflict
+from brain.llm_client import LLMClient
+from brain.provider_health import provider_health, classify_error, CircuitOpenError
+from memory.working_memory import WorkingMemory, TOOL_RECALL_RESULT, CONTEXT_TOKEN_BUDGET
 
 logger = logging.getLogger("TARS")
 from utils.agent_monitor import agent_monitor
 
 
+# ─────────────────────────────────────────────
+#  Shared pool for concurrent tool calls within one agent step
+#  (see BaseAgent.TOOL_RESOURCES). Long-lived and shared by all agents;
+#  pool threads only ever run leaf _dispatch() calls.
+# ─────────────────────────────────────────────
+
+AGENT_TOOL_WORKERS = 8
+
+# When every provider's circuit is open, wait this long at most for the
+# soonest one to reopen before failing the step
+MAX_PROVIDER_WAIT = 30.0
+
+_tool_pool = None
+_tool_pool_lock = threading.Lock()
+
+
+def _get_tool_pool():
+    global _tool_pool
+    with _tool_pool_lock:
+        if _tool_pool is None:
+            _tool_pool = ThreadPoolExecutor(max_workers=AGENT_TOOL_WORKERS, thread_name_prefix="tars-agent-tools")
+        return _tool_pool
+
+
 # ─────────────────────────────────────────────
 #  Parse <function>name{...}</function> or <function(name>{...}</function> tags from text
 #  Groq Llama uses both formats depending on the run:
@@ -64,26 +94,16 @@ def _parse_function_tags(text):
 #  iMessage progress helper
 # ─────────────────────────────────────────────
 
-def _send_progress(phone, message):
-    """Send a short iMessage progress update (bypasses rate limit)."""
+def _send_progress(phone, message, key="", progress=False):
+    """Queue a short iMessage progress update (bypasses rate limit).
+
+    Returns at once; the shared outbox sends it in the background.
+    progress=True lets a newer update from the same key replace this
+    one while it's still queued.
+    """
     if not phone:
         return
-    # Use argv to avoid AppleScript injection — message never enters eval context
-    script = f'''
-    on run argv
-        set msg to item 1 of argv
-        tell application "Messages"
-            set targetService to 1st account whose service type = iMessage
-            set targetBuddy to participant "{phone}" of targetService
-            send msg to targetBuddy
-        end tell
-    end run
-    '''
-    try:
-        subprocess.run(["osascript", "-e", script, message],
-                       capture_output=True, text=True, timeout=10)
-    except Exception:
-        pass
+    outbox.post(phone, message, key=key, progress=progress)
 
 
 class BaseAgent(ABC):
@@ -96,8 +116,22 @@ class BaseAgent(ABC):
       - system_prompt     (str)  — The agent's system prompt
       - tools            (list) — Tool definitions (Anthropic schema)
       - _dispatch(name, inp) → str  — Route tool calls to handlers
+
+    Subclasses may declare TOOL_RESOURCES to let independent tool calls
+    in one step run concurrently (see _prefetch_tools).
     """
 
+    # Tools whose calls may overlap within one step, mapped to the shared
+    # resources they touch as (resource, "read"|"write") pairs — the same
+    # form as brain.tools.TOOL_RESOURCES. Two calls conflict when they share
+    # a resource and one writes it. Undeclared tools run alone, in order.
+    TOOL_RESOURCES = {}
+    MAX_CONCURRENT_TOOLS = 4    # Per step, on top of the shared pool's limit
+
+    # Transcript tokens kept per request before old tool results are
+    # compacted into Working Notes (see memory/working_memory.py)
+    CONTEXT_TOKEN_BUDGET = CONTEXT_TOKEN_BUDGET
+
     def __init__(self, llm_client, model, max_steps=40, phone=None, update_every=3, kill_event=None,
                  fallback_client=None, fallback_model=None):
         self.client = llm_client
@@ -230,6 +264,183 @@ class BaseAgent(ABC):
         """Called when agent calls stuck(). Override for cleanup."""
         pass
 
+    def tool_resources(self, name: str, inp: dict):
+        """Resources a tool call touches, or None if it must run alone.
+        Override for input-aware declarations."""
+        return self.TOOL_RESOURCES.get(name)
+
+    # ── Concurrent tool calls within a step ──
+
+    @staticmethod
+    def _planned_dispatches(tool_blocks, effective_cap, hard_cap):
+        """The tool_use blocks the step loop will dispatch, in order.
+
+        Mirrors the loop's per-step cap rules and stops at the first
+        done/stuck, since nothing after a terminal call may run early.
+        """
+        planned = []
+        for block in tool_blocks:
+            if block.name in ("done", "stuck"):
+                break
+            is_verify = block.name in ("look", "read", "url", "screenshot")
+            if (not is_verify and len(planned) >= effective_cap) or len(planned) >= hard_cap + 1:
+                continue
+            planned.append(block)
+        return planned
+
+    def _prefetch_tools(self, blocks):
+        """Run a step's independent tool calls concurrently.
+
+        Each call waits only for earlier calls it conflicts with. Returns
+        {tool_use_id: Future}; the step loop takes results from these in
+        the original order, so logging, callbacks and loop detection stay
+        deterministic. Returns {} when nothing can overlap, and the loop
+        then dispatches inline exactly as before.
+
+        Nothing is started once the kill event is set, and no more calls
+        than the deployment's remaining tool-call budget; the loop answers
+        the rest as SKIPPED.
+        """
+        cap = getattr(getattr(self._kill_event, "limits", None), "max_tool_calls", None)
+        if cap is not None:
+            blocks = blocks[:max(0, cap - self._kill_event.usage.tool_calls)]
+        if len(blocks) < 2 or not self.TOOL_RESOURCES:
+            return {}
+        declared = [self.tool_resources(b.name, b.input) for b in blocks]
+        deps = [{j for j in range(i)
+                 if declared[i] is None or declared[j] is None
+                 or resources_conflict(declared[i], declared[j])}
+                for i in range(len(blocks))]
+        if all(len(deps[i]) == i for i in range(len(blocks))):
+            return {}
+
+        pool = _get_tool_pool()
+        futures = {}
+        pending = {i: set(d) for i, d in enumerate(deps)}
+        running = {}
+        peak = 0
+        start = time.time()
+        while pending or running:
+            for i in [i for i, d in pending.items() if not d]:
+                if len(running) >= self.MAX_CONCURRENT_TOOLS:
+                    break
+                if self._kill_event is not None and self._kill_event.is_set():
+                    pending.clear()
+                    break
+                del pending[i]
+                fut = pool.submit(self._run_tool, blocks[i].name, blocks[i].input)
+                futures[blocks[i].id] = fut
+                running[fut] = i
+            peak = max(peak, len(running))
+            done, _ = futures_wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                i = running.pop(fut)
+                for d in pending.values():
+                    d.discard(i)
+        logger.info(f"  ⚡ [{self.agent_name}] Ran {len(blocks)} tools with up to {peak} in parallel "
+                    f"({time.time() - start:.2f}s)")
+        return futures
+
+    def _call_llm(self, system, tools, messages, tool_choice):
+        """One LLM call through the shared provider circuit breakers.
+
+        Providers are tried in preference order (primary, then fallback).
+        Any whose breaker is open is skipped without a network call, so a
+        provider that another agent just found browning out costs nothing.
+        The order is adjusted for latency by provider_health.route().
+
+        Retries on the same provider: tool_use_failed is retried at once,
+        since it's a bad generation rather than a sick provider. A 429/5xx
+        is retried after a short kill-aware backoff, only when there's
+        nowhere else to go, and only until its breaker trips.
+
+        Returns (response, last_error); response is None if nothing answered.
+        """
+        candidates = [(self.client, self.model, "primary")]
+        if self._fallback_client and self._fallback_model:
+            candidates.append((self._fallback_client, self._fallback_model, "fallback"))
+            if self._using_fallback:    # Failed over earlier in this run — stay there first
+                candidates.reverse()
+        last_err = None
+
+        for _round in range(2):
+            routed = provider_health.route(candidates)
+            if not routed:
+                wait = provider_health.retry_in(candidates)
+                last_err = last_err or CircuitOpenError(
+                    provider_health.breaker(self.client, self.model).key, wait)
+                if _round or wait > MAX_PROVIDER_WAIT:
+                    break
+                logger.warning(f"  ⏸️ [{self.agent_name}] All providers cooling down — waiting {wait:.1f}s")
+                if self._pause(wait):
+                    break
+                continue
+
+            for position, (_cli, _mdl, _label) in enumerate(routed):
+                last_resort = position == len(routed) - 1
+                kwargs = {"max_retries": 1} if isinstance(_cli, LLMClient) else {}
+                for _api_try in range(3):
+                    try:
+                        response = provider_health.call(_cli, _mdl, lambda: _cli.create(
+                            model=_mdl,
+                            max_tokens=4096,
+                            system=system,
+                            tools=tools,
+                            messages=messages,
+                            tool_choice=tool_choice,
+                            **kwargs,
+                        ))
+                    except CircuitOpenError as e:
+                        logger.info(f"    ⏭️ [{self.agent_name}] Skipping {_label}: {e}")
+                        last_err = last_err or e
+                        break
+                    except Exception as e:
+                        last_err = e
+                        kind = classify_error(e)
+                        if kind == "tool_use_failed":
+                            logger.warning(f"    ⟳ Retrying LLM call ({_api_try + 2}/3) [{_label}]...")
+                            continue
+                        if kind in ("rate_limit", "server") and last_resort and _api_try < 2:
+                            logger.warning(f"    ⟳ Retrying LLM call ({_api_try + 2}/3) [{_label}] after {kind}...")
+                            if self._pause(1.0 * (_api_try + 1)):
+                                return None, e
+                            continue
+                        if kind == "fatal":
+                            logger.warning(f"  💀 [{self.agent_name}] {_label} provider dead: {str(e)[:150]}")
+                        break   # Next provider
+                    else:
+                        self._charge("charge_llm", response)
+                        if _label == "fallback" and not self._using_fallback:
+                            self._using_fallback = True
+                            logger.info(f"  🔄 [{self.agent_name}] Switched to fallback provider")
+                            event_bus.emit("agent_failover", {
+                                "agent": self.agent_name,
+                                "reason": str(last_err)[:200] if last_err else "primary failed",
+                            })
+                        return response, last_err
+            break
+        return None, last_err
+
+    def _pause(self, seconds):
+        """Sleep that the kill switch cuts short. Returns True if killed."""
+        if self._kill_event is None:
+            time.sleep(seconds)
+            return False
+        return self._kill_event.wait(seconds) or self._kill_event.is_set()
+
+    def _charge(self, meter, arg):
+        """Charge an LLM or tool call to the deployment token, if the
+        kill event is one (see agents/deployment.py)."""
+        charge = getattr(self._kill_event, meter, None)
+        if charge is not None:
+            charge(arg)
+
+    def _run_tool(self, name, inp):
+        """Dispatch one tool call; recall_result is answered from working memory."""
+        if name == "recall_result":
+            return self.working_memory.recall(inp.get("ref", ""))
+        return self._dispatch(name, inp)
+
     @property
     def _loop_detection_window(self) -> int:
         """How many step-patterns to check for repetition. Override for agents with naturally repetitive patterns (e.g. browser: click→wait→look)."""
@@ -272,9 +483,10 @@ class BaseAgent(ABC):
 
     # ── Core agent loop ──
 
-    def _notify(self, msg):
-        """Send iMessage progress if phone is configured."""
-        _send_progress(self.phone, msg)
+    def _notify(self, msg, progress=False):
+        """Queue an iMessage update if phone is configured. Periodic
+        step updates pass progress=True so a backlog collapses to the latest."""
+        _send_progress(self.phone, msg, key=f"{self.agent_name}:{id(self)}", progress=progress)
 
     def run(self, task, context=None):
         """
@@ -305,6 +517,7 @@ class BaseAgent(ABC):
             user_content += f"\n\n## Additional Context from Brain\n{context}"
 
         messages = [{"role": "user", "content": user_content}]
+        self.working_memory = WorkingMemory(token_budget=self.CONTEXT_TOKEN_BUDGET)
 
         # Text-only loop detection
         _last_text_hash = None
@@ -364,6 +577,16 @@ class BaseAgent(ABC):
 
             # ── Kill switch check — abort immediately ──
             if self._kill_event and self._kill_event.is_set():
+                stop_reason = getattr(self._kill_event, "reason", "")
+                if stop_reason:     # Deployment limit: wall time, tokens or tool calls
+                    logger.warning(f"  ⏰ {self.agent_name} stopped at step {step}: {stop_reason}")
+                    return {
+                        "success": False,
+                        "content": f"{self.agent_name} stopped at step {step}: {stop_reason}.",
+                        "steps": step,
+                        "stuck": True,
+                        "stuck_reason": stop_reason,
+                    }
                 msg = f"{self.agent_name} killed by user at step {step}."
                 logger.warning(f"  \U0001f6d1 {msg}")
                 return {
@@ -374,12 +597,6 @@ class BaseAgent(ABC):
                     "stuck_reason": "Killed by user",
                 }
 
-            # ── Context window management ──
-            # After many steps, trim old tool results to prevent context overflow.
-            # Keep the first message (task), last 6 messages (recent context), and
-            # truncate tool result contents in the middle to summaries.
-            _MAX_MESSAGES_BEFORE_TRIM = 20  # ~10 steps × 2 messages each
-
             # ── Browser agent step countdown — create urgency ──
             is_browser_agent = "browser" in self.agent_name.lower()
             remaining = self.max_steps - step
@@ -394,24 +611,13 @@ class BaseAgent(ABC):
                     f"If you've been clicking around without progress, try a DIFFERENT approach."
                 )})
 
-            if len(messages) > _MAX_MESSAGES_BEFORE_TRIM:
-                # Keep first message (original task) and last 6 (3 recent steps)
-                # Truncate tool results in the middle, but PRESERVE note results
-                for i in range(1, len(messages) - 6):
-                    msg = messages[i]
-                    if msg.get("role") == "user" and isinstance(msg.get("content"), list):
-                        # This is a tool_results list — truncate each result's content
-                        for tr in msg["content"]:
-                            if isinstance(tr, dict) and tr.get("type") == "tool_result":
-                                content = tr.get("content", "")
-                                if isinstance(content, str) and len(content) > 500:
-                                    # Preserve note results (they contain the agent's findings)
-                                    is_note = ("VERIFIED" in content or "HIGH" in content
-                                               or "MEDIUM" in content or "NOTE" in content
-                                               or "notes |" in content)
-                                    if is_note:
-                                        continue  # Don't truncate note results
-                                    tr["content"] = content[:500] + "... [truncated — data already processed]"
+            # ── Context window management ──
+            # Over budget, old raw tool results are compacted: their key facts
+            # move to the Working Notes block and the full text stays
+            # recallable by ref.
+            evicted = self.working_memory.compact(messages, step, focus=task)
+            if evicted:
+                logger.info(f"  🗜️ [{self.agent_name}] Compacted {evicted} old tool result(s) into working notes")
 
             # ── Inject session learnings at key intervals ──
             # After enough attempts, remind the agent what it's learned
@@ -420,67 +626,18 @@ class BaseAgent(ABC):
                 if session_ctx:
                     messages.append({"role": "user", "content": f"## 📝 Session Learnings (what you've discovered so far)\n{session_ctx}"})
 
-            # LLM call with retry for transient Groq errors
-            response = None
-            last_err = None
+            # LLM call — provider health decides where it goes (see _call_llm)
             # ALWAYS force tool_choice=required for Groq/Llama
             # With "auto", Llama alternates between tool_use and text-only, wasting steps.
             # With "required", it must pick a tool each step — including done() when finished.
             # This is safe because done() and stuck() are in the tool list.
             force_tool = "required"
-            logger.info(f"  🔧 [{self.agent_name}] tool_choice={force_tool}, step={step}, dispatches={_real_tool_dispatches}")
-
-            # Try primary client first, then fallback if primary fails hard
-            _clients_to_try = [(self.client, self.model, "primary")]
-            if self._fallback_client and self._fallback_model:
-                _clients_to_try.append((self._fallback_client, self._fallback_model, "fallback"))
-            # If already using fallback (switched earlier in this run), put fallback first
-            if self._using_fallback:
-                _clients_to_try = [(self._fallback_client, self._fallback_model, "fallback")]
-
-            for _cli, _mdl, _label in _clients_to_try:
-                response = None
-                last_err = None
-                for _api_try in range(3):
-                    try:
-                        response = _cli.create(
-                            model=_mdl,
-                            max_tokens=4096,
-                            system=self.system_prompt,
-                            tools=self.tools,
-                            messages=messages,
-                            tool_choice=force_tool,
-                        )
-                        break
-                    except Exception as e:
-                        last_err = e
-                        err_str = str(e).lower()
-                        # Transient errors — retry with same client
-                        if "tool_use_failed" in err_str or "rate_limit" in err_str:
-                            import time as _t
-                            _t.sleep(1.0 * (_api_try + 1))
-                            logger.warning(f"    ⟳ Retrying LLM call ({_api_try + 2}/3) [{_label}]...")
-                            continue
-                        # Non-transient: spend limit, quota, billing, permission — try fallback
-                        _fatal_markers = ("spend_limit", "spend limit", "spend alert",
-                                          "quota", "billing", "blocked", "suspended",
-                                          "api key expired", "permission_denied",
-                                          "insufficient_quota", "account")
-                        if any(m in err_str for m in _fatal_markers):
-                            logger.warning(f"  💀 [{self.agent_name}] {_label} provider dead: {str(last_err)[:150]}")
-                            break  # Break retry loop, fall through to next client
-                        break  # Other non-transient error, stop retrying
-
-                if response is not None:
-                    # If we succeeded on fallback, remember for remaining steps
-                    if _label == "fallback" and not self._using_fallback:
-                        self._using_fallback = True
-                        logger.info(f"  🔄 [{self.agent_name}] Switched to fallback provider for remaining steps")
-                        event_bus.emit("agent_failover", {
-                            "agent": self.agent_name,
-                            "reason": str(last_err)[:200] if last_err else "primary failed",
-                        })
-                    break  # Got a response, proceed
+            _system = self.system_prompt + self.working_memory.notes_block()
+            _tools = self.tools + [TOOL_RECALL_RESULT] if self.working_memory.has_evicted else self.tools
+            _sent_tokens = self.working_memory.record_request(_system, messages)
+            logger.info(f"  🔧 [{self.agent_name}] tool_choice={force_tool}, step={step}, dispatches={_real_tool_dispatches}, context≈{_sent_tokens} tokens")
+
+            response, last_err = self._call_llm(_system, _tools, messages, force_tool)
 
             if response is None:
                 err = f"API error: {last_err}"
@@ -531,7 +688,12 @@ class BaseAgent(ABC):
                 if last_tool in _verification_tools:
                     # We'll skip earlier non-essential tools to keep the verify step
                     _effective_cap = _MAX_PARALLEL_TOOLS - 1  # Reserve 1 slot for verification
-                    
+
+            # Independent calls (per TOOL_RESOURCES) start now, concurrently;
+            # the loop below still handles every block in order
+            _prefetched = self._prefetch_tools(
+                self._planned_dispatches(_tool_blocks, _effective_cap, _MAX_PARALLEL_TOOLS))
+
             for block in assistant_content:
                 if block.type == "text" and block.text.strip():
                     logger.debug(f"    💭 {block.text[:200]}")
@@ -707,7 +869,16 @@ class BaseAgent(ABC):
                     # ── Regular tool: dispatch ──
                     inp_short = json.dumps(inp)[:120]
                     logger.info(f"    🔧 {name}({inp_short})")
-                    result = self._dispatch(name, inp)
+                    if tid in _prefetched:
+                        result = _prefetched.pop(tid).result()
+                        self._charge("charge_tool", name)
+                    elif self._kill_event and self._kill_event.is_set():
+                        # Stopped mid-step: answer the call without running it
+                        result = f"SKIPPED: agent stopped ({getattr(self._kill_event, 'reason', '') or 'killed'})."
+                    else:
+                        result = self._run_tool(name, inp)
+                        self._charge("charge_tool", name)
+                    self.working_memory.track(tid, step, name, inp)
                     _real_tool_dispatches += 1
                     _tool_use_count_this_step += 1
 
@@ -784,7 +955,7 @@ class BaseAgent(ABC):
                     # Periodic progress update
                     if step % self.update_every == 0:
                         short = result_str[:200] + ("..." if len(result_str) > 200 else "")
-                        self._notify(f"{self.agent_emoji} Step {step}: {name}\n→ {short}")
+                        self._notify(f"{self.agent_emoji} Step {step}: {name}\n→ {short}", progress=True)
 
             # Log skipped tools
             if _skipped_tools:
@@ -10,10 +10,21 @@
 ╚══════════════════════════════════════════════════════════════╝
 """
 
+import os
+import json
 import time
+import logging
 import threading
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from collections import deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger("TARS")
+
+MAX_MESSAGES = 500          # Messages kept in memory; older ones spill to disk
+SPILL_BATCH = 50            # Messages evicted per spill, written in one append
+DEFAULT_SPILL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "memory", "agent_comms_archive.jsonl")
 
 
 @dataclass
@@ -25,6 +36,7 @@ class AgentMessage:
     msg_type: str = "info"       # info, request, result, handoff, scratchpad
     timestamp: float = field(default_factory=time.time)
     metadata: Dict = field(default_factory=dict)
+    seq: int = 0                 # Position in the log, assigned by send()
 
 
 @dataclass
@@ -35,6 +47,7 @@ class ScratchpadEntry:
     value: Any                   # The actual data (dict, list, str, etc.)
     source_agent: str            # Who wrote it
     timestamp: float = field(default_factory=time.time)
+    version: int = 1             # Bumped on every write to this key
 
 
 class AgentComms:
@@ -46,13 +59,30 @@ class AgentComms:
     v2: Includes a structured scratchpad where agents can read/write
     typed data (selectors, URLs, extracted facts, error context) so
     downstream agents don't have to re-discover information.
+
+    v3: Safe to use from concurrent agents. The message log is indexed
+    by agent and by type, and holds at most max_messages; older ones
+    are appended to spill_path in batches. Scratchpad entries are
+    versioned and indexed by data_type, so a reader can block in
+    wait_for_scratchpad() until a key changes instead of polling.
     """
 
-    def __init__(self):
-        self._messages: List[AgentMessage] = []
+    def __init__(self, max_messages: int = MAX_MESSAGES, spill_path: Optional[str] = None):
+        self.max_messages = max_messages
+        self.spill_path = spill_path
+        self._lock = threading.Lock()                    # Message log, indexes, handoffs
+        self._messages: Deque[AgentMessage] = deque()
+        self._by_agent: Dict[str, Deque[AgentMessage]] = {}  # sender or recipient → messages
+        self._by_type: Dict[str, Deque[AgentMessage]] = {}   # msg_type → messages
+        self._seq = 0
+        self._spilled = 0
+        self._spill_batch = min(SPILL_BATCH, max(1, max_messages // 10))
+        self._spill_lock = threading.Lock()
         self._handoff_context: Dict[str, str] = {}  # agent → context from prev agent
         self._scratchpad: Dict[str, ScratchpadEntry] = {}  # key → entry
+        self._scratchpad_by_type: Dict[str, Dict[str, None]] = {}  # data_type → keys (ordered)
         self._scratchpad_lock = threading.Lock()
+        self._scratchpad_changed = threading.Condition(self._scratchpad_lock)
 
     def send(self, from_agent: str, to_agent: str, content: str,
              msg_type: str = "info", metadata: Dict = None) -> AgentMessage:
@@ -64,14 +94,75 @@ class AgentComms:
             msg_type=msg_type,
             metadata=metadata or {},
         )
-        self._messages.append(msg)
+        with self._lock:
+            self._seq += 1
+            msg.seq = self._seq
+            self._messages.append(msg)
+            for agent in {from_agent, to_agent}:
+                self._by_agent.setdefault(agent, deque()).append(msg)
+            self._by_type.setdefault(msg_type, deque()).append(msg)
+            evicted = self._evict_locked() if len(self._messages) > self.max_messages else []
+        if evicted:
+            self._spill(evicted)
         return msg
 
+    def _evict_locked(self) -> List[AgentMessage]:
+        """Drop the oldest batch of messages from the log and its indexes."""
+        evicted = []
+        while len(self._messages) > self.max_messages - self._spill_batch:
+            msg = self._messages.popleft()
+            # Indexes are append-ordered too, so the oldest message is at their front
+            for index, name in ((self._by_agent, msg.from_agent), (self._by_agent, msg.to_agent),
+                                (self._by_type, msg.msg_type)):
+                bucket = index.get(name)
+                if bucket and bucket[0] is msg:
+                    bucket.popleft()
+                    if not bucket:
+                        del index[name]
+            evicted.append(msg)
+        self._spilled += len(evicted)
+        return evicted
+
+    def _spill(self, messages: List[AgentMessage]):
+        """Append evicted messages to the archive file, if there is one."""
+        if not self.spill_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            lines = "".join(json.dumps(asdict(m), default=str) + "\n" for m in messages)
+            with self._spill_lock:
+                with open(self.spill_path, "a") as f:
+                    f.write(lines)
+        except Exception as e:
+            logger.debug(f"Agent comms spill failed: {e}")
+
+    def read_archive(self, agent: str = None, msg_type: str = None,
+                     limit: int = 50) -> List[AgentMessage]:
+        """Most recent spilled messages from the archive file, optionally filtered."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        found: Deque[AgentMessage] = deque(maxlen=limit)
+        with open(self.spill_path) as f:
+            for line in f:
+                try:
+                    msg = AgentMessage(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                if agent and agent not in (msg.from_agent, msg.to_agent):
+                    continue
+                if msg_type and msg.msg_type != msg_type:
+                    continue
+                found.append(msg)
+        return list(found)
+
     # ─── Structured Scratchpad ───────────────────────
 
     def write_scratchpad(self, key: str, value: Any, data_type: str,
-                         source_agent: str) -> None:
+                         source_agent: str) -> int:
         """Write structured data to the shared scratchpad.
+
+        Returns the key's new version and wakes any wait_for_scratchpad()
+        callers waiting on it.
         
         Examples:
             write_scratchpad("login_selectors", {"email": "#email", "password": "#pass"},
@@ -79,17 +170,25 @@ class AgentComms:
             write_scratchpad("search_results", ["url1", "url2"], "urls", "research")
             write_scratchpad("api_key", "sk-...", "credentials", "coder")
         """
-        entry = ScratchpadEntry(
-            key=key,
-            data_type=data_type,
-            value=value,
-            source_agent=source_agent,
-        )
         with self._scratchpad_lock:
+            previous = self._scratchpad.get(key)
+            entry = ScratchpadEntry(
+                key=key,
+                data_type=data_type,
+                value=value,
+                source_agent=source_agent,
+                version=previous.version + 1 if previous else 1,
+            )
+            if previous and previous.data_type != data_type:
+                self._scratchpad_by_type.get(previous.data_type, {}).pop(key, None)
             self._scratchpad[key] = entry
+            self._scratchpad_by_type.setdefault(data_type, {})[key] = None
+            self._scratchpad_changed.notify_all()
 
         self.send(source_agent, "scratchpad", str(value)[:200],
-                  msg_type="scratchpad", metadata={"key": key, "data_type": data_type})
+                  msg_type="scratchpad", metadata={"key": key, "data_type": data_type,
+                                                   "version": entry.version})
+        return entry.version
 
     def read_scratchpad(self, key: str) -> Optional[Any]:
         """Read a value from the scratchpad by key. Returns None if not found."""
@@ -97,6 +196,26 @@ class AgentComms:
             entry = self._scratchpad.get(key)
             return entry.value if entry else None
 
+    def scratchpad_version(self, key: str) -> int:
+        """Current version of a key (0 if it has never been written)."""
+        with self._scratchpad_lock:
+            entry = self._scratchpad.get(key)
+            return entry.version if entry else 0
+
+    def wait_for_scratchpad(self, key: str, after_version: int = 0,
+                            timeout: Optional[float] = None) -> Optional[ScratchpadEntry]:
+        """Block until key has a version newer than after_version.
+
+        Returns the entry, or None on timeout. after_version=0 waits for
+        the key to exist at all.
+        """
+        with self._scratchpad_changed:
+            ready = self._scratchpad_changed.wait_for(
+                lambda: key in self._scratchpad and self._scratchpad[key].version > after_version,
+                timeout=timeout,
+            )
+            return self._scratchpad[key] if ready else None
+
     def read_scratchpad_by_type(self, data_type: str) -> Dict[str, Any]:
         """Read all scratchpad entries of a given type.
         
@@ -104,8 +223,8 @@ class AgentComms:
         """
         with self._scratchpad_lock:
             return {
-                k: v.value for k, v in self._scratchpad.items()
-                if v.data_type == data_type
+                k: self._scratchpad[k].value
+                for k in self._scratchpad_by_type.get(data_type, {})
             }
 
     def get_scratchpad_summary(self) -> str:
@@ -143,7 +262,8 @@ class AgentComms:
         
         handoff_text += "=== END HANDOFF ==="
 
-        self._handoff_context[to_agent] = handoff_text
+        with self._lock:
+            self._handoff_context[to_agent] = handoff_text
 
         self.send(
             from_agent=from_agent,
@@ -160,7 +280,8 @@ class AgentComms:
         
         v2: Always includes scratchpad summary if available.
         """
-        ctx = self._handoff_context.pop(agent_name, None)
+        with self._lock:
+            ctx = self._handoff_context.pop(agent_name, None)
         
         # Even without an explicit handoff, include scratchpad if populated
         if not ctx:
@@ -171,32 +292,63 @@ class AgentComms:
 
     def get_messages(self, agent: str = None, msg_type: str = None,
                      limit: int = 20) -> List[AgentMessage]:
-        """Get recent messages, optionally filtered."""
-        msgs = self._messages
-        if agent:
-            msgs = [m for m in msgs if m.from_agent == agent or m.to_agent == agent]
-        if msg_type:
-            msgs = [m for m in msgs if m.msg_type == msg_type]
-        return msgs[-limit:]
+        """Get recent messages, optionally filtered.
+
+        Reads the smaller matching index newest-first and stops after
+        limit matches, so cost doesn't grow with the whole log.
+        """
+        with self._lock:
+            candidates = [self._messages]
+            if agent:
+                candidates.append(self._by_agent.get(agent, ()))
+            if msg_type:
+                candidates.append(self._by_type.get(msg_type, ()))
+            source = min(candidates, key=len)
+            found = []
+            for m in reversed(source):
+                if len(found) >= limit:
+                    break
+                if agent and agent not in (m.from_agent, m.to_agent):
+                    continue
+                if msg_type and m.msg_type != msg_type:
+                    continue
+                found.append(m)
+        found.reverse()
+        return found
 
     def get_conversation_log(self) -> str:
         """Get a formatted log of all agent communications."""
-        if not self._messages:
+        recent = self.get_messages(limit=30)  # Last 30 messages
+        if not recent:
             return "No inter-agent communications yet."
 
         lines = ["=== Agent Communication Log ==="]
-        for msg in self._messages[-30:]:  # Last 30 messages
+        for msg in recent:
             ts = time.strftime("%H:%M:%S", time.localtime(msg.timestamp))
             lines.append(f"[{ts}] {msg.from_agent} → {msg.to_agent} ({msg.msg_type}): {msg.content[:200]}")
         return "\n".join(lines)
 
+    def stats(self) -> dict:
+        with self._lock:
+            messages = {
+                "messages": len(self._messages),
+                "spilled": self._spilled,
+                "by_type": {t: len(q) for t, q in self._by_type.items()},
+            }
+        with self._scratchpad_lock:
+            return {**messages, "scratchpad_keys": len(self._scratchpad)}
+
     def clear(self):
         """Clear all messages, handoff context, and scratchpad."""
-        self._messages.clear()
-        self._handoff_context.clear()
+        with self._lock:
+            self._messages.clear()
+            self._by_agent.clear()
+            self._by_type.clear()
+            self._handoff_context.clear()
         with self._scratchpad_lock:
             self._scratchpad.clear()
+            self._scratchpad_by_type.clear()
 
 
 # Global singleton
-agent_comms = AgentComms()
+agent_comms = AgentComms(spill_path=DEFAULT_SPILL_PATH)
@@ -0,0 +1,311 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Agent Deployment Runtime      ║
+╚══════════════════════════════════════════╝
+
+Runs specialist agents on one long-lived pool, with a cancellation
+token and resource accounting for each deployment.
+
+  - The DeploymentToken is the agent's kill event. BaseAgent already
+    checks it at every step boundary, and it reads as set once the
+    task is killed, the wall-time deadline passes, or the token /
+    tool-call budget runs out. The token records the reason.
+  - BaseAgent charges every LLM call (input/output tokens) and tool
+    call to the token. Going over a hard limit cancels the
+    deployment: no further LLM or tool call is made. The agent
+    returns at its next step boundary.
+  - When the deadline passes, the caller cancels the token and
+    allows CANCEL_GRACE_SECONDS for the agent to wind down. Python
+    can't kill a thread, so an agent stuck inside one long call is
+    tracked as "cancelling" until that call returns. It can't start
+    another step, so it is never left running unaccounted for.
+"""
+
+import time
+import logging
+import threading
+import itertools
+from dataclasses import dataclass, field, asdict, replace
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+
+from utils.task_context import TaskKillEvent
+
+logger = logging.getLogger("TARS")
+
+DEPLOY_WORKERS = 8              # Agents running at once across all tasks
+CANCEL_GRACE_SECONDS = 30.0     # After a hard stop, wait this long for the agent to return
+
+
+@dataclass(frozen=True)
+class DeploymentLimits:
+    """Hard limits for one deployment. None means unlimited."""
+    wall_seconds: float = 300.0
+    max_tokens: int = 600_000       # LLM input + output tokens
+    max_tool_calls: int = 150
+
+
+DEFAULT_LIMITS = DeploymentLimits()
+AGENT_LIMITS = {
+    # Autonomous PRD-to-production sessions run for up to an hour
+    "dev": DeploymentLimits(wall_seconds=3600.0, max_tokens=4_000_000, max_tool_calls=800),
+}
+
+
+def limits_for(agent_type, **overrides):
+    """Limits for an agent type, with any field overridden."""
+    limits = AGENT_LIMITS.get(agent_type, DEFAULT_LIMITS)
+    return replace(limits, **overrides) if overrides else limits
+
+
+@dataclass
+class DeploymentUsage:
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tool_calls: int = 0
+    tools: dict = field(default_factory=dict)   # tool name → calls
+
+    @property
+    def tokens(self):
+        return self.input_tokens + self.output_tokens
+
+
+class DeploymentToken(TaskKillEvent):
+    """Cancellation token and resource meter for one agent deployment.
+
+    is_set() is true once the parent (task) kill switch is set, the
+    token was cancelled, or the wall-time deadline has passed.
+    """
+
+    def __init__(self, parent=None, limits=DEFAULT_LIMITS, clock=time.monotonic):
+        super().__init__(parent)
+        self.limits = limits
+        self.usage = DeploymentUsage()
+        self.reason = ""            # Why the deployment was stopped, if it was
+        self._clock = clock
+        self.started_at = clock()
+        self.finished_at = None
+        self._meter_lock = threading.Lock()
+
+    # ─── Cancellation ────────────────────────────────
+
+    def cancel(self, reason="Cancelled"):
+        """Stop the deployment. The first reason given is kept."""
+        with self._meter_lock:
+            if not self.reason:
+                self.reason = reason
+        self.set()
+
+    def remaining(self):
+        """Seconds left before the wall-time deadline (None if unlimited)."""
+        if self.limits.wall_seconds is None:
+            return None
+        return max(0.0, self.started_at + self.limits.wall_seconds - self._clock())
+
+    def is_set(self):
+        if super().is_set():
+            return True
+        if self.remaining() == 0:
+            self.cancel(f"Timed out after {self.limits.wall_seconds:g}s")
+            return True
+        return False
+
+    def wait(self, timeout=None):
+        """Like Event.wait, but also wakes at the wall-time deadline or a parent kill."""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        super().wait(timeout)
+        return self.is_set()
+
+    # ─── Accounting ──────────────────────────────────
+
+    def charge_llm(self, response):
+        """Record one LLM call's token usage from response.usage."""
+        usage = getattr(response, "usage", None)
+        with self._meter_lock:
+            self.usage.llm_calls += 1
+            self.usage.input_tokens += getattr(usage, "input_tokens", 0) or 0
+            self.usage.output_tokens += getattr(usage, "output_tokens", 0) or 0
+            used, cap = self.usage.tokens, self.limits.max_tokens
+        if cap is not None and used >= cap:
+            self.cancel(f"Token budget exhausted ({used:,}/{cap:,} tokens)")
+
+    def charge_tool(self, name):
+        """Record one tool call."""
+        with self._meter_lock:
+            self.usage.tool_calls += 1
+            self.usage.tools[name] = self.usage.tools.get(name, 0) + 1
+            used, cap = self.usage.tool_calls, self.limits.max_tool_calls
+        if cap is not None and used >= cap:
+            self.cancel(f"Tool-call budget exhausted ({used}/{cap} calls)")
+
+    def finish(self):
+        self.finished_at = self._clock()
+
+    def snapshot(self):
+        with self._meter_lock:
+            usage = asdict(self.usage)
+        end = self.finished_at if self.finished_at is not None else self._clock()
+        return {
+            **usage,
+            "tokens": usage["input_tokens"] + usage["output_tokens"],
+            "wall_seconds": round(end - self.started_at, 2),
+            "stopped": self.reason,
+            "limits": asdict(self.limits),
+        }
+
+
+@dataclass
+class _Deployment:
+    id: int
+    agent_type: str
+    task: str
+    token: DeploymentToken
+    future: object = None
+    cancelling: bool = False
+
+
+class DeploymentPool:
+    """Long-lived pool that runs agent deployments under their tokens."""
+
+    def __init__(self, max_workers=DEPLOY_WORKERS, grace_seconds=CANCEL_GRACE_SECONDS):
+        self.max_workers = max_workers
+        self.grace_seconds = grace_seconds
+        self._pool = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._active = {}           # id → _Deployment, until its agent thread exits
+        self._totals = {"deployed": 0, "completed": 0, "timed_out": 0, "budget_stopped": 0,
+                        "crashed": 0, "tokens": 0, "tool_calls": 0}
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tars-agent")
+            return self._pool
+
+    def token(self, agent_type, parent=None, **overrides):
+        """A fresh token for an agent type's limits, under a task's kill switch."""
+        return DeploymentToken(parent, limits_for(agent_type, **overrides))
+
+    # ─── Running ─────────────────────────────────────
+
+    def run(self, agent, task, context=None, token=None, agent_type=""):
+        """Run agent.run(task, context) on the pool and return its result dict.
+
+        The agent must have been built with token as its kill_event. The
+        result carries a "usage" snapshot. A deployment that overruns its
+        wall time comes back as stuck with stuck_reason "Timed out after Ns".
+        """
+        token = token or getattr(agent, "_kill_event", None) or DeploymentToken()
+        dep = _Deployment(next(self._ids), agent_type or type(agent).__name__, task[:200], token)
+        with self._lock:
+            self._active[dep.id] = dep
+            self._totals["deployed"] += 1
+        dep.future = self._get_pool().submit(self._run_agent, dep, agent, task, context)
+
+        try:
+            result = self._wait(dep)
+        except Exception as e:
+            result = {
+                "success": False,
+                "content": f"Agent crashed: {e}",
+                "steps": 0,
+                "stuck": True,
+                "stuck_reason": f"Agent exception: {e}",
+            }
+            logger.error(f"💥 {dep.agent_type} agent crashed: {e}")
+            self._count("crashed")
+
+        if token.reason.startswith("Timed out"):
+            self._count("timed_out")
+        elif "budget exhausted" in token.reason:
+            self._count("budget_stopped")
+        result["usage"] = token.snapshot()
+        return result
+
+    def _wait(self, dep):
+        token = dep.token
+        try:
+            return dep.future.result(timeout=token.remaining())
+        except FuturesTimeout:
+            pass
+
+        # Deadline passed: stop it and give it the grace period to wind down
+        token.cancel(f"Timed out after {token.limits.wall_seconds:g}s")
+        if dep.future.cancel():         # Never got a worker
+            self._forget(dep)
+        else:
+            dep.cancelling = True
+            logger.warning(f"⏰ {dep.agent_type} agent hit its {token.limits.wall_seconds:g}s limit — cancelling")
+            try:
+                result = dep.future.result(timeout=self.grace_seconds)
+                result.setdefault("stuck_reason", token.reason)
+                return result
+            except FuturesTimeout:
+                logger.warning(f"⏰ {dep.agent_type} agent still inside a call {self.grace_seconds:.0f}s "
+                               f"after cancel — it will stop at its next step boundary")
+        return {
+            "success": False,
+            "content": (f"Agent timed out after {token.limits.wall_seconds:g}s. The task may be too complex "
+                        f"for a single agent deployment — try breaking it into smaller steps."),
+            "steps": 0,
+            "stuck": True,
+            "stuck_reason": token.reason,
+        }
+
+    def _run_agent(self, dep, agent, task, context):
+        try:
+            if dep.token.is_set():
+                return {
+                    "success": False,
+                    "content": f"{dep.agent_type} agent not started: {dep.token.reason or 'cancelled'}",
+                    "steps": 0,
+                    "stuck": bool(dep.token.reason),
+                    "stuck_reason": dep.token.reason or "Killed by user",
+                }
+            result = agent.run(task, context)
+            self._count("completed")
+            return result
+        finally:
+            dep.token.finish()
+            self._forget(dep)
+
+    def _forget(self, dep):
+        usage = dep.token.usage
+        with self._lock:
+            if self._active.pop(dep.id, None) is not None:
+                self._totals["tokens"] += usage.tokens
+                self._totals["tool_calls"] += usage.tool_calls
+
+    def _count(self, key):
+        with self._lock:
+            self._totals[key] += 1
+
+    # ─── Lifecycle ───────────────────────────────────
+
+    def cancel_all(self, reason="Shutting down"):
+        with self._lock:
+            active = list(self._active.values())
+        for dep in active:
+            dep.token.cancel(reason)
+        return len(active)
+
+    def active(self):
+        """In-flight deployments, including ones still winding down after cancel."""
+        with self._lock:
+            active = list(self._active.values())
+        return [{"id": d.id, "agent": d.agent_type, "task": d.task, "cancelling": d.cancelling,
+                 **d.token.snapshot()} for d in active]
+
+    def stats(self):
+        with self._lock:
+            totals = dict(self._totals)
+            cancelling = sum(1 for d in self._active.values() if d.cancelling)
+            running = len(self._active) - cancelling
+        return {**totals, "running": running, "cancelling": cancelling, "workers": self.max_workers}
+
+
+# Singleton — every task deploys through the same pool
+deployment_pool = DeploymentPool()
@@ -51,6 +51,7 @@ from hands.research_apis import (
     detect_domain, _score_url, ResearchCache,
 )
 import time as _time
+import threading
 import urllib.parse
 import urllib.request
 import json
@@ -723,6 +724,24 @@ class ResearchAgent(BaseAgent):
     citation system with evidence-weighted confidence.
     """
 
+    # Lookups and page reads share no agent state (CDP work is serialized by
+    # _browser_lock), so they may overlap within a step. Tools that touch
+    # the notebook declare what they read and write.
+    TOOL_RESOURCES = {
+        **{name: () for name in (
+            "web_search", "multi_search", "news_search", "wiki_search", "wiki_article",
+            "stock_quote", "finance_search", "academic_search", "arxiv_search",
+            "browse", "deep_read", "extract", "extract_table", "follow_links",
+            "cross_reference", "calculate", "convert", "date_calc",
+        )},
+        "fact_check": (("claims", "write"),),
+        "note": (("notes", "write"),),
+        "compare": (("comparisons", "write"),),
+        "research_plan": (("plan", "write"),),
+        "notes": (("notes", "read"), ("claims", "read"), ("comparisons", "read")),
+        "score_sources": (("notes", "read"), ("claims", "read")),
+    }
+
     def __init__(self, *args, config=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._notes = {}
@@ -736,6 +755,7 @@ class ResearchAgent(BaseAgent):
         self._cache_hits = 0
         self._browser_errors = 0
         self._browser_initialized = False
+        self._counter_lock = threading.Lock()   # Tools in one step may run concurrently
 
         # Config for API keys
         self._config = config or {}
@@ -844,6 +864,13 @@ class ResearchAgent(BaseAgent):
             self._browser_initialized = False
             return False
 
+    def _bump(self, counter):
+        """Increment a usage counter atomically and return its new value."""
+        with self._counter_lock:
+            value = getattr(self, counter) + 1
+            setattr(self, counter, value)
+            return value
+
     def _add_citation(self, url, title="", trust_score=50):
         """Add a source to the citation list. Returns citation number [N]."""
         # Check if already cited
@@ -939,18 +966,18 @@ class ResearchAgent(BaseAgent):
         Primary search: Serper API → Google CDP → DuckDuckGo HTTP.
         API-first = no CAPTCHAs, structured data, knowledge graphs.
         """
-        self._search_count += 1
+        search_num = self._bump("_search_count")
 
         # Try Serper API first (most reliable)
         result = serper_search(query, self._serper_key, num_results)
         if result:
-            result += f"\n\n_Search #{self._search_count} via Serper API_"
+            result += f"\n\n_Search #{search_num} via Serper API_"
             return result
 
         # Fallback to DuckDuckGo HTTP
         result = duckduckgo_search(query, num_results)
         if result:
-            result += f"\n\n_Search #{self._search_count} via DuckDuckGo_"
+            result += f"\n\n_Search #{search_num} via DuckDuckGo_"
             return result
 
         # Last resort: CDP browser
@@ -1056,17 +1083,17 @@ class ResearchAgent(BaseAgent):
 
     def _news_search(self, query, num_results=10):
         """Search latest news — Serper News API → Google News RSS."""
-        self._search_count += 1
+        search_num = self._bump("_search_count")
 
         # Try Serper news
         result = serper_news(query, self._serper_key, num_results)
         if result:
-            return result + f"\n\n_News search #{self._search_count} via Serper_"
+            return result + f"\n\n_News search #{search_num} via Serper_"
 
         # Fallback to Google News RSS
         result = google_news_rss(query, num_results)
         if result:
-            return result + f"\n\n_News search #{self._search_count} via Google News RSS_"
+            return result + f"\n\n_News search #{search_num} via Google News RSS_"
 
         # Last resort: web search with "news" prefix
         return self._web_search(f"{query} latest news", num_results)
@@ -1134,7 +1161,7 @@ class ResearchAgent(BaseAgent):
 
     def _browse(self, url, use_browser=False):
         """Read a web page — HTTP-first (fast), browser fallback for JS pages."""
-        self._pages_read += 1
+        page_num = self._bump("_pages_read")
 
         # Try HTTP first (faster, no browser overhead) unless forced
         if not use_browser:
@@ -1142,7 +1169,7 @@ class ResearchAgent(BaseAgent):
             if result and not result.startswith("ERROR:"):
                 score = _score_url(url)
                 self._sources_visited.append((url, "", score))
-                return result + f"\n\n_Page #{self._pages_read} via HTTP_"
+                return result + f"\n\n_Page #{page_num} via HTTP_"
 
         # Browser-based reading (for JS-rendered pages)
         if not self._ensure_browser():
@@ -1177,7 +1204,7 @@ class ResearchAgent(BaseAgent):
             if len(text) > 14000:
                 text = text[:14000] + "\n\n... [truncated — use deep_read for full content] ..."
 
-            return header + text + f"\n\n_Page #{self._pages_read} via Chrome CDP_"
+            return header + text + f"\n\n_Page #{page_num} via Chrome CDP_"
 
         except TimeoutError:
             with _browser_lock:
@@ -1191,7 +1218,7 @@ class ResearchAgent(BaseAgent):
 
     def _deep_read(self, url, max_scrolls=5):
         """Read a long page by scrolling — requires browser."""
-        self._pages_read += 1
+        self._bump("_pages_read")
         max_scrolls = min(max_scrolls, 10)
 
         if not self._ensure_browser():
@@ -1268,7 +1295,7 @@ class ResearchAgent(BaseAgent):
 
     def _extract(self, url, question):
         """Navigate to URL and extract specific info."""
-        self._pages_read += 1
+        self._bump("_pages_read")
 
         # Try HTTP first
         text = http_read_page(url, max_chars=15000)
@@ -1324,7 +1351,7 @@ class ResearchAgent(BaseAgent):
 
     def _extract_table(self, url, table_description):
         """Extract tabular data from a page — requires browser for JS tables."""
-        self._pages_read += 1
+        self._bump("_pages_read")
 
         if not self._ensure_browser():
             # Try HTTP and look for <table> tags
@@ -1474,7 +1501,7 @@ class ResearchAgent(BaseAgent):
                 # Read each linked page via HTTP (faster)
                 page_content = http_read_page(link["url"], max_chars=6000)
                 if page_content and not page_content.startswith("ERROR:"):
-                    self._pages_read += 1
+                    self._bump("_pages_read")
                     score = _score_url(link["url"])
                     self._sources_visited.append((link["url"], link["text"], score))
                     results.append(f"Trust: {score}/100")
@@ -1495,7 +1522,7 @@ class ResearchAgent(BaseAgent):
                             )
                             link_title = _js("document.title || ''") or ""
 
-                        self._pages_read += 1
+                        self._bump("_pages_read")
                         score = _score_url(link["url"], link_title)
                         self._sources_visited.append((link["url"], link_title, score))
                         results.append(f"Title: {link_title} | Trust: {score}/100")
@@ -1526,7 +1553,7 @@ class ResearchAgent(BaseAgent):
         Cross-reference a specific claim across multiple sources.
         Searches for the claim, reads top sources, and records evidence.
         """
-        self._search_count += 1
+        self._bump("_search_count")
 
         # Normalize claim for tracking
         claim_key = claim.strip().lower()[:200]
@@ -1575,7 +1602,7 @@ class ResearchAgent(BaseAgent):
 
     def _cross_reference(self, finding, original_source=""):
         """Check if a finding is confirmed by independent sources."""
-        self._search_count += 1
+        self._bump("_search_count")
 
         # Search for corroboration
         result = self._web_search(finding, 5)
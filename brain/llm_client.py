@@ -88,6 +88,24 @@ class LLMResponse:
 #  Tool Format Conversion
 # ─────────────────────────────────────────────
 
+# Converted schemas keyed by (format, ToolSubset.fingerprint). Only
+# fingerprinted subsets are cached — plain lists are converted per call.
+_converted_tools_cache = {}
+
+
+def _convert_tools_cached(fmt, tools, convert):
+    """Convert tools once per fingerprinted subset (see brain.tools.ToolSubset)."""
+    fingerprint = getattr(tools, "fingerprint", None)
+    if fingerprint is None:
+        return convert(tools)
+    key = (fmt, fingerprint)
+    converted = _converted_tools_cache.get(key)
+    if converted is None:
+        converted = convert(tools)
+        _converted_tools_cache[key] = converted
+    return converted
+
+
 def _anthropic_to_openai_tools(tools):
     """Convert Anthropic tool schemas to OpenAI function-calling format."""
     openai_tools = []
@@ -642,6 +660,7 @@ class OpenAIStreamWrapper:
                             "name": "",
                             "arguments": "",
                         }
+                        yield _ToolStartEvent()
                     if tc_delta.id:
                         self._collected_tool_calls[idx]["id"] = tc_delta.id
                     if tc_delta.function:
@@ -698,6 +717,16 @@ class _Delta:
         self.text = text
 
 
+class _ToolStartEvent:
+    """Mimics Anthropic's content_block_start event for a tool_use block."""
+    def __init__(self):
+        self.type = "content_block_start"
+        self.content_block = _ToolUseBlockStub()
+
+class _ToolUseBlockStub:
+    type = "tool_use"
+
+
 # ─────────────────────────────────────────────
 #  Gemini Native Stream Wrapper
 # ─────────────────────────────────────────────
@@ -755,6 +784,7 @@ class GeminiStreamWrapper:
                         "args": args,
                         "id": call_id,
                     })
+                    yield _ToolStartEvent()
                 elif part.text:
                     self._collected_text += part.text
                     yield _StreamEvent(part.text)
@@ -1037,7 +1067,7 @@ class LLMClient:
         exp = min(cap, base * (2 ** attempt))
         return random.uniform(0, exp)
 
-    def create(self, model, max_tokens, system, tools, messages, temperature=0, tool_choice=None):
+    def create(self, model, max_tokens, system, tools, messages, temperature=0, tool_choice=None, max_retries=5):
         """Create a completion (non-streaming). Returns normalized LLMResponse.
         
         Includes recovery logic for Groq/Llama tool_use_failed errors —
@@ -1051,6 +1081,8 @@ class LLMClient:
         
         temperature=0 by default for deterministic tool calls.
         tool_choice: "auto" (default), "required" (force tool use), or None.
+        max_retries: attempts per call. Agents pass 1 and leave retrying
+            and failover to brain.provider_health's circuit breakers.
         """
         if self._mode == "anthropic":
             resp = self._client.messages.create(
@@ -1064,7 +1096,7 @@ class LLMClient:
             return self._wrap_anthropic_response(resp)
         elif self._mode == "gemini":
             # ── Google GenAI SDK path ──
-            gemini_tools = _anthropic_to_gemini_tools(tools)
+            gemini_tools = _convert_tools_cached("gemini", tools, _anthropic_to_gemini_tools)
             gemini_contents = _convert_history_for_gemini(messages, system)
 
             config = _genai_types.GenerateContentConfig(
@@ -1076,7 +1108,6 @@ class LLMClient:
             if max_tokens:
                 config.max_output_tokens = max_tokens
 
-            max_retries = 5
             for attempt in range(1, max_retries + 1):
                 try:
                     resp = self._client.models.generate_content(
@@ -1104,10 +1135,9 @@ class LLMClient:
 
                     raise
         else:
-            openai_tools = _anthropic_to_openai_tools(tools)
+            openai_tools = _convert_tools_cached("openai", tools, _anthropic_to_openai_tools)
             openai_messages = _convert_history_for_openai(messages, system)
 
-            max_retries = 5
             for attempt in range(1, max_retries + 1):
                 try:
                     kwargs = {
@@ -1176,7 +1206,7 @@ class LLMClient:
             return AnthropicStreamWrapper(self._client, self._wrap_anthropic_response, **kwargs)
         elif self._mode == "gemini":
             # ── Google GenAI SDK streaming ──
-            gemini_tools = _anthropic_to_gemini_tools(tools)
+            gemini_tools = _convert_tools_cached("gemini", tools, _anthropic_to_gemini_tools)
             gemini_contents = _convert_history_for_gemini(messages, system)
 
             config = _genai_types.GenerateContentConfig(
@@ -1197,7 +1227,7 @@ class LLMClient:
                 config=config,
             )
         else:
-            openai_tools = _anthropic_to_openai_tools(tools)
+            openai_tools = _convert_tools_cached("openai", tools, _anthropic_to_openai_tools)
             openai_messages = _convert_history_for_openai(messages, system)
             kwargs = dict(
                 model=model,
@@ -14,15 +14,22 @@
 ║  processes them.                                             ║
 ║                                                              ║
 ║  Flow: iMessage → ingest() → [3s window] → batch → Brain    ║
+║                                                              ║
+║  One long-lived worker owns the merge deadline; the window   ║
+║  adapts — short for complete sentences, longer for fragments.║
 ╚══════════════════════════════════════════════════════════════╝
 """
 
 import re
 import time
+import logging
 import threading
+from collections import deque
 from dataclasses import dataclass, field
 from typing import List, Optional, Callable
 
+logger = logging.getLogger("TARS")
+
 
 # ─── Data Classes ────────────────────────────────────
 
@@ -117,18 +124,29 @@ ACKNOWLEDGMENT_PATTERNS = [
     r"^(👍|✅|🫡|💯|🤝|👌|🙏|💪|🔥)[\s]*$",
 ]
 
+# Fragment: message is obviously unfinished — more is coming
+_FRAGMENT_RE = re.compile(
+    r"(,|\.\.\.|…|:|-|\b(and|or|but|to|with|for|the|a|an|then|so|because|like))\s*$",
+    re.IGNORECASE,
+)
+# Complete: ends like a finished sentence
+_COMPLETE_RE = re.compile(r"[.!?)\"']\s*$")
+
 
 class MessageStreamParser:
     """
     Accumulates back-to-back iMessages and merges them intelligently.
     
-    When messages arrive within MERGE_WINDOW seconds of each other:
+    When messages arrive within the merge window of each other:
     - Corrections ("actually", "wait", "no") → replaces previous
     - Additions ("also", "and", "plus") → appends to previous
     - Separate tasks → queued individually but with shared context
     
-    After MERGE_WINDOW of silence, the batch is finalized and emitted
-    via the on_batch_ready callback.
+    After a window of silence, the batch is finalized and emitted via
+    the on_batch_ready callback. The window adapts per message:
+    MIN_MERGE_WINDOW for complete sentences, MAX_MERGE_WINDOW for
+    fragments, MERGE_WINDOW otherwise. A single worker thread sleeps
+    until the deadline and runs the callbacks.
     
     Usage:
         parser = MessageStreamParser(on_batch_ready=my_callback)
@@ -137,19 +155,30 @@ class MessageStreamParser:
         # 3s later → my_callback(MessageBatch(...merged_text="search flights to Tokyo"...))
     """
 
-    MERGE_WINDOW = 3.0  # Seconds to wait for more messages before emitting
+    MERGE_WINDOW = 3.0      # Seconds to wait for more messages before emitting
+    MIN_MERGE_WINDOW = 1.5  # Clearly complete message — emit sooner
+    MAX_MERGE_WINDOW = 5.0  # Fragment ("book a flight to", "and...") — wait longer
+    MAX_BATCH_AGE = 10.0    # Never hold a batch longer than this after its first message
 
-    def __init__(self, on_batch_ready: Callable[[MessageBatch], None]):
+    def __init__(self, on_batch_ready: Callable[[MessageBatch], None],
+                 clock: Callable[[], float] = None, start_worker: bool = True):
         self._buffer: List[ParsedMessage] = []
         self._lock = threading.Lock()
-        self._timer: Optional[threading.Timer] = None
+        self._cond = threading.Condition(self._lock)
         self._on_batch_ready = on_batch_ready
+        self._clock = clock or time.monotonic
+        self._deadline: Optional[float] = None   # When the current buffer is emitted
+        self._batch_started: Optional[float] = None
+        self._ready: deque = deque()             # Built batches awaiting delivery
+        self._auto_worker = start_worker
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
 
     def ingest(self, text: str, source: str = "imessage"):
         """
         Ingest a new message into the stream.
         
-        If no more messages arrive within MERGE_WINDOW seconds,
+        If no more messages arrive within the merge window,
         the accumulated batch is emitted via on_batch_ready.
         
         Acknowledgments with empty buffer are emitted immediately
@@ -167,57 +196,111 @@ class MessageStreamParser:
             source=source,
         )
 
-        with self._lock:
+        with self._cond:
             self._buffer.append(msg)
 
-            # Cancel existing timer
-            if self._timer:
-                self._timer.cancel()
-                self._timer = None
-
             # Acknowledgments with empty buffer before this msg → emit immediately
             if stream_intent == "acknowledgment" and len(self._buffer) == 1:
                 self._emit_batch_locked()
-                return
-
-            # Start new timer — if no more messages in MERGE_WINDOW, emit
-            self._timer = threading.Timer(self.MERGE_WINDOW, self._emit_batch)
-            self._timer.daemon = True
-            self._timer.start()
+            else:
+                # Push the deadline out — if no more messages in the window, emit
+                now = self._clock()
+                if self._batch_started is None:
+                    self._batch_started = now
+                self._deadline = min(now + self._merge_window(msg),
+                                     self._batch_started + self.MAX_BATCH_AGE)
+            self._cond.notify()
+            self._ensure_worker_locked()
 
     def force_flush(self):
         """Force-emit whatever's in the buffer. Used on shutdown or urgent messages."""
-        with self._lock:
-            if self._timer:
-                self._timer.cancel()
-                self._timer = None
+        with self._cond:
             if self._buffer:
                 self._emit_batch_locked()
+            self._cond.notify()
+            has_worker = self._worker is not None
+        if not has_worker:
+            self._deliver_ready()
+
+    def poll(self) -> int:
+        """Emit the batch if its deadline has passed, then deliver ready batches.
 
-    def _emit_batch(self):
-        """Timer callback — emit the batch (thread-safe wrapper)."""
-        with self._lock:
-            self._emit_batch_locked()
+        The worker calls this; with start_worker=False, callers drive it
+        directly (deterministic tests with an injected clock).
+        Returns the number of batches delivered.
+        """
+        with self._cond:
+            if self._deadline is not None and self._clock() >= self._deadline:
+                self._emit_batch_locked()
+        return self._deliver_ready()
+
+    def close(self):
+        """Stop the worker (pending buffer is flushed first)."""
+        self.force_flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            worker = self._worker
+        if worker and worker is not threading.current_thread():
+            worker.join(timeout=1.0)
+
+    def _merge_window(self, msg: ParsedMessage) -> float:
+        """How long to wait after this message for the next one."""
+        text = msg.text
+        if _FRAGMENT_RE.search(text) or (len(text.split()) < 3 and msg.stream_intent == "new"):
+            return self.MAX_MERGE_WINDOW
+        if (_COMPLETE_RE.search(text) and len(text.split()) >= 4
+                and msg.stream_intent in ("new", "correction")):
+            return self.MIN_MERGE_WINDOW
+        return self.MERGE_WINDOW
+
+    def _ensure_worker_locked(self):
+        if self._auto_worker and self._worker is None and not self._closed:
+            self._worker = threading.Thread(
+                target=self._run, name="tars-message-parser", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        """Worker loop: sleep until the deadline (or new work), then poll."""
+        while True:
+            with self._cond:
+                while not self._ready and not self._closed:
+                    if self._deadline is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._deadline - self._clock()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed and not self._ready:
+                    return
+            self.poll()
+
+    def _deliver_ready(self) -> int:
+        """Invoke the callback for each built batch, outside the lock."""
+        delivered = 0
+        while True:
+            with self._cond:
+                if not self._ready:
+                    return delivered
+                batch = self._ready.popleft()
+            # Callback may call back into parser — never hold the lock here
+            try:
+                self._on_batch_ready(batch)
+            except Exception as e:
+                logger.warning(f"  ⚠️ Batch callback failed: {e}")
+            delivered += 1
 
     def _emit_batch_locked(self):
-        """Build and emit a MessageBatch. Must be called with self._lock held."""
+        """Build a MessageBatch and queue it for delivery. Must be called with self._lock held."""
+        self._deadline = None
+        self._batch_started = None
         if not self._buffer:
             return
 
         messages = self._buffer[:]
         self._buffer.clear()
-        if self._timer:
-            self._timer.cancel()
-            self._timer = None
-
-        batch = self._build_batch(messages)
-        # Release lock before callback to prevent deadlocks
-        # (callback may call back into parser)
-        threading.Thread(
-            target=self._on_batch_ready,
-            args=(batch,),
-            daemon=True,
-        ).start()
+        self._ready.append(self._build_batch(messages))
 
     def _build_batch(self, messages: List[ParsedMessage]) -> MessageBatch:
         """
@@ -5,6 +5,7 @@
 ║  Real-time self-awareness layer that monitors the brain's    ║
 ║  own thinking process. Detects:                              ║
 ║    - Looping (same tool called 3+ times with similar args)   ║
+║    - Cycles (A → B → A → B) and near-duplicate arguments     ║
 ║    - Token waste (high usage with no progress)               ║
 ║    - Declining confidence                                    ║
 ║    - Stuck patterns (repeated failures)                      ║
@@ -14,10 +15,16 @@
 ╚══════════════════════════════════════════════════════════════╝
 """
 
+import re
+import json
 import time
 from collections import Counter, deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+_DIGITS_RE = re.compile(r"\d+")
+_NON_WORD_RE = re.compile(r"[^a-z#]+")
 
 
 @dataclass
@@ -36,6 +43,7 @@ class MetaCognitiveState:
     is_looping: bool = False
     loop_tool: str = ""
     loop_count: int = 0
+    loop_kind: str = ""               # exact, near_duplicate, cycle, name
     is_stalled: bool = False
     stall_reason: str = ""
     confidence_trend: str = "stable"  # rising, falling, stable
@@ -51,6 +59,113 @@ class MetaCognitiveState:
     strategic_advice: str = ""
 
 
+class LoopDetector:
+    """
+    Incremental loop detection over a sliding window of tool calls.
+
+    Each call contributes an exact and a normalized fingerprint. Counts
+    are adjusted as records enter and leave the window, and per-period
+    run lengths track A → B → A → B cycles, so every record costs O(1)
+    regardless of window size — nothing is rebuilt on analyze().
+
+    Signals (checked in priority order):
+      exact           same tool + args ≥ exact_threshold times
+      near_duplicate  same tool + normalized args ≥ near_threshold times
+      cycle           a 2- or 3-step pattern repeated back to back
+      name            same tool name past its per-tool threshold
+    """
+
+    PERIODS = (2, 3)
+
+    def __init__(self, window: int = 10, exact_threshold: int = 3,
+                 near_threshold: int = 4, name_threshold: Callable[[str], int] = None):
+        self.window = window
+        self.exact_threshold = exact_threshold
+        self.near_threshold = near_threshold
+        self._threshold_for = name_threshold or (lambda name: 4)
+        self.reset()
+
+    def reset(self):
+        self._records: deque = deque()      # (name, exact_fp, norm_fp)
+        self._exact = Counter()
+        self._near = Counter()
+        self._names = Counter()
+        self._flag_exact = {}                # fp → name, for counts over threshold
+        self._flag_near = {}
+        self._flag_names = set()
+        self._runs = {p: 0 for p in self.PERIODS}
+
+    def push(self, name: str, exact_fp, norm_fp):
+        """Add one tool call, evicting the oldest if the window is full."""
+        if len(self._records) >= self.window:
+            self._evict()
+        records = self._records
+
+        # Cycle runs: consecutive positions equal to the one p steps back
+        n = len(records)
+        for p in self.PERIODS:
+            if n >= p and records[n - p][2] == norm_fp:
+                self._runs[p] += 1
+            else:
+                self._runs[p] = 0
+
+        records.append((name, exact_fp, norm_fp))
+        self._bump(self._exact, self._flag_exact, exact_fp, name, self.exact_threshold, 1)
+        self._bump(self._near, self._flag_near, norm_fp, name, self.near_threshold, 1)
+        self._names[name] += 1
+        if self._names[name] >= self._threshold_for(name):
+            self._flag_names.add(name)
+
+    def _evict(self):
+        name, exact_fp, norm_fp = self._records.popleft()
+        self._bump(self._exact, self._flag_exact, exact_fp, name, self.exact_threshold, -1)
+        self._bump(self._near, self._flag_near, norm_fp, name, self.near_threshold, -1)
+        self._names[name] -= 1
+        if self._names[name] < self._threshold_for(name):
+            self._flag_names.discard(name)
+        if not self._names[name]:
+            del self._names[name]
+        # A run can't be longer than what's left in the window
+        for p in self.PERIODS:
+            self._runs[p] = min(self._runs[p], max(0, len(self._records) - p))
+
+    @staticmethod
+    def _bump(counter, flagged, key, name, threshold, delta):
+        counter[key] += delta
+        if counter[key] >= threshold:
+            flagged[key] = name
+        else:
+            flagged.pop(key, None)
+            if counter[key] <= 0:
+                del counter[key]
+
+    def check(self, skip_names=("think",)) -> Optional[Tuple[str, int, str]]:
+        """Return (tool_or_pattern, count, kind) if the window shows a loop.
+
+        skip_names are never flagged by name alone (think is never a loop).
+        """
+        for fp, name in self._flag_exact.items():
+            return (name, self._exact[fp], "exact")
+        for fp, name in self._flag_near.items():
+            return (name, self._near[fp], "near_duplicate")
+        for p in self.PERIODS:
+            run = self._runs[p]
+            if run >= p:
+                cycle = [self._records[-p + i] for i in range(p)]
+                names = [c[0] for c in cycle]
+                # Period-1 repeats (A A A A) are the exact/near signals' job
+                if len({c[2] for c in cycle}) == p and not set(names) <= set(skip_names):
+                    return (" → ".join(names), run // p + 1, "cycle")
+        best = None
+        for name in self._flag_names:
+            if name in skip_names:
+                continue
+            count = self._names[name]
+            if best is None or count > best[1]:
+                best = (name, count, "name")
+        return best
+
+
 class MetaCognitionMonitor:
     """
     Monitors the brain's thinking loop in real-time.
@@ -80,6 +195,25 @@ class MetaCognitionMonitor:
     CONFIDENCE_WINDOW = 5       # Last N confidence scores for trend
     FAILURE_SPIRAL_THRESHOLD = 3  # Consecutive failures
     MAX_THINKING_WITHOUT_ACTION = 5  # Max consecutive think() calls
+    LOOP_WINDOW = 10            # Recent calls considered for loop detection
+
+    # Name-only loop thresholds (same tool, any args)
+    NAME_LOOP_THRESHOLDS = {
+        # These tools are often called in parallel with DIFFERENT queries —
+        # only flag if args are also similar (caught by the fingerprints).
+        # Name-only threshold is very high to avoid false positives.
+        "web_search": 8, "quick_read_file": 8, "recall_memory": 8,
+        "scan_environment": 6,
+        # iMessage loops are critical — catch them faster
+        "send_imessage": 4,
+        # Parallel execution of different commands is normal for multi-task batches
+        "run_quick_command": 6,
+        # Verifying multiple files/results is normal after parallel work
+        "verify_result": 6,
+    }
+    # Agent deployments for different sub-tasks are normal —
+    # a 5-task batch legitimately deploys 4-5 agents. Only flag at high counts.
+    DEPLOY_NAME_THRESHOLD = 6
 
     def __init__(self):
         self._tool_history: deque = deque(maxlen=50)  # Last 50 tool calls
@@ -101,10 +235,25 @@ class MetaCognitionMonitor:
         self._unique_tools_used = set()      # Distinct tools used this task
         self._successful_results = 0         # Count of successful tool calls
         self._total_token_estimate = 0       # Running token estimate
+        self._loop_detector = LoopDetector(
+            window=self.LOOP_WINDOW,
+            exact_threshold=self.LOOP_THRESHOLD,
+            near_threshold=self.LOOP_THRESHOLD + 1,
+            name_threshold=self._name_loop_threshold,
+        )
+
+    def _name_loop_threshold(self, name: str) -> int:
+        """How many same-name calls (any args) in the window count as a loop."""
+        if name in self.NAME_LOOP_THRESHOLDS:
+            return self.NAME_LOOP_THRESHOLDS[name]
+        if name.startswith("deploy_"):
+            return self.DEPLOY_NAME_THRESHOLD
+        return self.LOOP_THRESHOLD + 1  # default: 4
 
     def reset(self):
         """Reset for a new task."""
         self._tool_history.clear()
+        self._loop_detector.reset()
         self._confidence_history.clear()
         self._consecutive_failures = 0
         self._steps_since_verify = 0
@@ -125,12 +274,13 @@ class MetaCognitionMonitor:
     def record_tool_call(self, tool_name: str, tool_input: dict,
                          success: bool, duration: float = 0.0):
         """Record a tool call and update all tracking state."""
-        # Hash the args for dedup detection
-        args_hash = self._hash_args(tool_name, tool_input)
+        # Fingerprint the args for dedup detection
+        exact_fp, norm_fp = self._fingerprint(tool_name, tool_input)
+        self._loop_detector.push(tool_name, exact_fp, norm_fp)
 
         record = ToolCallRecord(
             name=tool_name,
-            args_hash=args_hash,
+            args_hash=f"{tool_name}:{exact_fp}",
             timestamp=time.time(),
             success=success,
             duration=duration,
@@ -219,12 +369,20 @@ class MetaCognitionMonitor:
             state.is_looping = True
             state.loop_tool = loop_info[0]
             state.loop_count = loop_info[1]
-            state.recommendation = (
-                f"⚠️ META-COGNITION: You've called `{loop_info[0]}` {loop_info[1]} times "
-                f"with similar arguments. You are LOOPING. STOP this approach entirely. "
-                f"Try a COMPLETELY DIFFERENT strategy — different tool, different method, "
-                f"or ask Abdullah for help."
-            )
+            state.loop_kind = loop_info[2]
+            if loop_info[2] == "cycle":
+                state.recommendation = (
+                    f"⚠️ META-COGNITION: You're cycling `{loop_info[0]}` — the same "
+                    f"sequence has repeated {loop_info[1]} times. You are LOOPING. Break the "
+                    f"cycle: try a COMPLETELY DIFFERENT strategy or ask Abdullah for help."
+                )
+            else:
+                state.recommendation = (
+                    f"⚠️ META-COGNITION: You've called `{loop_info[0]}` {loop_info[1]} times "
+                    f"with similar arguments. You are LOOPING. STOP this approach entirely. "
+                    f"Try a COMPLETELY DIFFERENT strategy — different tool, different method, "
+                    f"or ask Abdullah for help."
+                )
 
         # ── Check 2: Stalling Detection ──
         elif self._steps_since_verify > self.STALL_THRESHOLD and self._has_deployments():
@@ -382,67 +540,36 @@ class MetaCognitionMonitor:
 
     # ─── Internal Helpers ────────────────────────────
 
-    def _hash_args(self, tool_name: str, tool_input: dict) -> str:
-        """Create a fuzzy hash of tool args for dedup detection."""
-        # For agent deployments, hash the first 100 chars of the task
-        if tool_name.startswith("deploy_"):
-            task = str(tool_input.get("task", ""))[:100].lower()
-            return f"{tool_name}:{hash(task)}"
-        # For commands, hash the command itself
-        if tool_name == "run_quick_command":
-            cmd = str(tool_input.get("command", "")).lower()
-            return f"{tool_name}:{hash(cmd)}"
-        # For everything else, hash the full input
-        return f"{tool_name}:{hash(str(sorted(tool_input.items())))}"
-
-    def _detect_loop(self) -> Optional[Tuple[str, int]]:
-        """Detect if the brain is calling the same tool repeatedly."""
-        if len(self._tool_history) < self.LOOP_THRESHOLD:
-            return None
-
-        # Check last N calls for the same tool+args
-        recent = list(self._tool_history)[-10:]
-        hash_counts = Counter(r.args_hash for r in recent)
-
-        for args_hash, count in hash_counts.most_common(1):
-            if count >= self.LOOP_THRESHOLD:
-                # Find the tool name
-                tool_name = next(r.name for r in recent if r.args_hash == args_hash)
-                return (tool_name, count)
-
-        # Also check for same tool name (even with different args)
-        name_counts = Counter(r.name for r in recent)
-        for name, count in name_counts.most_common(1):
-            # More lenient for tools that legitimately run in parallel with diverse args
-            if name in ("think",):
-                continue  # think is never a loop
-            elif name in ("web_search", "quick_read_file", "recall_memory"):
-                # These tools are often called in parallel with DIFFERENT queries —
-                # only flag if args are also similar (already caught above).
-                # Name-only threshold is very high to avoid false positives.
-                threshold = 8
-            elif name in ("scan_environment",):
-                threshold = 6
-            elif name == "send_imessage":
-                # iMessage loops are critical — catch them faster
-                threshold = 4
-            elif name.startswith("deploy_"):
-                # Agent deployments for different sub-tasks are normal —
-                # a 5-task batch legitimately deploys 4-5 agents.
-                # Only flag at high counts.
-                threshold = 6
-            elif name in ("run_quick_command",):
-                # Parallel execution of different commands is normal for multi-task batches
-                threshold = 6
-            elif name == "verify_result":
-                # Verifying multiple files/results is normal after parallel work
-                threshold = 6
-            else:
-                threshold = self.LOOP_THRESHOLD + 1  # default: 4
-            if count >= threshold:
-                return (name, count)
+    @staticmethod
+    def _fingerprint(tool_name: str, tool_input: dict) -> Tuple[int, int]:
+        """Exact and normalized fingerprints of a tool call's arguments.
 
-        return None
+        The normalized form lowercases, masks digits and drops punctuation
+        and word order, so "flights NYC March 3" and "NYC flights, march 4"
+        collide as near-duplicates.
+        """
+        # For agent deployments, fingerprint the first 100 chars of the task
+        if tool_name.startswith("deploy_"):
+            text = str(tool_input.get("task", ""))[:100].lower()
+        # For commands, fingerprint the command itself
+        elif tool_name == "run_quick_command":
+            text = str(tool_input.get("command", "")).lower()
+        # For everything else, the full input
+        else:
+            try:
+                text = json.dumps(tool_input, sort_keys=True, default=str)
+            except (TypeError, ValueError):
+                text = str(tool_input)
+        words = _NON_WORD_RE.split(_DIGITS_RE.sub("#", text.lower()))
+        norm = " ".join(sorted({w for w in words if w}))
+        return hash((tool_name, text)), hash((tool_name, norm))
+
+    def _detect_loop(self) -> Optional[Tuple[str, int, str]]:
+        """Detect repeated calls, near-duplicates, cycles and tool ruts.
+
+        Returns (tool_or_cycle, count, kind) — see LoopDetector.
+        """
+        return self._loop_detector.check()
 
     def _has_deployments(self) -> bool:
         """Check if any agent deployments happened."""
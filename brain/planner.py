@@ -15,25 +15,26 @@ import json
 import logging
 import threading
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import (
+    ThreadPoolExecutor, TimeoutError as FuturesTimeout,
+    wait as futures_wait, FIRST_COMPLETED,
+)
 
 from brain.llm_client import LLMClient, _parse_failed_tool_call
 from brain.prompts import build_system_prompt, RECOVERY_PROMPT
-from brain.tools import TARS_TOOLS, get_tools_for_intent
+from brain.tools import TARS_TOOLS, get_tools_for_intent, tool_registry, tool_resources, resources_conflict
 from brain.intent import IntentClassifier, Intent
 from brain.threads import ThreadManager
 from brain.metacognition import MetaCognitionMonitor
 from brain.decision_cache import DecisionCache
-from utils.event_bus import event_bus
+from utils.event_bus import event_bus, StreamCoalescer
 from memory.error_tracker import error_tracker
 
 logger = logging.getLogger("TARS")
 
-# Tools that depend on previous results — must run sequentially
+# Tools that depend on previous results — act as ordering barriers in a batch.
+# Everything else is scheduled by declared resources (brain.tools.TOOL_RESOURCES).
 DEPENDENT_TOOLS = {"verify_result", "send_imessage", "send_imessage_file", "wait_for_reply", "checkpoint"}
-# Tools safe to run in parallel
-PARALLEL_SAFE = {"think", "scan_environment", "recall_memory", "run_quick_command",
-                 "quick_read_file", "web_search", "save_memory"}
 
 # ── Progress / ack message blocker ──────────────────────────
 # If the LLM calls send_imessage with one of these, suppress it.
@@ -157,6 +158,15 @@ class TARSBrain:
         self.compaction_token_threshold = 80000
         self._compacted_summary = ""
         self.max_tool_loops = 50
+        self.tool_token_budget = None  # Cap on tool-schema tokens per call (None = no cap)
+
+        # Pre-think stages (recall, decomposition, decision cache) share one
+        # long-lived pool instead of running back-to-back per task.
+        self._prethink_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="tars-prethink")
+        self.prethink_speculative_grace = 0.05  # seconds to wait for speculative stages
+
+        # Tool calls from every task share one long-lived pool
+        self._tool_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tars-tools")
         self._brain_sent_imessage = False  # Track if brain already notified user
 
         # Phase 28: Reasoning Trace (per-task, but last one kept for accessors)
@@ -182,10 +192,9 @@ class TARSBrain:
         1. Normalize input
         2. Classify intent
         3. Route to thread
-        4. Decision cache lookup (Phase 26)
-        5. Multi-query memory recall (Phase 19)
-        6. Task decomposition (Phase 17)
-        7. Dynamic tool pruning (Phase 22)
+        4-7. Pre-think stages, run concurrently (see _run_prethink_stages):
+           decision cache (Phase 26), multi-query recall (Phase 19),
+           task decomposition (Phase 17), dynamic tool pruning (Phase 22)
         8. Build thread context
         9. Create per-task context
         10. Think via LLM loop
@@ -240,36 +249,12 @@ class TARSBrain:
         thread = self.threads.route_message(text, intent.type, intent.confidence)
         logger.info(f"  📎 Thread: {thread.topic} ({thread.id})")
 
-        # ── Step 4: Decision cache lookup (Phase 26) ──
-        cached = None
-        domain_hints = intent.domain_hints if intent and hasattr(intent, 'domain_hints') else []
-        if domain_hints:
-            cache_context = self.decision_cache.lookup_with_context(
-                intent.type, domain_hints, text,
-                complexity=getattr(intent, 'complexity', 'simple'),
-            )
-            cached = cache_context.get("cached_strategy")
-            if cached:
-                logger.info(f"  💾 Decision cache hit (reliability {cached.reliability:.0f}%)")
-                event_bus.emit("decision_cache_hit", {"task": text[:100], "reliability": cached.reliability})
-            anti = cache_context.get("anti_patterns", [])
-            if anti:
-                logger.info(f"  ⚠️ Anti-patterns found: {len(anti)}")
-
-        # ── Step 5: Multi-query memory recall (Phase 19) ──
-        memory_context = ""
-        if intent.needs_memory:
-            memory_context = self._auto_recall_multi(text, intent)
-
-        # ── Step 6: Task decomposition (Phase 17) ──
-        subtask_plan = ""
-        if intent.type == "TASK" and len(text) > 60:
-            subtask_plan = self._decompose_task(text, intent)
-
-        # ── Step 7: Dynamic tool pruning (Phase 22) ──
-        active_tools = get_tools_for_intent(intent)
-        if len(active_tools) < len(TARS_TOOLS):
-            logger.info(f"  🔧 Pruned tools: {len(TARS_TOOLS)} → {len(active_tools)}")
+        # ── Steps 4-7: Pre-think stages (run concurrently) ──
+        stages = self._run_prethink_stages(text, intent)
+        cached = stages["cached"]
+        memory_context = stages["memory_context"]
+        subtask_plan = stages["subtask_plan"]
+        active_tools = stages["tools"]
 
         # ── Step 8: Build thread context ──
         thread_context = self.threads.get_context_for_brain()
@@ -312,6 +297,105 @@ class TARSBrain:
 
         return response
 
+    # ═══════════════════════════════════════════════════
+    #  PRE-THINK STAGES (Phases 17, 19, 22, 26)
+    # ═══════════════════════════════════════════════════
+
+    def _run_prethink_stages(self, text, intent) -> dict:
+        """
+        Run the independent pre-think stages concurrently.
+
+        Decision-cache lookup (4), memory recall (5) and task decomposition
+        (6) don't depend on each other, so they run on the shared prethink
+        pool while tool selection (7) — a cached lookup — runs inline.
+
+        For simple intents decomposition is speculative: its plan is used
+        if it finishes within `prethink_speculative_grace` after the
+        required stages, otherwise the think loop starts without it.
+
+        Every stage reports its wall time as a "prethink_stage" event.
+        """
+        start = time.time()
+        complexity = getattr(intent, "complexity", "simple")
+        domain_hints = intent.domain_hints if intent and hasattr(intent, "domain_hints") else []
+
+        required, speculative = {}, {}
+        if domain_hints:
+            required["decision_cache"] = self._prethink_pool.submit(
+                self._timed_stage, "decision_cache", self._lookup_decision_cache, text, intent)
+        if intent.needs_memory:
+            required["recall"] = self._prethink_pool.submit(
+                self._timed_stage, "recall", self._auto_recall_multi, text, intent)
+        if intent.type == "TASK" and len(text) > 60:
+            is_simple = complexity == "simple" and not getattr(intent, "subtasks", None)
+            target = speculative if is_simple else required
+            target["decompose"] = self._prethink_pool.submit(
+                self._timed_stage, "decompose", self._decompose_task, text, intent)
+
+        tools = self._timed_stage(
+            "tools", get_tools_for_intent, intent, token_budget=self.tool_token_budget)
+        if tools is None:
+            tools = tool_registry.full      # Selection failed — offer every tool
+
+        results = {name: fut.result() for name, fut in required.items()}
+        for name, fut in speculative.items():
+            try:
+                results[name] = fut.result(timeout=self.prethink_speculative_grace)
+            except FuturesTimeout:
+                # Leave it running — subtasks still land in the thread journal
+                event_bus.emit("prethink_stage", {"stage": name, "status": "abandoned",
+                                                   "duration": round(time.time() - start, 4)})
+
+        total = time.time() - start
+        event_bus.emit("prethink_complete", {
+            "duration": round(total, 4),
+            "stages": sorted(results) + ["tools"],
+            "speculative": sorted(speculative),
+        })
+
+        cached = results.get("decision_cache")
+        if len(tools) < len(TARS_TOOLS):
+            logger.info(f"  🔧 Pruned tools: {len(TARS_TOOLS)} → {len(tools)} "
+                        f"(~{tools.token_weight} tok, {tools.fingerprint})")
+        return {
+            "cached": cached,
+            "memory_context": results.get("recall") or "",
+            "subtask_plan": results.get("decompose") or "",
+            "tools": tools,
+        }
+
+    def _timed_stage(self, name, fn, *args, **kwargs):
+        """Run one pre-think stage, emit its wall time, and never raise."""
+        stage_start = time.time()
+        status = "ok"
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            status = "error"
+            logger.warning(f"  ⚠️ Pre-think stage '{name}' failed: {e}")
+        event_bus.emit("prethink_stage", {
+            "stage": name,
+            "status": status,
+            "duration": round(time.time() - stage_start, 4),
+        })
+        return result
+
+    def _lookup_decision_cache(self, text, intent):
+        """Phase 26: decision cache lookup — returns the cached strategy or None."""
+        cache_context = self.decision_cache.lookup_with_context(
+            intent.type, intent.domain_hints, text,
+            complexity=getattr(intent, 'complexity', 'simple'),
+        )
+        cached = cache_context.get("cached_strategy")
+        if cached:
+            logger.info(f"  💾 Decision cache hit (reliability {cached.reliability:.0f}%)")
+            event_bus.emit("decision_cache_hit", {"task": text[:100], "reliability": cached.reliability})
+        anti = cache_context.get("anti_patterns", [])
+        if anti:
+            logger.info(f"  ⚠️ Anti-patterns found: {len(anti)}")
+        return cached
+
     def think(self, user_message, use_heavy=None):
         """
         Backward-compatible entry point.
@@ -399,7 +483,9 @@ class TARSBrain:
 
         while True:
             # Safety: kill switch
-            kill_event = getattr(self.tool_executor, '_kill_event', None)
+            kill_event = getattr(self.tool_executor, 'kill_event', None)  # This task's switch
+            if not isinstance(kill_event, threading.Event):
+                kill_event = getattr(self.tool_executor, '_kill_event', None)
             if kill_event and kill_event.is_set():
                 return "🛑 Kill switch activated — stopping all work."
 
@@ -599,13 +685,19 @@ class TARSBrain:
                 tools=tools,
                 messages=messages,
             ) as stream:
-                for event in stream:
-                    if event.type == "content_block_delta":
-                        if hasattr(event.delta, "text"):
-                            event_bus.emit("thinking", {
-                                "text": event.delta.text,
-                                "model": model,
-                            })
+                # Deltas are coalesced into fewer "thinking" events; tool-call
+                # boundaries and stream end flush immediately.
+                thinking = StreamCoalescer(event_bus, "thinking", {"model": model})
+                try:
+                    for event in stream:
+                        if event.type == "content_block_delta":
+                            if hasattr(event.delta, "text"):
+                                thinking.add(event.delta.text)
+                        elif event.type == "content_block_start":
+                            thinking.flush("tool_call")
+                finally:
+                    # Also on a broken stream: emit the text still buffered
+                    thinking.close()
                 response = stream.get_final_message()
 
             call_duration = time.time() - call_start
@@ -806,165 +898,197 @@ class TARSBrain:
         """
         Execute a batch of tool calls — v5 with metacognition + error patterns.
 
-        Supports parallel execution for independent tools.
-        Records to metacognition, decision cache, and reasoning trace.
+        Calls run through _schedule_tool_calls(), which executes
+        non-conflicting calls concurrently. Bookkeeping (metacognition,
+        decision log, error tracking) then runs here in the original call
+        order, so it stays deterministic regardless of completion order.
         """
         if ctx is None:
             ctx = _TaskContext()
         tool_results = []
 
-        # ── Parallel execution for independent tools ──
-        if len(tool_calls) > 1 and all(tc.name in PARALLEL_SAFE for tc in tool_calls):
-            logger.debug(f"  ⚡ Parallel execution: {', '.join(tc.name for tc in tool_calls)}")
-            with ThreadPoolExecutor(max_workers=min(len(tool_calls), 4)) as pool:
-                futures = {}
-                start_times = {}
-                for block in tool_calls:
-                    self._emit_tool_start(block)
-                    start_times[block.id] = time.time()
-                    future = pool.submit(self.tool_executor.execute, block.name, block.input)
-                    futures[future] = block
-
-                for future in as_completed(futures):
-                    block = futures[future]
-                    exec_duration = time.time() - start_times[block.id]
-                    result = future.result()
-                    self._emit_tool_result(block, result, exec_duration)
-
-                    # Phase 34: Record in metacognition
-                    ctx.metacognition.record_tool_call(
-                        block.name, block.input,
-                        result.get("success", False), exec_duration
-                    )
-
-                    # Phase 35: Track failures in error tracker (parallel path)
-                    # Skip deploy_* tools — executor._deploy_agent() already records those
-                    if not result.get("success") and not block.name.startswith("deploy_"):
-                        error_content = result.get("content", "unknown error")
-                        error_tracker.record_error(
-                            error=error_content,
-                            context=block.name,
-                            tool=block.name,
-                            source_file="brain/planner.py",
-                            details=self._format_error_details(block.name, block.input, error_content),
-                            params=self.tool_executor._safe_params(block.input) if hasattr(self.tool_executor, '_safe_params') else {},
-                        )
-
-                    result = self._enrich_failure(result, retry_count)
-                    tool_results.append(self._format_tool_result(block, result))
-        else:
-            # ── Sequential execution ──
-            for block in tool_calls:
-                tool_name = block.name
-                tool_input = block.input
-                tool_id = block.id
-
-                self._emit_tool_start(block)
-
-                # Log decision in thread
-                self.threads.log_decision(
-                    action=tool_name,
-                    reasoning=f"Called with: {str(tool_input)[:150]}",
-                    confidence=intent.confidence * 100 if intent else 70,
-                )
+        outcomes = self._schedule_tool_calls(tool_calls)
 
-                # Execute
-                logger.info(f"  🔧 Executing: {tool_name}({tool_input})")
-
-                # ── Progress message blocker ──
-                # If the brain calls send_imessage with a progress/ack update,
-                # suppress it and tell the LLM to stop doing that.
-                if tool_name == "send_imessage" and _is_progress_message(tool_input.get("message", "")):
-                    logger.info(f"  🚫 Blocked progress message: {tool_input.get('message', '')[:80]}")
-                    result = {
-                        "success": True,
-                        "content": (
-                            "⚠️ BLOCKED: That was a progress/status update. "
-                            "Abdullah does NOT want progress messages — only FINAL results. "
-                            "Continue working silently and send ONE message when the task is DONE."
-                        ),
-                    }
-                    exec_duration = 0.0
-                else:
-                    exec_start = time.time()
-                    result = self.tool_executor.execute(tool_name, tool_input)
-                    exec_duration = time.time() - exec_start
+        for block, (result, exec_duration) in zip(tool_calls, outcomes):
+            tool_name = block.name
+            tool_input = block.input
 
-                self._emit_tool_result(block, result, exec_duration)
+            # Log decision in thread
+            self.threads.log_decision(
+                action=tool_name,
+                reasoning=f"Called with: {str(tool_input)[:150]}",
+                confidence=intent.confidence * 100 if intent else 70,
+            )
 
-                # Phase 34: Record in metacognition
-                success = result.get("success", not result.get("error", False))
-                ctx.metacognition.record_tool_call(tool_name, tool_input, success, exec_duration)
+            # Phase 34: Record in metacognition
+            success = result.get("success", not result.get("error", False))
+            ctx.metacognition.record_tool_call(tool_name, tool_input, success, exec_duration)
 
-                # Phase 38: Parse confidence from think() results
-                if tool_name == "think" and success:
-                    self._parse_and_record_confidence(result.get("content", ""), ctx)
+            # Phase 38: Parse confidence from think() results
+            if tool_name == "think" and success:
+                self._parse_and_record_confidence(result.get("content", ""), ctx)
 
-                # Phase 38: Track deployments for budget awareness
-                if success and tool_name.startswith("deploy_"):
-                    ctx.metacognition.record_deployment(
-                        agent_type=tool_name.replace("deploy_", ""),
-                        task=str(tool_input.get("task", ""))[:200],
-                    )
+            # Phase 38: Track deployments for budget awareness
+            if success and tool_name.startswith("deploy_"):
+                ctx.metacognition.record_deployment(
+                    agent_type=tool_name.replace("deploy_", ""),
+                    task=str(tool_input.get("task", ""))[:200],
+                )
 
-                # Track if brain sent an iMessage (so _run_task doesn't double-send)
-                if tool_name in ("send_imessage", "send_imessage_file") and success:
-                    ctx.brain_sent_imessage = True
+            # Track if brain sent an iMessage (so _run_task doesn't double-send)
+            if tool_name in ("send_imessage", "send_imessage_file") and success:
+                ctx.brain_sent_imessage = True
 
-                # Phase 24: Record error pattern on failure
-                if not success:
-                    error_content = result.get("content", "unknown error")
-                    # Feed to self-healing engine for pattern detection
-                    self._record_self_heal_failure(
-                        tool_name, error_content, str(tool_input)[:200],
+            # Phase 24: Record error pattern on failure
+            if not success:
+                error_content = result.get("content", "unknown error")
+                # Feed to self-healing engine for pattern detection
+                self._record_self_heal_failure(
+                    tool_name, error_content, str(tool_input)[:200],
+                )
+                # Phase 35: Error tracker — skip deploy_* (executor already records)
+                fix_info = None
+                if not tool_name.startswith("deploy_"):
+                    fix_info = error_tracker.record_error(
+                        error=error_content,
+                        context=tool_name,
+                        tool=tool_name,
+                        source_file="brain/planner.py",
+                        details=self._format_error_details(tool_name, tool_input, error_content),
+                        params=self.tool_executor._safe_params(tool_input) if hasattr(self.tool_executor, '_safe_params') else {},
                     )
-                    # Phase 35: Error tracker — skip deploy_* (executor already records)
-                    fix_info = None
-                    if not tool_name.startswith("deploy_"):
-                        fix_info = error_tracker.record_error(
+                if fix_info and fix_info.get("has_fix"):
+                    # Check if this same error recurred after a fix was already suggested
+                    fix_key = f"{tool_name}:{error_content[:100]}"
+                    if fix_key in ctx.applied_fixes:
+                        # Fix was already suggested but error recurred — mark it as failed
+                        logger.warning(f"🩹 Auto-fix failed — same error recurred: {error_content[:80]}")
+                        error_tracker.mark_fix_failed(
                             error=error_content,
                             context=tool_name,
-                            tool=tool_name,
-                            source_file="brain/planner.py",
-                            details=self._format_error_details(tool_name, tool_input, error_content),
-                            params=self.tool_executor._safe_params(tool_input) if hasattr(self.tool_executor, '_safe_params') else {},
                         )
-                    if fix_info and fix_info.get("has_fix"):
-                        # Check if this same error recurred after a fix was already suggested
-                        fix_key = f"{tool_name}:{error_content[:100]}"
-                        if fix_key in ctx.applied_fixes:
-                            # Fix was already suggested but error recurred — mark it as failed
-                            logger.warning(f"🩹 Auto-fix failed — same error recurred: {error_content[:80]}")
-                            error_tracker.mark_fix_failed(
-                                error=error_content,
-                                context=tool_name,
-                            )
-                            del ctx.applied_fixes[fix_key]
-                        else:
-                            # First time suggesting this fix — track it
-                            ctx.applied_fixes[fix_key] = fix_info["fix"][:200]
-                            logger.info(f"🩹 Known fix available: {fix_info['fix'][:80]}")
-                            event_bus.emit("auto_fix_available", {
-                                "tool": tool_name,
-                                "fix": fix_info["fix"][:200],
-                                "confidence": fix_info.get("confidence", 0),
-                                "times_applied": fix_info.get("times_applied", 0),
-                            })
-
-
-                # Update decision outcome
-                outcome = "success" if success else "failed"
-                self.threads.update_decision_outcome(outcome)
-
-                # Enrich failures with retry guidance
-                result = self._enrich_failure(result, retry_count)
-                if result.get("error"):
-                    retry_count += 1
+                        del ctx.applied_fixes[fix_key]
+                    else:
+                        # First time suggesting this fix — track it
+                        ctx.applied_fixes[fix_key] = fix_info["fix"][:200]
+                        logger.info(f"🩹 Known fix available: {fix_info['fix'][:80]}")
+                        event_bus.emit("auto_fix_available", {
+                            "tool": tool_name,
+                            "fix": fix_info["fix"][:200],
+                            "confidence": fix_info.get("confidence", 0),
+                            "times_applied": fix_info.get("times_applied", 0),
+                        })
+
+            # Update decision outcome
+            outcome = "success" if success else "failed"
+            self.threads.update_decision_outcome(outcome)
+
+            # Enrich failures with retry guidance
+            result = self._enrich_failure(result, retry_count)
+            if result.get("error"):
+                retry_count += 1
 
-                tool_results.append(self._format_tool_result(block, result))
+            tool_results.append(self._format_tool_result(block, result))
 
         return tool_results
 
+    def _schedule_tool_calls(self, tool_calls):
+        """
+        Run a batch of tool calls with resource-aware parallelism.
+
+        Each call waits only for earlier calls it conflicts with (shared
+        resource, at least one writer — see brain.tools.tool_resources).
+        DEPENDENT_TOOLS act as barriers in both directions. Independent
+        calls run on the long-lived tool pool; a fully serial batch runs
+        inline on the calling thread.
+
+        Returns [(result, duration)] in the original call order and emits
+        a "tool_batch" event with the batch's parallel speedup.
+        """
+        n = len(tool_calls)
+        declared = [tool_resources(b.name, b.input) for b in tool_calls]
+        deps = []
+        for i, block in enumerate(tool_calls):
+            deps.append({
+                j for j in range(i)
+                if block.name in DEPENDENT_TOOLS
+                or tool_calls[j].name in DEPENDENT_TOOLS
+                or resources_conflict(declared[i], declared[j])
+            })
+
+        batch_start = time.time()
+        serial = all(len(deps[i]) == i for i in range(n))
+        max_concurrency = 1
+
+        if serial:
+            outcomes = [self._run_tool_call(block) for block in tool_calls]
+        else:
+            logger.debug(f"  ⚡ Parallel execution: {', '.join(tc.name for tc in tool_calls)}")
+            outcomes = [None] * n
+            pending = {i: set(d) for i, d in enumerate(deps)}
+            running = {}
+            # Pool threads run under this task's executor context
+            bind = getattr(self.tool_executor, 'bind_task_context', None)
+            run_call = bind(self._run_tool_call) if callable(bind) else self._run_tool_call
+            while pending or running:
+                for i in [i for i, d in pending.items() if not d]:
+                    del pending[i]
+                    running[self._tool_pool.submit(run_call, tool_calls[i])] = i
+                max_concurrency = max(max_concurrency, len(running))
+                done, _ = futures_wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    i = running.pop(fut)
+                    outcomes[i] = fut.result()
+                    for d in pending.values():
+                        d.discard(i)
+
+        if n > 1:
+            wall = time.time() - batch_start
+            serial_time = sum(duration for _, duration in outcomes)
+            event_bus.emit("tool_batch", {
+                "tools": [b.name for b in tool_calls],
+                "parallel": not serial,
+                "max_concurrency": max_concurrency,
+                "wall_time": round(wall, 4),
+                "serial_time": round(serial_time, 4),
+                "speedup": round(serial_time / wall, 2) if wall > 0 else 1.0,
+            })
+        return outcomes
+
+    def _run_tool_call(self, block):
+        """Execute one tool call (any thread). Returns (result, duration)."""
+        tool_name = block.name
+        tool_input = block.input
+
+        self._emit_tool_start(block)
+
+        # ── Progress message blocker ──
+        # If the brain calls send_imessage with a progress/ack update,
+        # suppress it and tell the LLM to stop doing that.
+        if tool_name == "send_imessage" and _is_progress_message(tool_input.get("message", "")):
+            logger.info(f"  🚫 Blocked progress message: {tool_input.get('message', '')[:80]}")
+            result = {
+                "success": True,
+                "content": (
+                    "⚠️ BLOCKED: That was a progress/status update. "
+                    "Abdullah does NOT want progress messages — only FINAL results. "
+                    "Continue working silently and send ONE message when the task is DONE."
+                ),
+            }
+            exec_duration = 0.0
+        else:
+            logger.info(f"  🔧 Executing: {tool_name}({tool_input})")
+            exec_start = time.time()
+            try:
+                result = self.tool_executor.execute(tool_name, tool_input)
+            except Exception as e:
+                result = {"success": False, "error": True,
+                          "content": f"Tool {tool_name} raised {type(e).__name__}: {e}"}
+            exec_duration = time.time() - exec_start
+
+        self._emit_tool_result(block, result, exec_duration)
+        return result, exec_duration
+
     def _emit_tool_start(self, block):
         """Emit tool call event for dashboard."""
         event_bus.emit("tool_called", {
@@ -1205,6 +1329,9 @@ class TARSBrain:
         3. Domain-specific keywords (preferences, procedures)
         4. Action + object patterns
         5. Entity-specific queries from intent classifier
+
+        All queries go to memory.recall_many() in one batch when the
+        memory manager supports it; otherwise they are recalled one by one.
         """
         queries = [text[:100]]
 
@@ -1252,6 +1379,17 @@ class TARSBrain:
                     queries.append(context_slice)
                 break
 
+        # Batched path: one pass over memory for all queries (O(corpus))
+        if hasattr(self.memory, "recall_many"):
+            try:
+                result = self.memory.recall_many(queries, max_results=6)
+            except Exception:
+                return ""
+            content = result.get("content", "") if result.get("success") else ""
+            if len(content) <= 20 or content.startswith("No memories found"):
+                return ""
+            return content[:1500]
+
         # Deduplicate and search
         seen = set()
         results = []
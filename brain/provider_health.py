@@ -0,0 +1,282 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Provider Health               ║
+╚══════════════════════════════════════════╝
+
+Shared circuit breakers for LLM providers, one per (provider, model).
+
+Agents share this state, so once one agent has found that a
+provider is browning out, the rest skip it at once. They don't
+each rediscover the failure one retry-sleep at a time.
+
+  - closed     calls flow. After FAILURE_THRESHOLD consecutive
+               transient failures (429, 5xx, timeouts) it trips.
+  - open       calls are refused without touching the network.
+               The open period doubles on every consecutive trip,
+               up to MAX_OPEN_SECONDS. A 429 that says when to come
+               back opens it for exactly that long. Fatal errors
+               (spend limit, quota, revoked key) open it for
+               FATAL_OPEN_SECONDS.
+  - half_open  after the open period, one probe call is let
+               through. Success closes the breaker; failure
+               re-opens it.
+
+Latency is tracked as an EWMA per breaker. route() keeps the
+caller's preference order, but moves a slow provider behind a
+healthy one that is markedly faster.
+"""
+
+import re
+import time
+import logging
+import threading
+
+from utils.event_bus import event_bus
+
+logger = logging.getLogger("TARS")
+
+FAILURE_THRESHOLD = 3       # Consecutive transient failures that trip a breaker
+OPEN_SECONDS = 15.0         # First open period; doubles per consecutive trip
+MAX_OPEN_SECONDS = 300.0
+FATAL_OPEN_SECONDS = 900.0  # Spend limit / quota / auth: don't probe for a while
+SLOW_SECONDS = 20.0         # EWMA latency above this marks a provider slow
+LATENCY_ALPHA = 0.3         # EWMA weight of the newest sample
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_FATAL_MARKERS = ("spend_limit", "spend limit", "spend alert", "quota", "billing", "credit balance",
+                  "suspended", "api key expired", "permission_denied", "insufficient_quota", "invalid api key")
+# Status codes are matched as whole numbers, so "215000 tokens" is not a 500
+_RATE_RE = re.compile(r"\b429\b|rate[_ ]limit|resource_exhausted|too many requests")
+_SERVER_RE = re.compile(r"\b5\d\d\b|overloaded|timed out|timeout|connection error|connection reset|"
+                        r"service unavailable")
+_STATUS_RE = re.compile(r"(?:error code|status(?: code)?)[:\s]*([1-5]\d\d)\b")
+_RETRY_AFTER_RE = re.compile(r"(?:retry[- ]after|try again in)[:\s]*([\d.]+)\s*(ms|s)?", re.I)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, key, retry_in):
+        super().__init__(f"{key[0]}/{key[1]} circuit open — retry in {retry_in:.0f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+
+def _status_code(error, text):
+    """HTTP status of a provider exception: SDK attribute first, then "Error code: NNN" in its message."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status
+    match = _STATUS_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def classify_error(error):
+    """Sort a provider exception into fatal / rate_limit / server / tool_use_failed / other."""
+    text = str(error).lower()
+    if "tool_use_failed" in text:
+        return "tool_use_failed"        # A bad generation, not a sick provider
+    status = _status_code(error, text)
+    if status == 429:
+        return "rate_limit"
+    if status in (401, 402, 403):
+        return "fatal"
+    if status == 408 or (status is not None and status >= 500):
+        return "server"
+    if status is None and _RATE_RE.search(text):
+        return "rate_limit"
+    if any(m in text for m in _FATAL_MARKERS):
+        return "fatal"                  # Some providers report billing problems as a plain 400
+    if status is not None:
+        return "other"                  # Any other 4xx is about this request, not the provider
+    if isinstance(error, TimeoutError) or _SERVER_RE.search(text):
+        return "server"
+    return "other"
+
+
+def _retry_after(error):
+    """Seconds the provider asked us to wait, if the error says."""
+    match = _RETRY_AFTER_RE.search(str(error))
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value / 1000 if (match.group(2) or "").lower() == "ms" else value
+
+
+def provider_key(client, model):
+    """(provider, model) for a client — LLMClient exposes .provider."""
+    return (str(getattr(client, "provider", None) or type(client).__name__), str(model))
+
+
+class CircuitBreaker:
+    """Health of one (provider, model). Thread-safe."""
+
+    def __init__(self, key, clock=time.monotonic):
+        self.key = key
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0           # Consecutive transient failures
+        self.trips = 0              # Consecutive trips without a success
+        self.open_until = 0.0
+        self.probing = False
+        self.latency = None         # EWMA seconds
+        self.calls = 0
+        self.errors = {}            # kind → count
+        self.last_error = ""
+
+    def allow(self):
+        """True if a call may go out now. In half-open, admits one probe."""
+        with self._lock:
+            if self.state == OPEN:
+                if self._clock() < self.open_until:
+                    return False
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == HALF_OPEN:
+                if self.probing:
+                    return False
+                self.probing = True
+            return True
+
+    def retry_in(self):
+        with self._lock:
+            return max(0.0, self.open_until - self._clock()) if self.state == OPEN else 0.0
+
+    def record_success(self, latency):
+        with self._lock:
+            self.calls += 1
+            self._observe(latency)
+            reopened = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.trips = 0
+            self.probing = False
+        if reopened:
+            logger.info(f"  💚 Provider {self.key[0]}/{self.key[1]} recovered — circuit closed")
+            event_bus.emit("provider_circuit", {"provider": self.key[0], "model": self.key[1], "state": CLOSED})
+
+    def record_failure(self, error, latency=None):
+        """Count a failed call. Returns its kind (see classify_error)."""
+        kind = classify_error(error)
+        with self._lock:
+            self.calls += 1
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+            self.last_error = str(error)[:200]
+            if latency is not None:
+                self._observe(latency)
+            if kind in ("tool_use_failed", "other"):     # The request's fault, not the provider's
+                self.probing = False
+                return kind
+            self.failures += 1
+            if kind == "fatal":
+                period = FATAL_OPEN_SECONDS
+            elif kind == "rate_limit" and _retry_after(error) is not None:
+                period = min(_retry_after(error), MAX_OPEN_SECONDS)
+            elif self.state == HALF_OPEN or self.failures >= FAILURE_THRESHOLD:
+                period = min(OPEN_SECONDS * (2 ** self.trips), MAX_OPEN_SECONDS)
+            else:
+                self.probing = False
+                return kind
+            self.state = OPEN
+            self.trips += 1
+            self.probing = False
+            self.open_until = self._clock() + period
+        logger.warning(f"  🔌 Provider {self.key[0]}/{self.key[1]} circuit open for {period:.0f}s ({kind}: {str(error)[:120]})")
+        event_bus.emit("provider_circuit", {
+            "provider": self.key[0], "model": self.key[1], "state": OPEN,
+            "kind": kind, "open_seconds": round(period, 1),
+        })
+        return kind
+
+    def _observe(self, latency):
+        self.latency = latency if self.latency is None else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.latency)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in": round(max(0.0, self.open_until - self._clock()), 1) if self.state == OPEN else 0.0,
+                "latency_ewma": round(self.latency, 3) if self.latency is not None else None,
+                "calls": self.calls,
+                "errors": dict(self.errors),
+                "last_error": self.last_error,
+            }
+
+
+class ProviderHealth:
+    """Registry of breakers plus health-aware calling and routing."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, client, model):
+        key = provider_key(client, model)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(key, clock=self._clock)
+            return self._breakers[key]
+
+    def call(self, client, model, fn):
+        """Run fn() against (client, model) through its breaker.
+
+        Raises CircuitOpenError without calling when the breaker is
+        open. Otherwise records the outcome and latency, and re-raises
+        any provider error.
+        """
+        breaker = self.breaker(client, model)
+        if not breaker.allow():
+            raise CircuitOpenError(breaker.key, breaker.retry_in())
+        start = self._clock()
+        try:
+            result = fn()
+        except Exception as e:
+            breaker.record_failure(e, self._clock() - start)
+            raise
+        breaker.record_success(self._clock() - start)
+        return result
+
+    def route(self, candidates):
+        """Order (client, model, ...) candidates for this call.
+
+        Open breakers are left out. Preference order is kept, except
+        that a slow provider goes behind a healthy one with under half
+        its latency.
+        """
+        usable = []
+        for cand in candidates:
+            breaker = self.breaker(cand[0], cand[1])
+            if breaker.state != OPEN or breaker.retry_in() == 0:
+                usable.append((cand, breaker.latency))
+        if len(usable) > 1:
+            (first, slow), rest = usable[0], usable[1:]
+            if slow is not None and slow > SLOW_SECONDS:
+                faster = [u for u in rest if u[1] is None or u[1] < slow / 2]
+                if faster:
+                    usable.remove(faster[0])
+                    usable.insert(0, faster[0])
+        return [cand for cand, _ in usable]
+
+    def retry_in(self, candidates):
+        """Seconds until the soonest of the candidates reopens (0 if any is usable)."""
+        return min((self.breaker(c[0], c[1]).retry_in() for c in candidates), default=0.0)
+
+    def stats(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {f"{p}/{m}": b.snapshot() for (p, m), b in sorted(breakers.items())}
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+# Singleton — shared by every agent in the process
+provider_health = ProviderHealth()
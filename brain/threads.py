@@ -21,13 +21,19 @@
 ║    new message → route_message() → Thread                    ║
 ║    TARS responds → record_response()                         ║
 ║    Thread idle >10min → becomes stale                        ║
-║    Max 20 threads in memory, oldest pruned                   ║
+║    Max 100 threads in memory, oldest archived to disk        ║
+║                                                              ║
+║  Persistence: every mutation appends one line to an          ║
+║  append-only journal; the journal is periodically compacted  ║
+║  into a threads.json snapshot and replayed on startup.       ║
 ╚══════════════════════════════════════════════════════════════╝
 """
 
+import os
 import time
 import uuid
 import json
+import threading
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 from pathlib import Path
@@ -179,14 +185,24 @@ class ThreadManager:
     - Thread-aware context for the Brain prompt
     """
 
-    MAX_THREADS = 20        # Keep last 20 threads in memory
+    MAX_THREADS = 100       # Keep last 100 threads in memory; older ones are archived
     STALE_TIMEOUT = 600     # 10 minutes
+    COMPACT_EVERY = 200     # Journal records between snapshot compactions
+    MAX_SNAPSHOT_MESSAGES = 50  # Messages per thread kept in snapshots/archive
+
+    SNAPSHOT_FILE = "threads.json"
+    JOURNAL_FILE = "threads.journal"
+    ARCHIVE_FILE = "threads_archive.jsonl"
 
     def __init__(self, persistence_dir: Optional[str] = None):
         self._threads: Dict[str, Thread] = {}
         self._active_thread_id: Optional[str] = None
         self._thread_order: List[str] = []  # Most recent first
         self._persistence_dir = persistence_dir
+        self._journal_lock = threading.Lock()
+        self._journal_fh = None
+        self._seq = 0                # Sequence number of the last journal record
+        self._journal_records = 0    # Records appended since the last snapshot
 
         # Load persisted threads if available
         if persistence_dir:
@@ -247,9 +263,10 @@ class ThreadManager:
         self._thread_order.insert(0, thread_id)
         self._active_thread_id = thread_id
 
-        # Prune old threads
+        self._persist("create", id=thread_id, topic=thread.topic, ts=now,
+                      msg=self._message_state(thread.messages[0]))
+        # Archive old threads
         self._prune()
-        self._persist()
 
         return thread
 
@@ -260,23 +277,27 @@ class ThreadManager:
         if not thread:
             return self.create_thread("continued", text, intent_type, confidence)
 
-        thread.messages.append(ThreadMessage(
+        message = ThreadMessage(
             role=role,
             text=text,
             timestamp=time.time(),
             intent_type=intent_type,
             confidence=confidence,
-        ))
-        thread.last_activity = time.time()
+        )
+        self._apply_message(thread, message)
+        self._persist("message", id=thread_id, msg=self._message_state(message))
+        return thread
 
-        # Move to front of order
-        if thread_id in self._thread_order:
-            self._thread_order.remove(thread_id)
-        self._thread_order.insert(0, thread_id)
-        self._active_thread_id = thread_id
+    def _apply_message(self, thread: Thread, message: ThreadMessage):
+        """Append a message, bump the thread to the front and make it active."""
+        thread.messages.append(message)
+        thread.last_activity = message.timestamp
 
-        self._persist()
-        return thread
+        # Move to front of order
+        if thread.id in self._thread_order:
+            self._thread_order.remove(thread.id)
+        self._thread_order.insert(0, thread.id)
+        self._active_thread_id = thread.id
 
     # ═══════════════════════════════════════════════════
     #  Message Routing
@@ -336,14 +357,14 @@ class ThreadManager:
         if active:
             active.active_task = task[:200]
             active.task_status = status
-            self._persist()
+            self._persist("task", id=active.id, task=active.active_task, status=status)
 
     def set_task_status(self, status: str):
         """Update task status: idle, working, waiting_user, completed, failed."""
         active = self.active_thread
         if active:
             active.task_status = status
-            self._persist()
+            self._persist("status", id=active.id, status=status)
 
     def add_subtasks(self, subtasks: List[dict]):
         """
@@ -355,14 +376,17 @@ class ThreadManager:
         if not active:
             return
 
+        added = []
         for i, st in enumerate(subtasks):
-            active.subtasks.append(Subtask(
+            subtask = Subtask(
                 id=len(active.subtasks) + 1,
                 description=st.get("description", ""),
                 agent=st.get("agent", ""),
                 depends_on=st.get("depends_on", []),
-            ))
-        self._persist()
+            )
+            active.subtasks.append(subtask)
+            added.append(self._subtask_state(subtask))
+        self._persist("subtasks", id=active.id, subtasks=added)
 
     def update_subtask(self, subtask_id: int, status: str, result: str = ""):
         """Update a subtask's status and result."""
@@ -370,13 +394,17 @@ class ThreadManager:
         if not active:
             return
 
-        for st in active.subtasks:
+        self._apply_subtask_update(active, subtask_id, status, result)
+        self._persist("subtask", id=active.id, sid=subtask_id, status=status, result=result)
+
+    @staticmethod
+    def _apply_subtask_update(thread: Thread, subtask_id: int, status: str, result: str):
+        for st in thread.subtasks:
             if st.id == subtask_id:
                 st.status = status
                 if result:
                     st.result = result[:300]
                 break
-        self._persist()
 
     def get_next_subtask(self) -> Optional[Subtask]:
         """Get the next pending subtask whose dependencies are met."""
@@ -418,26 +446,31 @@ class ThreadManager:
 
         active = self.active_thread
         if active:
-            active.decisions.append(decision)
-            # Keep last 20 decisions per thread
-            if len(active.decisions) > 20:
-                active.decisions = active.decisions[-20:]
-            self._persist()
+            self._apply_decision(active, decision)
+            self._persist("decision", id=active.id, decision=self._decision_state(decision))
 
         return decision
 
+    @staticmethod
+    def _apply_decision(thread: Thread, decision: Decision):
+        thread.decisions.append(decision)
+        # Keep last 20 decisions per thread
+        if len(thread.decisions) > 20:
+            thread.decisions = thread.decisions[-20:]
+
     def update_decision_outcome(self, outcome: str):
         """Update the most recent decision with its outcome."""
         active = self.active_thread
         if active and active.decisions:
             active.decisions[-1].outcome = outcome
-            self._persist()
+            self._persist("outcome", id=active.id, outcome=outcome)
 
     def record_escalation(self):
         """Record that we escalated to the user."""
         active = self.active_thread
         if active:
             active.escalation_count += 1
+            self._persist("escalation", id=active.id)
 
     # ═══════════════════════════════════════════════════
     #  Context for Brain
@@ -609,66 +642,248 @@ class ThreadManager:
         return clean[:1].upper() + clean[1:] if clean else "Untitled"
 
     def _prune(self):
-        """Remove oldest threads beyond MAX_THREADS."""
+        """Archive oldest threads beyond MAX_THREADS (appended to the archive file)."""
         while len(self._thread_order) > self.MAX_THREADS:
             old_id = self._thread_order.pop()
-            self._threads.pop(old_id, None)
+            thread = self._threads.pop(old_id, None)
+            if thread is None:
+                continue
+            if self._persistence_dir:
+                try:
+                    path = Path(self._persistence_dir) / self.ARCHIVE_FILE
+                    with open(path, "a") as f:
+                        f.write(json.dumps(self._thread_state(thread)) + "\n")
+                except Exception:
+                    pass  # Non-critical
+            self._persist("archive", id=old_id)
+
+    def get_archived_thread(self, thread_id: str) -> Optional[Thread]:
+        """Load an archived thread by id (None if not found)."""
+        if not self._persistence_dir:
+            return None
+        path = Path(self._persistence_dir) / self.ARCHIVE_FILE
+        if not path.exists():
+            return None
+        found = None
+        with open(path) as f:
+            for line in f:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                if data.get("id") == thread_id:
+                    found = data  # Last write wins
+        return self._thread_from_state(found) if found else None
+
+    # ─── Persistence: journal + snapshot ─────────────
+
+    @staticmethod
+    def _message_state(m: ThreadMessage) -> dict:
+        return {"role": m.role, "text": m.text, "ts": m.timestamp,
+                "intent": m.intent_type, "conf": m.confidence}
+
+    @staticmethod
+    def _subtask_state(s: Subtask) -> dict:
+        return {"id": s.id, "desc": s.description, "status": s.status,
+                "agent": s.agent, "result": s.result, "depends_on": s.depends_on}
+
+    @staticmethod
+    def _decision_state(d: Decision) -> dict:
+        return {"action": d.action, "reasoning": d.reasoning, "confidence": d.confidence,
+                "ts": d.timestamp, "outcome": d.outcome}
+
+    def _thread_state(self, thread: Thread) -> dict:
+        """Full-fidelity serialization (to_dict() is the truncated dashboard view)."""
+        state = thread.to_dict()
+        state.update({
+            "messages": [self._message_state(m)
+                         for m in thread.messages[-self.MAX_SNAPSHOT_MESSAGES:]],
+            "subtasks": [self._subtask_state(s) for s in thread.subtasks],
+            "decisions": [self._decision_state(d) for d in thread.decisions],
+            "metadata": thread.metadata,
+        })
+        return state
 
-    def _persist(self):
-        """Save thread state to disk for crash recovery."""
+    @staticmethod
+    def _thread_from_state(tdata: dict) -> Thread:
+        thread = Thread(
+            id=tdata["id"],
+            created_at=tdata.get("created_at", 0),
+            last_activity=tdata.get("last_activity", 0),
+            topic=tdata.get("topic", "restored"),
+            task_status=tdata.get("task_status", "idle"),
+            active_task=tdata.get("active_task"),
+            escalation_count=tdata.get("escalation_count", 0),
+            metadata=tdata.get("metadata", {}),
+        )
+        for mdata in tdata.get("messages", []):
+            thread.messages.append(ThreadMessage(
+                role=mdata.get("role", "user"),
+                text=mdata.get("text", ""),
+                timestamp=mdata.get("ts", tdata.get("last_activity", 0)),
+                intent_type=mdata.get("intent", ""),
+                confidence=mdata.get("conf", 0.0),
+            ))
+        for sdata in tdata.get("subtasks", []):
+            thread.subtasks.append(Subtask(
+                id=sdata.get("id", 0),
+                description=sdata.get("desc", ""),
+                status=sdata.get("status", "pending"),
+                agent=sdata.get("agent", ""),
+                result=sdata.get("result", ""),
+                depends_on=sdata.get("depends_on", []),
+            ))
+        for ddata in tdata.get("decisions", []):
+            thread.decisions.append(Decision(
+                action=ddata.get("action", ""),
+                reasoning=ddata.get("reasoning", ""),
+                confidence=ddata.get("confidence", 0.0),
+                timestamp=ddata.get("ts", 0.0),
+                outcome=ddata.get("outcome", ""),
+            ))
+        return thread
+
+    def _persist(self, op: str, **fields):
+        """Append one mutation to the journal (cost ∝ change, not total state)."""
         if not self._persistence_dir:
             return
 
         try:
-            path = Path(self._persistence_dir) / "threads.json"
-            path.parent.mkdir(parents=True, exist_ok=True)
-
-            data = {
-                "active_thread_id": self._active_thread_id,
-                "thread_order": self._thread_order[:10],  # Persist last 10
-                "threads": {
-                    tid: self._threads[tid].to_dict()
-                    for tid in self._thread_order[:10]
-                    if tid in self._threads
-                },
-            }
-            path.write_text(json.dumps(data, indent=2))
+            with self._journal_lock:
+                if self._journal_fh is None:
+                    Path(self._persistence_dir).mkdir(parents=True, exist_ok=True)
+                    self._journal_fh = open(
+                        Path(self._persistence_dir) / self.JOURNAL_FILE, "a")
+                self._seq += 1
+                fields["op"] = op
+                fields["seq"] = self._seq
+                self._journal_fh.write(json.dumps(fields) + "\n")
+                self._journal_fh.flush()
+                self._journal_records += 1
+                if self._journal_records >= self.COMPACT_EVERY:
+                    self._compact_locked()
         except Exception:
             pass  # Non-critical — don't crash on persistence failure
 
+    def compact(self):
+        """Write a snapshot and truncate the journal."""
+        if not self._persistence_dir:
+            return
+        try:
+            with self._journal_lock:
+                self._compact_locked()
+        except Exception:
+            pass  # Non-critical
+
+    def _compact_locked(self):
+        path = Path(self._persistence_dir) / self.SNAPSHOT_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": 2,
+            "seq": self._seq,
+            "active_thread_id": self._active_thread_id,
+            "thread_order": list(self._thread_order),
+            "threads": {
+                tid: self._thread_state(self._threads[tid])
+                for tid in self._thread_order
+                if tid in self._threads
+            },
+        }
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, path)
+        # Snapshot is durable — records up to self._seq are now redundant.
+        # A crash before truncation is harmless: replay skips seq <= snapshot seq.
+        if self._journal_fh is not None:
+            self._journal_fh.close()
+            self._journal_fh = None
+        open(Path(self._persistence_dir) / self.JOURNAL_FILE, "w").close()
+        self._journal_records = 0
+
     def _load_threads(self):
-        """Load persisted thread state. Non-critical — failure is OK."""
+        """Load the snapshot, then replay journal records newer than it. Non-critical."""
         if not self._persistence_dir:
             return
 
         try:
-            path = Path(self._persistence_dir) / "threads.json"
-            if not path.exists():
-                return
-
-            data = json.loads(path.read_text())
-            self._active_thread_id = data.get("active_thread_id")
-            self._thread_order = data.get("thread_order", [])
-
-            # Reconstruct threads (partial — messages are truncated)
-            for tid, tdata in data.get("threads", {}).items():
-                thread = Thread(
-                    id=tid,
-                    created_at=tdata.get("created_at", 0),
-                    last_activity=tdata.get("last_activity", 0),
-                    topic=tdata.get("topic", "restored"),
-                    task_status=tdata.get("task_status", "idle"),
-                    active_task=tdata.get("active_task"),
-                    escalation_count=tdata.get("escalation_count", 0),
-                )
-                for mdata in tdata.get("messages", []):
-                    thread.messages.append(ThreadMessage(
-                        role=mdata.get("role", "user"),
-                        text=mdata.get("text", ""),
-                        timestamp=tdata.get("last_activity", 0),
-                        intent_type=mdata.get("intent", ""),
-                    ))
-                self._threads[tid] = thread
+            path = Path(self._persistence_dir) / self.SNAPSHOT_FILE
+            if path.exists():
+                data = json.loads(path.read_text())
+                self._seq = data.get("seq", 0)
+                self._active_thread_id = data.get("active_thread_id")
+                self._thread_order = data.get("thread_order", [])
+
+                # v1 snapshots hold the truncated to_dict() view — still loadable
+                for tid, tdata in data.get("threads", {}).items():
+                    tdata.setdefault("id", tid)
+                    self._threads[tid] = self._thread_from_state(tdata)
+                self._thread_order = [tid for tid in self._thread_order if tid in self._threads]
+        except Exception:
+            pass  # Non-critical
 
+        try:
+            journal = Path(self._persistence_dir) / self.JOURNAL_FILE
+            if journal.exists():
+                with open(journal) as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            break  # Torn final write from a crash
+                        if rec.get("seq", 0) <= self._seq:
+                            continue
+                        self._replay(rec)
+                        self._seq = rec["seq"]
+                        self._journal_records += 1
         except Exception:
             pass  # Non-critical
+
+        if self._journal_records:
+            self.compact()
+
+    def _replay(self, rec: dict):
+        """Apply one journal record to in-memory state."""
+        op = rec.get("op")
+        tid = rec.get("id")
+        if op == "create":
+            m = rec["msg"]
+            thread = Thread(id=tid, created_at=rec["ts"], last_activity=rec["ts"], topic=rec["topic"])
+            thread.messages.append(ThreadMessage(m["role"], m["text"], m["ts"], m["intent"], m["conf"]))
+            self._threads[tid] = thread
+            self._thread_order.insert(0, tid)
+            self._active_thread_id = tid
+            return
+        if op == "archive":
+            self._threads.pop(tid, None)
+            if tid in self._thread_order:
+                self._thread_order.remove(tid)
+            return
+
+        thread = self._threads.get(tid)
+        if thread is None:
+            return
+        if op == "message":
+            m = rec["msg"]
+            self._apply_message(thread, ThreadMessage(m["role"], m["text"], m["ts"], m["intent"], m["conf"]))
+        elif op == "task":
+            thread.active_task = rec["task"]
+            thread.task_status = rec["status"]
+        elif op == "status":
+            thread.task_status = rec["status"]
+        elif op == "subtasks":
+            for sdata in rec["subtasks"]:
+                thread.subtasks.append(Subtask(
+                    id=sdata["id"], description=sdata["desc"], status=sdata["status"],
+                    agent=sdata["agent"], result=sdata["result"], depends_on=sdata["depends_on"],
+                ))
+        elif op == "subtask":
+            self._apply_subtask_update(thread, rec["sid"], rec["status"], rec["result"])
+        elif op == "decision":
+            d = rec["decision"]
+            self._apply_decision(thread, Decision(d["action"], d["reasoning"], d["confidence"],
+                                                  d["ts"], d["outcome"]))
+        elif op == "outcome":
+            if thread.decisions:
+                thread.decisions[-1].outcome = rec["outcome"]
+        elif op == "escalation":
+            thread.escalation_count += 1
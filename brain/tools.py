@@ -13,6 +13,10 @@
 ╚══════════════════════════════════════════════════════════════╝
 """
 
+import json
+import hashlib
+import threading
+
 TARS_TOOLS = [
     # ═══════════════════════════════════════
     #  Core Thinking Tool (Phase 1)
@@ -873,13 +877,13 @@ TARS_TOOLS = [
     # ═══════════════════════════════════════
     {
         "name": "ingest_document",
-        "description": "Ingest a document into TARS's semantic memory for RAG (Retrieval-Augmented Generation). Once ingested, you can search the document's contents using search_documents or recall_memory.\n\nSupported formats: PDF, DOCX, TXT, MD, PY, JSON, CSV, HTML, YAML, JS, TS\n\nExamples:\n  ingest_document(file_path='~/Documents/research_paper.pdf')\n  ingest_document(file_path='~/notes.md')\n  ingest_document(file_path='~/code/README.md')\n\nAfter ingesting, use: search_documents(query='what does the paper say about X?')",
+        "description": "Ingest a document into TARS's semantic memory for RAG (Retrieval-Augmented Generation). Once ingested, you can search the document's contents using search_documents or recall_memory.\n\nSupported formats: PDF, DOCX, TXT, MD, PY, JSON, CSV, HTML, YAML, JS, TS\n\nPass a folder to index every supported file in it. Re-ingesting is incremental: unchanged files are skipped, edited files only re-embed what changed, and files deleted from the folder are dropped from memory.\n\nExamples:\n  ingest_document(file_path='~/Documents/research_paper.pdf')\n  ingest_document(file_path='~/notes.md')\n  ingest_document(file_path='~/Documents/papers')\n\nAfter ingesting, use: search_documents(query='what does the paper say about X?')",
         "input_schema": {
             "type": "object",
             "properties": {
-                "file_path": {"type": "string", "description": "Path to the document to ingest."},
-                "chunk_size": {"type": "integer", "description": "Characters per chunk (default: 1000).", "default": 1000},
-                "chunk_overlap": {"type": "integer", "description": "Overlap between chunks (default: 200).", "default": 200}
+                "file_path": {"type": "string", "description": "Path to the document (or folder) to ingest."},
+                "chunk_size": {"type": "integer", "description": "Target tokens per chunk (default: 256). Chunks follow headings, paragraphs, lists, tables and code blocks.", "default": 256},
+                "chunk_overlap": {"type": "integer", "description": "Tokens of overlap between chunks in the same section (default: 32).", "default": 32}
             },
             "required": ["file_path"]
         }
@@ -977,47 +981,261 @@ _DOMAIN_TOOLS = {
     "memory": {"save_memory", "recall_memory", "list_memories", "delete_memory", "ingest_document", "search_documents"},
 }
 
+# ═══════════════════════════════════════════════════
+#  TOOL RESOURCE DECLARATIONS (parallel scheduling)
+# ═══════════════════════════════════════════════════
+
+# Shared resources each tool touches, as (resource, mode) pairs. Two calls
+# conflict when they share a resource and at least one of them writes it;
+# "fs:<path>" is a sub-resource of "fs". Non-conflicting calls in one LLM
+# turn may run concurrently; conflicting ones keep their original order.
+# Tools not listed here are treated as touching everything ("*").
+_READ, _WRITE = "read", "write"
+
+TOOL_RESOURCES = {
+    "think": (),
+    "web_search": (),
+    "checkpoint": (("thread", _WRITE),),
+    "scan_environment": (("system", _READ),),
+    "run_quick_command": (("shell", _WRITE), ("fs", _WRITE)),   # Arbitrary commands can change anything on disk
+    "recall_memory": (("memory", _READ),),
+    "list_memories": (("memory", _READ),),
+    "search_documents": (("memory", _READ),),
+    "save_memory": (("memory", _WRITE),),
+    "delete_memory": (("memory", _WRITE),),
+    "ingest_document": (("memory", _WRITE),),
+    "headless_browse": (("headless", _WRITE),),
+    "deploy_browser_agent": (("browser", _WRITE),),
+    "deploy_research_agent": (("browser", _WRITE),),
+    "deploy_screen_agent": (("browser", _WRITE), ("screen", _WRITE)),
+    "manage_account": (("browser", _WRITE), ("accounts", _WRITE)),
+    "search_flights": (("browser", _WRITE),),
+    "search_flights_report": (("browser", _WRITE), ("mail", _WRITE)),
+    "find_cheapest_dates": (("browser", _WRITE), ("mail", _WRITE)),
+    "book_flight": (("browser", _WRITE),),
+    "track_flight_price": (("scheduler", _WRITE),),
+    "get_tracked_flights": (("scheduler", _READ),),
+    "stop_tracking": (("scheduler", _WRITE),),
+    "deploy_email_agent": (("mail", _WRITE),),
+    "mac_mail": (("mail", _WRITE),),
+    "send_imessage": (("imessage", _WRITE),),
+    "send_imessage_file": (("imessage", _WRITE),),
+    "wait_for_reply": (("imessage", _WRITE),),
+    "deploy_file_agent": (("fs", _WRITE),),
+    "deploy_coder_agent": (("fs", _WRITE), ("shell", _WRITE)),
+    "deploy_dev_agent": (("fs", _WRITE), ("shell", _WRITE), ("screen", _WRITE)),
+    "deploy_system_agent": (("system", _WRITE), ("screen", _WRITE)),
+    "mac_system": (("system", _WRITE),),
+    "mac_notes": (("notes", _WRITE),),
+    "mac_calendar": (("calendar", _WRITE),),
+    "mac_reminders": (("reminders", _WRITE),),
+    "smart_home": (("home", _WRITE),),
+    "schedule_task": (("scheduler", _WRITE),),
+    "list_scheduled_tasks": (("scheduler", _READ),),
+    "remove_scheduled_task": (("scheduler", _WRITE),),
+    "generate_report": (("fs", _WRITE),),
+    "generate_presentation": (("fs", _WRITE),),
+    "generate_image": (("fs", _WRITE),),
+    "process_media": (("fs", _WRITE),),
+    "get_error_report": (),
+    "propose_self_heal": (("self_heal", _WRITE),),
+    "mcp_list_tools": (("mcp", _READ),),
+}
+
+_ALL_RESOURCES = (("*", _WRITE),)
+
+
+def tool_resources(name, tool_input=None) -> tuple:
+    """Return the (resource, mode) pairs a tool call touches.
+
+    Path-aware for file reads and verification so that reads of
+    different files don't block each other.
+    """
+    tool_input = tool_input or {}
+    if name == "quick_read_file":
+        return ((f"fs:{tool_input.get('path', '')}", _READ),)
+    if name == "verify_result":
+        check_type = tool_input.get("type", "")
+        if check_type == "file":
+            return ((f"fs:{tool_input.get('check', '')}", _READ),)
+        if check_type == "browser":
+            return (("browser", _READ),)
+        return (("shell", _READ), ("system", _READ))
+    return TOOL_RESOURCES.get(name, _ALL_RESOURCES)
+
+
+def _resource_overlaps(a, b):
+    if a == "*" or b == "*" or a == b:
+        return True
+    return a.startswith(b + ":") or b.startswith(a + ":")
+
+
+def resources_conflict(first, second) -> bool:
+    """True if two resource declarations can't safely run concurrently."""
+    for res_a, mode_a in first:
+        for res_b, mode_b in second:
+            if (mode_a == _WRITE or mode_b == _WRITE) and _resource_overlaps(res_a, res_b):
+                return True
+    return False
+
+
 # Build a name→tool lookup once
 _TOOL_BY_NAME = {t["name"]: t for t in TARS_TOOLS}
 
 
-def get_tools_for_intent(intent) -> list:
+def _resolve_intent(intent):
+    """Reduce an intent to (intent_type, normalized domain hints)."""
+    if intent is None:
+        return None, ()
+    intent_type = intent.type if hasattr(intent, "type") else str(intent)
+    hints = getattr(intent, "domain_hints", None) or []
+    return intent_type, tuple(sorted({h.lower() for h in hints}))
+
+
+def _match_domains(hints, domains=_DOMAIN_TOOLS):
+    """Map free-form domain hints onto _DOMAIN_TOOLS group names."""
+    matched = set()
+    for hint_lower in hints:
+        for domain in domains:
+            if domain in hint_lower or hint_lower in domain:
+                matched.add(domain)
+    return frozenset(matched)
+
+
+class ToolSubset(tuple):
+    """Immutable, fingerprinted selection of tool schemas.
+
+    Behaves like a tuple of tool dicts, so it can be passed anywhere a
+    tool list is expected. Two extra attributes:
+      fingerprint  — stable hash of the serialized schemas; downstream
+                     layers (schema conversion, prompt caches) key on it
+      token_weight — estimated tokens the schemas cost per request
+                     (~4 chars/token, same heuristic as the planner)
+    """
+
+    def __new__(cls, tools, label=""):
+        self = super().__new__(cls, tools)
+        serialized = json.dumps(list(self), sort_keys=True, ensure_ascii=False)
+        self.fingerprint = hashlib.sha1(serialized.encode("utf-8")).hexdigest()[:16]
+        self.token_weight = len(serialized) // 4
+        self.label = label
+        return self
+
+    @property
+    def names(self):
+        return [t["name"] for t in self]
+
+    def __repr__(self):
+        return f"ToolSubset({self.label or '?'}, {len(self)} tools, ~{self.token_weight} tok, {self.fingerprint})"
+
+
+class ToolRegistry:
+    """Builds tool subsets once per (intent type, domain set) and reuses them.
+
+    Selection rules match the original get_tools_for_intent():
+      CONVERSATION → core tools only
+      TASK + domain hints → core + matched domain groups (min 10 tools)
+      anything else → full tool set
+
+    Identical subsets are interned by fingerprint, so callers can compare
+    or cache on `subset.fingerprint` without holding extra copies.
+    """
+
+    MIN_TASK_TOOLS = 10  # Avoid over-pruning task tool sets
+
+    def __init__(self, tools=None, core=None, domains=None):
+        self._tools = list(tools if tools is not None else TARS_TOOLS)
+        self._core = frozenset(core if core is not None else _CORE_TOOLS)
+        self._domains = domains if domains is not None else _DOMAIN_TOOLS
+        self._lock = threading.Lock()
+        self._by_key = {}          # (intent_type, hints) → ToolSubset
+        self._by_fingerprint = {}  # fingerprint → ToolSubset (interned)
+        self.full = self._intern(ToolSubset(self._tools, label="all"))
+        self.core = self._intern(self._select(self._core, label="core"))
+
+    def _intern(self, subset):
+        return self._by_fingerprint.setdefault(subset.fingerprint, subset)
+
+    def _select(self, names, label):
+        # Preserve TARS_TOOLS ordering so fingerprints are deterministic
+        return ToolSubset([t for t in self._tools if t["name"] in names], label=label)
+
+    def _build(self, intent_type, hints):
+        """Return (preferred, lean) subsets for a resolved intent key."""
+        if intent_type is None:
+            return self.full, self.core
+        if intent_type == "CONVERSATION":
+            return self.core, self.core
+        if intent_type == "TASK" and hints:
+            matched = _match_domains(hints, self._domains)
+            needed = set(self._core)
+            for domain in matched:
+                needed.update(self._domains[domain])
+            if len(needed) > len(self._core):
+                needed.add("verify_result")
+                label = "task:" + "+".join(sorted(matched))
+                lean = self._intern(self._select(needed, label=label))
+                if len(lean) >= self.MIN_TASK_TOOLS:
+                    return lean, lean
+                return self.full, lean
+        return self.full, self.core
+
+    def _lookup(self, intent):
+        key = _resolve_intent(intent)
+        entry = self._by_key.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._by_key.get(key)
+                if entry is None:
+                    entry = self._build(*key)
+                    self._by_key[key] = entry
+        return entry
+
+    def subset_for(self, intent, token_budget=None):
+        """Return the cached ToolSubset for an intent.
+
+        With a token_budget, falls back to leaner subsets (domain-only,
+        then core) when the preferred subset's schemas would exceed it.
+        """
+        preferred, lean = self._lookup(intent)
+        if token_budget is None or preferred.token_weight <= token_budget:
+            return preferred
+        if lean.token_weight <= token_budget:
+            return lean
+        return self.core
+
+    def get(self, fingerprint):
+        """Look up a previously built subset by fingerprint (or None)."""
+        return self._by_fingerprint.get(fingerprint)
+
+    def stats(self) -> dict:
+        """Summary of every built subset — for dashboards and budget tuning."""
+        with self._lock:
+            subsets = list(self._by_fingerprint.values())
+            keys = len(self._by_key)
+        return {
+            "intent_keys": keys,
+            "subsets": [
+                {"label": s.label, "fingerprint": s.fingerprint,
+                 "tools": len(s), "token_weight": s.token_weight}
+                for s in sorted(subsets, key=lambda s: s.token_weight)
+            ],
+        }
+
+
+# Singleton — built once at import, shared by the brain and LLM client
+tool_registry = ToolRegistry()
+
+
+def get_tools_for_intent(intent, token_budget=None) -> ToolSubset:
     """
     Return a filtered subset of TARS_TOOLS based on the classified intent.
 
     For CONVERSATION intents, returns only core tools (saves tokens).
     For TASK intents, uses domain hints to select relevant tool groups.
     Falls back to full tool set if no pruning applies.
-    """
-    if intent is None:
-        return TARS_TOOLS
 
-    intent_type = intent.type if hasattr(intent, "type") else str(intent)
-
-    # Conversations only need core tools
-    if intent_type == "CONVERSATION":
-        return [t for t in TARS_TOOLS if t["name"] in _CORE_TOOLS]
-
-    # For tasks, build a set of relevant tool names
-    if intent_type == "TASK":
-        needed = set(_CORE_TOOLS)
-
-        domain_hints = getattr(intent, "domain_hints", [])
-        if domain_hints:
-            for hint in domain_hints:
-                hint_lower = hint.lower()
-                for domain, tools in _DOMAIN_TOOLS.items():
-                    if domain in hint_lower or hint_lower in domain:
-                        needed.update(tools)
-
-        # If domain hints gave us a good set, use it
-        if len(needed) > len(_CORE_TOOLS):
-            # Always include verify_result for tasks
-            needed.add("verify_result")
-            filtered = [t for t in TARS_TOOLS if t["name"] in needed]
-            # Minimum 10 tools to avoid over-pruning
-            if len(filtered) >= 10:
-                return filtered
-
-    # Default: return all tools
-    return TARS_TOOLS
+    Subsets are precomputed per (intent type, domain hints) by
+    tool_registry, so repeated calls return the same ToolSubset object.
+    """
+    return tool_registry.subset_for(intent, token_budget=token_budget)
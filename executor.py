@@ -24,7 +24,6 @@ import logging
 import subprocess
 import threading
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 
 logger = logging.getLogger("TARS")
 
@@ -39,6 +38,7 @@ from agents.dev_agent import DevAgent
 from agents.screen_agent import ScreenAgent
 from agents.email_agent import EmailAgent
 from agents.comms import agent_comms
+from agents.deployment import deployment_pool
 from memory.agent_memory import AgentMemory
 from hands.terminal import run_terminal
 from hands.file_manager import read_file
@@ -47,6 +47,8 @@ from hands import mac_control as mac
 from hands.report_gen import generate_report as _gen_report
 from utils.event_bus import event_bus
 from utils.agent_monitor import agent_monitor
+from utils.tool_dispatch import ToolDispatcher
+from utils.task_context import TaskContext
 from memory.error_tracker import error_tracker
 
 
@@ -76,15 +78,23 @@ class ToolExecutor:
         self.logger = logger
         self.comms = agent_comms
         self.monitor = agent_monitor
+        self.deployments = deployment_pool  # Long-lived agent pool with per-deployment limits
         self._kill_event = kill_event  # Shared threading.Event — set when kill word received
 
         # ── Reply routing — thread-local so each task thread knows its source ──
         self._reply_source = threading.local()
 
-        # ── Deployment tracker — resets per task ──
-        # Every deployment and its result, so brain sees full history
-        self._deployment_log = []  # [{agent, task, success, steps, reason}]
-        self._deployment_lock = threading.Lock()  # Thread safety for parallel tasks
+        # ── Per-task execution state — deployment log, budget, kill switch ──
+        # Each task thread gets its own TaskContext (see begin_task), so
+        # parallel tasks never share deployment history or budgets.
+        self._task_local = threading.local()
+        self._task_contexts = {}  # {task_id: TaskContext} for running tasks
+        self._task_contexts_lock = threading.Lock()
+        self._default_context = TaskContext("default", parent_kill=kill_event)
+
+        # ── Tool registry — built from the _dispatch route table on first call ──
+        self._tool_dispatcher = None
+        self._dispatcher_lock = threading.Lock()
         self.max_deployments = config.get("safety", {}).get("max_deployments", DEFAULT_MAX_DEPLOYMENTS)
 
         # ── Dual-provider: agents use agent_llm (fast/free) ──
@@ -177,9 +187,71 @@ class ToolExecutor:
         """Set the voice interface reference for TTS replies."""
         self._voice_interface = voice_interface
 
+    # ── Per-task context ─────────────────────────────────
+    def begin_task(self, task_id, source="imessage"):
+        """Give the calling thread a fresh TaskContext (called from tars._run_task)."""
+        ctx = TaskContext(task_id, source=source, parent_kill=self._kill_event)
+        with self._task_contexts_lock:
+            self._task_contexts[task_id] = ctx
+        self._task_local.ctx = ctx
+        self.set_reply_source(source)
+        return ctx
+
+    def end_task(self, task_id):
+        """Drop a finished task's context."""
+        with self._task_contexts_lock:
+            ctx = self._task_contexts.pop(task_id, None)
+        if getattr(self._task_local, "ctx", None) is ctx:
+            self._task_local.ctx = None
+        return ctx
+
+    def current_context(self):
+        """The TaskContext of the task running on this thread."""
+        return getattr(self._task_local, "ctx", None) or self._default_context
+
+    def cancel_task(self, task_id):
+        """Stop one running task without touching the others."""
+        with self._task_contexts_lock:
+            ctx = self._task_contexts.get(task_id)
+        if ctx:
+            ctx.cancel()
+        return ctx is not None
+
+    def active_contexts(self):
+        with self._task_contexts_lock:
+            return [ctx.snapshot() for ctx in self._task_contexts.values()]
+
+    def bind_task_context(self, fn, ctx=None):
+        """Wrap fn so it runs under this thread's (or the given) task
+        context and reply source on whatever thread calls it."""
+        ctx = ctx or self.current_context()
+        source = self.get_reply_source()
+
+        def run(*args, **kwargs):
+            prev_ctx = getattr(self._task_local, "ctx", None)
+            prev_source = getattr(self._reply_source, "source", None)
+            self._task_local.ctx = ctx
+            self._reply_source.source = source
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._task_local.ctx = prev_ctx
+                self._reply_source.source = prev_source
+        return run
+
+    @property
+    def kill_event(self):
+        """Kill switch for the current task (also trips on the global one)."""
+        return self.current_context().kill_event
+
+    @property
+    def _deployment_log(self):
+        """Read-only snapshot of the current task's deployments."""
+        return self.current_context().deployments()
+
     def reset_task_tracker(self):
-        """Call this when a new user task starts (from tars.py)."""
-        self._deployment_log = []
+        """Start a fresh, anonymous deployment budget on this thread."""
+        self._task_local.ctx = TaskContext(parent_kill=self._kill_event)
 
     @staticmethod
     def _safe_params(tool_input) -> dict:
@@ -203,9 +275,9 @@ class ToolExecutor:
                 safe[k] = v
         return safe
 
-    def _get_failure_summary(self):
+    def _get_failure_summary(self, ctx=None):
         """Build a summary of all failed deployments this task for the brain to see."""
-        failures = [d for d in self._deployment_log if not d["success"]]
+        failures = (ctx or self.current_context()).failures()
         if not failures:
             return ""
         lines = ["## ⚠️ PREVIOUS FAILED ATTEMPTS THIS TASK:"]
@@ -215,8 +287,14 @@ class ToolExecutor:
         lines.append("DO NOT repeat the same approach. Analyze WHY each failed and try something DIFFERENT.")
         return "\n".join(lines)
 
-    def execute(self, tool_name, tool_input):
-        """Execute a tool call and return the result."""
+    def execute(self, tool_name, tool_input, ctx=None):
+        """Execute a tool call and return the result.
+
+        ctx: the TaskContext to run under; defaults to the calling thread's.
+        """
+        if ctx is not None and ctx is not getattr(self._task_local, "ctx", None):
+            return self.bind_task_context(self.execute, ctx)(tool_name, tool_input)
+
         self.logger.info(f"🔧 {tool_name} → {str(tool_input)[:120]}")
 
         try:
@@ -244,234 +322,225 @@ class ToolExecutor:
         return result
 
     def _dispatch(self, tool_name, inp):
-        """Route tool call to the right handler."""
+        """Route tool call to the right handler through the tool dispatcher.
 
-        # ─── Agent Deployments ───────────────────
-        if tool_name == "deploy_browser_agent":
-            return self._deploy_agent("browser", inp["task"])
-
-        elif tool_name == "deploy_coder_agent":
-            return self._deploy_agent("coder", inp["task"])
-
-        elif tool_name == "deploy_system_agent":
-            return self._deploy_agent("system", inp["task"])
-
-        elif tool_name == "deploy_research_agent":
-            return self._deploy_agent("research", inp["task"])
-
-        elif tool_name == "deploy_file_agent":
-            return self._deploy_agent("file", inp["task"])
-
-        elif tool_name == "deploy_screen_agent":
-            return self._deploy_agent("screen", inp["task"])
+        The route table below is built into a ToolDispatcher on first use;
+        after that a call is one dict lookup plus the middleware chain
+        (metrics, validation, caching, deadlines, retries, errors).
+        """
+        registry = self._tool_dispatcher
+        if registry is None:
+            with self._dispatcher_lock:
+                registry = self._tool_dispatcher
+                if registry is None:
+                    registry = self._build_tool_dispatcher()
+                    r = registry.register
+                    # Only reads that don't drive the shared browser get a deadline:
+                    # a timed-out call keeps running in the background
+                    read = dict(idempotent=True)
+
+                    # ─── Agent Deployments ───────────────────
+                    r("deploy_browser_agent", lambda i: self._deploy_agent("browser", i["task"]))
+                    r("deploy_coder_agent", lambda i: self._deploy_agent("coder", i["task"]))
+                    r("deploy_system_agent", lambda i: self._deploy_agent("system", i["task"]))
+                    r("deploy_research_agent", lambda i: self._deploy_agent("research", i["task"]))
+                    r("deploy_file_agent", lambda i: self._deploy_agent("file", i["task"]))
+                    r("deploy_screen_agent", lambda i: self._deploy_agent("screen", i["task"]))
+                    r("deploy_email_agent", lambda i: self._deploy_agent("email", i["task"]))
+                    r("deploy_dev_agent", lambda i: self._deploy_agent("dev", self._dev_agent_task(i)))
+
+                    # ─── Direct Tools ────────────────────────
+                    r("send_imessage", lambda i: self.send_reply(i["message"]))
+                    r("send_imessage_file", self._send_imessage_file)
+                    r("wait_for_reply", self._wait_for_reply)
+                    r("save_memory", lambda i: self.memory.save(i["category"], i["key"], i["value"]),
+                      invalidates=("recall_memory", "list_memories"))
+                    r("recall_memory", lambda i: self.memory.recall(i["query"]), timeout=30, cache_ttl=30, **read)
+                    r("list_memories", self._list_memories, cache_ttl=30, **read)
+                    r("delete_memory", self._delete_memory,
+                      invalidates=("recall_memory", "list_memories", "search_documents"))
+                    r("run_quick_command", self._run_quick_command)
+                    r("quick_read_file", lambda i: read_file(i["path"]), timeout=30, **read)
+                    r("think", self._think)
+
+                    # ─── Phase 2/3/8: Awareness, Verification, Checkpoint ──
+                    r("scan_environment", lambda i: self._scan_environment(i.get("checks", ["all"])), timeout=60, **read)
+                    r("verify_result", lambda i: self._verify_result(i["type"], i["check"], i.get("expected", "")),
+                      timeout=60, **read)
+                    r("checkpoint", lambda i: self._checkpoint(i["completed"], i["remaining"]))
+
+                    # ─── Legacy / hallucinated tool names ──
+                    r("web_task", lambda i: self._deploy_agent("browser", i["task"]), schema={"required": ["task"]})
+                    # LLM sometimes hallucinates "browser_agent" / "screen_agent" without the deploy_ prefix
+                    r("browser_agent", lambda i: self._deploy_agent(
+                        "browser", i.get("task", i.get("command", i.get("url", str(i))))))
+                    r("screen_agent", lambda i: self._deploy_agent(
+                        "screen", i.get("task", i.get("command", str(i)))))
+
+                    # Falls back to the shared Chrome tab (browser_google): no deadline.
+                    # Cached by hands.research_apis.ResearchCache, keyed on the normalized query
+                    r("web_search", lambda i: self._web_search(i["query"]), **read)
+
+                    # ─── Account Management (Keychain-backed) ──
+                    r("manage_account", self._manage_account)
+
+                    # ─── Direct Mac Control (brain-level) ──
+                    r("mac_mail", self._mac_mail)
+                    r("mac_notes", self._mac_notes)
+                    r("mac_calendar", self._mac_calendar)
+                    r("mac_reminders", self._mac_reminders)
+                    r("mac_system", self._mac_system)
+
+                    # ─── Smart Services (API-first) ──
+                    r("search_flights", self._search_flights, cache_ttl=600, **read)   # Drives Chrome over CDP
+                    r("search_flights_report", self._search_flights_report)
+                    r("find_cheapest_dates", self._find_cheapest_dates)    # Sends its report by iMessage/email
+                    r("track_flight_price", self._track_flight_price, invalidates=("get_tracked_flights",))
+                    r("get_tracked_flights", self._get_tracked_flights, cache_ttl=30, **read)
+                    r("stop_tracking", self._stop_tracking, invalidates=("get_tracked_flights",))
+                    r("book_flight", self._book_flight)
+
+                    # ─── Report Generation ──
+                    r("generate_report", self._generate_report)
+
+                    # ─── Scheduled Tasks ──
+                    r("schedule_task", self._schedule_task, invalidates=("list_scheduled_tasks",))
+                    r("list_scheduled_tasks", self._list_scheduled_tasks, cache_ttl=30, **read)
+                    r("remove_scheduled_task", self._remove_scheduled_task, invalidates=("list_scheduled_tasks",))
+
+                    # ─── Image Generation / Home / PowerPoint / Media ──
+                    r("generate_image", self._generate_image)
+                    r("smart_home", self._smart_home)
+                    r("generate_presentation", self._generate_presentation)
+                    r("process_media", self._process_media)
+
+                    # ─── Document Ingestion (RAG) ──
+                    r("ingest_document", self._ingest_document, invalidates=("search_documents", "recall_memory"))
+                    r("search_documents", self._search_documents, timeout=60, cache_ttl=60, **read)
+
+                    # ─── Headless Browser ──
+                    r("headless_browse", self._headless_browse)
+
+                    # ─── MCP (Model Context Protocol) ──
+                    r("mcp_list_tools", self._mcp_list_tools, timeout=30, cache_ttl=300, **read)
+                    r("mcp_call_tool", self._mcp_call_tool)
+
+                    # ─── Self-Healing ──
+                    r("propose_self_heal", self._propose_self_heal)
+                    r("get_error_report", self._get_error_report, **read)
+
+                    self._tool_dispatcher = registry
+
+        if tool_name in registry:
+            return registry.call(tool_name, inp)
+
+        from memory.error_tracker import error_tracker
+        error_tracker.record_error(
+            error=f"Unknown tool: {tool_name}",
+            context="dispatch",
+            tool=tool_name,
+            source_file="executor.py",
+            details="Brain hallucinated a tool name that doesn't exist",
+            params=self._safe_params(inp),
+        )
+        return {"success": False, "error": True, "content": f"Unknown tool: {tool_name}"}
 
-        elif tool_name == "deploy_email_agent":
-            return self._deploy_agent("email", inp["task"])
+    def _build_tool_dispatcher(self):
+        """Empty dispatcher wired to TARS_TOOLS schemas, the error tracker
+        and task-context propagation for deadline threads."""
+        from brain.tools import TARS_TOOLS
 
-        elif tool_name == "deploy_dev_agent":
-            # Prepend project_path to task string so the Dev Agent knows where to work
-            task = inp["task"]
-            project_path = inp.get("project_path", "")
-            if project_path and project_path not in task:
-                task = f"[Project: {project_path}]\n\n{task}"
-            return self._deploy_agent("dev", task)
+        def on_error(name, exc, inp):
+            error_tracker.record_error(
+                error=f"Tool crash: {type(exc).__name__}: {exc}",
+                context=name,
+                tool=name,
+                source_file="executor.py",
+                details="Unhandled exception in tool handler",
+                params=self._safe_params(inp),
+            )
 
-        # ─── Direct Tools ────────────────────────
-        elif tool_name == "send_imessage":
-            return self.send_reply(inp["message"])
+        return ToolDispatcher(
+            schemas={t["name"]: t.get("input_schema", {}) for t in TARS_TOOLS},
+            on_error=on_error,
+            wrap_context=self.bind_task_context,
+        )
 
-        elif tool_name == "send_imessage_file":
-            result = self.sender.send_file(
-                file_path=inp["file_path"],
-                caption=inp.get("caption"),
-            )
-            if result.get("success"):
-                fname = os.path.basename(os.path.expanduser(inp["file_path"]))
-                display = inp.get("caption", f"📎 {fname}")
-                event_bus.emit("imessage_sent", {"message": f"{display}\n📎 {fname}"})
-            return result
+    def get_tool_stats(self):
+        """Per-tool latency histograms (served by /api/health)."""
+        registry = self._tool_dispatcher
+        return registry.stats() if registry else {}
 
-        elif tool_name == "wait_for_reply":
-            result = self.reader.wait_for_reply(timeout=inp.get("timeout", 300))
-            if result.get("success"):
-                event_bus.emit("imessage_received", {"message": result.get("content", "")})
-            return result
+    # ─── Inline tool handlers ────────────────────────
 
-        elif tool_name == "save_memory":
-            return self.memory.save(inp["category"], inp["key"], inp["value"])
+    @staticmethod
+    def _dev_agent_task(inp):
+        # Prepend project_path to task string so the Dev Agent knows where to work
+        task = inp["task"]
+        project_path = inp.get("project_path", "")
+        if project_path and project_path not in task:
+            task = f"[Project: {project_path}]\n\n{task}"
+        return task
+
+    def _send_imessage_file(self, inp):
+        result = self.sender.send_file(
+            file_path=inp["file_path"],
+            caption=inp.get("caption"),
+        )
+        if result.get("success"):
+            fname = os.path.basename(os.path.expanduser(inp["file_path"]))
+            display = inp.get("caption", f"📎 {fname}")
+            event_bus.emit("imessage_sent", {"message": f"{display}\n📎 {fname}"})
+        return result
 
-        elif tool_name == "recall_memory":
-            return self.memory.recall(inp["query"])
+    def _wait_for_reply(self, inp):
+        result = self.reader.wait_for_reply(timeout=inp.get("timeout", 300))
+        if result.get("success"):
+            event_bus.emit("imessage_received", {"message": result.get("content", "")})
+        return result
 
-        elif tool_name == "list_memories":
-            result = self.memory.list_all(category=inp.get("category"))
-            event_bus.emit("tool_result", {"tool": "list_memories", "category": inp.get("category", "all")})
-            return result
+    def _list_memories(self, inp):
+        result = self.memory.list_all(category=inp.get("category"))
+        event_bus.emit("tool_result", {"tool": "list_memories", "category": inp.get("category", "all")})
+        return result
 
-        elif tool_name == "delete_memory":
-            result = self.memory.delete(inp["category"], key=inp.get("key"))
-            event_bus.emit("tool_result", {"tool": "delete_memory", "category": inp["category"], "key": inp.get("key", "*")})
-            return result
+    def _delete_memory(self, inp):
+        result = self.memory.delete(inp["category"], key=inp.get("key"))
+        event_bus.emit("tool_result", {"tool": "delete_memory", "category": inp["category"], "key": inp.get("key", "*")})
+        return result
 
-        elif tool_name == "run_quick_command":
-            cmd = inp.get("command", "")
-            if not cmd:
-                return {"success": False, "error": True, "content": "⚠️ Missing 'command' parameter. Example: run_quick_command({\"command\": \"ls -la\"})"}
-            return run_terminal(cmd, timeout=inp.get("timeout", 30))
-
-        elif tool_name == "quick_read_file":
-            return read_file(inp["path"])
-
-        elif tool_name == "think":
-            thought = inp.get("thought", "")
-            if not thought:
-                return {"success": False, "error": True, "content": "⚠️ Empty thought. You MUST provide a 'thought' string. Example: think({\"thought\": \"Analyzing the request...\"})"}
-            self.logger.info(f"💭 Brain thinking: {thought[:200]}")
-            event_bus.emit("thinking", {"text": thought, "model": "brain"})
-            return {"success": True, "content": "Thought recorded. Continue with your plan."}
-
-        # ─── Phase 2: Environmental Awareness ──
-        elif tool_name == "scan_environment":
-            return self._scan_environment(inp.get("checks", ["all"]))
-
-        # ─── Phase 3: Verification Loop ──
-        elif tool_name == "verify_result":
-            return self._verify_result(inp["type"], inp["check"], inp.get("expected", ""))
-
-        # ─── Phase 8: Checkpoint ──
-        elif tool_name == "checkpoint":
-            return self._checkpoint(inp["completed"], inp["remaining"])
-
-        # ─── Legacy / hallucinated tool names ──
-        elif tool_name == "web_task":
-            return self._deploy_agent("browser", inp["task"])
-
-        elif tool_name == "browser_agent":
-            # LLM sometimes hallucinates "browser_agent" instead of "deploy_browser_agent"
-            task = inp.get("task", inp.get("command", inp.get("url", str(inp))))
-            return self._deploy_agent("browser", task)
-
-        elif tool_name == "screen_agent":
-            # LLM sometimes hallucinates "screen_agent" instead of "deploy_screen_agent"
-            task = inp.get("task", inp.get("command", str(inp)))
-            return self._deploy_agent("screen", task)
-
-        elif tool_name == "web_search":
-            query = inp.get("query", "")
-            if not query:
-                return {"success": False, "error": True, "content": "⚠️ Missing 'query' parameter. Example: web_search({\"query\": \"weather in Miami\"})"}
-            return self._web_search(query)
-
-        # ─── Account Management (Keychain-backed) ──
-        elif tool_name == "manage_account":
-            return self._manage_account(inp)
-
-        # ─── Direct Mac Control (brain-level) ──
-        elif tool_name == "mac_mail":
-            return self._mac_mail(inp)
-        elif tool_name == "mac_notes":
-            return self._mac_notes(inp)
-        elif tool_name == "mac_calendar":
-            return self._mac_calendar(inp)
-        elif tool_name == "mac_reminders":
-            return self._mac_reminders(inp)
-        elif tool_name == "mac_system":
-            return self._mac_system(inp)
-
-        # ─── Smart Services (API-first) ──
-        elif tool_name == "search_flights":
-            return self._search_flights(inp)
-        elif tool_name == "search_flights_report":
-            return self._search_flights_report(inp)
-        elif tool_name == "find_cheapest_dates":
-            return self._find_cheapest_dates(inp)
-        elif tool_name == "track_flight_price":
-            return self._track_flight_price(inp)
-        elif tool_name == "get_tracked_flights":
-            return self._get_tracked_flights(inp)
-        elif tool_name == "stop_tracking":
-            return self._stop_tracking(inp)
-        elif tool_name == "book_flight":
-            return self._book_flight(inp)
-
-        # ─── Report Generation ──
-        elif tool_name == "generate_report":
-            return self._generate_report(inp)
-
-        # ─── Scheduled Tasks ──
-        elif tool_name == "schedule_task":
-            return self._schedule_task(inp)
-        elif tool_name == "list_scheduled_tasks":
-            return self._list_scheduled_tasks(inp)
-        elif tool_name == "remove_scheduled_task":
-            return self._remove_scheduled_task(inp)
-
-        # ─── Image Generation ──
-        elif tool_name == "generate_image":
-            return self._generate_image(inp)
-
-        # ─── Home Automation ──
-        elif tool_name == "smart_home":
-            return self._smart_home(inp)
-
-        # ─── PowerPoint ──
-        elif tool_name == "generate_presentation":
-            return self._generate_presentation(inp)
-
-        # ─── Media Processing ──
-        elif tool_name == "process_media":
-            return self._process_media(inp)
-
-        # ─── Document Ingestion (RAG) ──
-        elif tool_name == "ingest_document":
-            return self._ingest_document(inp)
-        elif tool_name == "search_documents":
-            return self._search_documents(inp)
-
-        # ─── Headless Browser ──
-        elif tool_name == "headless_browse":
-            return self._headless_browse(inp)
-
-        # ─── MCP (Model Context Protocol) ──
-        elif tool_name == "mcp_list_tools":
-            return self._mcp_list_tools(inp)
-        elif tool_name == "mcp_call_tool":
-            return self._mcp_call_tool(inp)
-
-        # ─── Self-Healing ──
-        elif tool_name == "propose_self_heal":
-            return self._propose_self_heal(inp)
-
-        elif tool_name == "get_error_report":
-            return self._get_error_report(inp)
+    def _run_quick_command(self, inp):
+        cmd = inp.get("command", "")
+        if not cmd:
+            return {"success": False, "error": True, "content": "⚠️ Missing 'command' parameter. Example: run_quick_command({\"command\": \"ls -la\"})"}
+        return run_terminal(cmd, timeout=inp.get("timeout", 30))
 
-        else:
-            from memory.error_tracker import error_tracker
-            error_tracker.record_error(
-                error=f"Unknown tool: {tool_name}",
-                context="dispatch",
-                tool=tool_name,
-                source_file="executor.py",
-                details="Brain hallucinated a tool name that doesn't exist",
-                params=self._safe_params(inp),
-            )
-            return {"success": False, "error": True, "content": f"Unknown tool: {tool_name}"}
+    def _think(self, inp):
+        thought = inp.get("thought", "")
+        if not thought:
+            return {"success": False, "error": True, "content": "⚠️ Empty thought. You MUST provide a 'thought' string. Example: think({\"thought\": \"Analyzing the request...\"})"}
+        self.logger.info(f"💭 Brain thinking: {thought[:200]}")
+        event_bus.emit("thinking", {"text": thought, "model": "brain"})
+        return {"success": True, "content": "Thought recorded. Continue with your plan."}
 
     def _web_search(self, query):
-        """Fast web search — Serper API (primary), DuckDuckGo (fallback).
+        """Fast web search — Serper API (primary), DuckDuckGo (fallback), browser (last resort).
         
         Uses Serper Google Search API first (fast, reliable, no CAPTCHAs).
         Falls back to DuckDuckGo HTTP if Serper is unavailable.
+
+        Results come from the research cache shared with hands/research_apis.py
+        (keyed by normalized query, per-provider TTLs), so the brain and the
+        research agent don't pay twice for the same search. A provider that
+        keeps failing is skipped for a cool-down instead of costing its
+        timeout on every call.
         """
-        import urllib.request
-        import urllib.parse
-        import re
+        from hands.research_apis import serper_search, duckduckgo_search, ResearchCache, search_health
 
         # ── Fast path: Serper API (most reliable) ──
         serper_key = self.config.get("research", {}).get("serper_api_key", "")
         if serper_key:
             try:
-                from hands.research_apis import serper_search
                 result = serper_search(query, serper_key, num_results=10)
                 if result:
                     return {"success": True, "content": result}
@@ -480,49 +549,35 @@ class ToolExecutor:
 
         # ── Fallback: DuckDuckGo HTML (no browser, no CAPTCHA) ──
         try:
-            encoded = urllib.parse.quote_plus(query)
-            url = f"https://html.duckduckgo.com/html/?q={encoded}"
-            req = urllib.request.Request(url, headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/120.0.0.0 Safari/537.36"
-                ),
-            })
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                html = resp.read().decode("utf-8", errors="replace")
-            # Extract result snippets from DuckDuckGo HTML
-            snippets = re.findall(r'class="result__snippet">(.*?)</a>', html, re.S)
-            titles = re.findall(r'class="result__a"[^>]*>(.*?)</a>', html, re.S)
-            if snippets:
-                results = []
-                for i, (t, s) in enumerate(zip(titles, snippets), 1):
-                    t_clean = re.sub(r'<[^>]+>', '', t).strip()
-                    s_clean = re.sub(r'<[^>]+>', '', s).strip()
-                    results.append(f"{i}. {t_clean}\n   {s_clean}")
-                text = "\n\n".join(results[:10])
-                return {"success": True, "content": f"Search results for '{query}':\n\n{text}"}
-            # Fallback: strip all HTML
-            text = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.S)
-            text = re.sub(r'<style[^>]*>.*?</style>', '', text, flags=re.S)
-            text = re.sub(r'<[^>]+>', ' ', text)
-            text = re.sub(r'\s+', ' ', text).strip()
-            if len(text) > 200:
-                return {"success": True, "content": f"Search results for '{query}':\n\n{text[:6000]}"}
+            result = duckduckgo_search(query, num_results=10)
+            if result:
+                return {"success": True, "content": result}
         except Exception as e:
             logger.warning(f"⚠️ HTTP search failed ({e}), trying browser...")
 
         # ── Slow fallback: CDP browser (with hard 30s timeout) ──
+        cache = ResearchCache()
+        cached = cache.get("browser_search", query)
+        if cached:
+            return {"success": True, "content": cached}
+        if not search_health.available("browser"):
+            return {"success": False, "error": True,
+                    "content": "Web search failed: Serper, DuckDuckGo and the browser are all failing "
+                               "right now. Try again in a few minutes or use a different tool."}
         import concurrent.futures
-        def _browser_search():
-            return browser_google(query)
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
         try:
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                future = pool.submit(_browser_search)
-                text = future.result(timeout=30)
-                return {"success": True, "content": text if isinstance(text, str) else str(text)}
+            text = pool.submit(browser_google, query).result(timeout=30)
+            text = text if isinstance(text, str) else str(text)
         except Exception as e2:
-            return {"success": False, "error": True, "content": f"Web search failed: {e2}"}
+            reason = str(e2) or "browser timed out after 30s"
+            search_health.record_failure("browser", reason)
+            return {"success": False, "error": True, "content": f"Web search failed: {reason}"}
+        finally:
+            pool.shutdown(wait=False)   # Don't wait out a hung browser
+        search_health.record_success("browser")
+        cache.put("browser_search", query, text)
+        return {"success": True, "content": text}
 
     def _scan_environment(self, checks):
         """
@@ -621,12 +676,13 @@ class ToolExecutor:
                 results.append(f"## System Info\n⚠️ Error: {e}")
 
         # ── Deployment status this task ──
-        deployed = len(self._deployment_log)
+        deployment_log = self.current_context().deployments()
+        deployed = len(deployment_log)
         remaining = self.max_deployments - deployed
-        if self._deployment_log:
+        if deployment_log:
             dep_summary = "\n".join(
                 f"  {'✅' if d['success'] else '❌'} {d['agent']}: {d['task'][:80]}"
-                for d in self._deployment_log
+                for d in deployment_log
             )
             results.append(f"## Deployment Status ({deployed}/{self.max_deployments} used, {remaining} remaining)\n{dep_summary}")
         else:
@@ -752,12 +808,15 @@ class ToolExecutor:
         Phase 8: Checkpoint
         Save current progress so the brain can resume if interrupted.
         """
+        ctx = self.current_context()
+        deployment_log = ctx.deployments()
         checkpoint_data = {
             "timestamp": datetime.now().isoformat(),
+            "task_id": ctx.task_id,
             "completed": completed,
             "remaining": remaining,
-            "deployments": len(self._deployment_log),
-            "deployment_log": self._deployment_log,
+            "deployments": len(deployment_log),
+            "deployment_log": deployment_log,
         }
 
         # Save to memory
@@ -776,7 +835,7 @@ class ToolExecutor:
 
         return {
             "success": True,
-            "content": f"💾 Checkpoint saved.\nCompleted: {completed}\nRemaining: {remaining}\nDeployments used: {len(self._deployment_log)}/{self.max_deployments}"
+            "content": f"💾 Checkpoint saved.\nCompleted: {completed}\nRemaining: {remaining}\nDeployments used: {len(deployment_log)}/{self.max_deployments}"
         }
 
     # ─────────────────────────────────────────────
@@ -1938,8 +1997,8 @@ class ToolExecutor:
         event_bus.emit("tool_use", {"tool": "ingest_document", "file": file_path})
         return self.memory.semantic.ingest_document(
             file_path=file_path,
-            chunk_size=inp.get("chunk_size", 1000),
-            chunk_overlap=inp.get("chunk_overlap", 200),
+            chunk_size=inp.get("chunk_size"),
+            chunk_overlap=inp.get("chunk_overlap"),
         )
 
     def _search_documents(self, inp):
@@ -2065,7 +2124,7 @@ class ToolExecutor:
         except Exception as e:
             return {"success": False, "error": True, "content": f"Self-heal error: {e}"}
 
-    def _deploy_agent(self, agent_type, task):
+    def _deploy_agent(self, agent_type, task, ctx=None):
         """
         Deploy a specialist agent. No hidden retry loops.
         
@@ -2074,30 +2133,25 @@ class ToolExecutor:
         of all previous failures so the brain can make a smarter decision.
         
         The BRAIN decides what to do next, not the executor.
+
+        ctx: the task's TaskContext (defaults to the calling thread's). All
+        budget, failure history and checkpoints are read from and written
+        to it, so concurrent tasks deploy independently.
         """
         agent_class = AGENT_CLASSES.get(agent_type)
         if not agent_class:
             return {"success": False, "error": True, "content": f"Unknown agent type: {agent_type}"}
+        ctx = ctx or self.current_context()
 
         # ── Hard limit: prevent infinite deployment loops ──
-        deployment_count = len(self._deployment_log)
-        if deployment_count >= self.max_deployments:
-            failures = self._get_failure_summary()
-            return {
-                "success": False,
-                "error": True,
-                "content": (
-                    f"DEPLOYMENT LIMIT REACHED ({self.max_deployments} agents deployed this task). "
-                    f"You MUST ask Abdullah for help via send_imessage now.\n\n"
-                    f"{failures}"
-                ),
-            }
+        if ctx.deployments_used >= self.max_deployments:
+            return self._deployment_limit_reached(ctx)
 
         # ── Build context from previous failures + memory ──
         context_parts = []
 
         # Previous failure history (most important — prevents repeating mistakes)
-        failure_summary = self._get_failure_summary()
+        failure_summary = self._get_failure_summary(ctx)
         if failure_summary:
             context_parts.append(failure_summary)
 
@@ -2126,20 +2180,18 @@ class ToolExecutor:
 
         # Inject previous browser agent's state checkpoint for continuity
         if agent_type == "browser":
-            for prev in reversed(self._deployment_log):
-                if prev.get("agent") == "browser" and prev.get("checkpoint"):
-                    cp = prev["checkpoint"]
-                    checkpoint_ctx = (
-                        f"## Previous Browser Agent State\n"
-                        f"- Domain: {cp.get('domain', '?')}\n"
-                        f"- Visited URLs: {', '.join(cp.get('visited_urls', [])[:5])}\n"
-                        f"- Past signup form: {cp.get('past_first_page', False)}\n"
-                        f"- Flow progress: {' → '.join(cp.get('flow_steps', [])[-5:])}\n"
-                        f"- ⚠️ Do NOT navigate back to URLs the previous agent already visited.\n"
-                        f"- ⚠️ Chrome may still be on the page where the previous agent stopped — look first!"
-                    )
-                    context_parts.append(checkpoint_ctx)
-                    break
+            cp = ctx.last_checkpoint("browser")
+            if cp:
+                checkpoint_ctx = (
+                    f"## Previous Browser Agent State\n"
+                    f"- Domain: {cp.get('domain', '?')}\n"
+                    f"- Visited URLs: {', '.join(cp.get('visited_urls', [])[:5])}\n"
+                    f"- Past signup form: {cp.get('past_first_page', False)}\n"
+                    f"- Flow progress: {' → '.join(cp.get('flow_steps', [])[-5:])}\n"
+                    f"- ⚠️ Do NOT navigate back to URLs the previous agent already visited.\n"
+                    f"- ⚠️ Chrome may still be on the page where the previous agent stopped — look first!"
+                )
+                context_parts.append(checkpoint_ctx)
 
         context = "\n\n".join(context_parts) if context_parts else None
 
@@ -2149,8 +2201,12 @@ class ToolExecutor:
         if "~/" in task:
             task = task.replace("~/", f"{home}/")
 
+        # ── Claim a budget slot (atomic — parallel deploys can't overshoot) ──
+        attempt = ctx.reserve_deployment(self.max_deployments)
+        if not attempt:
+            return self._deployment_limit_reached(ctx)
+
         # ── Emit events ──
-        attempt = deployment_count + 1
         event_bus.emit("agent_started", {
             "agent": agent_type,
             "task": task[:200],
@@ -2170,13 +2226,14 @@ class ToolExecutor:
             except Exception:
                 pass
 
-        # ── Create and run the agent (with timeout) ──
+        # ── Create and run the agent (with its deployment limits) ──
+        token = self.deployments.token(agent_type, parent=ctx.kill_event)
         agent_kwargs = dict(
             llm_client=self.llm_client,
             model=self.heavy_model,
             max_steps=40,
             phone=self.phone,
-            kill_event=self._kill_event,
+            kill_event=token,
             fallback_client=self.fallback_llm_client,
             fallback_model=self.fallback_model,
         )
@@ -2190,31 +2247,12 @@ class ToolExecutor:
             agent_kwargs["config"] = self.config
         agent = agent_class(**agent_kwargs)
 
-        agent_timeout = 300  # 5 minutes max per agent deployment
-        if agent_type == "dev":
-            agent_timeout = 3600  # 60 minutes for autonomous PRD-to-production sessions
-        try:
-            with ThreadPoolExecutor(max_workers=1) as pool:
-                future = pool.submit(agent.run, task, context)
-                result = future.result(timeout=agent_timeout)
-        except FuturesTimeout:
-            result = {
-                "success": False,
-                "content": f"Agent timed out after {agent_timeout}s. The task may be too complex for a single agent deployment — try breaking it into smaller steps.",
-                "steps": 0,
-                "stuck": True,
-                "stuck_reason": f"Timed out after {agent_timeout}s",
-            }
-            self.logger.warning(f"⏰ {agent_type} agent timed out after {agent_timeout}s")
-        except Exception as e:
-            result = {
-                "success": False,
-                "content": f"Agent crashed: {e}",
-                "steps": 0,
-                "stuck": True,
-                "stuck_reason": f"Agent exception: {e}",
-            }
-            self.logger.error(f"💥 {agent_type} agent crashed: {e}")
+        # The token is the agent's kill event: the task's kill switch plus this
+        # deployment's wall-time (5 min; 60 for dev), token and tool-call limits
+        result = self.deployments.run(agent, task, context, token=token, agent_type=agent_type)
+        usage = result.get("usage", {})
+        self.logger.info(f"📊 {agent_type} agent used {usage.get('tokens', 0):,} tokens, "
+                         f"{usage.get('tool_calls', 0)} tool calls in {usage.get('wall_seconds', 0):.0f}s")
 
         # ── Record this deployment ──
         entry = {
@@ -2223,8 +2261,8 @@ class ToolExecutor:
             "success": result.get("success", False),
             "steps": result.get("steps", 0),
             "reason": result.get("stuck_reason") or result.get("content", "")[:300],
+            "usage": result.get("usage", {}),
         }
-        self._deployment_log.append(entry)
 
         # ── Save browser agent checkpoint on failure for handoff ──
         if agent_type == "browser" and not result.get("success"):
@@ -2234,6 +2272,7 @@ class ToolExecutor:
                     entry["checkpoint"] = checkpoint
             except Exception:
                 pass
+        ctx.record_deployment(entry)
 
         # ── Record browser errors to site_knowledge for learning ──
         if agent_type == "browser" and not result.get("success"):
@@ -2275,9 +2314,9 @@ class ToolExecutor:
             # ── Budget awareness nudge ──
             # When >50% of deployments used, or same agent type deployed 3+ times,
             # remind the brain to move forward to the next phase
-            deployed = len(self._deployment_log)
+            deployed = ctx.deployments_used
             remaining = self.max_deployments - deployed
-            same_type_count = sum(1 for d in self._deployment_log if d["agent"] == agent_type)
+            same_type_count = len(ctx.deployments(agent_type))
 
             budget_nudge = ""
             if same_type_count >= 3:
@@ -2335,9 +2374,9 @@ class ToolExecutor:
             self.logger.warning(f"⚠️ {agent_type} agent stuck: {stuck_reason[:200]}")
 
             # Build rich failure response with recovery ladder
-            all_failures = self._get_failure_summary()
-            remaining = self.max_deployments - len(self._deployment_log)
-            attempt_num = len([d for d in self._deployment_log if d["agent"] == agent_type])
+            all_failures = self._get_failure_summary(ctx)
+            remaining = self.max_deployments - ctx.deployments_used
+            attempt_num = len(ctx.deployments(agent_type))
 
             # Structured recovery ladder — escalates with each failure
             if attempt_num <= 1:
@@ -2379,3 +2418,15 @@ class ToolExecutor:
             )
 
         return result
+
+    def _deployment_limit_reached(self, ctx):
+        failures = self._get_failure_summary(ctx)
+        return {
+            "success": False,
+            "error": True,
+            "content": (
+                f"DEPLOYMENT LIMIT REACHED ({self.max_deployments} agents deployed this task). "
+                f"You MUST ask Abdullah for help via send_imessage now.\n\n"
+                f"{failures}"
+            ),
+        }
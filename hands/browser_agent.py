@@ -418,10 +418,10 @@ class BrowserAgent:
         except Exception as e:
             return f"ERROR: {e}"
 
-    def _notify(self, msg):
-        """Send iMessage progress if phone configured."""
+    def _notify(self, msg, progress=False):
+        """Queue an iMessage update if phone configured."""
         if self.phone:
-            _send_progress(self.phone, msg)
+            _send_progress(self.phone, msg, key=f"browser:{id(self)}", progress=progress)
 
     def run(self, task, context=None):
         """Execute a browser task autonomously. Returns result dict."""
@@ -640,7 +640,7 @@ class BrowserAgent:
                     # iMessage update every N steps
                     if step % self.update_every == 0:
                         short = result_str[:200] + ("..." if len(result_str) > 200 else "")
-                        self._notify(f"🌐 Step {step}: {name}\n→ {short}")
+                        self._notify(f"🌐 Step {step}: {name}\n→ {short}", progress=True)
 
             # No tool calls = prompt to act
             if not tool_results:
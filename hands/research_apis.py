@@ -10,7 +10,7 @@
 ║  Phase 5:  Yahoo Finance (stocks, crypto, market data)       ║
 ║  Phase 6:  Semantic Scholar + arXiv (academic papers)        ║
 ║  Phase 7:  Google News RSS (current events)                  ║
-║  Phase 17: Research cache (1-hour TTL)                       ║
+║  Phase 17: Research cache (per-provider TTLs, cool-downs)    ║
 ║                                                              ║
 ║  All functions return plain strings — no dict wrappers.      ║
 ║  The ResearchAgent calls these directly from _dispatch().    ║
@@ -20,57 +20,181 @@
 import json
 import re
 import time
+import logging
 import hashlib
+import threading
+import unicodedata
 import urllib.parse
 import urllib.request
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
+logger = logging.getLogger("TARS")
+
 
 # ═══════════════════════════════════════════════════════
-#  Phase 17: Research Cache (1-hour TTL)
+#  Phase 17: Research Cache (per-provider TTLs)
 # ═══════════════════════════════════════════════════════
 
+# How long each source's results stay fresh (seconds). Prices and news
+# go stale fast; encyclopedia and paper lookups barely change.
+CACHE_TTLS = {
+    "serper": 3600, "serper_scholar": 86400, "ddg": 3600, "browser_search": 1800,
+    "serper_news": 900, "gnews": 900,
+    "yf_quote": 300,
+    "wiki_summary": 86400, "wiki_search": 86400, "wiki_full": 86400, "wiki_infobox": 86400,
+    "s2": 86400, "arxiv": 86400,
+    "page": 3600,
+}
+DEFAULT_CACHE_TTL = 3600
+CACHE_MAX_ENTRIES = 500
+
+# Free-text query sources: "Tesla  Q3 revenue?" and "tesla q3 revenue" share an entry.
+# URL / title lookups (page, wiki_full, yf_quote...) are keyed exactly.
+_QUERY_PREFIXES = {"serper", "serper_news", "serper_scholar", "ddg", "browser_search",
+                   "gnews", "s2", "arxiv", "wiki_search"}
+_TRAILING_PUNCT_RE = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_query(query):
+    """Canonical form of a search query: NFKC, case-folded, single spaces,
+    no trailing punctuation. Word order and quotes are kept — they change
+    what a search engine returns."""
+    q = unicodedata.normalize("NFKC", str(query)).casefold()
+    q = " ".join(q.split())
+    return _TRAILING_PUNCT_RE.sub("", q)
+
+
 class ResearchCache:
-    """In-memory cache with 1-hour TTL. Shared across agent invocations."""
+    """In-memory LRU cache keyed by content hash, with per-provider TTLs.
+    Shared across agent invocations and with ToolExecutor.web_search."""
 
     _instance = None
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._cache = {}
-            cls._instance._max_entries = 200
+            cls._instance._cache = OrderedDict()    # key → {"data", "ts", "prefix"}
+            cls._instance._max_entries = CACHE_MAX_ENTRIES
+            cls._instance._lock = threading.Lock()
+            cls._instance._hits = 0
+            cls._instance._misses = 0
         return cls._instance
 
     def _key(self, prefix, query):
-        h = hashlib.md5(f"{prefix}:{query}".encode()).hexdigest()[:16]
+        text = normalize_query(query) if prefix in _QUERY_PREFIXES else str(query).strip()
+        h = hashlib.sha256(f"{prefix}\0{text}".encode()).hexdigest()[:24]
         return f"{prefix}:{h}"
 
+    @staticmethod
+    def ttl(prefix):
+        return CACHE_TTLS.get(prefix, DEFAULT_CACHE_TTL)
+
     def get(self, prefix, query):
         key = self._key(prefix, query)
-        entry = self._cache.get(key)
-        if entry and time.time() - entry["ts"] < 3600:
-            return entry["data"]
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and time.time() - entry["ts"] < self.ttl(prefix):
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return entry["data"]
+            if entry:
+                del self._cache[key]
+            self._misses += 1
         return None
 
     def put(self, prefix, query, data):
         key = self._key(prefix, query)
-        self._cache[key] = {"data": data, "ts": time.time()}
-        # Prune if too large
-        if len(self._cache) > self._max_entries:
-            oldest = sorted(self._cache.items(), key=lambda x: x[1]["ts"])
-            for k, _ in oldest[:50]:
-                del self._cache[k]
+        with self._lock:
+            self._cache[key] = {"data": data, "ts": time.time(), "prefix": prefix}
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._max_entries:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
 
     def stats(self):
-        valid = sum(1 for v in self._cache.values() if time.time() - v["ts"] < 3600)
-        return {"entries": len(self._cache), "valid": valid}
+        now = time.time()
+        with self._lock:
+            valid = sum(1 for v in self._cache.values() if now - v["ts"] < self.ttl(v["prefix"]))
+            return {"entries": len(self._cache), "valid": valid, "hits": self._hits, "misses": self._misses}
 
 
 _cache = ResearchCache()
 
 
+# ═══════════════════════════════════════════════════════
+#  Search provider cool-downs
+# ═══════════════════════════════════════════════════════
+
+FAILURES_BEFORE_COOLDOWN = 2    # Consecutive failures before a provider is skipped
+COOLDOWN_SECONDS = 120.0        # First cool-down; doubles per consecutive one
+MAX_COOLDOWN_SECONDS = 900.0
+
+
+class SearchProviderHealth:
+    """Consecutive-failure tracking per search provider (serper, ddg, browser).
+
+    A provider that fails FAILURES_BEFORE_COOLDOWN times in a row is
+    skipped for COOLDOWN_SECONDS, doubling on each repeat, so callers go
+    straight to the next provider instead of paying its timeout again.
+    A success resets it.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = {}    # provider → {"failures", "cooldowns", "until", "last_error"}
+
+    def _entry(self, provider):
+        return self._state.setdefault(provider, {"failures": 0, "cooldowns": 0, "until": 0.0,
+                                                 "last_error": "", "skipped": 0})
+
+    def available(self, provider):
+        """False while the provider is cooling down (and counts the skip)."""
+        with self._lock:
+            entry = self._entry(provider)
+            if self._clock() < entry["until"]:
+                entry["skipped"] += 1
+                return False
+            return True
+
+    def record_success(self, provider):
+        with self._lock:
+            entry = self._entry(provider)
+            entry["failures"] = 0
+            entry["cooldowns"] = 0
+
+    def record_failure(self, provider, error=""):
+        with self._lock:
+            entry = self._entry(provider)
+            entry["failures"] += 1
+            entry["last_error"] = str(error)[:200]
+            if entry["failures"] < FAILURES_BEFORE_COOLDOWN:
+                return
+            period = min(COOLDOWN_SECONDS * (2 ** entry["cooldowns"]), MAX_COOLDOWN_SECONDS)
+            entry["cooldowns"] += 1
+            entry["failures"] = 0
+            entry["until"] = self._clock() + period
+        logger.warning(f"  🧊 Search provider {provider} failing — skipping it for {period:.0f}s")
+
+    def stats(self):
+        now = self._clock()
+        with self._lock:
+            return {p: {"cooling_down_for": round(max(0.0, e["until"] - now), 1),
+                        "consecutive_failures": e["failures"], "skipped": e["skipped"],
+                        "last_error": e["last_error"]}
+                    for p, e in sorted(self._state.items())}
+
+
+# Shared by the research agent and ToolExecutor.web_search
+search_health = SearchProviderHealth()
+
+
 # ═══════════════════════════════════════════════════════
 #  HTTP helpers
 # ═══════════════════════════════════════════════════════
@@ -127,6 +251,23 @@ def _http_post_json(url, payload, headers=None, timeout=15):
 #  Phase 1: Serper.dev Google Search API
 # ═══════════════════════════════════════════════════════
 
+def _serper_post(endpoint, payload, api_key):
+    """POST to a Serper endpoint unless Serper is cooling down; records the outcome."""
+    if not search_health.available("serper"):
+        return None
+    data = _http_post_json(
+        f"https://google.serper.dev/{endpoint}",
+        payload,
+        headers={"X-API-KEY": api_key},
+        timeout=10,
+    )
+    if data is None:
+        search_health.record_failure("serper", f"{endpoint}: no response")
+    else:
+        search_health.record_success("serper")
+    return data
+
+
 def serper_search(query, api_key, num_results=10, search_type="search"):
     """
     Google search via Serper.dev API. $5/2500 searches. Zero CAPTCHAs.
@@ -142,12 +283,7 @@ def serper_search(query, api_key, num_results=10, search_type="search"):
         return cached
 
     payload = {"q": query, "num": min(num_results, 20)}
-    data = _http_post_json(
-        f"https://google.serper.dev/{search_type}",
-        payload,
-        headers={"X-API-KEY": api_key},
-        timeout=10,
-    )
+    data = _serper_post(search_type, payload, api_key)
 
     if not data:
         return None
@@ -223,12 +359,7 @@ def serper_news(query, api_key, num_results=10):
     if cached:
         return cached
 
-    data = _http_post_json(
-        "https://google.serper.dev/news",
-        {"q": query, "num": min(num_results, 20)},
-        headers={"X-API-KEY": api_key},
-        timeout=10,
-    )
+    data = _serper_post("news", {"q": query, "num": min(num_results, 20)}, api_key)
 
     if not data:
         return None
@@ -257,12 +388,7 @@ def serper_scholar(query, api_key, num_results=10):
     if cached:
         return cached
 
-    data = _http_post_json(
-        "https://google.serper.dev/scholar",
-        {"q": query, "num": min(num_results, 10)},
-        headers={"X-API-KEY": api_key},
-        timeout=10,
-    )
+    data = _serper_post("scholar", {"q": query, "num": min(num_results, 10)}, api_key)
 
     if not data:
         return None
@@ -821,16 +947,22 @@ def duckduckgo_search(query, num_results=10):
     if cached:
         return cached
 
+    if not search_health.available("ddg"):
+        return None
+
     encoded = urllib.parse.quote_plus(query)
     url = f"https://html.duckduckgo.com/html/?q={encoded}"
     html = _http_get(url, timeout=10)
 
     if not html:
+        search_health.record_failure("ddg", "no response")
         return None
 
     # Check for CAPTCHA
     if "Please complete the" in html or "bot" in html.lower()[:500]:
+        search_health.record_failure("ddg", "CAPTCHA")
         return None
+    search_health.record_success("ddg")
 
     titles = re.findall(r'class="result__a"[^>]*>(.*?)</a>', html, re.S)
     snippets = re.findall(r'class="result__snippet">(.*?)</a>', html, re.S)
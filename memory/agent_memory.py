@@ -15,77 +15,199 @@
 
 import os
 import json
+import atexit
+import logging
+import threading
 from datetime import datetime
 
+try:
+    import fcntl  # POSIX advisory locks for cross-process safety
+except ImportError:  # pragma: no cover — Windows
+    fcntl = None
 
-class AgentMemory:
-    """Persistent memory for agent learning patterns."""
+logger = logging.getLogger("TARS")
 
-    def __init__(self, base_dir):
-        self.memory_dir = os.path.join(base_dir, "memory", "agents")
-        os.makedirs(self.memory_dir, exist_ok=True)
+FLUSH_INTERVAL = 5.0   # Seconds between a record_* call and its disk flush
+MAX_PATTERNS = 20      # Success/failure patterns kept per agent
 
-    def _agent_file(self, agent_name):
-        """Get memory file path for an agent."""
-        safe_name = agent_name.lower().replace(" ", "_")
+
+def _empty_record():
+    return {
+        "success_patterns": [],
+        "failure_patterns": [],
+        "stats": {"total_tasks": 0, "successes": 0, "failures": 0, "total_steps": 0},
+    }
+
+
+class _AgentMemoryStore:
+    """Process-wide in-memory store for one memory directory.
+
+    Records live in memory; record_* calls mutate them under a lock and
+    queue a delta. Flushes happen on an interval and at exit: for each
+    dirty agent the file is locked, re-read, the pending deltas are merged
+    onto what's on disk (so other processes' updates aren't lost), and the
+    result is written atomically.
+    """
+
+    def __init__(self, memory_dir):
+        self.memory_dir = memory_dir
+        self._records = {}      # safe_name → record
+        self._pending = {}      # safe_name → unflushed delta (same shape as a record)
+        self._lock = threading.RLock()
+        self._flush_timer = None
+        atexit.register(self.flush)
+
+    def _path(self, safe_name):
         return os.path.join(self.memory_dir, f"{safe_name}.json")
 
-    def _load(self, agent_name):
-        """Load agent memory from disk."""
-        path = self._agent_file(agent_name)
+    def _read_disk(self, safe_name):
+        path = self._path(safe_name)
         if os.path.exists(path):
             try:
                 with open(path, "r") as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
                 pass
-        return {
-            "success_patterns": [],
-            "failure_patterns": [],
-            "stats": {"total_tasks": 0, "successes": 0, "failures": 0, "total_steps": 0},
-        }
-
-    def _save(self, agent_name, data):
-        """Save agent memory to disk."""
-        path = self._agent_file(agent_name)
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+        return _empty_record()
+
+    def get(self, safe_name):
+        """Return the live record for an agent (loaded on first use)."""
+        with self._lock:
+            record = self._records.get(safe_name)
+            if record is None:
+                record = self._read_disk(safe_name)
+                self._records[safe_name] = record
+            return record
+
+    def update(self, safe_name, outcome, entry, steps):
+        """Apply one task outcome ("success"/"failure") in memory and queue it for flush."""
+        key = f"{outcome}_patterns"
+        counter = "successes" if outcome == "success" else "failures"
+        with self._lock:
+            record = self.get(safe_name)
+            delta = self._pending.get(safe_name)
+            if delta is None:
+                delta = self._pending[safe_name] = _empty_record()
+            for target in (record["stats"], delta["stats"]):
+                target["total_tasks"] = target.get("total_tasks", 0) + 1
+                target[counter] = target.get(counter, 0) + 1
+                target["total_steps"] = target.get("total_steps", 0) + steps
+            record[key].append(entry)
+            record[key] = record[key][-MAX_PATTERNS:]
+            delta[key].append(entry)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Merge pending deltas into each dirty agent's file."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            for safe_name in list(self._pending):
+                try:
+                    self._flush_agent(safe_name)
+                except (IOError, OSError) as e:
+                    logger.warning(f"Failed to save agent memory for {safe_name}: {e}")
+
+    def _flush_agent(self, safe_name):
+        delta = self._pending[safe_name]
+        os.makedirs(self.memory_dir, exist_ok=True)
+        path = self._path(safe_name)
+        with open(path + ".lock", "w") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                merged = self._read_disk(safe_name)
+                stats = merged.setdefault("stats", {})
+                for k, v in delta["stats"].items():
+                    stats[k] = stats.get(k, 0) + v
+                for key in ("success_patterns", "failure_patterns"):
+                    merged[key] = (merged.get(key, []) + delta[key])[-MAX_PATTERNS:]
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(merged, f, indent=2)
+                os.replace(tmp, path)
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._records[safe_name] = merged
+        del self._pending[safe_name]
+
+    def known_agents(self):
+        """Safe names of every agent on disk or in memory."""
+        with self._lock:
+            names = set(self._records)
+        if os.path.exists(self.memory_dir):
+            names.update(f[:-5] for f in os.listdir(self.memory_dir) if f.endswith(".json"))
+        return sorted(names)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _store_for(memory_dir):
+    """One shared store per memory directory, across all AgentMemory instances."""
+    key = os.path.realpath(memory_dir)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = _AgentMemoryStore(memory_dir)
+        return store
+
+
+class AgentMemory:
+    """Persistent memory for agent learning patterns.
+
+    A thin view over the process-wide store for base_dir — every
+    AgentMemory pointing at the same directory shares the same records,
+    so tars.py and the executor never race each other's writes.
+    """
+
+    def __init__(self, base_dir):
+        self.memory_dir = os.path.join(base_dir, "memory", "agents")
+        os.makedirs(self.memory_dir, exist_ok=True)
+        self._store = _store_for(self.memory_dir)
+
+    @staticmethod
+    def _safe_name(agent_name):
+        return agent_name.lower().replace(" ", "_")
+
+    def _agent_file(self, agent_name):
+        """Get memory file path for an agent."""
+        return os.path.join(self.memory_dir, f"{self._safe_name(agent_name)}.json")
+
+    def _load(self, agent_name):
+        """Get agent memory (from the in-memory store)."""
+        return self._store.get(self._safe_name(agent_name))
+
+    def flush(self):
+        """Write pending updates to disk now."""
+        self._store.flush()
 
     def record_success(self, agent_name, task, summary, steps):
         """Record a successful task completion."""
-        data = self._load(agent_name)
-        data["stats"]["total_tasks"] += 1
-        data["stats"]["successes"] += 1
-        data["stats"]["total_steps"] += steps
-
-        # Keep last 20 success patterns
-        data["success_patterns"].append({
+        self._store.update(self._safe_name(agent_name), "success", {
             "task": task[:200],
             "summary": summary[:300],
             "steps": steps,
             "timestamp": datetime.now().isoformat(),
-        })
-        data["success_patterns"] = data["success_patterns"][-20:]
-
-        self._save(agent_name, data)
+        }, steps)
 
     def record_failure(self, agent_name, task, reason, steps):
         """Record a failed task."""
-        data = self._load(agent_name)
-        data["stats"]["total_tasks"] += 1
-        data["stats"]["failures"] += 1
-        data["stats"]["total_steps"] += steps
-
-        # Keep last 20 failure patterns
-        data["failure_patterns"].append({
+        self._store.update(self._safe_name(agent_name), "failure", {
             "task": task[:200],
             "reason": reason[:300],
             "steps": steps,
             "timestamp": datetime.now().isoformat(),
-        })
-        data["failure_patterns"] = data["failure_patterns"][-20:]
-
-        self._save(agent_name, data)
+        }, steps)
 
     def get_context(self, agent_name, max_patterns=5):
         """Get memory context to inject into agent system prompt."""
@@ -120,13 +242,8 @@ class AgentMemory:
     def get_all_stats(self):
         """Get stats for all agents."""
         stats = {}
-        if not os.path.exists(self.memory_dir):
-            return stats
-
-        for filename in os.listdir(self.memory_dir):
-            if filename.endswith(".json"):
-                agent_name = filename[:-5].replace("_", " ").title()
-                data = self._load(agent_name)
-                stats[agent_name] = data["stats"]
+        for safe_name in self._store.known_agents():
+            agent_name = safe_name.replace("_", " ").title()
+            stats[agent_name] = dict(self._store.get(safe_name)["stats"])
 
         return stats
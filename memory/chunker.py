@@ -0,0 +1,294 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Document Chunker              ║
+╚══════════════════════════════════════════╝
+
+Splits extracted document text into embedding-sized chunks.
+
+  - Budgets are in tokens (tiktoken cl100k_base when installed,
+    a conservative regex estimate otherwise), so chunks fill the
+    embedding model evenly instead of by character count.
+  - Structure is kept: headings, paragraphs, list items, pipe
+    tables and fenced code blocks are never cut mid-way unless a
+    single block is larger than the budget. A new section starts
+    a new chunk, and headings are never left dangling at the end.
+  - Overlap is taken from whole sentences/lines of the previous
+    chunk, and only within a section.
+  - Every chunk records its provenance: text[start:end] == chunk.text,
+    plus the heading path and (for paginated PDF text) the page.
+"""
+
+import re
+import bisect
+from dataclasses import dataclass
+from typing import List, Tuple
+
+CHUNK_TOKENS = 256          # Target tokens per chunk
+OVERLAP_TOKENS = 32         # Tokens carried over from the previous chunk
+MIN_SECTION_FILL = 0.25     # A heading only starts a new chunk past this fill
+CHUNKER_VERSION = 2         # Bump to re-chunk everything on next ingest
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None
+
+# ~1 token per 4 word characters or per punctuation mark — errs on the
+# high side of real BPE counts, so budgets are never overshot.
+_TOKEN_RE = re.compile(r"\w{1,4}|[^\w\s]")
+
+_HEADING_RE = re.compile(r"^\s{0,3}(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s{0,3}(```|~~~)")
+_LIST_RE = re.compile(r"^\s*(?:[-*+•]|\d{1,3}[.)])\s+")
+_TABLE_RE = re.compile(r"^\s*\|")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?。])[\"')\]]*\s+|\n+")
+
+
+def count_tokens(text):
+    """Token count for budgeting (exact with tiktoken, estimated otherwise)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(_TOKEN_RE.findall(text))
+
+
+@dataclass
+class Block:
+    """One structural unit of the source text."""
+    kind: str       # heading, paragraph, list, table, code
+    start: int
+    end: int
+    tokens: int
+    section: str    # Heading path, e.g. "Setup > Install"
+
+
+@dataclass
+class Chunk:
+    """An embedding-ready slice of the source, with provenance."""
+    text: str
+    start: int
+    end: int
+    tokens: int
+    section: str = ""
+    page: int = 0   # 1-based page for form-feed paginated text, else 0
+
+
+# ─── Structure ───────────────────────────────────────
+
+def _lines(text):
+    """(start, end, line) for each line, end excluding the newline."""
+    pos = 0
+    n = len(text)
+    while pos < n:
+        nl = text.find("\n", pos)
+        end = n if nl == -1 else nl
+        yield pos, end, text[pos:end]
+        pos = end + 1
+
+
+def split_blocks(text):
+    """Parse text into structural blocks with source offsets."""
+    blocks = []
+    headings = []           # [(level, title)]
+    section = ""
+    lines = list(_lines(text))
+    i = 0
+
+    def add(kind, start, end):
+        raw = text[start:end]
+        lead = len(raw) - len(raw.lstrip())
+        trail = len(raw.rstrip())
+        if trail > lead:
+            blocks.append(Block(kind, start + lead, start + trail,
+                                count_tokens(raw[lead:trail]), section))
+
+    while i < len(lines):
+        start, end, line = lines[i]
+        stripped = line.strip().strip("\f")
+
+        if not stripped:
+            i += 1
+            continue
+
+        if _FENCE_RE.match(line):
+            fence = _FENCE_RE.match(line).group(1)
+            j = i + 1
+            while j < len(lines) and not lines[j][2].lstrip().startswith(fence):
+                j += 1
+            last = min(j, len(lines) - 1)
+            add("code", start, lines[last][1])
+            i = last + 1
+            continue
+
+        m = _HEADING_RE.match(line)
+        if m:
+            level = len(m.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, m.group(2)))
+            section = " > ".join(t for _, t in headings)
+            add("heading", start, end)
+            i += 1
+            continue
+
+        if _TABLE_RE.match(line):
+            j = i
+            while j + 1 < len(lines) and _TABLE_RE.match(lines[j + 1][2]):
+                j += 1
+            add("table", start, lines[j][1])
+            i = j + 1
+            continue
+
+        kind = "list" if _LIST_RE.match(line) else "paragraph"
+        indent = len(line) - len(line.lstrip())
+        j = i
+        while j + 1 < len(lines):
+            nxt = lines[j + 1][2]
+            if not nxt.strip().strip("\f") or "\f" in nxt:
+                break
+            if _FENCE_RE.match(nxt) or _HEADING_RE.match(nxt) or _TABLE_RE.match(nxt):
+                break
+            if _LIST_RE.match(nxt) and (kind == "paragraph" or len(nxt) - len(nxt.lstrip()) <= indent):
+                break
+            j += 1
+        add(kind, start, lines[j][1])
+        i = j + 1
+
+    return blocks
+
+
+# ─── Splitting oversize units ────────────────────────
+
+def _boundaries(text, start, end, kind):
+    """Candidate cut offsets inside [start, end): line ends for code and
+    tables, sentence ends for prose."""
+    if kind in ("code", "table"):
+        return [start + m.end() for m in re.finditer(r"\n", text[start:end])]
+    return [start + m.end() for m in _SENTENCE_END_RE.finditer(text[start:end])]
+
+
+def _hard_split(text, start, end, max_tokens):
+    """Cut a boundary-less span every max_tokens tokens (estimated)."""
+    spans = []
+    count = 0
+    piece_start = start
+    for m in _TOKEN_RE.finditer(text, start, end):
+        if count == max_tokens:
+            spans.append((piece_start, m.start()))
+            piece_start = m.start()
+            count = 0
+        count += 1
+    spans.append((piece_start, end))
+    return spans
+
+
+def _split_span(text, start, end, kind, max_tokens):
+    """Split one oversize span into pieces of at most max_tokens."""
+    cuts = [c for c in _boundaries(text, start, end, kind) if start < c < end] + [end]
+    pieces = []
+    piece_start = start
+    prev = start
+    for cut in cuts:
+        if count_tokens(text[piece_start:cut]) <= max_tokens:
+            prev = cut
+            continue
+        if prev > piece_start:
+            pieces.append((piece_start, prev))
+            piece_start = prev
+        if count_tokens(text[piece_start:cut]) > max_tokens:
+            pieces.extend(_hard_split(text, piece_start, cut, max_tokens))
+            piece_start = cut
+        prev = cut
+    if piece_start < end:
+        pieces.append((piece_start, end))
+    return pieces
+
+
+def _tail_start(text, start, end, kind, budget):
+    """Earliest boundary in (start, end) whose tail fits in budget tokens."""
+    if budget <= 0:
+        return end
+    best = end
+    for cut in reversed(_boundaries(text, start, end, kind)):
+        if cut >= end:
+            continue
+        if count_tokens(text[cut:end]) > budget:
+            break
+        best = cut
+    return best
+
+
+# ─── Packing ─────────────────────────────────────────
+
+def chunk_text(text, max_tokens=CHUNK_TOKENS, overlap_tokens=OVERLAP_TOKENS):
+    """Split text into structure-aware chunks of about max_tokens each."""
+    if not text or not text.strip():
+        return []
+    max_tokens = max(16, int(max_tokens))
+    overlap_tokens = max(0, min(int(overlap_tokens), max_tokens // 2))
+
+    # Units are blocks, with oversize blocks pre-split into pieces. Pieces
+    # leave room for the overlap and for a heading directly above them.
+    units: List[Tuple[str, int, int, int, str]] = []
+    heading_tokens = 0
+    for b in split_blocks(text):
+        above = min(heading_tokens, max_tokens // 4)
+        if b.tokens + above <= max_tokens:
+            units.append((b.kind, b.start, b.end, b.tokens, b.section))
+        else:
+            budget = max_tokens - max(overlap_tokens, above)
+            for s, e in _split_span(text, b.start, b.end, b.kind, budget):
+                units.append((b.kind, s, e, count_tokens(text[s:e]), b.section))
+        heading_tokens = heading_tokens + b.tokens if b.kind == "heading" else 0
+
+    pages = [m.start() for m in re.finditer("\f", text)]
+    chunks: List[Chunk] = []
+    current = []            # Units in the chunk being built
+    used = 0                # Tokens in current, including carried overlap
+    carry_from = None       # Offset where carried overlap starts
+
+    def flush(keep_heading=True):
+        nonlocal current, used, carry_from
+        if not current:
+            return [], None
+        held = []
+        # A trailing heading belongs with what follows it
+        while keep_heading and len(current) > 1 and current[-1][0] == "heading":
+            held.insert(0, current.pop())
+        start = carry_from if carry_from is not None else current[0][1]
+        end = current[-1][2]
+        body = text[start:end]
+        chunks.append(Chunk(
+            text=body,
+            start=start,
+            end=end,
+            tokens=count_tokens(body),
+            section=current[0][4],
+            page=bisect.bisect_right(pages, start) + 1 if pages else 0,
+        ))
+        last = current[-1]
+        current, used, carry_from = [], 0, None
+        return held, last
+
+    for unit in units:
+        kind, s, e, tokens, section = unit
+        new_section = kind == "heading" and bool(current) and used >= max_tokens * MIN_SECTION_FILL
+
+        if new_section or (current and used + tokens > max_tokens):
+            held, last = flush()
+            if not new_section and overlap_tokens and not held and last[4] == section:
+                tail = _tail_start(text, last[1], last[2], last[0], overlap_tokens)
+                if tail < last[2] and count_tokens(text[tail:last[2]]) + tokens <= max_tokens:
+                    carry_from = tail + (len(text[tail:last[2]]) - len(text[tail:last[2]].lstrip()))
+                    used = count_tokens(text[carry_from:last[2]])
+            for h in held:
+                current.append(h)
+                used += h[3]
+
+        current.append(unit)
+        used += tokens
+
+    flush(keep_heading=False)
+    return chunks
@@ -0,0 +1,257 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Incremental Document Ingest   ║
+╚══════════════════════════════════════════╝
+
+Keeps the semantic "documents" collection in step with folders
+on disk. A manifest records (size, mtime, content hash, chunk ids)
+per file, so re-indexing a folder only costs what changed:
+
+  - Unchanged size+mtime  → skipped without reading the file.
+  - Same content hash     → manifest touch only.
+  - Changed content       → re-extracted and re-chunked in worker
+                            processes; only chunks whose text changed
+                            are re-embedded.
+  - File gone from disk   → its vectors are deleted.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from memory.chunker import chunk_text, CHUNK_TOKENS, OVERLAP_TOKENS, CHUNKER_VERSION
+
+logger = logging.getLogger("tars.semantic")
+
+SUPPORTED_EXTENSIONS = {
+    ".txt", ".md", ".pdf", ".docx", ".py", ".json", ".csv", ".yaml", ".yml",
+    ".js", ".ts", ".html", ".css", ".sh", ".bash",
+}
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+PARALLEL_MIN_FILES = 2      # Below this, extracting inline beats spawning workers
+EMBED_BATCH = 256           # Chunks per upsert call
+
+
+def _file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _extract_and_chunk(path, chunk_size, chunk_overlap):
+    """Worker-process entry point: hash, extract and chunk one file.
+
+    Returns (path, content_hash, chunks, chars, error). Runs in a child
+    process, so it only takes and returns plain picklable values.
+    """
+    from memory.semantic_memory import SemanticMemory
+    try:
+        content_hash = _file_hash(path)
+        text = SemanticMemory._extract_text(path, os.path.splitext(path)[1].lower())
+        if not text:
+            return path, content_hash, [], 0, "no text extracted"
+        return path, content_hash, chunk_text(text, chunk_size, chunk_overlap), len(text), None
+    except Exception as e:
+        return path, None, [], 0, str(e)
+
+
+def chunk_ids(path, chunks):
+    """Content-addressed chunk ids: an unchanged chunk keeps its id across edits.
+
+    Repeated identical chunks within one file are told apart by occurrence.
+    """
+    prefix = hashlib.md5(path.encode()).hexdigest()[:8]
+    seen = Counter()
+    ids = []
+    for chunk in chunks:
+        digest = hashlib.sha1(chunk.text.encode("utf-8", "replace")).hexdigest()[:16]
+        seen[digest] += 1
+        ids.append(f"doc_{prefix}_{digest}_{seen[digest]}")
+    return ids
+
+
+class DocumentIngestor:
+    """Manifest-driven, incremental ingestion into SemanticMemory."""
+
+    def __init__(self, semantic, manifest_path, max_workers=MAX_WORKERS):
+        self.semantic = semantic
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers
+        self._manifest = self._load_manifest()
+
+    # ─── Manifest ────────────────────────────────────
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+            return data.get("files", {}) if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self._manifest}, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def reset(self):
+        """Forget every tracked file (after the vector store is cleared)."""
+        self._manifest = {}
+        self._save_manifest()
+
+    def tracked_files(self, directory=None):
+        """Paths in the manifest, optionally limited to one directory tree."""
+        if directory is None:
+            return sorted(self._manifest)
+        root = os.path.join(os.path.abspath(os.path.expanduser(directory)), "")
+        return sorted(p for p in self._manifest if p.startswith(root))
+
+    # ─── Ingestion ───────────────────────────────────
+
+    def ingest_directory(self, directory, recursive=True, chunk_size=CHUNK_TOKENS, chunk_overlap=OVERLAP_TOKENS):
+        """Bring one directory tree up to date. Returns a stats dict."""
+        directory = os.path.abspath(os.path.expanduser(directory))
+        present = self._stat_all(self._walk(directory, recursive))
+        stats = self._sync(present, chunk_size, chunk_overlap)
+
+        for path in self.tracked_files(directory):
+            if path not in present and (recursive or os.path.dirname(path) == directory):
+                stats["chunks_deleted"] += self.semantic.delete("documents", self._manifest[path]["chunks"])
+                del self._manifest[path]
+                stats["removed"] += 1
+
+        self._save_manifest()
+        return stats
+
+    def ingest_file(self, path, chunk_size=CHUNK_TOKENS, chunk_overlap=OVERLAP_TOKENS):
+        """Bring one file up to date. Returns (stats, manifest entry or None)."""
+        path = os.path.abspath(os.path.expanduser(path))
+        stats = self._sync(self._stat_all([path]), chunk_size, chunk_overlap)
+        self._save_manifest()
+        return stats, self._manifest.get(path)
+
+    @staticmethod
+    def _stat_all(paths):
+        present = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            present[path] = (st.st_size, st.st_mtime)
+        return present
+
+    def _sync(self, present, chunk_size, chunk_overlap):
+        """Re-index whichever of the present files changed since the manifest."""
+        stats = {"scanned": len(present), "unchanged": 0, "touched": 0, "indexed": 0,
+                 "removed": 0, "failed": 0, "chunks_embedded": 0, "chunks_deleted": 0}
+        settings = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "chunker": CHUNKER_VERSION}
+
+        def same_settings(entry):
+            return all(entry.get(k) == v for k, v in settings.items())
+
+        candidates = []
+        for path, (size, mtime) in present.items():
+            entry = self._manifest.get(path)
+            if entry and entry.get("size") == size and entry.get("mtime") == mtime and same_settings(entry):
+                stats["unchanged"] += 1
+            else:
+                candidates.append(path)
+
+        for path, content_hash, chunks, chars, error in self._extract(candidates, chunk_size, chunk_overlap):
+            if content_hash is None:
+                stats["failed"] += 1
+                logger.warning(f"  📄 Ingest failed for {path}: {error}")
+                continue
+            size, mtime = present[path]
+            entry = self._manifest.get(path)
+            if entry and entry.get("hash") == content_hash and same_settings(entry):
+                entry.update(size=size, mtime=mtime)
+                stats["touched"] += 1
+                continue
+            if error:
+                stats["failed"] += 1
+                logger.warning(f"  📄 Ingest failed for {path}: {error}")
+            added, deleted = self._apply(path, chunks, entry)
+            self._manifest[path] = {
+                "size": size, "mtime": mtime, "hash": content_hash, "chars": chars,
+                **settings, "chunks": chunk_ids(path, chunks),
+            }
+            stats["indexed"] += 1
+            stats["chunks_embedded"] += added
+            stats["chunks_deleted"] += deleted
+        return stats
+
+    @staticmethod
+    def _walk(directory, recursive):
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if not d.startswith(".")) if recursive else []
+            for name in sorted(files):
+                if name.startswith("."):
+                    continue
+                if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS:
+                    yield os.path.join(root, name)
+
+    def _extract(self, paths, chunk_size, chunk_overlap):
+        """Extract + chunk files, in worker processes when there are several."""
+        if len(paths) < PARALLEL_MIN_FILES or self.max_workers <= 1:
+            for path in paths:
+                yield _extract_and_chunk(path, chunk_size, chunk_overlap)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, len(paths))) as pool:
+            yield from pool.map(_extract_and_chunk, paths,
+                                [chunk_size] * len(paths), [chunk_overlap] * len(paths))
+
+    def _apply(self, path, chunks, entry):
+        """Diff a file's new chunks against the stored ones.
+
+        New chunk ids are embedded, vanished ones deleted, and kept ones
+        only get their position metadata (index, offsets, page) refreshed. Returns (added, deleted).
+        """
+        ids = chunk_ids(path, chunks)
+        if entry is None:
+            # Not in the manifest — drop chunks an older ingest left behind
+            old_ids = self.semantic.ids_where("documents", {"file_path": path})
+        else:
+            old_ids = entry.get("chunks", [])
+        old = set(old_ids)
+        new = set(ids)
+
+        deleted = self.semantic.delete("documents", [i for i in old_ids if i not in new])
+
+        ts = datetime.now().isoformat()
+        filename = os.path.basename(path)
+        metas = [{
+            "source": filename,
+            "file_path": path,
+            "chunk_index": i,
+            "total_chunks": len(chunks),
+            "start_offset": c.start,
+            "end_offset": c.end,
+            "tokens": c.tokens,
+            "section": c.section,
+            "page": c.page,
+            "type": "document",
+            "timestamp": ts,
+        } for i, c in enumerate(chunks)]
+
+        fresh = [i for i, cid in enumerate(ids) if cid not in old]
+        for start in range(0, len(fresh), EMBED_BATCH):
+            batch = fresh[start:start + EMBED_BATCH]
+            self.semantic.upsert("documents",
+                                 documents=[chunks[i].text for i in batch],
+                                 metadatas=[metas[i] for i in batch],
+                                 ids=[ids[i] for i in batch])
+
+        kept = [i for i, cid in enumerate(ids) if cid in old]
+        if kept:
+            self.semantic.update_metadata("documents", [ids[i] for i in kept], [metas[i] for i in kept])
+        return len(fresh), deleted
@@ -17,10 +17,13 @@
 
 import os
 import re
+import sys
 import json
 import time
+import atexit
 import traceback
 import threading
+from functools import lru_cache
 from datetime import datetime
 from typing import Dict, Optional, List
 
@@ -35,6 +38,7 @@ TARS_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TRACKER_DB = os.path.join(TARS_ROOT, "memory", "error_tracker.json")
 MAX_ENTRIES = 200
 MAX_FIXES_PER_ERROR = 5
+FLUSH_DELAY = 5.0  # Write-behind: seconds between a record_error and its disk flush
 
 
 # ─── Fix Hint Patterns ─────────────────────────────
@@ -134,6 +138,76 @@ _FIX_HINT_PATTERNS = [
 ]
 
 
+
+# ─── Precompiled Matching Pipeline ─────────────────
+# record_error() runs on every failure, and failure storms (e.g. a browser
+# crash loop) call it thousands of times — so everything is compiled once.
+
+def _build_hint_matcher(patterns):
+    """Combine all hint patterns into one regex that keeps list priority.
+
+    Each pattern sits in an anchored lookahead; alternation is tried in
+    order, so the first pattern that matches anywhere wins — same result
+    as searching the patterns one by one, but in a single regex call.
+    Returns (regex, [(outer_group_index, n_inner_groups), ...]).
+    """
+    parts, spans = [], []
+    group = 0
+    for pattern, _, _ in patterns:
+        group += 1
+        inner = re.compile(pattern).groups
+        spans.append((group, inner))
+        parts.append(f"(?=[\\s\\S]*?({pattern}))")
+        group += inner
+    return re.compile("^(?:" + "|".join(parts) + ")", re.IGNORECASE), spans
+
+
+_HINT_RE, _HINT_SPANS = _build_hint_matcher(_FIX_HINT_PATTERNS)
+
+_RECOVERY_MARKERS = ("\n\n## Recovery:", "\n\n## ⚠️ PREVIOUS", "\n\n⚡ BUDGET",
+                     "\n\n⚡ Budget:", "\nDO NOT repeat")
+_FAILED_PREFIX_RE = re.compile(r"^❌\s*\w+\s+agent\s+FAILED\s+after\s+\d+\s+steps\.\s*\n?Reason:\s*")
+_NORMALIZE_STEPS = (
+    (re.compile(r"/[\w/\-.]+"), "<PATH>"),
+    (re.compile(r"\b\d{4,}\b"), "<NUM>"),
+    (re.compile(r"0x[0-9a-fA-F]+"), "<HEX>"),
+    (re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"), "<EMAIL>"),
+    (re.compile(r"'[^']{30,}'"), "'<LONG_STR>'"),
+)
+
+
+@lru_cache(maxsize=2048)
+def _normalize_error(error: str) -> str:
+    """Cached signature for a raw error string (see ErrorTracker._normalize)."""
+    for marker in _RECOVERY_MARKERS:
+        idx = error.find(marker)
+        if idx > 0:
+            error = error[:idx]
+    sig = _FAILED_PREFIX_RE.sub("", error)
+    for regex, repl in _NORMALIZE_STEPS:
+        sig = regex.sub(repl, sig)
+    return sig[:200].strip()
+
+
+@lru_cache(maxsize=1024)
+def _match_hint(error: str) -> tuple:
+    """Cached (hint, files) lookup via the combined hint regex."""
+    m = _HINT_RE.match(error)
+    if not m:
+        return "", []
+    for (group, inner), (_, hint_template, files) in zip(_HINT_SPANS, _FIX_HINT_PATTERNS):
+        if m.group(group) is None:
+            continue
+        groups = m.groups()[group:group + inner]
+        try:
+            hint = hint_template.format(*groups) if groups else hint_template
+        except (IndexError, KeyError):
+            hint = hint_template
+        return hint[:500], files
+    return "", []
+
+
+
 class ErrorEntry:
     """A recorded error with optional fix."""
 
@@ -215,11 +289,18 @@ class ErrorTracker:
     the fix so the caller can auto-apply.
     """
 
-    def __init__(self):
+    def __init__(self, db_path: str = None):
         self._entries: Dict[str, ErrorEntry] = {}
         self._lock = threading.Lock()
+        self._io_lock = threading.Lock()    # Serializes file writes
         self._dirty = False
+        self._file = db_path or TRACKER_DB
+        self._total_occurrences = 0         # Running sum of entry counts
+        self._flush_timer = None            # Pending write-behind flush
+        self._generation = 0                # Bumped by every snapshot
+        self._written_generation = 0        # Newest snapshot on disk
         self._load()
+        atexit.register(self.save)
 
     # ═══════════════════════════════════════════════════
     #  PUBLIC API
@@ -251,17 +332,14 @@ class ErrorTracker:
 
         # Auto-capture traceback if we're inside an except block and none provided
         if not tb:
-            import sys
             exc_info = sys.exc_info()
             if exc_info[2] is not None:
                 tb = "".join(traceback.format_exception(*exc_info))[-1000:]
 
-        # Auto-match fix hints from patterns
-        hint, hint_files = self._match_fix_hint(error)
-
+        fix_result = None
         with self._lock:
-            if key in self._entries:
-                entry = self._entries[key]
+            entry = self._entries.get(key)
+            if entry is not None:
                 entry.count += 1
                 entry.last_seen = datetime.now().isoformat()
                 # Update details if we have more info now
@@ -273,15 +351,18 @@ class ErrorTracker:
                 # Update traceback if we have a better one
                 if tb and (not entry.traceback_str or len(tb) > len(entry.traceback_str)):
                     entry.traceback_str = tb[:1000]
-                # Update fix hint if newly matched
-                if hint and not entry.fix_hint:
-                    entry.fix_hint = hint
-                    entry.fix_hint_files = hint_files
+                # Match a fix hint only while the entry still lacks one
+                if not entry.fix_hint:
+                    hint, hint_files = self._match_fix_hint(error)
+                    if hint:
+                        entry.fix_hint = hint
+                        entry.fix_hint_files = hint_files
                 # Store sample params (keep last 3 for pattern analysis)
                 if params:
                     entry.sample_params.append(params)
                     entry.sample_params = entry.sample_params[-3:]
             else:
+                hint, hint_files = self._match_fix_hint(error)
                 entry = ErrorEntry(
                     signature=sig,
                     context=context,
@@ -297,28 +378,19 @@ class ErrorTracker:
                 )
                 self._entries[key] = entry
 
+            self._total_occurrences += 1
             self._dirty = True
+            self._schedule_flush()
 
-            # Emit event for dashboard
-            event_bus.emit("error_tracked", {
-                "signature": sig,
-                "context": context,
-                "tool": tool,
-                "count": entry.count,
-                "has_fix": entry.auto_fixable,
-            })
-
-            # Auto-save every 10 new errors
-            total = sum(e.count for e in self._entries.values())
-            if total % 10 == 0:
-                self._save()
+            count = entry.count
+            auto_fixable = entry.auto_fixable
 
             # Check if we have a known fix
             if entry.auto_fixable and entry.fixes:
                 best_fix = self._get_best_fix(entry)
                 if best_fix:
                     entry.fixed_count += 1
-                    return {
+                    fix_result = {
                         "has_fix": True,
                         "fix": best_fix["fix"],
                         "confidence": best_fix.get("confidence", 0.8),
@@ -326,7 +398,16 @@ class ErrorTracker:
                         "times_applied": entry.fixed_count,
                     }
 
-        return None
+        # Emit event for dashboard (outside the lock — subscribers may be slow)
+        event_bus.emit("error_tracked", {
+            "signature": sig,
+            "context": context,
+            "tool": tool,
+            "count": count,
+            "has_fix": auto_fixable,
+        })
+
+        return fix_result
 
     def record_fix(self, error: str, fix: str, context: str = "",
                    source: str = "manual", success: bool = True,
@@ -355,6 +436,7 @@ class ErrorTracker:
                     context=context,
                     raw_error=error[:500],
                 )
+                self._total_occurrences += 1
 
             entry = self._entries[key]
             fix_record = {
@@ -452,7 +534,7 @@ class ErrorTracker:
         """Get tracker statistics for dashboard."""
         with self._lock:
             total_errors = len(self._entries)
-            total_occurrences = sum(e.count for e in self._entries.values())
+            total_occurrences = self._total_occurrences
             fixable = sum(1 for e in self._entries.values() if e.auto_fixable)
             unfixed = sum(1 for e in self._entries.values() if not e.auto_fixable and e.count >= 2)
             total_fixes_applied = sum(e.fixed_count for e in self._entries.values())
@@ -797,6 +879,7 @@ class ErrorTracker:
                         keys_to_remove.append(key)
                         break
             for key in keys_to_remove:
+                self._total_occurrences -= self._entries[key].count
                 del self._entries[key]
                 removed += 1
 
@@ -859,8 +942,12 @@ class ErrorTracker:
         return fixed
 
     def save(self):
-        """Force save to disk."""
-        self._save()
+        """Force save to disk (flushes any pending write-behind)."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._save()
 
     # ═══════════════════════════════════════════════════
     #  INTERNAL HELPERS
@@ -870,19 +957,13 @@ class ErrorTracker:
     def _match_fix_hint(error: str) -> tuple:
         """Match error against known patterns and return (hint, likely_files).
 
+        Uses the combined, precompiled hint regex (first pattern in
+        _FIX_HINT_PATTERNS order wins).
+
         Returns:
             (hint_text, [file1, file2, ...]) or ("", [])
         """
-        for pattern, hint_template, files in _FIX_HINT_PATTERNS:
-            m = re.search(pattern, error, re.IGNORECASE)
-            if m:
-                # Fill in any capture groups into the hint template
-                try:
-                    hint = hint_template.format(*m.groups()) if m.groups() else hint_template
-                except (IndexError, KeyError):
-                    hint = hint_template
-                return hint[:500], files
-        return "", []
+        return _match_hint(error)
 
     @staticmethod
     def _normalize(error: str) -> str:
@@ -893,28 +974,10 @@ class ErrorTracker:
         - Agent FAILED preamble ("❌ browser agent FAILED after N steps.\nReason: ")
         - File paths, long numbers, hex addresses, emails, long strings
         - Budget nudges ("⚡ BUDGET ALERT")
-        """
-        # Strip recovery ladder text that makes dedup impossible
-        for marker in ["\n\n## Recovery:", "\n\n## ⚠️ PREVIOUS", "\n\n⚡ BUDGET",
-                       "\n\n⚡ Budget:", "\nDO NOT repeat"]:
-            idx = error.find(marker)
-            if idx > 0:
-                error = error[:idx]
-
-        # Strip "❌ <agent> agent FAILED after N steps.\nReason: " prefix
-        error = re.sub(
-            r"^❌\s*\w+\s+agent\s+FAILED\s+after\s+\d+\s+steps\.\s*\n?Reason:\s*",
-            "", error
-        )
 
-        # Standard normalizations
-        sig = re.sub(r"/[\w/\-.]+", "<PATH>", error)
-        sig = re.sub(r"\b\d{4,}\b", "<NUM>", sig)
-        sig = re.sub(r"0x[0-9a-fA-F]+", "<HEX>", sig)
-        sig = re.sub(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", "<EMAIL>", sig)
-        sig = re.sub(r"'[^']{30,}'", "'<LONG_STR>'", sig)
-        # Strip trailing whitespace and limit length
-        return sig[:200].strip()
+        Regexes are precompiled and results cached per raw string.
+        """
+        return _normalize_error(error)
 
     @staticmethod
     def _get_best_fix(entry: ErrorEntry) -> Optional[dict]:
@@ -929,8 +992,8 @@ class ErrorTracker:
     def _load(self):
         """Load tracker from disk."""
         try:
-            if os.path.exists(TRACKER_DB):
-                with open(TRACKER_DB, "r") as f:
+            if os.path.exists(self._file):
+                with open(self._file, "r") as f:
                     data = json.load(f)
                 for key, entry_dict in data.items():
                     self._entries[key] = ErrorEntry.from_dict(entry_dict)
@@ -954,33 +1017,80 @@ class ErrorTracker:
         except Exception as e:
             logger.warning(f"  ⚠️ Error tracker load failed: {e}")
             self._entries = {}
+        self._total_occurrences = sum(e.count for e in self._entries.values())
+
+    def _schedule_flush(self):
+        """Write-behind: persist within FLUSH_DELAY of the first dirty record.
+
+        Called with self._lock held. A storm of errors coalesces into a
+        single write per interval instead of a write every few errors.
+        """
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self._flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush(self):
+        """Timer callback — snapshot under the lock, write outside it."""
+        with self._lock:
+            self._flush_timer = None
+            if not self._dirty:
+                return
+            data = self._snapshot()
+            generation = self._generation
+            self._dirty = False
+        if not self._write(data, generation):
+            with self._lock:
+                self._dirty = True
+                self._schedule_flush()
+
+    def _snapshot(self) -> dict:
+        """Prune to MAX_ENTRIES and serialize entries. Caller holds self._lock."""
+        # Prune oldest low-count entries if over limit
+        if len(self._entries) > MAX_ENTRIES:
+            sorted_keys = sorted(
+                self._entries.keys(),
+                key=lambda k: (
+                    self._entries[k].auto_fixable,  # Keep fixable ones
+                    self._entries[k].count,
+                ),
+            )
+            for k in sorted_keys[:len(self._entries) - MAX_ENTRIES]:
+                self._total_occurrences -= self._entries[k].count
+                del self._entries[k]
+        self._generation += 1
+        return {k: v.to_dict() for k, v in self._entries.items()}
+
+    def _write(self, data: dict, generation: int) -> bool:
+        """Atomically write a snapshot to disk. False if the write failed.
+
+        A snapshot older than the one already on disk is skipped, so a
+        timer flush that lost the race to save() can't overwrite newer data.
+        """
+        with self._io_lock:
+            if generation < self._written_generation:
+                return True
+            try:
+                os.makedirs(os.path.dirname(self._file), exist_ok=True)
+                tmp = self._file + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(data, f, indent=2)
+                os.replace(tmp, self._file)  # Atomic on POSIX
+            except Exception as e:
+                logger.warning(f"  ⚠️ Error tracker save failed: {e}")
+                return False
+            self._written_generation = generation
+            return True
 
     def _save(self):
-        """Persist tracker to disk."""
+        """Persist tracker to disk now. Caller holds self._lock."""
         if not self._dirty:
             return
-        try:
-            # Prune oldest low-count entries if over limit
-            if len(self._entries) > MAX_ENTRIES:
-                sorted_keys = sorted(
-                    self._entries.keys(),
-                    key=lambda k: (
-                        self._entries[k].auto_fixable,  # Keep fixable ones
-                        self._entries[k].count,
-                    ),
-                )
-                for k in sorted_keys[:len(self._entries) - MAX_ENTRIES]:
-                    del self._entries[k]
-
-            os.makedirs(os.path.dirname(TRACKER_DB), exist_ok=True)
-            data = {k: v.to_dict() for k, v in self._entries.items()}
-            tmp = TRACKER_DB + ".tmp"
-            with open(tmp, "w") as f:
-                json.dump(data, f, indent=2)
-            os.replace(tmp, TRACKER_DB)  # Atomic on POSIX
-            self._dirty = False
-        except Exception as e:
-            logger.warning(f"  ⚠️ Error tracker save failed: {e}")
+        data = self._snapshot()
+        self._dirty = False
+        if not self._write(data, self._generation):
+            self._dirty = True
+            self._schedule_flush()
 
 
 # ─── Singleton ──────────────────────────────────────
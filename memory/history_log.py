@@ -0,0 +1,270 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Action History Log           ║
+╚══════════════════════════════════════════╝
+
+Append-only JSONL log of every action TARS takes.
+
+  - tail(n) seeks backward from the end of the file, so recent
+    history costs the same at 1KB or 10MB (it feeds every prompt).
+  - A sparse timestamp → byte-offset index (sidecar .idx file)
+    lets range queries seek straight to the right place.
+  - Rotated segments are gzip-compressed in the background.
+"""
+
+import os
+import glob
+import gzip
+import json
+import time
+import shutil
+import bisect
+import threading
+from datetime import datetime
+
+MAX_BYTES = 10_000_000       # Rotate the live file past this size
+INDEX_INTERVAL = 64 * 1024   # Bytes between sparse index points
+TAIL_BLOCK = 8 * 1024        # Backward read size for tail()
+
+# One lock per history file, shared by every HistoryLog on that path
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(path):
+    key = os.path.realpath(path)
+    with _locks_guard:
+        return _locks.setdefault(key, threading.RLock())
+
+
+class HistoryLog:
+    """Indexed, tail-readable JSONL history file with compressed rotation."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, index_interval=INDEX_INTERVAL):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.max_bytes = max_bytes
+        self.index_interval = index_interval
+        self._lock = _lock_for(path)
+        self._index = []        # [(ts, offset)] ascending
+        self._index_ts = []     # Parallel list of ts for bisect
+        self._load_index()
+
+    # ─── Writes ──────────────────────────────────────
+
+    def append(self, entry):
+        """Append one entry (dict with an ISO "ts"). Rotates past max_bytes."""
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            self._maybe_rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                offset = f.tell()
+                f.write(line)
+            if self._needs_index_point(offset):
+                self._add_index_point(entry.get("ts", ""), offset)
+
+    def _needs_index_point(self, offset):
+        if not self._index:
+            return True
+        last_offset = self._index[-1][1]
+        if offset < last_offset:
+            # File was truncated/replaced under us — start over
+            self._reset_index()
+            return True
+        return offset - last_offset >= self.index_interval
+
+    def _add_index_point(self, ts, offset):
+        self._index.append((ts, offset))
+        self._index_ts.append(ts)
+        try:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([ts, offset]) + "\n")
+        except OSError:
+            pass  # Index is an optimization — never fail a write over it
+
+    def _reset_index(self):
+        self._index = []
+        self._index_ts = []
+        try:
+            os.remove(self.index_path)
+        except OSError:
+            pass
+
+    def _maybe_rotate(self):
+        try:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) <= self.max_bytes:
+                return
+            segment = f"{self.path}.{int(time.time() * 1000)}"
+            os.rename(self.path, segment)
+        except OSError:
+            return
+        self._reset_index()
+        threading.Thread(target=self._compress, args=(segment,), daemon=True).start()
+
+    @staticmethod
+    def _compress(segment):
+        """gzip a rotated segment, then drop the plain copy."""
+        try:
+            tmp = segment + ".gz.tmp"
+            with open(segment, "rb") as src, gzip.open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, segment + ".gz")
+            os.remove(segment)
+        except OSError:
+            pass  # Plain segment stays readable
+
+    # ─── Reads ───────────────────────────────────────
+
+    def tail(self, n=10):
+        """Return the last n entries (oldest first) by reading backward from EOF."""
+        if n <= 0:
+            return []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                pos = f.tell()
+                buf = b""
+                # n complete lines need n+1 newlines unless we reach the start
+                while pos > 0 and buf.count(b"\n") <= n:
+                    step = min(TAIL_BLOCK, pos)
+                    pos -= step
+                    f.seek(pos)
+                    buf = f.read(step) + buf
+        except FileNotFoundError:
+            return []
+        lines = buf.splitlines()
+        if pos > 0:
+            lines = lines[1:]  # First line may be partial
+        return self._parse(lines[-n:])
+
+    def between(self, start=None, end=None):
+        """Entries with start <= ts <= end (ISO strings; None = open-ended).
+
+        Rotated segments are scanned only if they can overlap the range;
+        the live file is entered at the nearest index point before start.
+        """
+        results = []
+        for segment in self._segments(start):
+            opener = gzip.open if segment.endswith(".gz") else open
+            try:
+                with opener(segment, "rb") as f:
+                    results.extend(self._filter(self._parse(f), start, end))
+            except OSError:
+                continue
+
+        offset = 0
+        if start is not None:
+            # Last index point strictly before start — nothing earlier can match
+            i = bisect.bisect_left(self._index_ts, start) - 1
+            if i >= 0:
+                offset = self._index[i][1]
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                if offset:
+                    f.readline()  # Realign on a line boundary
+                for entry in self._filter(self._parse(f), start, end):
+                    results.append(entry)
+        except FileNotFoundError:
+            pass
+        return results
+
+    def _segments(self, start):
+        """Rotated segment files (oldest first) that may contain ts >= start."""
+        since = None
+        if start is not None:
+            try:
+                since = datetime.fromisoformat(start).timestamp() * 1000
+            except ValueError:
+                since = None
+        found = {}
+        for p in glob.glob(glob.escape(self.path) + ".*"):
+            suffix = p[len(self.path) + 1:]
+            stamp = suffix[:-3] if suffix.endswith(".gz") else suffix
+            if not stamp.isdigit():
+                continue  # .idx, .tmp, legacy .bak archives
+            # Prefer the compressed copy once it exists
+            if stamp not in found or p.endswith(".gz"):
+                found[stamp] = p
+        return [p for stamp, p in sorted(found.items(), key=lambda x: int(x[0]))
+                if since is None or int(stamp) >= since]
+
+    @staticmethod
+    def _filter(entries, start, end):
+        for entry in entries:
+            ts = entry.get("ts", "")
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts > end:
+                break
+            yield entry
+
+    @staticmethod
+    def _parse(lines):
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(entry, dict):
+                entries.append(entry)
+        return entries
+
+    # ─── Index ───────────────────────────────────────
+
+    def _load_index(self):
+        """Load the sidecar index; rebuild it if it doesn't match the file."""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                self._reset_index()
+                return
+            points = []
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            ts, off = json.loads(line)
+                        except (ValueError, TypeError):
+                            continue
+                        if off < size:
+                            points.append((ts, off))
+            except OSError:
+                pass
+            if points and self._valid_point(*points[-1]):
+                self._index = points
+                self._index_ts = [ts for ts, _ in points]
+            elif size:
+                self._rebuild_index()
+
+    def _valid_point(self, ts, offset):
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline()).get("ts") == ts
+        except (OSError, ValueError, AttributeError):
+            return False
+
+    def _rebuild_index(self):
+        """One pass over the live file to recreate the sparse index."""
+        self._reset_index()
+        last = None
+        try:
+            with open(self.path, "rb") as f:
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    if last is not None and offset - last < self.index_interval:
+                        continue
+                    try:
+                        ts = json.loads(line).get("ts", "")
+                    except (ValueError, AttributeError):
+                        continue
+                    self._add_index_point(ts, offset)
+                    last = offset
+        except OSError:
+            pass
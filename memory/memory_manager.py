@@ -9,15 +9,14 @@ Hybrid: flat-file keyword search + ChromaDB semantic search.
 
 import os
 import json
-import threading
+from collections import deque
 from datetime import datetime
 
+from memory.history_log import HistoryLog
+
 # Lazy import — created in __init__ if chromadb available
 _semantic = None
 
-# Lock for thread-safe history file appends
-_history_lock = threading.Lock()
-
 
 class MemoryManager:
     def __init__(self, config, base_dir):
@@ -43,6 +42,7 @@ class MemoryManager:
 
         # Create default files if they don't exist
         self._init_files()
+        self.history = HistoryLog(self.history_file)
 
     def _init_files(self):
         if not os.path.exists(self.context_file):
@@ -112,47 +112,33 @@ class MemoryManager:
     # ─── History ─────────────────────────────────────
 
     def log_action(self, action, input_data, result):
-        """Append an action to the history log. Auto-rotates at 10MB. Thread-safe."""
-        with _history_lock:
-            # Rotate if file is too large
-            try:
-                if os.path.exists(self.history_file) and os.path.getsize(self.history_file) > 10_000_000:
-                    import time as _t
-                    archive = self.history_file + f".{int(_t.time())}.bak"
-                    os.rename(self.history_file, archive)
-            except Exception:
-                pass
-
-            entry = {
-                "ts": datetime.now().isoformat(),
-                "action": action,
-                "input": str(input_data)[:500],
-                "result": str(result)[:500],
-                "success": result.get("success", False) if isinstance(result, dict) else True,
-            }
-            try:
-                with open(self.history_file, "a", encoding="utf-8") as f:
-                    f.write(json.dumps(entry) + "\n")
-            except Exception:
-                pass  # Don't crash on history write failure
+        """Append an action to the history log. Auto-rotates (gzip) at 10MB. Thread-safe."""
+        entry = {
+            "ts": datetime.now().isoformat(),
+            "action": action,
+            "input": str(input_data)[:500],
+            "result": str(result)[:500],
+            "success": result.get("success", False) if isinstance(result, dict) else True,
+        }
+        try:
+            self.history.append(entry)
+        except Exception:
+            pass  # Don't crash on history write failure
 
     def _get_recent_history(self, n=10):
-        """Get the last N actions from history."""
-        try:
-            with open(self.history_file, "r") as f:
-                lines = f.readlines()
-            recent = lines[-n:] if len(lines) > n else lines
-            summaries = []
-            for line in recent:
-                try:
-                    entry = json.loads(line)
-                    status = "✅" if entry.get("success") else "❌"
-                    summaries.append(f"{status} {entry['action']}: {entry['input'][:80]}")
-                except json.JSONDecodeError:
-                    continue
-            return "\n".join(summaries)
-        except FileNotFoundError:
-            return ""
+        """Get the last N actions from history (backward seek — O(n), not O(file))."""
+        summaries = []
+        for entry in self.history.tail(n):
+            try:
+                status = "✅" if entry.get("success") else "❌"
+                summaries.append(f"{status} {entry['action']}: {entry['input'][:80]}")
+            except (KeyError, TypeError):
+                continue
+        return "\n".join(summaries)
+
+    def get_history_range(self, start=None, end=None):
+        """History entries between two ISO timestamps (uses the sparse index)."""
+        return self.history.between(start, end)
 
     # ─── Save/Recall (for Claude tool calls) ─────────
 
@@ -282,6 +268,93 @@ class MemoryManager:
         else:
             return {"success": True, "content": f"No memories found matching '{query}'"}
 
+    def recall_many(self, queries, max_results=10):
+        """Batched recall: answer several queries in one pass over memory.
+
+        Each source (context, preferences, projects, credentials, learned,
+        history) is read once and every query is scored against it in the
+        same pass; semantic memory is queried once per collection for the
+        whole batch. Matches are deduplicated across queries and ranked by
+        how many queries hit them, under one shared result budget.
+        """
+        matchers = []
+        seen = set()
+        for q in queries:
+            q_lower = (q or "").lower().strip()
+            if len(q_lower) < 3 or q_lower in seen:
+                continue
+            seen.add(q_lower)
+            tokens = set(q_lower.split())
+            matchers.append((q, q_lower, tokens, max(1, len(tokens) // 2)))
+
+        if not matchers:
+            return {"success": True, "content": "No memories found matching the given queries."}
+
+        def _hits(text):
+            """Number of queries that match text (same rule as recall())."""
+            text_lower = text.lower()
+            count = 0
+            for _, q_lower, tokens, needed in matchers:
+                if q_lower in text_lower or sum(1 for t in tokens if t in text_lower) >= needed:
+                    count += 1
+            return count
+
+        candidates = []  # (hits, order, snippet)
+
+        def _consider(label, content, limit=500):
+            if not content:
+                return
+            hits = _hits(content)
+            if hits:
+                candidates.append((hits, len(candidates), f"[{label}] {content[:limit]}"))
+
+        _consider("Context", self._read(self.context_file))
+        _consider("Preferences", self._read(self.preferences_file))
+        if os.path.exists(self.projects_dir):
+            for fname in sorted(os.listdir(self.projects_dir)):
+                _consider(f"Project: {fname}", self._read(os.path.join(self.projects_dir, fname)))
+        _consider("Credentials", self._read(os.path.join(self.base_dir, "memory", "credentials.md")))
+        _consider("Learned", self._read(os.path.join(self.base_dir, "memory", "learned.md")))
+
+        # History: one streaming pass; keep only the most recent matches
+        recent = deque(maxlen=max_results)
+        try:
+            with open(self.history_file, "r") as f:
+                for line in f:
+                    hits = _hits(line)
+                    if hits:
+                        recent.append((hits, line.strip()[:200]))
+        except FileNotFoundError:
+            pass
+        for hits, line in reversed(recent):
+            candidates.append((hits, len(candidates), f"[History] {line}"))
+
+        # Rank by number of queries matched, then by source order; dedupe
+        candidates.sort(key=lambda c: (-c[0], c[1]))
+        results = []
+        seen_snippets = set()
+        for _, _, snippet in candidates:
+            if snippet in seen_snippets:
+                continue
+            seen_snippets.add(snippet)
+            results.append(snippet)
+
+        # ── Semantic search (ChromaDB) — one query per collection for the batch ──
+        semantic_block = None
+        if self.semantic and self.semantic.available and hasattr(self.semantic, "recall_many"):
+            semantic_result = self.semantic.recall_many([m[0].strip() for m in matchers], n_results=5)
+            if semantic_result.get("success") and "No semantic matches" not in semantic_result.get("content", ""):
+                semantic_block = f"\n── Semantic Memory ──\n{semantic_result['content']}"
+
+        # Shared budget: semantic matches take one slot when present
+        results = results[:max_results - 1 if semantic_block else max_results]
+        if semantic_block:
+            results.append(semantic_block)
+
+        if results:
+            return {"success": True, "content": "\n\n".join(results)}
+        return {"success": True, "content": "No memories found matching the given queries."}
+
     # ─── List All Memories ───────────────────────────
 
     def list_all(self, category=None):
@@ -463,7 +536,7 @@ class MemoryManager:
                     try:
                         import hashlib
                         doc_id = hashlib.md5(f"knowledge:{key}".encode()).hexdigest()
-                        self.semantic._collections["knowledge"].delete(ids=[doc_id])
+                        self.semantic.delete("knowledge", [doc_id])
                     except Exception:
                         pass
                 return {"success": True, "content": f"🗑️ Deleted '{key}' from {category}."}
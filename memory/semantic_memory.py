@@ -8,6 +8,9 @@
 ║    • RAG search over ingested documents                  ║
 ║  Uses ChromaDB for local vector storage with             ║
 ║  OpenAI text-embedding-3-small (fallback to default).    ║
+║                                                          ║
+║  Recall embeds each query once, searches the collections ║
+║  concurrently, and caches results for a short TTL.       ║
 ╚══════════════════════════════════════════════════════════╝
 """
 
@@ -16,12 +19,70 @@ import json
 import time
 import hashlib
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from memory.chunker import chunk_text, CHUNK_TOKENS, OVERLAP_TOKENS
+
 logger = logging.getLogger("tars.semantic")
 
 CHROMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chroma_db")
 
+COLLECTIONS = ("conversations", "knowledge", "documents")
+RECALL_CACHE_TTL = 30.0      # Seconds a cached query embedding / result stays valid
+RECALL_CACHE_SIZE = 256      # Max cached entries (LRU beyond this)
+
+
+def _relevance(distance, space):
+    """Map a raw distance to a 0-1 relevance comparable across collections."""
+    if distance is None:
+        return 0.0
+    if space == "l2":
+        score = 1.0 / (1.0 + distance)
+    else:
+        # cosine and ip distances are 1 - similarity
+        score = 1.0 - distance
+    return max(0.0, min(1.0, score))
+
+
+class _TTLCache:
+    """Small thread-safe LRU whose entries expire after a TTL."""
+
+    def __init__(self, ttl, size, clock=time.monotonic):
+        self.ttl = ttl
+        self.size = size
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            stamp, value = hit
+            if self._clock() - stamp > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
 
 class OpenAIEmbeddingFunction:
     """ChromaDB-compatible embedding function using OpenAI text-embedding-3-small.
@@ -75,11 +136,19 @@ class SemanticMemory:
     Falls back gracefully if ChromaDB is not installed.
     """
 
-    def __init__(self, base_dir=None, config=None):
+    def __init__(self, base_dir=None, config=None, embedding_fn=None):
         self._client = None
         self._collections = {}
+        self._counts = {}           # name → vector count, kept in step with writes
+        self._spaces = {}           # name → hnsw distance metric
+        self._count_lock = threading.Lock()
+        self._embed_cache = _TTLCache(RECALL_CACHE_TTL, RECALL_CACHE_SIZE)
+        self._result_cache = _TTLCache(RECALL_CACHE_TTL, RECALL_CACHE_SIZE)
+        self._pool = None
+        self._ingestor = None
         self._available = False
-        self._embedding_fn = None
+        self._embedding_fn = embedding_fn
+        self._query_embedder = None
         self._base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
         self._chroma_dir = os.path.join(self._base_dir, "memory", "chroma_db")
 
@@ -103,36 +172,42 @@ class SemanticMemory:
                     or os.environ.get("OPENAI_API_KEY")
                 )
 
-            if openai_key:
+            if openai_key and not self._embedding_fn:
                 ef = OpenAIEmbeddingFunction(api_key=openai_key)
                 if ef.available:
                     self._embedding_fn = ef
 
-            embed_label = "OpenAI text-embedding-3-small" if self._embedding_fn else "default"
+            if embedding_fn is not None:
+                embed_label = type(embedding_fn).__name__
+            else:
+                embed_label = "OpenAI text-embedding-3-small" if self._embedding_fn else "default"
 
             # Create collections (with embedding function if available)
             col_kwargs = {}
             if self._embedding_fn:
                 col_kwargs["embedding_function"] = self._embedding_fn
 
-            self._collections["conversations"] = self._client.get_or_create_collection(
-                name="conversations",
-                metadata={"hnsw:space": "cosine"},
-                **col_kwargs,
-            )
-            self._collections["knowledge"] = self._client.get_or_create_collection(
-                name="knowledge",
-                metadata={"hnsw:space": "cosine"},
-                **col_kwargs,
-            )
-            self._collections["documents"] = self._client.get_or_create_collection(
-                name="documents",
-                metadata={"hnsw:space": "cosine"},
-                **col_kwargs,
-            )
+            for name in COLLECTIONS:
+                col = self._client.get_or_create_collection(
+                    name=name,
+                    metadata={"hnsw:space": "cosine"},
+                    **col_kwargs,
+                )
+                self._collections[name] = col
+                self._counts[name] = col.count()
+                self._spaces[name] = (col.metadata or {}).get("hnsw:space", "l2")
 
+            # Queries are embedded once here, then searched by vector in
+            # every collection (instead of each collection re-embedding)
+            if self._embedding_fn:
+                self._query_embedder = self._embedding_fn
+            else:
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                self._query_embedder = DefaultEmbeddingFunction()
+
+            self._pool = ThreadPoolExecutor(max_workers=len(COLLECTIONS), thread_name_prefix="tars-recall")
             self._available = True
-            total = sum(c.count() for c in self._collections.values())
+            total = sum(self._counts.values())
             logger.info(f"  🧠 Semantic memory online ({total} vectors, embeddings: {embed_label})")
 
         except ImportError:
@@ -152,12 +227,12 @@ class SemanticMemory:
             return
 
         try:
-            col = self._collections["conversations"]
             ts = datetime.now().isoformat()
             doc_id = hashlib.md5(f"{ts}:{user_message[:100]}".encode()).hexdigest()
 
             # Store user message
-            col.add(
+            self.upsert(
+                "conversations",
                 documents=[f"User: {user_message}\nTARS: {tars_response[:500]}"],
                 metadatas=[{
                     "timestamp": ts,
@@ -178,11 +253,11 @@ class SemanticMemory:
             return {"success": False, "error": True, "content": "Semantic memory unavailable (pip install chromadb)."}
 
         try:
-            col = self._collections["knowledge"]
             doc_id = hashlib.md5(f"knowledge:{key}".encode()).hexdigest()
 
             # Upsert (add or update)
-            col.upsert(
+            self.upsert(
+                "knowledge",
                 documents=[f"{key}: {content}"],
                 metadatas=[{
                     "key": key,
@@ -195,6 +270,50 @@ class SemanticMemory:
         except Exception as e:
             return {"success": False, "error": True, "content": f"Semantic store error: {e}"}
 
+    # ─── Writes & Counts ─────────────────────────────
+
+    def upsert(self, name, documents, metadatas, ids):
+        """Upsert into a collection, keeping the cached count exact.
+
+        Only ids not already stored grow the count; any write drops cached
+        recall results so the next query sees the new vectors.
+        """
+        col = self._collections[name]
+        existing = set(col.get(ids=ids, include=[])["ids"])
+        col.upsert(documents=documents, metadatas=metadatas, ids=ids)
+        with self._count_lock:
+            self._counts[name] += len(set(ids) - existing)
+        self._result_cache.clear()
+
+    def delete(self, collection, ids):
+        """Delete vectors by id from one collection. Returns how many existed."""
+        if not self._available or not ids:
+            return 0
+        col = self._collections[collection]
+        existing = col.get(ids=list(ids), include=[])["ids"]
+        if existing:
+            col.delete(ids=existing)
+            with self._count_lock:
+                self._counts[collection] = max(0, self._counts[collection] - len(existing))
+            self._result_cache.clear()
+        return len(existing)
+
+    def update_metadata(self, collection, ids, metadatas):
+        """Replace metadata on existing vectors without re-embedding them."""
+        self._collections[collection].update(ids=ids, metadatas=metadatas)
+        self._result_cache.clear()
+
+    def ids_where(self, collection, where):
+        """Ids of vectors in a collection whose metadata matches a filter."""
+        return self._collections[collection].get(where=where, include=[])["ids"]
+
+    def count(self, collection=None):
+        """Vector count for one collection (or all) without a store round-trip."""
+        with self._count_lock:
+            if collection:
+                return self._counts.get(collection, 0)
+            return sum(self._counts.values())
+
     # ─── Semantic Recall ─────────────────────────────
 
     def recall(self, query, n_results=5, collection="all"):
@@ -212,72 +331,155 @@ class SemanticMemory:
             return {"success": False, "error": True, "content": "Semantic memory unavailable (pip install chromadb)."}
 
         try:
-            results = []
+            results = self._search([query], n_results, collection)[0]
 
-            collections_to_search = (
-                [self._collections[collection]] if collection in self._collections
-                else list(self._collections.values())
-            )
+            if not results:
+                return {"success": True, "content": f"No semantic matches for '{query}'."}
 
-            for col in collections_to_search:
-                if col.count() == 0:
-                    continue
+            return {"success": True, "content": self._format(f"for: '{query}'", results)}
 
-                res = col.query(
-                    query_texts=[query],
-                    n_results=min(n_results, col.count()),
-                )
+        except Exception as e:
+            return {"success": False, "error": True, "content": f"Semantic recall error: {e}"}
 
-                for i, doc in enumerate(res["documents"][0]):
-                    meta = res["metadatas"][0][i]
-                    distance = res["distances"][0][i] if res.get("distances") else None
-                    relevance = f" (relevance: {1 - distance:.2f})" if distance is not None else ""
-
-                    source = meta.get("type", col.name)
-                    timestamp = meta.get("timestamp", "")
-                    if timestamp:
-                        try:
-                            dt = datetime.fromisoformat(timestamp)
-                            timestamp = dt.strftime("%b %d, %Y")
-                        except Exception:
-                            pass
-
-                    results.append({
-                        "source": source,
-                        "timestamp": timestamp,
-                        "relevance": 1 - distance if distance else 0,
-                        "content": doc[:500],
-                    })
-
-            # Sort by relevance
-            results.sort(key=lambda x: x["relevance"], reverse=True)
-            results = results[:n_results]
+    def recall_many(self, queries, n_results=5, collection="all"):
+        """Semantic search for several queries at once.
 
-            if not results:
-                return {"success": True, "content": f"No semantic matches for '{query}'."}
+        All query texts are embedded in one batch and each collection is
+        queried once with every embedding. Hits are deduplicated by id across
+        queries keeping the best relevance, and the top n_results overall
+        are returned.
+        """
+        if not self._available:
+            return {"success": False, "error": True, "content": "Semantic memory unavailable (pip install chromadb)."}
+
+        queries = [q for q in queries if q]
+        if not queries:
+            return {"success": True, "content": "No semantic matches for an empty query batch."}
 
-            lines = [f"## Semantic Memory Results for: '{query}'\n"]
-            for r in results:
-                lines.append(f"**[{r['source']}]** {r['timestamp']} (relevance: {r['relevance']:.2f})")
-                lines.append(f"  {r['content'][:300]}")
-                lines.append("")
+        try:
+            best = {}  # collection:id → result dict
+            for hits in self._search(queries, n_results, collection):
+                for hit in hits:
+                    key = hit["key"]
+                    if key not in best or hit["relevance"] > best[key]["relevance"]:
+                        best[key] = hit
+
+            results = sorted(best.values(), key=lambda x: x["relevance"], reverse=True)[:n_results]
+            if not results:
+                return {"success": True, "content": f"No semantic matches for {len(queries)} queries."}
 
-            return {"success": True, "content": "\n".join(lines)}
+            return {"success": True, "content": self._format(f"for {len(queries)} queries", results)}
 
         except Exception as e:
             return {"success": False, "error": True, "content": f"Semantic recall error: {e}"}
 
+    def _search(self, queries, n_results, collection="all"):
+        """Ranked hits per query, merged across collections.
+
+        Each query text is embedded once (cached for RECALL_CACHE_TTL), then
+        every non-empty collection is searched concurrently by vector.
+        Results are cached per query embedding until the TTL expires or a
+        write lands.
+        """
+        names = [collection] if collection in self._collections else list(COLLECTIONS)
+        with self._count_lock:
+            names = [n for n in names if self._counts.get(n, 0) > 0]
+        if not names:
+            return [[] for _ in queries]
+
+        embeddings = self._embed(queries)
+        keys = [(self._embedding_key(e), n_results, tuple(names)) for e in embeddings]
+        out = [self._result_cache.get(k) for k in keys]
+        missing = [i for i, hits in enumerate(out) if hits is None]
+        if not missing:
+            return out
+
+        batch = [embeddings[i] for i in missing]
+        if len(names) == 1:
+            per_col = [self._query_collection(names[0], batch, n_results)]
+        else:
+            futures = [self._pool.submit(self._query_collection, n, batch, n_results) for n in names]
+            per_col = [f.result() for f in futures]
+
+        for j, i in enumerate(missing):
+            hits = [h for col_hits in per_col for h in col_hits[j]]
+            hits.sort(key=lambda h: h["relevance"], reverse=True)
+            out[i] = hits[:n_results]
+            self._result_cache.put(keys[i], out[i])
+        return out
+
+    def _query_collection(self, name, embeddings, n_results):
+        """Query one collection by vector. Returns a hit list per embedding."""
+        count = self._counts.get(name, 0)
+        if count <= 0:
+            return [[] for _ in embeddings]
+        col = self._collections[name]
+        space = self._spaces.get(name, "cosine")
+        res = col.query(query_embeddings=embeddings, n_results=min(n_results, count))
+
+        per_query = []
+        for qi in range(len(embeddings)):
+            hits = []
+            for i, doc in enumerate(res["documents"][qi]):
+                meta = res["metadatas"][qi][i] or {}
+                distance = res["distances"][qi][i] if res.get("distances") else None
+
+                timestamp = meta.get("timestamp", "")
+                if timestamp:
+                    try:
+                        timestamp = datetime.fromisoformat(timestamp).strftime("%b %d, %Y")
+                    except Exception:
+                        pass
+
+                hits.append({
+                    "key": f"{name}:{res['ids'][qi][i]}",
+                    "source": meta.get("type", name),
+                    "timestamp": timestamp,
+                    "relevance": _relevance(distance, space),
+                    "content": (doc or "")[:500],
+                })
+            per_query.append(hits)
+        return per_query
+
+    def _embed(self, texts):
+        """Embed query texts, reusing embeddings seen within the TTL."""
+        out = [self._embed_cache.get(t) for t in texts]
+        missing = [i for i, e in enumerate(out) if e is None]
+        if missing:
+            fresh = self._query_embedder([texts[i] for i in missing])
+            for i, emb in zip(missing, fresh):
+                emb = [float(x) for x in emb]
+                self._embed_cache.put(texts[i], emb)
+                out[i] = emb
+        return out
+
+    @staticmethod
+    def _embedding_key(embedding):
+        return hashlib.sha1(json.dumps(embedding).encode()).hexdigest()
+
+    @staticmethod
+    def _format(title, results):
+        lines = [f"## Semantic Memory Results {title}\n"]
+        for r in results:
+            lines.append(f"**[{r['source']}]** {r['timestamp']} (relevance: {r['relevance']:.2f})")
+            lines.append(f"  {r['content'][:300]}")
+            lines.append("")
+        return "\n".join(lines)
+
     # ─── Document Ingestion (RAG) ─────────────────────
 
-    def ingest_document(self, file_path, chunk_size=1000, chunk_overlap=200):
-        """Ingest a document for RAG search.
+    def ingest_document(self, file_path, chunk_size=None, chunk_overlap=None):
+        """Ingest a document (or a whole folder) for RAG search.
         
         Supports: .txt, .md, .pdf, .docx, .py, .json, .csv
+        Files are tracked in the ingest manifest, so re-ingesting an
+        unchanged file is free and an edited one only re-embeds the
+        chunks that changed.
         
         Args:
-            file_path: Path to the document
-            chunk_size: Characters per chunk
-            chunk_overlap: Overlap between chunks
+            file_path: Path to the document, or a directory to index
+            chunk_size: Target tokens per chunk (default CHUNK_TOKENS)
+            chunk_overlap: Tokens of overlap between chunks (default OVERLAP_TOKENS)
         
         Returns:
             Standard tool result dict
@@ -285,56 +487,73 @@ class SemanticMemory:
         if not self._available:
             return {"success": False, "error": True, "content": "Semantic memory unavailable (pip install chromadb)."}
 
+        chunk_size = chunk_size or CHUNK_TOKENS
+        chunk_overlap = OVERLAP_TOKENS if chunk_overlap is None else chunk_overlap
         file_path = os.path.expanduser(file_path)
         if not os.path.exists(file_path):
             return {"success": False, "error": True, "content": f"File not found: {file_path}"}
+        if os.path.isdir(file_path):
+            return self.ingest_directory(file_path, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
         try:
-            # Extract text based on file type
-            ext = os.path.splitext(file_path)[1].lower()
-            text = self._extract_text(file_path, ext)
+            stats, entry = self._get_ingestor().ingest_file(file_path, chunk_size, chunk_overlap)
+            filename = os.path.basename(file_path)
 
-            if not text:
+            if not entry or (stats["failed"] and not entry.get("chunks")):
                 return {"success": False, "error": True, "content": f"Could not extract text from {file_path}"}
 
-            # Chunk the text
-            chunks = self._chunk_text(text, chunk_size, chunk_overlap)
+            chunks = len(entry["chunks"])
+            if stats["unchanged"] or stats["touched"]:
+                return {"success": True, "content": f"'{filename}' is already up to date in semantic memory ({chunks} chunks)."}
 
-            if not chunks:
-                return {"success": False, "error": True, "content": "No text chunks generated."}
+            logger.info(f"  📄 Ingested {filename}: {chunks} chunks ({stats['chunks_embedded']} embedded)")
+            return {
+                "success": True,
+                "content": f"Ingested '{filename}' into semantic memory: {chunks} chunks ({entry.get('chars', 0)} chars). You can now search it with recall_memory."
+            }
 
-            # Store chunks
-            col = self._collections["documents"]
-            filename = os.path.basename(file_path)
-            file_hash = hashlib.md5(file_path.encode()).hexdigest()[:8]
-
-            ids = []
-            documents = []
-            metadatas = []
-
-            for i, chunk in enumerate(chunks):
-                doc_id = f"doc_{file_hash}_{i}"
-                ids.append(doc_id)
-                documents.append(chunk)
-                metadatas.append({
-                    "source": filename,
-                    "file_path": file_path,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "type": "document",
-                    "timestamp": datetime.now().isoformat(),
-                })
+        except Exception as e:
+            return {"success": False, "error": True, "content": f"Document ingestion error: {e}"}
+
+    def ingest_directory(self, directory, recursive=True, chunk_size=CHUNK_TOKENS, chunk_overlap=OVERLAP_TOKENS):
+        """Index every supported file under a directory, incrementally.
+
+        New and edited files are extracted in parallel worker processes,
+        unchanged ones are skipped, and files deleted from disk have their
+        vectors removed.
+        """
+        if not self._available:
+            return {"success": False, "error": True, "content": "Semantic memory unavailable (pip install chromadb)."}
 
-            col.upsert(documents=documents, metadatas=metadatas, ids=ids)
+        directory = os.path.expanduser(directory)
+        if not os.path.isdir(directory):
+            return {"success": False, "error": True, "content": f"Directory not found: {directory}"}
 
-            logger.info(f"  📄 Ingested {filename}: {len(chunks)} chunks")
+        try:
+            started = time.time()
+            stats = self._get_ingestor().ingest_directory(directory, recursive, chunk_size, chunk_overlap)
+            logger.info(f"  📄 Indexed {directory}: {stats}")
             return {
                 "success": True,
-                "content": f"Ingested '{filename}' into semantic memory: {len(chunks)} chunks ({len(text)} chars). You can now search it with recall_memory."
+                "content": (
+                    f"Indexed '{directory}' in {time.time() - started:.1f}s: {stats['scanned']} files scanned, "
+                    f"{stats['indexed']} (re)indexed, {stats['unchanged'] + stats['touched']} unchanged, "
+                    f"{stats['removed']} removed, {stats['failed']} failed. "
+                    f"{stats['chunks_embedded']} chunks embedded, {stats['chunks_deleted']} deleted."
+                ),
             }
-
         except Exception as e:
-            return {"success": False, "error": True, "content": f"Document ingestion error: {e}"}
+            return {"success": False, "error": True, "content": f"Directory ingestion error: {e}"}
+
+    def _get_ingestor(self):
+        if self._ingestor is None:
+            from memory.document_ingest import DocumentIngestor
+            self._ingestor = DocumentIngestor(
+                self, os.path.join(self._base_dir, "memory", "document_manifest.json"))
+            if self.count("documents") == 0 and self._ingestor.tracked_files():
+                # Vector store was wiped outside TARS — the manifest is stale
+                self._ingestor.reset()
+        return self._ingestor
 
     def search_documents(self, query, n_results=5):
         """Search only the documents collection (RAG).
@@ -371,7 +590,7 @@ class SemanticMemory:
                     text_parts = []
                     for page in reader.pages:
                         text_parts.append(page.extract_text() or "")
-                    return "\n\n".join(text_parts)
+                    return "\f".join(text_parts)  # Form feeds mark pages, like pdftotext
                 except ImportError:
                     pass
 
@@ -401,33 +620,9 @@ class SemanticMemory:
                 return None
 
     @staticmethod
-    def _chunk_text(text, chunk_size=1000, overlap=200):
-        """Split text into overlapping chunks."""
-        if not text:
-            return []
-
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + chunk_size
-
-            # Try to break at a sentence boundary
-            if end < len(text):
-                for sep in ["\n\n", "\n", ". ", "! ", "? "]:
-                    last_sep = text.rfind(sep, start + chunk_size // 2, end + 100)
-                    if last_sep > start:
-                        end = last_sep + len(sep)
-                        break
-
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-
-            start = end - overlap
-            if start >= len(text):
-                break
-
-        return chunks
+    def _chunk_text(text, chunk_size=CHUNK_TOKENS, overlap=OVERLAP_TOKENS):
+        """Split text into structure-aware chunks (budgets in tokens)."""
+        return [c.text for c in chunk_text(text, chunk_size, overlap)]
 
     # ─── Stats ───────────────────────────────────────
 
@@ -436,9 +631,8 @@ class SemanticMemory:
         if not self._available:
             return {"available": False}
 
-        stats = {"available": True, "collections": {}}
-        for name, col in self._collections.items():
-            stats["collections"][name] = col.count()
+        with self._count_lock:
+            stats = {"available": True, "collections": dict(self._counts)}
         stats["total_vectors"] = sum(stats["collections"].values())
         return stats
 
@@ -449,8 +643,12 @@ class SemanticMemory:
         for name, col in self._collections.items():
             try:
                 # Get all IDs and delete them
-                all_ids = col.get()["ids"]
+                all_ids = col.get(include=[])["ids"]
                 if all_ids:
                     col.delete(ids=all_ids)
+                with self._count_lock:
+                    self._counts[name] = col.count()
             except Exception as e:
                 logger.debug(f"  🧠 Clear {name} error: {e}")
+        self._result_cache.clear()
+        self._get_ingestor().reset()
@@ -16,52 +16,216 @@
 """
 
 import os
+import re
 import json
+import atexit
+import itertools
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from urllib.parse import urlparse
 
 logger = logging.getLogger("TARS")
 
 KNOWLEDGE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "memory", "site_knowledge.json")
+SHARD_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "memory", "sites")
+INDEX_NAME = "_index.json"
 MAX_ENTRIES_PER_SECTION = 50
-MAX_DOMAINS = 100
+MAX_DOMAINS = 5000          # Shards on disk — only the index is always resident
+HOT_DOMAINS = 64            # LRU of fully-loaded domains kept in memory
+FLUSH_DELAY = 2.0           # Batch learn_* writes into one flush per interval
 
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
 
-class SiteKnowledge:
-    """Persistent per-domain knowledge base — learns how websites work."""
 
-    def __init__(self):
-        self._data = {}
+class SiteKnowledge:
+    """Persistent per-domain knowledge base — learns how websites work.
+
+    Storage is sharded: one JSON file per domain under SHARD_DIR plus a
+    small index (visit counts + section sizes) that is the only thing
+    loaded at startup. Domains are loaded lazily into an LRU of hot
+    entries; learn_* calls mark them dirty and a write-behind timer
+    flushes only the dirty shards.
+    """
+
+    def __init__(self, base_dir: str = None, legacy_file: str = None):
+        self._dir = base_dir or SHARD_DIR
+        self._legacy_file = legacy_file or KNOWLEDGE_FILE
+        self._index = {}                    # domain → {"file", "visit_count", counts...}
+        self._hot = OrderedDict()           # domain → full data (LRU)
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._flush_timer = None
         self._load()
+        atexit.register(self.flush)
+
+    # ═══════════════════════════════════════════
+    #  Storage
+    # ═══════════════════════════════════════════
 
     def _load(self):
-        """Load knowledge from disk."""
-        if os.path.exists(KNOWLEDGE_FILE):
+        """Load the domain index (and migrate the legacy single file once)."""
+        index_path = os.path.join(self._dir, INDEX_NAME)
+        if os.path.exists(index_path):
             try:
-                with open(KNOWLEDGE_FILE, "r") as f:
-                    self._data = json.load(f)
+                with open(index_path, "r") as f:
+                    self._index = json.load(f)
             except (json.JSONDecodeError, IOError):
-                self._data = {}
+                self._index = self._rebuild_index()
+        elif os.path.exists(self._legacy_file):
+            self._migrate_legacy()
 
-    def _save(self):
-        """Save knowledge to disk."""
+    def _migrate_legacy(self):
+        """Split the old monolithic site_knowledge.json into shards."""
         try:
-            os.makedirs(os.path.dirname(KNOWLEDGE_FILE), exist_ok=True)
-            # Prune if too many domains
-            if len(self._data) > MAX_DOMAINS:
-                # Remove least-visited domains
-                sorted_domains = sorted(
-                    self._data.items(),
-                    key=lambda x: x[1].get("visit_count", 0),
-                )
-                for domain, _ in sorted_domains[:len(self._data) - MAX_DOMAINS]:
-                    del self._data[domain]
-            with open(KNOWLEDGE_FILE, "w") as f:
-                json.dump(self._data, f, indent=2, default=str)
-        except IOError as e:
+            with open(self._legacy_file, "r") as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        with self._lock:
+            for domain, data in legacy.items():
+                self._index[domain] = {"file": self._shard_name(domain)}
+                self._hot[domain] = data
+                self._dirty.add(domain)
+            self._flush_locked()
+            self._hot.clear()
+        try:
+            os.replace(self._legacy_file, self._legacy_file + ".migrated")
+        except OSError:
+            pass
+        logger.info(f"  🌐 Site knowledge: migrated {len(legacy)} domains to shards")
+
+    def _rebuild_index(self):
+        """Recover the index by scanning shard files."""
+        index = {}
+        if not os.path.isdir(self._dir):
+            return index
+        for name in os.listdir(self._dir):
+            if not name.endswith(".json") or name == INDEX_NAME:
+                continue
+            try:
+                with open(os.path.join(self._dir, name), "r") as f:
+                    shard = json.load(f)
+                index[shard["domain"]] = self._summarize(name, shard["data"])
+            except (json.JSONDecodeError, IOError, KeyError):
+                continue
+        return index
+
+    @staticmethod
+    def _shard_name(domain):
+        return _UNSAFE_CHARS.sub("_", domain)[:180] + ".json"
+
+    @staticmethod
+    def _summarize(filename, data):
+        """Index entry: enough to answer get_stats() and prune without loading shards."""
+        return {
+            "file": filename,
+            "visit_count": data.get("visit_count", 0),
+            "pages": len(data.get("pages", {})),
+            "flows": len(data.get("flows", {})),
+            "selectors": len(data.get("selectors", {})),
+            "errors": len(data.get("errors", {})),
+        }
+
+    def _domain(self, domain):
+        """Return a domain's data, loading its shard on first use. None if unknown."""
+        with self._lock:
+            data = self._hot.get(domain)
+            if data is not None:
+                self._hot.move_to_end(domain)
+                return data
+            meta = self._index.get(domain)
+            if meta is None:
+                return None
+            try:
+                with open(os.path.join(self._dir, meta["file"]), "r") as f:
+                    data = json.load(f)["data"]
+            except (json.JSONDecodeError, IOError, KeyError):
+                logger.warning(f"Site knowledge shard for {domain} unreadable — starting fresh")
+                data = None
+            if data is None:
+                del self._index[domain]
+                return None
+            self._hot[domain] = data
+            self._evict()
+            return data
+
+    def _evict(self):
+        """Drop least-recently-used clean domains beyond HOT_DOMAINS.
+
+        The most recent domain is never dropped: the caller is about to use it.
+        """
+        flushed = False
+        while len(self._hot) > HOT_DOMAINS:
+            older = itertools.islice(self._hot, len(self._hot) - 1)
+            victim = next((d for d in older if d not in self._dirty), None)
+            if victim is None:
+                if flushed:
+                    # Flush failed (disk full, bad path) — grow past HOT_DOMAINS until one succeeds
+                    return
+                # Everything hot is dirty — flush now instead of growing unbounded
+                self._flush_locked()
+                flushed = True
+                continue
+            del self._hot[victim]
+
+    def _save(self, domain=None):
+        """Mark a domain dirty and schedule a batched flush."""
+        with self._lock:
+            if domain is not None:
+                self._dirty.add(domain)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """Write all dirty shards and the index to disk."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            for domain in list(self._dirty):
+                data = self._hot.get(domain)
+                if data is None:
+                    continue
+                meta = self._index.get(domain) or {"file": self._shard_name(domain)}
+                self._write_json(meta["file"], {"domain": domain, "data": data})
+                self._index[domain] = self._summarize(meta["file"], data)
+            self._dirty.clear()
+            self._prune()
+            self._write_json(INDEX_NAME, self._index)
+        except (IOError, OSError) as e:
             logger.warning(f"Failed to save site knowledge: {e}")
 
+    def _write_json(self, name, payload):
+        path = os.path.join(self._dir, name)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(payload, f, indent=2, default=str)
+        os.replace(tmp, path)
+
+    def _prune(self):
+        """Remove least-visited domains beyond MAX_DOMAINS."""
+        if len(self._index) <= MAX_DOMAINS:
+            return
+        ranked = sorted(self._index.items(), key=lambda x: x[1].get("visit_count", 0))
+        for domain, meta in ranked[:len(self._index) - MAX_DOMAINS]:
+            del self._index[domain]
+            self._hot.pop(domain, None)
+            try:
+                os.remove(os.path.join(self._dir, meta["file"]))
+            except OSError:
+                pass
+
     def _get_domain(self, url_or_domain):
         """Extract domain from URL or return as-is."""
         if "://" in url_or_domain:
@@ -70,19 +234,26 @@ class SiteKnowledge:
         return url_or_domain
 
     def _ensure_domain(self, domain):
-        """Ensure domain entry exists."""
-        if domain not in self._data:
-            self._data[domain] = {
-                "pages": {},
-                "selectors": {},
-                "flows": {},
-                "errors": {},
-                "login_indicators": {},
-                "overlay_dismissals": {},
-                "first_seen": datetime.now().isoformat(),
-                "visit_count": 0,
-            }
-        self._data[domain]["visit_count"] = self._data[domain].get("visit_count", 0) + 1
+        """Ensure domain entry exists, bump its visit count, and return it."""
+        with self._lock:
+            data = self._domain(domain)
+            if data is None:
+                data = {
+                    "pages": {},
+                    "selectors": {},
+                    "flows": {},
+                    "errors": {},
+                    "login_indicators": {},
+                    "overlay_dismissals": {},
+                    "first_seen": datetime.now().isoformat(),
+                    "visit_count": 0,
+                }
+                self._index[domain] = {"file": self._shard_name(domain), "visit_count": 0}
+                self._hot[domain] = data
+                self._dirty.add(domain)
+                self._evict()
+            data["visit_count"] = data.get("visit_count", 0) + 1
+            return data
 
     # ═══════════════════════════════════════════
     #  Page Learning
@@ -100,29 +271,31 @@ class SiteKnowledge:
         """
         domain = self._get_domain(url)
         path = urlparse(url).path if "://" in url else url
-        self._ensure_domain(domain)
-
-        self._data[domain]["pages"][path] = {
-            "type": page_type,
-            "fields": (fields or [])[:20],
-            "buttons": (buttons or [])[:15],
-            "notes": (notes or "")[:300],
-            "last_seen": datetime.now().isoformat(),
-        }
-        # Prune old pages
-        pages = self._data[domain]["pages"]
-        if len(pages) > MAX_ENTRIES_PER_SECTION:
-            oldest = sorted(pages.items(), key=lambda x: x[1].get("last_seen", ""))
-            for key, _ in oldest[:len(pages) - MAX_ENTRIES_PER_SECTION]:
-                del pages[key]
-        self._save()
+        with self._lock:   # The flush timer and _evict must not see a half-applied update
+            data = self._ensure_domain(domain)
+
+            data["pages"][path] = {
+                "type": page_type,
+                "fields": (fields or [])[:20],
+                "buttons": (buttons or [])[:15],
+                "notes": (notes or "")[:300],
+                "last_seen": datetime.now().isoformat(),
+            }
+            # Prune old pages
+            pages = data["pages"]
+            if len(pages) > MAX_ENTRIES_PER_SECTION:
+                oldest = sorted(pages.items(), key=lambda x: x[1].get("last_seen", ""))
+                for key, _ in oldest[:len(pages) - MAX_ENTRIES_PER_SECTION]:
+                    del pages[key]
+            self._save(domain)
 
     def get_page(self, url):
         """Get known page structure."""
         domain = self._get_domain(url)
         path = urlparse(url).path if "://" in url else url
-        if domain in self._data:
-            return self._data[domain]["pages"].get(path)
+        data = self._domain(domain)
+        if data is not None:
+            return data["pages"].get(path)
         return None
 
     # ═══════════════════════════════════════════
@@ -139,36 +312,38 @@ class SiteKnowledge:
             worked: Whether it succeeded
         """
         domain = self._get_domain(domain)
-        self._ensure_domain(domain)
+        with self._lock:
+            data = self._ensure_domain(domain)
 
-        key = element_name.lower().strip()[:80]
-        if key not in self._data[domain]["selectors"]:
-            self._data[domain]["selectors"][key] = {}
+            key = element_name.lower().strip()[:80]
+            if key not in data["selectors"]:
+                data["selectors"][key] = {}
 
-        sel_data = self._data[domain]["selectors"][key]
-        if selector not in sel_data:
-            sel_data[selector] = {"successes": 0, "failures": 0}
+            sel_data = data["selectors"][key]
+            if selector not in sel_data:
+                sel_data[selector] = {"successes": 0, "failures": 0}
 
-        if worked:
-            sel_data[selector]["successes"] += 1
-        else:
-            sel_data[selector]["failures"] += 1
+            if worked:
+                sel_data[selector]["successes"] += 1
+            else:
+                sel_data[selector]["failures"] += 1
 
-        # Prune low-value selectors (>5 failures, 0 successes)
-        to_remove = [s for s, d in sel_data.items() if d["failures"] > 5 and d["successes"] == 0]
-        for s in to_remove:
-            del sel_data[s]
+            # Prune low-value selectors (>5 failures, 0 successes)
+            to_remove = [s for s, d in sel_data.items() if d["failures"] > 5 and d["successes"] == 0]
+            for s in to_remove:
+                del sel_data[s]
 
-        self._save()
+            self._save(domain)
 
     def get_best_selector(self, domain, element_name):
         """Get the most reliable selector for an element on a domain."""
         domain = self._get_domain(domain)
         key = element_name.lower().strip()[:80]
 
-        if domain not in self._data:
+        data = self._domain(domain)
+        if data is None:
             return None
-        selectors = self._data[domain].get("selectors", {}).get(key, {})
+        selectors = data.get("selectors", {}).get(key, {})
         if not selectors:
             return None
 
@@ -186,9 +361,10 @@ class SiteKnowledge:
     def get_all_selectors(self, domain):
         """Get all known selectors for a domain."""
         domain = self._get_domain(domain)
-        if domain not in self._data:
+        data = self._domain(domain)
+        if data is None:
             return {}
-        return self._data[domain].get("selectors", {})
+        return data.get("selectors", {})
 
     # ═══════════════════════════════════════════
     #  Flow Learning
@@ -204,20 +380,21 @@ class SiteKnowledge:
             success: Whether the flow completed successfully
         """
         domain = self._get_domain(domain)
-        self._ensure_domain(domain)
-
-        flow_key = flow_name.lower().strip()
-        if flow_key not in self._data[domain]["flows"]:
-            self._data[domain]["flows"][flow_key] = []
-
-        self._data[domain]["flows"][flow_key].append({
-            "steps": steps[:20],
-            "success": success,
-            "timestamp": datetime.now().isoformat(),
-        })
-        # Keep last 5 recordings per flow
-        self._data[domain]["flows"][flow_key] = self._data[domain]["flows"][flow_key][-5:]
-        self._save()
+        with self._lock:
+            data = self._ensure_domain(domain)
+
+            flow_key = flow_name.lower().strip()
+            if flow_key not in data["flows"]:
+                data["flows"][flow_key] = []
+
+            data["flows"][flow_key].append({
+                "steps": steps[:20],
+                "success": success,
+                "timestamp": datetime.now().isoformat(),
+            })
+            # Keep last 5 recordings per flow
+            data["flows"][flow_key] = data["flows"][flow_key][-5:]
+            self._save(domain)
 
     def get_flow(self, domain, flow_name):
         """Get the most recent successful flow for a domain.
@@ -227,9 +404,10 @@ class SiteKnowledge:
         domain = self._get_domain(domain)
         flow_key = flow_name.lower().strip()
 
-        if domain not in self._data:
+        data = self._domain(domain)
+        if data is None:
             return None
-        flows = self._data[domain].get("flows", {}).get(flow_key, [])
+        flows = data.get("flows", {}).get(flow_key, [])
         # Return the most recent successful flow
         for flow in reversed(flows):
             if flow.get("success"):
@@ -251,38 +429,41 @@ class SiteKnowledge:
             page: Optional page path where it occurred
         """
         domain = self._get_domain(domain)
-        self._ensure_domain(domain)
-
-        error_key = error_pattern[:100].lower().strip()
-        self._data[domain]["errors"][error_key] = {
-            "fix": fix[:300],
-            "page": page,
-            "times_used": self._data[domain]["errors"].get(error_key, {}).get("times_used", 0) + 1,
-            "last_used": datetime.now().isoformat(),
-        }
-        # Prune old errors
-        errors = self._data[domain]["errors"]
-        if len(errors) > MAX_ENTRIES_PER_SECTION:
-            oldest = sorted(errors.items(), key=lambda x: x[1].get("last_used", ""))
-            for key, _ in oldest[:len(errors) - MAX_ENTRIES_PER_SECTION]:
-                del errors[key]
-        self._save()
+        with self._lock:
+            data = self._ensure_domain(domain)
+
+            error_key = error_pattern[:100].lower().strip()
+            data["errors"][error_key] = {
+                "fix": fix[:300],
+                "page": page,
+                "times_used": data["errors"].get(error_key, {}).get("times_used", 0) + 1,
+                "last_used": datetime.now().isoformat(),
+            }
+            # Prune old errors
+            errors = data["errors"]
+            if len(errors) > MAX_ENTRIES_PER_SECTION:
+                oldest = sorted(errors.items(), key=lambda x: x[1].get("last_used", ""))
+                for key, _ in oldest[:len(errors) - MAX_ENTRIES_PER_SECTION]:
+                    del errors[key]
+            self._save(domain)
 
     def get_error_fix(self, domain, error):
         """Get a known fix for an error on a domain."""
         domain = self._get_domain(domain)
-        if domain not in self._data:
+        data = self._domain(domain)
+        if data is None:
             return None
 
         error_lower = error[:200].lower().strip()
-        errors = self._data[domain].get("errors", {})
+        errors = data.get("errors", {})
 
         # Check for matching patterns
-        for pattern, fix_data in errors.items():
-            if pattern in error_lower or error_lower in pattern:
-                fix_data["times_used"] = fix_data.get("times_used", 0) + 1
-                self._save()
-                return fix_data["fix"]
+        with self._lock:
+            for pattern, fix_data in errors.items():
+                if pattern in error_lower or error_lower in pattern:
+                    fix_data["times_used"] = fix_data.get("times_used", 0) + 1
+                    self._save(domain)
+                    return fix_data["fix"]
         return None
 
     # ═══════════════════════════════════════════
@@ -295,15 +476,17 @@ class SiteKnowledge:
         indicator_type: "url_pattern", "element_present", "title_pattern"
         """
         domain = self._get_domain(domain)
-        self._ensure_domain(domain)
-        self._data[domain]["login_indicators"][indicator_type] = indicator_value
-        self._save()
+        with self._lock:
+            data = self._ensure_domain(domain)
+            data["login_indicators"][indicator_type] = indicator_value
+            self._save(domain)
 
     def get_login_indicators(self, domain):
         """Get known login detection rules for a domain."""
         domain = self._get_domain(domain)
-        if domain in self._data:
-            return self._data[domain].get("login_indicators", {})
+        data = self._domain(domain)
+        if data is not None:
+            return data.get("login_indicators", {})
         return {}
 
     # ═══════════════════════════════════════════
@@ -317,18 +500,20 @@ class SiteKnowledge:
         dismiss_action: The action that worked, e.g. "click('Accept all')"
         """
         domain = self._get_domain(domain)
-        self._ensure_domain(domain)
-        self._data[domain]["overlay_dismissals"][overlay_type] = {
-            "action": dismiss_action[:200],
-            "last_used": datetime.now().isoformat(),
-        }
-        self._save()
+        with self._lock:
+            data = self._ensure_domain(domain)
+            data["overlay_dismissals"][overlay_type] = {
+                "action": dismiss_action[:200],
+                "last_used": datetime.now().isoformat(),
+            }
+            self._save(domain)
 
     def get_overlay_dismissals(self, domain):
         """Get known overlay dismissal actions for a domain."""
         domain = self._get_domain(domain)
-        if domain in self._data:
-            return self._data[domain].get("overlay_dismissals", {})
+        data = self._domain(domain)
+        if data is not None:
+            return data.get("overlay_dismissals", {})
         return {}
 
     # ═══════════════════════════════════════════
@@ -342,10 +527,10 @@ class SiteKnowledge:
         or empty string if we have no knowledge.
         """
         domain = self._get_domain(url)
-        if domain not in self._data:
+        data = self._domain(domain)  # Only this domain's shard is touched
+        if data is None:
             return ""
 
-        data = self._data[domain]
         parts = [f"\n🧠 SITE MEMORY for {domain} ({data.get('visit_count', 0)} previous visits):"]
 
         # Known page types
@@ -411,13 +596,21 @@ class SiteKnowledge:
     # ═══════════════════════════════════════════
 
     def get_stats(self):
-        """Get summary statistics."""
+        """Get summary statistics (from the index — no shards are loaded)."""
+        with self._lock:
+            for domain in self._dirty:
+                if domain in self._hot:
+                    meta = self._index.get(domain, {})
+                    self._index[domain] = self._summarize(meta.get("file", self._shard_name(domain)),
+                                                          self._hot[domain])
+            metas = list(self._index.values())
         return {
-            "domains_known": len(self._data),
-            "total_pages": sum(len(d.get("pages", {})) for d in self._data.values()),
-            "total_flows": sum(len(d.get("flows", {})) for d in self._data.values()),
-            "total_selectors": sum(len(d.get("selectors", {})) for d in self._data.values()),
-            "total_error_fixes": sum(len(d.get("errors", {})) for d in self._data.values()),
+            "domains_known": len(metas),
+            "total_pages": sum(m.get("pages", 0) for m in metas),
+            "total_flows": sum(m.get("flows", 0) for m in metas),
+            "total_selectors": sum(m.get("selectors", 0) for m in metas),
+            "total_error_fixes": sum(m.get("errors", 0) for m in metas),
+            "hot_domains": len(self._hot),
         }
 
 
@@ -0,0 +1,297 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Agent Working Memory          ║
+╚══════════════════════════════════════════╝
+
+Keeps an agent's transcript inside a token budget during long runs.
+
+  - Raw tool results stay verbatim while they're recent or cheap.
+  - Once the transcript is over budget, older results are evicted,
+    the stalest and least task-relevant first. Each one becomes a
+    one-line stub with a ref like "r7".
+  - Before eviction, durable facts (figures, prices, dates, URLs,
+    "key: value" lines, titles) are pulled out of the result into a
+    compact Working Notes block, which goes with every request.
+  - The full text is archived. recall_result(ref) brings it back
+    on demand.
+  - Tokens sent per step are recorded, so long runs can be replayed
+    and measured (see stats()).
+"""
+
+import re
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from memory.chunker import count_tokens
+
+CONTEXT_TOKEN_BUDGET = 12000    # Transcript tokens before old results are evicted
+NOTES_TOKEN_BUDGET = 1500       # Cap on the Working Notes block
+KEEP_RECENT_STEPS = 3           # Results from the last N steps are never evicted
+PIN_TOKENS = 150                # Results this small are never worth evicting
+FACTS_PER_RESULT = 6
+FACT_CHARS = 220
+IMAGE_TOKENS = 800              # Rough cost of an attached screenshot
+
+_WORD_RE = re.compile(r"[a-z0-9]{4,}")
+_NUMBER_RE = re.compile(r"\d")
+_URL_RE = re.compile(r"https?://\S+")
+_KEY_VALUE_RE = re.compile(r"^[\w\s()/.-]{2,40}:\s+\S")
+_TITLE_RE = re.compile(r"^(#{1,4}\s|\*\*[^*]+\*\*)")
+_NOISE_RE = re.compile(r"^[\W_]+$")
+
+TOOL_RECALL_RESULT = {
+    "name": "recall_result",
+    "description": "Re-read the full text of an earlier tool result that was compacted out of the conversation. Refs like r7 appear in the Working Notes and in compacted results. Prefer this over fetching the same page or search again.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "ref": {
+                "type": "string",
+                "description": "Result ref, e.g. 'r7'"
+            }
+        },
+        "required": ["ref"]
+    }
+}
+
+
+def _words(text):
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _block_tokens(block):
+    """Tokens for one message content block (dict or SDK object)."""
+    if not isinstance(block, dict):
+        return count_tokens(getattr(block, "text", None) or str(getattr(block, "input", "") or ""))
+    if block.get("type") == "tool_result":
+        tokens = count_tokens(str(block.get("content", "")))
+        return tokens + (IMAGE_TOKENS if block.get("_image_base64") else 0)
+    return count_tokens(str(block.get("content") or block.get("text") or ""))
+
+
+def transcript_tokens(system, messages):
+    """Tokens in a system prompt plus message list."""
+    tokens = count_tokens(system)
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            tokens += count_tokens(content)
+        else:
+            tokens += sum(_block_tokens(block) for block in content or [])
+    return tokens
+
+
+def extract_facts(text, limit=FACTS_PER_RESULT):
+    """Pick the lines of a tool result most worth remembering.
+
+    Scores each line on cheap signals (numbers, URLs, key: value,
+    titles) and keeps the best `limit` in their original order.
+    """
+    if not text:
+        return []
+    first = text.strip().splitlines()[0] if text.strip() else ""
+    if first.startswith("ERROR") or first.startswith("FAILED"):
+        return [first[:FACT_CHARS]]
+
+    scored = []
+    seen = set()
+    for i, raw in enumerate(text.splitlines()):
+        line = raw.strip().lstrip("-•* ").strip()
+        if len(line) < 8 or _NOISE_RE.match(line):
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        score = 0
+        if _NUMBER_RE.search(line):
+            score += 2
+        if _URL_RE.search(line):
+            score += 1
+        if _KEY_VALUE_RE.match(line):
+            score += 1
+        if _TITLE_RE.match(raw.strip()):
+            score += 1
+        if len(line) > FACT_CHARS:    # Facts are short; long lines are prose
+            score -= 1
+        if score > 0:
+            scored.append((score, i, line[:FACT_CHARS]))
+
+    best = sorted(scored, key=lambda s: (-s[0], s[1]))[:limit]
+    return [line for _, _, line in sorted(best, key=lambda s: s[1])]
+
+
+@dataclass
+class ResultEntry:
+    """One tool result the memory is tracking."""
+    ref: str
+    tool_use_id: str
+    step: int
+    tool: str
+    summary: str                    # e.g. web_search("tesla q3 deliveries")
+    tokens: int = 0
+    evicted: bool = False
+    facts: List[str] = field(default_factory=list)
+    archived: Optional[str] = None  # Full text once evicted
+
+
+class WorkingMemory:
+    """Token-budgeted view of one agent run's tool results.
+
+    Args:
+        token_budget: transcript tokens allowed before eviction kicks in
+        notes_budget: token cap on the Working Notes block
+        keep_recent: results from this many latest steps are never evicted
+    """
+
+    def __init__(self, token_budget=CONTEXT_TOKEN_BUDGET, notes_budget=NOTES_TOKEN_BUDGET,
+                 keep_recent=KEEP_RECENT_STEPS):
+        self.token_budget = token_budget
+        self.notes_budget = notes_budget
+        self.keep_recent = keep_recent
+        self._entries = {}          # tool_use_id → ResultEntry
+        self._by_ref = {}           # ref → ResultEntry
+        self._order = []            # ResultEntry, in dispatch order
+        self._sent = []             # Tokens sent per step
+        self._evictions = 0
+        self._recalls = 0
+
+    # ─── Tracking ────────────────────────────────────
+
+    def track(self, tool_use_id, step, tool, inp):
+        """Register a dispatched tool call. Returns its ref."""
+        ref = f"r{len(self._order) + 1}"
+        arg = ""
+        if isinstance(inp, dict) and inp:
+            arg = next(iter(inp.values()))
+            arg = arg if isinstance(arg, str) else json.dumps(arg, default=str)
+        entry = ResultEntry(ref=ref, tool_use_id=tool_use_id, step=step, tool=tool,
+                            summary=f"{tool}({json.dumps(arg[:80]) if arg else ''})")
+        self._entries[tool_use_id] = entry
+        self._by_ref[ref] = entry
+        self._order.append(entry)
+        return ref
+
+    def recall(self, ref):
+        """Full text of an evicted (or still live) result, for recall_result."""
+        entry = self._by_ref.get(str(ref).strip())
+        if entry is None:
+            known = ", ".join(e.ref for e in self._order if e.evicted) or "none"
+            return f"ERROR: No result with ref '{ref}'. Compacted refs: {known}"
+        self._recalls += 1
+        if entry.archived is None:
+            return f"{entry.ref} {entry.summary} is still in the conversation above — no need to recall it."
+        return f"[{entry.ref}] {entry.summary} (step {entry.step}):\n{entry.archived}"
+
+    # ─── Compaction ──────────────────────────────────
+
+    def compact(self, messages, step, focus=""):
+        """Evict old raw results from `messages` (in place) until the
+        transcript fits the budget. Returns the number evicted."""
+        live = []   # (entry, tool_result dict)
+        total = 0
+        for msg in messages:
+            content = msg.get("content")
+            if isinstance(content, str):
+                total += count_tokens(content)
+                continue
+            for block in content or []:
+                tokens = _block_tokens(block)
+                total += tokens
+                if isinstance(block, dict) and block.get("type") == "tool_result":
+                    entry = self._entries.get(block.get("tool_use_id"))
+                    if entry is not None and not entry.evicted:
+                        entry.tokens = tokens
+                        live.append((entry, block))
+
+        if total <= self.token_budget:
+            return 0
+
+        focus_words = _words(focus)
+        candidates = [
+            (self._eviction_score(entry, block, step, focus_words), entry, block)
+            for entry, block in live
+            if step - entry.step > self.keep_recent and entry.tokens > PIN_TOKENS
+        ]
+        evicted = 0
+        for _, entry, block in sorted(candidates, key=lambda c: -c[0]):
+            if total <= self.token_budget:
+                break
+            total -= entry.tokens
+            self._evict(entry, block)
+            total += _block_tokens(block)
+            evicted += 1
+        self._evictions += evicted
+        return evicted
+
+    @staticmethod
+    def _eviction_score(entry, block, step, focus_words):
+        """Higher = evict sooner: older, bigger, and less related to the task."""
+        age = step - entry.step
+        if focus_words:
+            overlap = len(_words(str(block.get("content", ""))) & focus_words)
+            relevance = overlap / len(focus_words)
+        else:
+            relevance = 0.0
+        return age * (1.0 - 0.5 * min(relevance, 1.0)) + entry.tokens / 2000
+
+    def _evict(self, entry, block):
+        text = str(block.get("content", ""))
+        entry.archived = text
+        entry.facts = extract_facts(text)
+        entry.evicted = True
+        block.pop("_image_base64", None)
+        block.pop("_image_mime", None)
+        block["content"] = f"[{entry.ref} compacted: {entry.summary}, {entry.tokens} tokens — see Working Notes]"
+
+    # ─── Notes block ─────────────────────────────────
+
+    @property
+    def has_evicted(self):
+        return self._evictions > 0
+
+    def notes_block(self):
+        """Working Notes for the system prompt: one line of facts per
+        compacted result. Over the notes budget, the oldest lines are
+        dropped but their refs stay listed for recall."""
+        lines = []
+        dropped = []
+        used = 0
+        for entry in reversed(self._order):
+            if not entry.evicted:
+                continue
+            line = f"- [{entry.ref}] {entry.summary}: " + (" | ".join(entry.facts) or "(no extractable facts)")
+            tokens = count_tokens(line)
+            if dropped or used + tokens > self.notes_budget:
+                dropped.append(entry.ref)
+                continue
+            lines.append(line)
+            used += tokens
+        if not lines:
+            return ""
+        block = "\n\n## Working Notes (facts kept from compacted tool results)\n" + "\n".join(reversed(lines))
+        if dropped:
+            block += f"\n- Older: {', '.join(reversed(dropped))}"
+        return block + "\nUse recall_result(ref) to re-read a compacted result instead of fetching it again."
+
+    # ─── Measurement ─────────────────────────────────
+
+    def record_request(self, system, messages):
+        """Count the tokens about to be sent for this step."""
+        tokens = transcript_tokens(system, messages)
+        self._sent.append(tokens)
+        return tokens
+
+    def stats(self):
+        sent = self._sent
+        return {
+            "steps": len(sent),
+            "tokens_sent": sum(sent),
+            "tokens_per_step_mean": round(sum(sent) / len(sent)) if sent else 0,
+            "tokens_per_step_max": max(sent) if sent else 0,
+            "results": len(self._order),
+            "evicted": self._evictions,
+            "recalls": self._recalls,
+            "facts": sum(len(e.facts) for e in self._order),
+        }
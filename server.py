@@ -22,6 +22,9 @@ import websockets
 
 from utils.event_bus import event_bus
 from utils.agent_monitor import agent_monitor
+from brain.provider_health import provider_health
+from agents.deployment import deployment_pool
+from hands.research_apis import ResearchCache, search_health
 
 # Prefer built Vite output (dashboard/dist/), fall back to dashboard/ root
 _base = os.path.dirname(os.path.abspath(__file__))
@@ -101,7 +104,7 @@ class DashboardHTTPHandler(SimpleHTTPRequestHandler):
         return False
 
     def _handle_health(self):
-        """Return JSON health status: uptime, agents, queue, memory."""
+        """Return JSON health status: uptime, agents, queue and admission, memory, tool and provider health."""
         import resource
         try:
             uptime = 0
@@ -113,12 +116,21 @@ class DashboardHTTPHandler(SimpleHTTPRequestHandler):
             # Queue depth (if tars instance available)
             queue_depth = 0
             last_msg_time = None
+            tool_latency = {}
+            task_admission = {}
             if DashboardHTTPHandler._server_ref and DashboardHTTPHandler._server_ref.tars:
                 tars = DashboardHTTPHandler._server_ref.tars
                 queue_depth = tars._task_queue.qsize()
+                admission = getattr(tars, '_task_admission', None)
+                if admission:
+                    task_admission = admission.stats()
+                    queue_depth += task_admission["queued"]
                 brain = getattr(tars, 'brain', None)
                 if brain:
                     last_msg_time = getattr(brain, '_last_message_time', None)
+                executor = getattr(tars, 'executor', None)
+                if executor and hasattr(executor, 'get_tool_stats'):
+                    tool_latency = executor.get_tool_stats()
 
             # Memory usage (RSS in MB)
             rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -130,10 +142,15 @@ class DashboardHTTPHandler(SimpleHTTPRequestHandler):
                 "uptime_seconds": round(uptime, 1),
                 "uptime_human": f"{int(uptime // 3600)}h {int((uptime % 3600) // 60)}m {int(uptime % 60)}s",
                 "queue_depth": queue_depth,
+                "task_admission": task_admission,
                 "last_message_time": last_msg_time,
                 "memory_rss_mb": round(rss_mb, 1),
                 "agents": agents,
                 "api_stats": stats,
+                "tool_latency": tool_latency,
+                "providers": provider_health.stats(),
+                "deployments": deployment_pool.stats(),
+                "search": {"cache": ResearchCache().stats(), "providers": search_health.stats()},
             }
 
             payload = json.dumps(health, indent=2).encode()
@@ -49,6 +49,7 @@ from utils.logger import setup_logger
 from utils.event_bus import event_bus
 from utils.agent_monitor import agent_monitor
 from utils.watchdog import HealthWatchdog
+from utils.task_admission import TaskAdmission, PRIORITY_EMERGENCY, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_NAMES
 from server import TARSServer
 from hands import mac_control as mac
 from hands.environment import setup_environment, cleanup_environment, clipboard_save, clipboard_restore, focus_save, focus_restore
@@ -224,8 +225,9 @@ class TARS:
 
         # Parallel task processing config
         self._max_parallel_tasks = self.config.get("agent", {}).get("max_parallel_tasks", 3)
-        self._active_tasks = {}  # {task_id: threading.Thread}
-        self._active_tasks_lock = threading.Lock()
+        self._task_admission = TaskAdmission(self._max_parallel_tasks)
+        self._active_tasks = self._task_admission.active  # {task_id: Ticket} — live view
+        self._active_tasks_lock = self._task_admission.lock
         self._task_counter = 0
         logger.info(f"  ⚡ Parallel task pool (max {self._max_parallel_tasks} concurrent)")
 
@@ -234,7 +236,7 @@ class TARS:
         self.message_parser = MessageStreamParser(
             on_batch_ready=self._on_batch_ready
         )
-        logger.info("  📨 Message stream parser ready (3s merge window)")
+        logger.info("  📨 Message stream parser ready (adaptive merge window)")
 
         self.monitor = agent_monitor
         logger.info("  📊 Agent monitor active")
@@ -308,9 +310,9 @@ class TARS:
         if hasattr(self, 'voice') and self.voice.is_active:
             self.voice.stop()
 
-        # Flush any pending messages in the stream parser
+        # Flush any pending messages in the stream parser and stop its worker
         if hasattr(self, 'message_parser'):
-            self.message_parser.force_flush()
+            self.message_parser.close()
 
         # Stop daily improver
         if hasattr(self, 'daily_improver'):
@@ -335,6 +337,9 @@ class TARS:
         # Wait for current task to finish (up to 10s)
         try:
             self._task_queue.join()  # blocks until task_done() called
+            dropped = self._task_admission.close(timeout=10)
+            if dropped:
+                logger.info(f"  🗑️ Dropped {dropped} queued task(s)")
         except Exception:
             pass
 
@@ -632,7 +637,11 @@ class TARS:
         self._task_queue.put(batch)
 
     def _task_worker(self):
-        """Background worker that dispatches tasks from the queue to parallel threads."""
+        """Background worker that hands queued tasks to the admission pool.
+
+        Never blocks on capacity: TaskAdmission orders tasks by priority
+        and wakes a pool worker the moment a slot frees up.
+        """
         while self.running:
             try:
                 item = self._task_queue.get(timeout=1)
@@ -640,12 +649,6 @@ class TARS:
                 continue
 
             try:
-                # Wait if at max capacity
-                while self._count_active_tasks() >= self._max_parallel_tasks:
-                    time.sleep(0.5)
-                    if not self.running:
-                        break
-
                 # Handle both MessageBatch (new) and raw strings (legacy)
                 if isinstance(item, MessageBatch):
                     task_text = item.merged_text
@@ -658,23 +661,21 @@ class TARS:
                 self._task_counter += 1
                 task_id = f"task_{self._task_counter}"
 
-                # Launch in a new thread
-                t = threading.Thread(
-                    target=self._run_task,
-                    args=(task_id, task_text, batch),
-                    name=f"tars-{task_id}",
-                    daemon=True,
+                priority = self._task_priority(task_text, batch)
+                self._task_admission.submit(
+                    task_id, self._run_task, task_id, task_text, batch,
+                    priority=priority, label=task_text[:100],
                 )
-                with self._active_tasks_lock:
-                    self._active_tasks[task_id] = t
-                t.start()
 
                 active = self._count_active_tasks()
-                logger.info(f"  ⚡ Spawned {task_id} (active: {active}/{self._max_parallel_tasks})")
-                event_bus.emit("parallel_task_started", {
+                if active >= self._max_parallel_tasks:
+                    logger.info(f"  ⏳ Queued {task_id} [{PRIORITY_NAMES[priority]}] "
+                                f"(active: {active}/{self._max_parallel_tasks}, "
+                                f"waiting: {self._task_admission.queued_count()})")
+                event_bus.emit("task_queued", {
                     "task_id": task_id,
                     "task": task_text[:100],
-                    "active_count": active,
+                    "priority": PRIORITY_NAMES[priority],
                 })
 
             except Exception as e:
@@ -682,14 +683,22 @@ class TARS:
             finally:
                 self._task_queue.task_done()
 
+    def _task_priority(self, task_text, batch):
+        """Admission class: scheduled work is background, urgent intents jump the queue."""
+        if batch is not None and batch.source == "scheduler":
+            return PRIORITY_BACKGROUND
+        try:
+            batch_type = batch.batch_type if batch else "single"
+            intent = self.brain.intent_classifier.classify(task_text, batch_type=batch_type)
+            if intent.type == "EMERGENCY":
+                return PRIORITY_EMERGENCY
+        except Exception:
+            pass
+        return PRIORITY_INTERACTIVE
+
     def _count_active_tasks(self) -> int:
-        """Count currently running task threads."""
-        with self._active_tasks_lock:
-            # Clean up finished threads
-            finished = [tid for tid, t in self._active_tasks.items() if not t.is_alive()]
-            for tid in finished:
-                del self._active_tasks[tid]
-            return len(self._active_tasks)
+        """Count currently running tasks."""
+        return self._task_admission.active_count()
 
     def _run_task(self, task_id, task_text, batch):
         """Execute a single task in its own thread.
@@ -706,16 +715,26 @@ class TARS:
             # Register task with watchdog
             self.watchdog.task_started(task_id)
 
+            ticket = self._task_admission.get(task_id)
+            wait = ticket.wait if ticket else 0.0
+            active = self._count_active_tasks()
+            logger.info(f"  ⚡ Admitted {task_id} after {wait:.2f}s in queue (active: {active}/{self._max_parallel_tasks})")
+            event_bus.emit("parallel_task_started", {
+                "task_id": task_id,
+                "task": task_text[:100],
+                "active_count": active,
+                "queue_wait": round(wait, 3),
+                "priority": PRIORITY_NAMES[ticket.priority] if ticket else "interactive",
+            })
+
             self.logger.info(f"[{task_id}] New message: {task_text}")
             event_bus.emit("task_received", {"task": task_text, "source": "agent", "task_id": task_id})
             event_bus.emit("status_change", {"status": "working", "label": f"WORKING ({self._count_active_tasks()})" })
 
-            # Set reply routing — dashboard messages get dashboard replies
+            # Own execution context: reply routing (dashboard messages get
+            # dashboard replies), a fresh agent budget, and a kill switch
             task_source = batch.source if batch else "imessage"
-            self.executor.set_reply_source(task_source)
-
-            # Reset deployment tracker (fresh agent budget)
-            self.executor.reset_task_tracker()
+            self.executor.begin_task(task_id, source=task_source)
 
             # Streaming progress: debounced updates to iMessage
             progress_collector = _ProgressCollector(
@@ -802,8 +821,9 @@ class TARS:
             )
 
         finally:
-            # Unregister task from watchdog
+            # Unregister task from watchdog and executor
             self.watchdog.task_completed(task_id)
+            self.executor.end_task(task_id)
 
             # Update status — check if other tasks are still running
             remaining = self._count_active_tasks() - 1  # -1 for this finishing thread
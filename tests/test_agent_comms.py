@@ -0,0 +1,153 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Agent Comms          ║
+╚══════════════════════════════════════════╝
+
+Tests the inter-agent hub: indexed message queries, bounded
+retention with spill-to-disk, concurrent writers, and versioned
+scratchpad entries that readers can wait on.
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from agents.comms import AgentComms
+
+
+class TestMessages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "comms.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_filters_match_linear_scan(self):
+        comms = AgentComms()
+        agents = ["browser", "coder", "research"]
+        types = ["info", "result", "handoff"]
+        for i in range(90):
+            comms.send(agents[i % 3], "brain" if i % 2 else agents[(i + 1) % 3], f"m{i}", msg_type=types[i % 5 % 3])
+        log = list(comms._messages)
+        for agent in agents + ["brain", None]:
+            for msg_type in types + [None]:
+                expected = [m for m in log if (not agent or agent in (m.from_agent, m.to_agent))
+                            and (not msg_type or m.msg_type == msg_type)][-7:]
+                self.assertEqual(comms.get_messages(agent, msg_type, limit=7), expected)
+
+    def test_retention_is_bounded_and_spills(self):
+        comms = AgentComms(max_messages=100, spill_path=self.path)
+        for i in range(1000):
+            comms.send("coder", "brain", f"m{i}", msg_type="result" if i % 10 == 0 else "info")
+        stats = comms.stats()
+        self.assertLessEqual(stats["messages"], 100)
+        self.assertEqual(stats["messages"] + stats["spilled"], 1000)
+        self.assertEqual(comms.get_messages(limit=1)[0].content, "m999")
+        # Indexes shrink with the log
+        self.assertLessEqual(len(comms._by_agent["coder"]), 100)
+        self.assertEqual(sum(stats["by_type"].values()), stats["messages"])
+        archived = comms.read_archive(msg_type="result", limit=1000)
+        self.assertEqual(archived[0].content, "m0")
+        self.assertEqual(len(archived) + len(comms.get_messages(msg_type="result", limit=1000)), 100)
+
+    def test_without_spill_path_old_messages_are_dropped(self):
+        comms = AgentComms(max_messages=20)
+        for i in range(100):
+            comms.send("a", "b", f"m{i}")
+        self.assertLessEqual(comms.stats()["messages"], 20)
+        self.assertEqual(comms.read_archive(), [])
+
+    def test_concurrent_senders(self):
+        comms = AgentComms(max_messages=10_000)
+
+        def writer(n):
+            for i in range(500):
+                comms.send(f"agent{n}", "brain", f"{n}:{i}")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        seqs = [m.seq for m in comms._messages]
+        self.assertEqual(seqs, list(range(1, 4001)))
+        for n in range(8):
+            mine = comms.get_messages(f"agent{n}", limit=1000)
+            self.assertEqual([m.content for m in mine], [f"{n}:{i}" for i in range(500)])
+
+    def test_indexed_query_cost_is_independent_of_log_size(self):
+        comms = AgentComms(max_messages=50_000)
+        for i in range(40_000):
+            comms.send("research", "brain", f"m{i}")
+        comms.send("coder", "brain", "rare", msg_type="handoff")
+        start = time.perf_counter()
+        for _ in range(200):
+            found = comms.get_messages("coder", "handoff")
+        elapsed = time.perf_counter() - start
+        self.assertEqual([m.content for m in found], ["rare"])
+        self.assertLess(elapsed, 0.1)
+
+
+class TestScratchpad(unittest.TestCase):
+
+    def test_versions_and_type_index(self):
+        comms = AgentComms()
+        self.assertEqual(comms.write_scratchpad("login", {"email": "#e"}, "selectors", "browser"), 1)
+        self.assertEqual(comms.write_scratchpad("login", {"email": "#email"}, "selectors", "browser"), 2)
+        comms.write_scratchpad("urls", ["a"], "urls", "research")
+        self.assertEqual(comms.scratchpad_version("login"), 2)
+        self.assertEqual(comms.scratchpad_version("missing"), 0)
+        self.assertEqual(comms.read_scratchpad_by_type("selectors"), {"login": {"email": "#email"}})
+        comms.write_scratchpad("urls", "now a fact", "facts", "research")
+        self.assertEqual(comms.read_scratchpad_by_type("urls"), {})
+        self.assertEqual(comms.read_scratchpad_by_type("facts"), {"urls": "now a fact"})
+        self.assertEqual(comms.get_messages(msg_type="scratchpad")[-1].metadata["version"], 2)
+
+    def test_wait_for_change(self):
+        comms = AgentComms()
+        comms.write_scratchpad("plan", "v1", "facts", "research")
+        seen = []
+
+        def reader():
+            entry = comms.wait_for_scratchpad("plan", after_version=1, timeout=2)
+            seen.append((entry.value, entry.version, time.monotonic()))
+
+        t = threading.Thread(target=reader)
+        t.start()
+        time.sleep(0.05)
+        self.assertEqual(seen, [])
+        written = time.monotonic()
+        comms.write_scratchpad("plan", "v2", "facts", "coder")
+        t.join(2)
+        self.assertEqual(seen[0][:2], ("v2", 2))
+        self.assertLess(seen[0][2] - written, 0.5)
+
+    def test_wait_returns_at_once_or_times_out(self):
+        comms = AgentComms()
+        comms.write_scratchpad("k", 1, "facts", "a")
+        self.assertEqual(comms.wait_for_scratchpad("k", timeout=0).value, 1)
+        self.assertIsNone(comms.wait_for_scratchpad("k", after_version=1, timeout=0.05))
+        self.assertIsNone(comms.wait_for_scratchpad("never", timeout=0.05))
+
+    def test_handoff_and_clear(self):
+        comms = AgentComms()
+        comms.write_scratchpad("k", "v", "facts", "a")
+        comms.handoff("browser", "coder", "page is ready", task="fill form")
+        ctx = comms.get_handoff_context("coder")
+        self.assertIn("HANDOFF FROM BROWSER", ctx)
+        self.assertIn("[facts] k", ctx)
+        comms.clear()
+        self.assertEqual(comms.stats()["messages"], 0)
+        self.assertEqual(comms.read_scratchpad_by_type("facts"), {})
+        self.assertIsNone(comms.get_handoff_context("coder"))
+
+
+if __name__ == "__main__":
+    unittest.main()
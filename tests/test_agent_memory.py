@@ -0,0 +1,141 @@
+"""
+╔══════════════════════════════════════════╗
+║     TARS — Test Suite: Agent Memory       ║
+╚══════════════════════════════════════════╝
+
+Tests the in-memory AgentMemory service: shared per-directory
+store, no disk I/O per step, lost-update safety under threads,
+and merge-on-flush across independent stores (processes).
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+import json
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from memory import agent_memory as am
+from memory.agent_memory import AgentMemory, _AgentMemoryStore
+
+
+class _Base(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        am._stores.pop(os.path.realpath(os.path.join(self.tmp, "memory", "agents")), None)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def on_disk(self, agent="coder"):
+        with open(os.path.join(self.tmp, "memory", "agents", f"{agent}.json")) as f:
+            return json.load(f)
+
+
+class TestInMemory(_Base):
+    """Records are served from memory and flushed later."""
+
+    def test_record_does_not_touch_disk(self):
+        mem = AgentMemory(self.tmp)
+        with mock.patch.object(mem._store, "_flush_agent") as flush:
+            mem.record_success("coder", "write tests", "done", 4)
+            mem.record_failure("coder", "deploy", "timeout", 2)
+            flush.assert_not_called()
+        self.assertIn("1/2 tasks succeeded", mem.get_context("coder"))
+        self.assertFalse(os.path.exists(os.path.join(mem.memory_dir, "coder.json")))
+
+    def test_flush_persists(self):
+        mem = AgentMemory(self.tmp)
+        mem.record_success("coder", "write tests", "done", 4)
+        mem.flush()
+        data = self.on_disk()
+        self.assertEqual(data["stats"]["successes"], 1)
+        self.assertEqual(data["stats"]["total_steps"], 4)
+        self.assertEqual(len(data["success_patterns"]), 1)
+
+    def test_instances_share_a_store(self):
+        a, b = AgentMemory(self.tmp), AgentMemory(self.tmp)
+        self.assertIs(a._store, b._store)
+        a.record_success("coder", "t", "s", 1)
+        self.assertEqual(b.get_all_stats()["Coder"]["successes"], 1)
+
+    def test_interval_flush(self):
+        with mock.patch.object(am, "FLUSH_INTERVAL", 0.05):
+            mem = AgentMemory(self.tmp)
+            mem.record_failure("coder", "t", "r", 1)
+            path = os.path.join(mem.memory_dir, "coder.json")
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                threading.Event().wait(0.02)
+        self.assertEqual(self.on_disk()["stats"]["failures"], 1)
+
+
+class TestLostUpdates(_Base):
+    """Concurrent updates are never lost."""
+
+    def test_threads_on_shared_store(self):
+        instances = [AgentMemory(self.tmp) for _ in range(4)]
+        per_thread = 50
+
+        def worker(mem, i):
+            for n in range(per_thread):
+                if n % 2:
+                    mem.record_success("coder", f"task {i}-{n}", "ok", 1)
+                else:
+                    mem.record_failure("coder", f"task {i}-{n}", "nope", 1)
+
+        threads = [threading.Thread(target=worker, args=(instances[i % 4], i)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        instances[0].flush()
+
+        stats = self.on_disk()["stats"]
+        self.assertEqual(stats["total_tasks"], 8 * per_thread)
+        self.assertEqual(stats["successes"] + stats["failures"], 8 * per_thread)
+        self.assertEqual(stats["total_steps"], 8 * per_thread)
+
+    def test_flush_during_updates(self):
+        mem = AgentMemory(self.tmp)
+        stop = threading.Event()
+
+        def flusher():
+            while not stop.is_set():
+                mem.flush()
+
+        t = threading.Thread(target=flusher)
+        t.start()
+        for n in range(300):
+            mem.record_success("coder", f"t{n}", "ok", 1)
+        stop.set()
+        t.join()
+        mem.flush()
+        self.assertEqual(self.on_disk()["stats"]["total_tasks"], 300)
+
+    def test_independent_stores_merge(self):
+        # Two stores on one directory behave like two processes
+        memory_dir = os.path.join(self.tmp, "memory", "agents")
+        os.makedirs(memory_dir)
+        p1, p2 = _AgentMemoryStore(memory_dir), _AgentMemoryStore(memory_dir)
+        entry = {"task": "t", "summary": "s", "steps": 1, "timestamp": ""}
+        p1.get("coder")
+        p2.get("coder")
+        for _ in range(10):
+            p1.update("coder", "success", entry, 1)
+            p2.update("coder", "success", entry, 2)
+        p1.flush()
+        p2.flush()
+        stats = self.on_disk()["stats"]
+        self.assertEqual(stats["total_tasks"], 20)
+        self.assertEqual(stats["total_steps"], 30)
+        # p2 now sees p1's updates too
+        self.assertEqual(p2.get("coder")["stats"]["total_tasks"], 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,14 +6,18 @@
 Tests for base_agent.py utilities:
   - _parse_function_tags (Groq text→tool parsing)
   - Text-only loop detection behavior
+  - Concurrent tool calls within a step (TOOL_RESOURCES)
 """
 
 import unittest
+import threading
+import time
 import sys
 import os
+from types import SimpleNamespace
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from agents.base_agent import _parse_function_tags
+from agents.base_agent import BaseAgent, _parse_function_tags
 
 
 class TestParseFunctionTags(unittest.TestCase):
@@ -143,5 +147,117 @@ class TestParseFunctionTags(unittest.TestCase):
         self.assertEqual(result[1][0], "done")
 
 
+def _call(name, i, **inp):
+    return SimpleNamespace(type="tool_use", name=name, input=inp, id=f"call_{i}")
+
+
+class _ScriptedClient:
+    """LLM double: replays one response per step and records tool results."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.tool_results = []
+
+    def create(self, messages, **kwargs):
+        last = messages[-1]["content"]
+        if isinstance(last, list):
+            self.tool_results.append(last)
+        blocks = self.steps.pop(0)
+        return SimpleNamespace(content=blocks, stop_reason="tool_use")
+
+
+class _SleepyAgent(BaseAgent):
+    """Agent whose tools sleep, so overlap shows up as wall-clock time."""
+
+    TOOL_RESOURCES = {
+        "fetch": (),
+        "note": (("notes", "write"),),
+    }
+    DELAY = 0.1
+
+    def __init__(self, client):
+        super().__init__(client, "stub-model")
+        self.calls = []
+        self.live = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    agent_name = "Sleepy Agent"
+    agent_emoji = "💤"
+    system_prompt = "test"
+    tools = []
+
+    def _dispatch(self, name, inp):
+        with self._lock:
+            self.live += 1
+            self.peak = max(self.peak, self.live)
+            self.calls.append(name)
+        try:
+            if name == "boom":
+                raise RuntimeError("tool exploded")
+            time.sleep(self.DELAY)
+            return f"{name}:{inp.get('n')}"
+        finally:
+            with self._lock:
+                self.live -= 1
+
+
+class TestConcurrentToolCalls(unittest.TestCase):
+    """Declared-independent tool calls in one step overlap; results stay in order."""
+
+    def _run(self, *calls):
+        client = _ScriptedClient(
+            [_call(name, i, n=i) for i, name in enumerate(calls)],
+            [_call("done", 99, summary="Finished the scripted run with all results.")],
+        )
+        agent = _SleepyAgent(client)
+        start = time.perf_counter()
+        result = agent.run("scripted")
+        return agent, client, result, time.perf_counter() - start
+
+    def test_independent_calls_overlap(self):
+        agent, client, result, elapsed = self._run("fetch", "fetch", "fetch", "fetch")
+        self.assertTrue(result["success"])
+        self.assertEqual(agent.peak, 4)
+        self.assertLess(elapsed, 4 * _SleepyAgent.DELAY)
+
+    def test_results_keep_block_order(self):
+        agent, client, result, _ = self._run("fetch", "fetch", "fetch")
+        results = client.tool_results[0]
+        self.assertEqual([r["tool_use_id"] for r in results], ["call_0", "call_1", "call_2"])
+        self.assertEqual([r["content"] for r in results], ["fetch:0", "fetch:1", "fetch:2"])
+
+    def test_conflicting_calls_run_alone(self):
+        agent, _, _, _ = self._run("note", "note")
+        self.assertEqual(agent.peak, 1)
+
+    def test_undeclared_tool_is_exclusive(self):
+        agent, _, _, elapsed = self._run("fetch", "mystery", "fetch")
+        self.assertEqual(agent.peak, 1)
+        self.assertGreaterEqual(elapsed, 3 * _SleepyAgent.DELAY)
+
+    def test_calls_after_done_are_not_started_early(self):
+        client = _ScriptedClient([
+            _call("fetch", 0, n=0), _call("fetch", 1, n=1),
+            _call("done", 2, summary="Finished after two fetch calls here."),
+            _call("fetch", 3, n=3),
+        ])
+        agent = _SleepyAgent(client)
+        self.assertTrue(agent.run("scripted")["success"])
+        self.assertEqual(agent.calls, ["fetch", "fetch"])
+
+    def test_tool_exception_propagates(self):
+        client = _ScriptedClient([_call("fetch", 0, n=0), _call("boom", 1, n=1)])
+        agent = _SleepyAgent(client)
+        agent.TOOL_RESOURCES = {"fetch": (), "boom": ()}
+        with self.assertRaises(RuntimeError):
+            agent.run("scripted")
+
+    def test_planned_dispatches_follow_step_caps(self):
+        blocks = [_call("fetch", i) for i in range(8)] + [_call("look", 8)]
+        planned = BaseAgent._planned_dispatches(blocks, effective_cap=5, hard_cap=6)
+        self.assertEqual([b.id for b in planned], [f"call_{i}" for i in range(5)] + ["call_8"])
+
+
 if __name__ == "__main__":
     unittest.main()
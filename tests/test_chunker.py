@@ -0,0 +1,212 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Document Chunker     ║
+╚══════════════════════════════════════════╝
+
+Tests the token-aware, structure-preserving chunker: token
+budgets, headings/lists/tables/code kept intact, section-scoped
+overlap, provenance offsets and pages, and throughput on large
+text and paginated (PDF-extracted) fixtures.
+"""
+
+import unittest
+import tempfile
+import shutil
+import random
+import shutil as _sh
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from memory.chunker import chunk_text, split_blocks, count_tokens
+from memory.semantic_memory import SemanticMemory
+
+WORDS = ("the quick brown fox jumps over lazy dog memory vector search "
+         "token budget section heading table code agent browser").split()
+
+
+def _sentence(rng, n=14):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def _markdown(sections=40, seed=3):
+    rng = random.Random(seed)
+    parts = ["# Handbook", "", _sentence(rng), ""]
+    for s in range(sections):
+        parts += [f"## Section {s}", ""]
+        for _ in range(4):
+            parts += [" ".join(_sentence(rng) for _ in range(5)), ""]
+        parts += ["- first item " + _sentence(rng), "- second item", "  continued detail", ""]
+        parts += ["| name | value |", "|------|-------|", "| a | 1 |", "| b | 2 |", ""]
+        parts += ["```python", "def handler(x):", "    return x * 2", "```", ""]
+    return "\n".join(parts)
+
+
+def _paginated(pages=60, seed=5):
+    rng = random.Random(seed)
+    return "\f".join("\n\n".join(" ".join(_sentence(rng) for _ in range(6)) for _ in range(4))
+                     for _ in range(pages))
+
+
+class TestStructure(unittest.TestCase):
+    """Blocks are parsed with kinds, offsets and heading paths."""
+
+    def test_block_kinds(self):
+        text = "# Top\n\nIntro text.\n\n## Sub\n\n- a\n- b\n\n| x |\n|---|\n\n```\ncode\n```\n"
+        kinds = [b.kind for b in split_blocks(text)]
+        self.assertEqual(kinds, ["heading", "paragraph", "heading", "list", "list", "table", "code"])
+        self.assertEqual(split_blocks(text)[-1].section, "Top > Sub")
+
+    def test_blank_lines_inside_code_stay_in_block(self):
+        text = "```\nline one\n\nline three\n```\n\nAfter."
+        blocks = split_blocks(text)
+        self.assertEqual(blocks[0].kind, "code")
+        self.assertIn("line three", text[blocks[0].start:blocks[0].end])
+
+    def test_sibling_heading_replaces_section(self):
+        text = "# A\n\n## B\n\nx\n\n## C\n\ny\n\n# D\n\nz"
+        sections = [b.section for b in split_blocks(text) if b.kind == "paragraph"]
+        self.assertEqual(sections, ["A > B", "A > C", "D"])
+
+
+class TestChunking(unittest.TestCase):
+    """Budgets, structure and overlap."""
+
+    def setUp(self):
+        self.text = _markdown()
+        self.chunks = chunk_text(self.text, max_tokens=120, overlap_tokens=20)
+
+    def test_provenance_offsets_are_exact(self):
+        for c in self.chunks:
+            self.assertEqual(self.text[c.start:c.end], c.text)
+
+    def test_chunks_respect_token_budget(self):
+        self.assertTrue(all(c.tokens <= 120 for c in self.chunks))
+
+    def test_small_blocks_never_split(self):
+        for c in self.chunks:
+            # Every code fence that opens in a chunk closes in it
+            self.assertEqual(c.text.count("```") % 2, 0, c.text)
+            if "| name | value |" in c.text:
+                self.assertIn("| b | 2 |", c.text)
+
+    def test_no_chunk_ends_on_heading(self):
+        for c in self.chunks[:-1]:
+            self.assertFalse(c.text.rstrip().splitlines()[-1].startswith("#"), c.text)
+
+    def test_sections_start_new_chunks(self):
+        starts = {c.section for c in self.chunks}
+        self.assertIn("Handbook > Section 5", starts)
+
+    def test_overlap_within_section_only(self):
+        text = "# A\n\n" + " ".join(f"Sentence number {i} is here." for i in range(200)) + "\n\n# B\n\nTail."
+        chunks = chunk_text(text, max_tokens=60, overlap_tokens=12)
+        same = [(a, b) for a, b in zip(chunks, chunks[1:]) if a.section == b.section]
+        self.assertTrue(same)
+        for a, b in same:
+            self.assertLess(b.start, a.end)
+            self.assertLessEqual(count_tokens(text[b.start:a.end]), 12)
+        self.assertGreaterEqual(chunks[-1].start, chunks[-2].end)
+
+    def test_oversize_run_on_is_hard_split(self):
+        text = "word " * 2000
+        chunks = chunk_text(text, max_tokens=50, overlap_tokens=0)
+        self.assertTrue(all(c.tokens <= 50 for c in chunks))
+        self.assertEqual("".join(text[c.start:c.end] for c in chunks).split(), text.split())
+
+    def test_pages_from_form_feeds(self):
+        text = _paginated(pages=5)
+        chunks = chunk_text(text, max_tokens=80)
+        self.assertEqual(chunks[0].page, 1)
+        self.assertEqual(chunks[-1].page, 5)
+        for c in chunks:
+            self.assertEqual(text.count("\f", 0, c.start) + 1, c.page)
+
+    def test_empty(self):
+        self.assertEqual(chunk_text(""), [])
+        self.assertEqual(chunk_text("   \n\n "), [])
+
+    def test_legacy_wrapper_returns_strings(self):
+        self.assertTrue(all(isinstance(c, str) for c in SemanticMemory._chunk_text(self.text, 100, 10)))
+
+
+def _write_pdf(path, pages):
+    """Minimal valid PDF, one Helvetica text line per page."""
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objs.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                    f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objs)} 0 R >>")
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _pdf_extractor_available():
+    if _sh.which("pdftotext"):
+        return True
+    try:
+        import PyPDF2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class TestPdf(unittest.TestCase):
+    """Real PDF extraction keeps page provenance (needs pdftotext or PyPDF2)."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    @unittest.skipUnless(_pdf_extractor_available(), "no PDF text extractor installed")
+    def test_pdf_pages(self):
+        path = os.path.join(self.tmp, "doc.pdf")
+        _write_pdf(path, [f"Page {i} talks about topic {i}." for i in range(1, 4)])
+        text = SemanticMemory._extract_text(path, ".pdf")
+        chunks = chunk_text(text, max_tokens=16, overlap_tokens=0)
+        pages = {c.page for c in chunks if "topic 3" in c.text}
+        self.assertEqual(pages, {3})
+
+
+class TestThroughput(unittest.TestCase):
+    """Benchmark: chunking large text and paginated PDF text."""
+
+    def _rate(self, text, **kwargs):
+        start = time.perf_counter()
+        chunks = chunk_text(text, **kwargs)
+        elapsed = time.perf_counter() - start
+        return chunks, len(text) / 1e6 / max(elapsed, 1e-9)
+
+    def test_large_markdown(self):
+        text = _markdown(sections=600)
+        chunks, mb_per_s = self._rate(text)
+        self.assertGreater(len(text), 1_000_000)
+        self.assertGreater(mb_per_s, 0.5)
+        self.assertEqual(chunks[-1].end, len(text.rstrip()))
+
+    def test_large_paginated_pdf_text(self):
+        text = _paginated(pages=800)
+        chunks, mb_per_s = self._rate(text)
+        self.assertGreater(mb_per_s, 0.5)
+        self.assertEqual(chunks[-1].page, 800)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,333 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Agent Deployment     ║
+╚══════════════════════════════════════════╝
+
+Tests the deployment runtime: the long-lived pool, cancellation
+tokens checked at BaseAgent step boundaries, wall-time deadlines,
+token and tool-call budgets, and that a timed-out agent stops
+instead of running on in the background.
+"""
+
+import unittest
+import threading
+import logging
+import time
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import agents.deployment as deployment_module
+from agents.deployment import DeploymentPool, DeploymentToken, DeploymentLimits, limits_for
+from agents.base_agent import BaseAgent
+
+try:
+    import executor as executor_module
+    HAS_EXECUTOR = True
+except Exception:   # Optional deps / platform-only modules missing
+    executor_module = None
+    HAS_EXECUTOR = False
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowClient:
+    """LLM double: each call takes `delay` seconds, reports `tokens` used,
+    and asks for one `work` tool call. Never calls done."""
+
+    def __init__(self, delay=0.0, tokens=100):
+        self.delay = delay
+        self.tokens = tokens
+        self.calls = 0
+        self.last_call = None
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls += 1
+            self.last_call = time.monotonic()
+            n = self.calls
+        block = SimpleNamespace(type="tool_use", name="work", input={"n": n}, id=f"w{n}")
+        return SimpleNamespace(content=[block], stop_reason="tool_use",
+                               usage=SimpleNamespace(input_tokens=self.tokens - 10, output_tokens=10))
+
+
+class SlowAgent(BaseAgent):
+    agent_name = "Slow Agent"
+    agent_emoji = "🐢"
+    system_prompt = "Work forever."
+    tools = [{"name": "work"}, {"name": "done"}, {"name": "stuck"}]
+    _loop_detection_repeats = 10 ** 6
+
+    def __init__(self, *args, tool_delay=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tool_delay = tool_delay
+        self.tool_calls = 0
+
+    def _dispatch(self, name, inp):
+        time.sleep(self.tool_delay)
+        self.tool_calls += 1
+        return f"worked {inp['n']}"
+
+
+class BatchClient(SlowClient):
+    """SlowClient that asks for `batch` independent work calls per step."""
+
+    def __init__(self, batch, **kwargs):
+        super().__init__(**kwargs)
+        self.batch = batch
+
+    def create(self, **kwargs):
+        response = super().create(**kwargs)
+        n = self.calls
+        response.content = [SimpleNamespace(type="tool_use", name="work", input={"n": f"{n}.{i}"}, id=f"w{n}.{i}")
+                            for i in range(self.batch)]
+        return response
+
+
+class ParallelAgent(SlowAgent):
+    TOOL_RESOURCES = {"work": ()}
+
+    def __init__(self, *args, on_tool=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_tool = on_tool
+        self._count_lock = threading.Lock()
+
+    def _dispatch(self, name, inp):
+        with self._count_lock:
+            self.tool_calls += 1
+        if self.on_tool:
+            self.on_tool()
+        return f"worked {inp['n']}"
+
+
+def _slow_agent(token, delay=0.0, tokens=100, tool_delay=0.0, max_steps=1000):
+    client = SlowClient(delay, tokens)
+    return SlowAgent(client, "m", max_steps=max_steps, kill_event=token, tool_delay=tool_delay), client
+
+
+class TestToken(unittest.TestCase):
+
+    def test_deadline_sets_token_with_reason(self):
+        clock = _Clock()
+        token = DeploymentToken(limits=DeploymentLimits(wall_seconds=10), clock=clock)
+        self.assertFalse(token.is_set())
+        clock.now += 10
+        self.assertTrue(token.is_set())
+        self.assertEqual(token.reason, "Timed out after 10s")
+
+    def test_parent_kill_is_not_a_limit(self):
+        parent = threading.Event()
+        token = DeploymentToken(parent)
+        parent.set()
+        self.assertTrue(token.is_set())
+        self.assertEqual(token.reason, "")
+
+    def test_budgets_cancel(self):
+        token = DeploymentToken(limits=DeploymentLimits(max_tokens=250, max_tool_calls=2))
+        resp = SimpleNamespace(usage=SimpleNamespace(input_tokens=90, output_tokens=10))
+        token.charge_llm(resp)
+        token.charge_llm(resp)
+        self.assertFalse(token.is_set())
+        token.charge_llm(resp)
+        self.assertTrue(token.is_set())
+        self.assertIn("Token budget exhausted", token.reason)
+        token.charge_tool("a")
+        token.charge_tool("a")
+        self.assertIn("Token budget", token.reason)     # First reason wins
+        self.assertEqual(token.snapshot()["tools"], {"a": 2})
+
+    def test_wait_wakes_at_deadline(self):
+        token = DeploymentToken(limits=DeploymentLimits(wall_seconds=0.05))
+        start = time.monotonic()
+        self.assertTrue(token.wait(5))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_wait_wakes_on_parent_kill(self):
+        parent = threading.Event()
+        token = DeploymentToken(parent, DeploymentLimits(wall_seconds=None))
+        threading.Timer(0.05, parent.set).start()
+        start = time.monotonic()
+        self.assertTrue(token.wait(5))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertFalse(DeploymentToken(threading.Event()).wait(0.05))
+
+    def test_dev_limits(self):
+        self.assertEqual(limits_for("dev").wall_seconds, 3600)
+        self.assertEqual(limits_for("coder").wall_seconds, 300)
+        self.assertEqual(limits_for("coder", max_tokens=5).max_tokens, 5)
+
+
+class TestPool(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DeploymentPool(max_workers=4, grace_seconds=2)
+
+    def test_timeout_stops_agent_at_step_boundary(self):
+        token = self.pool.token("research", wall_seconds=0.3)
+        agent, client = _slow_agent(token, delay=0.05)
+        start = time.monotonic()
+        result = self.pool.run(agent, "grind", token=token, agent_type="research")
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertFalse(result["success"])
+        self.assertTrue(result["stuck"])
+        self.assertEqual(result["stuck_reason"], "Timed out after 0.3s")
+        # No orphan: nothing left running, and no calls after the result came back
+        self.assertEqual(self.pool.active(), [])
+        calls = client.calls
+        time.sleep(0.2)
+        self.assertEqual(client.calls, calls)
+        self.assertEqual(self.pool.stats()["timed_out"], 1)
+
+    def test_agent_blocked_in_a_call_is_tracked_until_it_returns(self):
+        self.pool.grace_seconds = 0.1
+        token = self.pool.token("research", wall_seconds=0.1)
+        agent, client = _slow_agent(token, tool_delay=0.6)
+        result = self.pool.run(agent, "grind", token=token, agent_type="research")
+        self.assertEqual(result["stuck_reason"], "Timed out after 0.1s")
+        self.assertEqual(self.pool.stats()["cancelling"], 1)
+        self.assertTrue(self.pool.active()[0]["cancelling"])
+        deadline = time.monotonic() + 3
+        while self.pool.active() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(self.pool.active(), [])
+        self.assertEqual(client.calls, 1)       # Never started a second step
+        self.assertEqual(agent.tool_calls, 1)
+
+    def test_token_budget_stops_agent(self):
+        token = self.pool.token("coder", max_tokens=1000)
+        agent, client = _slow_agent(token, tokens=300)
+        result = self.pool.run(agent, "grind", token=token, agent_type="coder")
+        self.assertIn("Token budget exhausted", result["stuck_reason"])
+        self.assertEqual(client.calls, 4)
+        self.assertEqual(result["usage"]["tokens"], 1200)
+        self.assertEqual(result["usage"]["llm_calls"], 4)
+        self.assertEqual(self.pool.stats()["budget_stopped"], 1)
+
+    def test_tool_budget_skips_remaining_calls(self):
+        token = self.pool.token("coder", max_tool_calls=3)
+        agent, _ = _slow_agent(token)
+        result = self.pool.run(agent, "grind", token=token, agent_type="coder")
+        self.assertIn("Tool-call budget exhausted", result["stuck_reason"])
+        self.assertEqual(agent.tool_calls, 3)
+        self.assertEqual(result["usage"]["tools"], {"work": 3})
+
+    def test_tool_budget_caps_concurrent_calls(self):
+        token = self.pool.token("coder", max_tool_calls=3)
+        agent = ParallelAgent(BatchClient(4), "m", kill_event=token)
+        result = self.pool.run(agent, "grind", token=token, agent_type="coder")
+        self.assertIn("Tool-call budget exhausted", result["stuck_reason"])
+        self.assertEqual(agent.tool_calls, 3)
+        self.assertEqual(result["usage"]["tool_calls"], 3)
+
+    def test_kill_stops_concurrent_calls_not_yet_started(self):
+        kill = threading.Event()
+        token = self.pool.token("coder", parent=kill)
+        agent = ParallelAgent(BatchClient(4), "m", kill_event=token, on_tool=kill.set)
+        agent.MAX_CONCURRENT_TOOLS = 1
+        result = self.pool.run(agent, "grind", token=token, agent_type="coder")
+        self.assertFalse(result["success"])
+        self.assertEqual(agent.tool_calls, 1)
+
+    def test_kill_switch_reaches_queued_and_running_agents(self):
+        kill = threading.Event()
+        tokens = [self.pool.token("coder", parent=kill) for _ in range(6)]
+        agents = [_slow_agent(t, delay=0.02)[0] for t in tokens]
+        results = [None] * 6
+
+        def deploy(i):
+            results[i] = self.pool.run(agents[i], "grind", token=tokens[i], agent_type="coder")
+
+        threads = [threading.Thread(target=deploy, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        kill.set()
+        for t in threads:
+            t.join(3)
+        self.assertTrue(all(r is not None and not r["success"] for r in results))
+        self.assertEqual(self.pool.active(), [])
+
+    def test_pool_threads_are_reused(self):
+        names = set()
+
+        class Quick:
+            def run(self, task, context=None):
+                names.add(threading.current_thread().name)
+                return {"success": True, "steps": 1, "content": "ok"}
+
+        for _ in range(20):
+            self.assertTrue(self.pool.run(Quick(), "t", token=DeploymentToken())["success"])
+        self.assertLessEqual(len(names), 4)
+        self.assertEqual(self.pool.stats()["deployed"], 20)
+
+    def test_crash_is_reported(self):
+        class Boom:
+            def run(self, task, context=None):
+                raise RuntimeError("kaboom")
+
+        result = self.pool.run(Boom(), "t", token=DeploymentToken())
+        self.assertIn("kaboom", result["stuck_reason"])
+        self.assertEqual(self.pool.stats()["crashed"], 1)
+        self.assertEqual(self.pool.active(), [])
+
+
+@unittest.skipUnless(HAS_EXECUTOR, "executor not importable here")
+class TestExecutorDeploy(unittest.TestCase):
+    """_deploy_agent runs agents on the shared pool under their limits."""
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(executor_module, "LLMClient"),
+            mock.patch.object(executor_module, "AgentMemory"),
+            mock.patch.object(executor_module, "SelfImproveEngine"),
+            mock.patch.object(executor_module, "agent_comms"),
+            mock.patch.object(executor_module, "error_tracker"),
+            mock.patch.object(executor_module, "AGENT_CLASSES", {"coder": self._build}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        executor_module.agent_comms.get_handoff_context.return_value = None
+        config = {
+            "llm": {"provider": "stub", "api_key": "k", "heavy_model": "m"},
+            "imessage": {"owner_phone": "+10000000000"},
+            "safety": {"max_deployments": 6},
+        }
+        self.ex = executor_module.ToolExecutor(
+            config, mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+            logging.getLogger("test"), kill_event=threading.Event(),
+        )
+        self.ex.self_improve.get_pre_task_advice.return_value = ""
+        self.ex.self_improve.run_post_task_review.return_value = None
+        self.ex.deployments = DeploymentPool(max_workers=2, grace_seconds=1)
+        self.built = []
+
+    def _build(self, **kwargs):
+        agent, client = _slow_agent(kwargs["kill_event"], delay=0.01)
+        self.built.append((agent, client))
+        return agent
+
+    def test_deadline_and_usage_recorded(self):
+        with mock.patch.dict(deployment_module.AGENT_LIMITS, {"coder": DeploymentLimits(wall_seconds=0.2)}):
+            result = self.ex._deploy_agent("coder", "grind")
+        self.assertFalse(result["success"])
+        self.assertIn("Timed out after 0.2s", result["content"])
+        entry = self.ex.current_context().deployments()[-1]
+        self.assertGreater(entry["usage"]["llm_calls"], 0)
+        agent, client = self.built[0]
+        self.assertIsInstance(agent._kill_event, DeploymentToken)
+        self.assertEqual(self.ex.deployments.active(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
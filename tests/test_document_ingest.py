@@ -0,0 +1,227 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Document Ingest      ║
+╚══════════════════════════════════════════╝
+
+Tests incremental folder ingestion: manifest-based change
+detection, re-embedding only changed chunks, deletion of
+vectors for removed files, parallel extraction, and a re-index
+benchmark where only a few files in a large folder changed.
+"""
+
+import unittest
+import tempfile
+import shutil
+import hashlib
+import re
+import time
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    from chromadb import EmbeddingFunction
+    HAS_CHROMADB = True
+except ImportError:
+    EmbeddingFunction = object
+    HAS_CHROMADB = False
+
+from memory import document_ingest as di
+from memory.semantic_memory import SemanticMemory
+
+DIM = 64
+
+
+class HashEmbedding(EmbeddingFunction):
+    """Offline bag-of-words embedding that counts embedded texts."""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def __call__(self, input):
+        self.embedded += len(input)
+        vectors = []
+        for text in input:
+            vec = [0.0] * DIM
+            for word in re.findall(r"[a-z0-9]+", text.lower()):
+                vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1.0
+            vec[0] += 0.01
+            vectors.append(vec)
+        return vectors
+
+
+def _paragraphs(tag, n=8):
+    return "\n\n".join(f"Section {i} of {tag}. " + "Details about the topic here. " * 12 for i in range(n))
+
+
+@unittest.skipUnless(HAS_CHROMADB, "chromadb not installed")
+class _Base(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.docs = os.path.join(self.tmp, "docs")
+        os.makedirs(self.docs)
+        os.makedirs(os.path.join(self.tmp, "memory"))
+        self.embedder = HashEmbedding()
+        self.mem = SemanticMemory(base_dir=self.tmp, embedding_fn=self.embedder)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, name, text):
+        path = os.path.join(self.docs, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def ingest(self, **kwargs):
+        return self.mem._get_ingestor().ingest_directory(self.docs, chunk_size=120, chunk_overlap=16, **kwargs)
+
+
+class TestChangeDetection(_Base):
+    """Only what changed is extracted and embedded."""
+
+    def test_first_run_indexes_everything(self):
+        self.write("a.md", _paragraphs("a"))
+        self.write("sub/b.txt", _paragraphs("b"))
+        self.write("skip.bin", "binary")
+        stats = self.ingest()
+        self.assertEqual(stats["scanned"], 2)
+        self.assertEqual(stats["indexed"], 2)
+        self.assertEqual(stats["chunks_embedded"], self.mem.count("documents"))
+
+    def test_unchanged_folder_is_free(self):
+        self.write("a.md", _paragraphs("a"))
+        self.ingest()
+        self.embedder.embedded = 0
+        with mock.patch.object(di, "_extract_and_chunk") as extract:
+            stats = self.ingest()
+        extract.assert_not_called()
+        self.assertEqual(stats["unchanged"], 1)
+        self.assertEqual(self.embedder.embedded, 0)
+
+    def test_touched_file_is_not_reembedded(self):
+        path = self.write("a.md", _paragraphs("a"))
+        self.ingest()
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        self.embedder.embedded = 0
+        stats = self.ingest()
+        self.assertEqual(stats["touched"], 1)
+        self.assertEqual(self.embedder.embedded, 0)
+
+    def test_edit_reembeds_only_changed_chunks(self):
+        text = _paragraphs("a", n=12)
+        path = self.write("a.md", text)
+        self.ingest()
+        total = self.mem.count("documents")
+
+        self.write("a.md", text + "\n\nOne more closing paragraph about something new.")
+        self.embedder.embedded = 0
+        stats = self.ingest()
+        self.assertEqual(stats["indexed"], 1)
+        self.assertLess(self.embedder.embedded, total / 2)
+        entry = self.mem._get_ingestor()._manifest[path]
+        self.assertEqual(self.mem.count("documents"), len(entry["chunks"]))
+
+    def test_chunking_settings_change_reindexes(self):
+        self.write("a.md", _paragraphs("a"))
+        self.ingest()
+        stats = self.mem._get_ingestor().ingest_directory(self.docs, chunk_size=60, chunk_overlap=8)
+        self.assertEqual(stats["indexed"], 1)
+
+
+class TestRemoval(_Base):
+    """Vectors follow files off disk."""
+
+    def test_deleted_file_vectors_removed(self):
+        self.write("a.md", _paragraphs("a"))
+        b = self.write("b.md", _paragraphs("b"))
+        self.ingest()
+        before = self.mem.count("documents")
+        os.remove(b)
+        stats = self.ingest()
+        self.assertEqual(stats["removed"], 1)
+        self.assertLess(self.mem.count("documents"), before)
+        self.assertEqual(self.mem.ids_where("documents", {"file_path": b}), [])
+        self.assertEqual(self.mem.count("documents"), self.mem._collections["documents"].count())
+
+    def test_other_folders_untouched(self):
+        other = os.path.join(self.tmp, "other")
+        os.makedirs(other)
+        with open(os.path.join(other, "keep.md"), "w") as f:
+            f.write(_paragraphs("keep"))
+        self.mem._get_ingestor().ingest_directory(other)
+        self.write("a.md", _paragraphs("a"))
+        stats = self.ingest()
+        self.assertEqual(stats["removed"], 0)
+        self.assertEqual(len(self.mem._get_ingestor().tracked_files()), 2)
+
+    def test_legacy_chunks_replaced(self):
+        path = self.write("a.md", _paragraphs("a"))
+        self.mem.upsert("documents", documents=["old chunk"], ids=["doc_legacy_0"],
+                        metadatas=[{"file_path": os.path.abspath(path), "type": "document"}])
+        self.ingest()
+        self.assertNotIn("doc_legacy_0", self.mem.ids_where("documents", {"file_path": os.path.abspath(path)}))
+
+    def test_clear_all_forgets_manifest(self):
+        self.write("a.md", _paragraphs("a"))
+        self.ingest()
+        self.mem.clear_all()
+        stats = self.ingest()
+        self.assertEqual(stats["indexed"], 1)
+        self.assertGreater(self.mem.count("documents"), 0)
+
+
+class TestToolEntryPoints(_Base):
+    """ingest_document() handles files and folders through the manifest."""
+
+    def test_reingest_same_file(self):
+        path = self.write("a.md", _paragraphs("a"))
+        first = self.mem.ingest_document(path)
+        self.assertIn("chunks", first["content"])
+        second = self.mem.ingest_document(path)
+        self.assertTrue(second["success"])
+        self.assertIn("already up to date", second["content"])
+
+    def test_folder_path(self):
+        self.write("a.md", _paragraphs("a"))
+        result = self.mem.ingest_document(self.docs)
+        self.assertTrue(result["success"])
+        self.assertIn("1 (re)indexed", result["content"])
+
+    def test_parallel_extraction(self):
+        for i in range(4):
+            self.write(f"f{i}.md", _paragraphs(f"f{i}"))
+        ingestor = self.mem._get_ingestor()
+        ingestor.max_workers = 2
+        with mock.patch.object(di, "ProcessPoolExecutor", wraps=di.ProcessPoolExecutor) as pool:
+            stats = self.ingest()
+        pool.assert_called_once()
+        self.assertEqual(stats["indexed"], 4)
+
+
+class TestReindexBenchmark(_Base):
+    """Benchmark: re-indexing a large folder costs what changed."""
+
+    def test_reindex_proportional_to_changes(self):
+        paths = [self.write(f"notes/n{i:03d}.md", _paragraphs(f"n{i}", n=4)) for i in range(120)]
+        start = time.perf_counter()
+        self.ingest()
+        full = time.perf_counter() - start
+
+        self.write("notes/n007.md", _paragraphs("edited", n=4))
+        os.remove(paths[42])
+        self.embedder.embedded = 0
+        start = time.perf_counter()
+        stats = self.ingest()
+        incremental = time.perf_counter() - start
+
+        self.assertEqual((stats["indexed"], stats["removed"], stats["unchanged"]), (1, 1, 118))
+        self.assertLessEqual(self.embedder.embedded, 4)
+        self.assertLess(incremental, full / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+"""
+╔══════════════════════════════════════════╗
+║    TARS — Test Suite: Error Tracker       ║
+╚══════════════════════════════════════════╝
+
+Tests the error tracker hot path: precompiled normalization,
+combined fix-hint matching (priority order preserved), running
+counters, write-behind persistence, and a 10k-error storm.
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import time
+import re
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from memory import error_tracker as et
+from memory.error_tracker import ErrorTracker, _FIX_HINT_PATTERNS
+
+
+def _sequential_hint(error):
+    """Reference implementation: search each pattern in list order."""
+    for pattern, hint_template, files in _FIX_HINT_PATTERNS:
+        m = re.search(pattern, error, re.IGNORECASE)
+        if m:
+            try:
+                hint = hint_template.format(*m.groups()) if m.groups() else hint_template
+            except (IndexError, KeyError):
+                hint = hint_template
+            return hint[:500], files
+    return "", []
+
+
+class TestMatching(unittest.TestCase):
+    """Normalization and hint matching are unchanged by precompilation."""
+
+    SAMPLES = [
+        "Unknown tool: deploy_magic_agent",
+        "KeyError: 'thread_id'",
+        "ModuleNotFoundError: No module named 'pyobjc'",
+        "HTTP 429 Too Many Requests — rate limit",
+        "Connection timed out after 30s",
+        "No such file or directory: /Users/abdullah/x.txt",
+        "osascript: execution error",
+        "Something nobody has a pattern for",
+        "❌ browser agent FAILED after 12 steps.\nReason: timeout on /tmp/page",
+    ]
+
+    def test_combined_matcher_matches_sequential(self):
+        for error in self.SAMPLES:
+            self.assertEqual(ErrorTracker._match_fix_hint(error), _sequential_hint(error), error)
+
+    def test_every_pattern_keeps_priority(self):
+        # A string hitting two patterns must resolve to the earlier one
+        for pattern, _, _ in _FIX_HINT_PATTERNS[:10]:
+            sample = re.sub(r"[\\()\[\]?*+|^$.]", "", pattern)[:40]
+            self.assertEqual(ErrorTracker._match_fix_hint(sample), _sequential_hint(sample))
+
+    def test_normalize_strips_variable_parts(self):
+        a = ErrorTracker._normalize("File /Users/a/one.py failed at 0xdeadbeef id 123456")
+        b = ErrorTracker._normalize("File /opt/b/two.py failed at 0xcafe id 987654")
+        self.assertEqual(a, b)
+        self.assertIn("<PATH>", a)
+
+    def test_normalize_strips_recovery_and_preamble(self):
+        sig = ErrorTracker._normalize(
+            "❌ browser agent FAILED after 3 steps.\nReason: page blank\n\n## Recovery: LEVEL 2")
+        self.assertEqual(sig, "page blank")
+
+
+class TestCounters(unittest.TestCase):
+    """Stats come from running counters, not a rescan."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.tracker = ErrorTracker(db_path=os.path.join(self.tmp, "tracker.json"))
+
+    def tearDown(self):
+        self.tracker.save()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_total_occurrences_tracks_records(self):
+        for i in range(7):
+            self.tracker.record_error("Connection refused", context="web")
+        self.tracker.record_error("Disk full", context="files")
+        stats = self.tracker.get_stats()
+        self.assertEqual(stats["total_occurrences"], 8)
+        self.assertEqual(stats["unique_errors"], 2)
+
+    def test_counter_survives_purge(self):
+        self.tracker.record_error("A real error", context="x")
+        self.tracker.record_error("test error", context="x")
+        self.tracker.purge_noise()
+        expected = sum(e.count for e in self.tracker._entries.values())
+        self.assertEqual(self.tracker.get_stats()["total_occurrences"], expected)
+
+    def test_counter_recomputed_on_load(self):
+        for _ in range(3):
+            self.tracker.record_error("Connection refused", context="web")
+        self.tracker.save()
+        reloaded = ErrorTracker(db_path=self.tracker._file)
+        self.assertEqual(reloaded.get_stats()["total_occurrences"], 3)
+
+
+class TestWriteBehind(unittest.TestCase):
+    """record_error() defers disk writes; save() flushes."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "tracker.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_record_does_not_write_synchronously(self):
+        tracker = ErrorTracker(db_path=self.path)
+        with mock.patch.object(tracker, "_write") as write:
+            for _ in range(50):
+                tracker.record_error("Connection refused", context="web")
+            write.assert_not_called()
+            tracker.save()
+            write.assert_called_once()
+
+    def test_timer_flushes_to_disk(self):
+        with mock.patch.object(et, "FLUSH_DELAY", 0.05):
+            tracker = ErrorTracker(db_path=self.path)
+            tracker.record_error("Connection refused", context="web")
+            deadline = time.time() + 2.0
+            while not os.path.exists(self.path) and time.time() < deadline:
+                time.sleep(0.02)
+        with open(self.path) as f:
+            data = json.load(f)
+        self.assertEqual(len(data), 1)
+
+    def test_stale_flush_does_not_overwrite_newer_save(self):
+        tracker = ErrorTracker(db_path=self.path)
+        tracker.record_error("Connection refused", context="web")
+        with tracker._lock:                 # What the timer does before releasing the lock
+            stale, generation = tracker._snapshot(), tracker._generation
+        tracker.record_error("KeyError: 'name'", context="parse")
+        tracker.save()
+        tracker._write(stale, generation)
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_failed_write_stays_dirty_and_retries(self):
+        blocker = os.path.join(self.tmp, "not_a_dir")
+        open(blocker, "w").close()
+        tracker = ErrorTracker(db_path=os.path.join(blocker, "tracker.json"))
+        tracker.record_error("Connection refused", context="web")
+        tracker._flush_timer.cancel()
+        tracker._flush()
+        self.assertTrue(tracker._dirty)
+        self.assertIsNotNone(tracker._flush_timer)
+        tracker._flush_timer.cancel()
+
+    def test_save_persists_and_prunes(self):
+        tracker = ErrorTracker(db_path=self.path)
+        for i in range(et.MAX_ENTRIES + 20):
+            tracker.record_error(f"distinct failure kind {chr(65 + i % 26)}{i}", context=f"c{i}")
+        tracker.save()
+        with open(self.path) as f:
+            self.assertEqual(len(json.load(f)), et.MAX_ENTRIES)
+        self.assertEqual(tracker.get_stats()["total_occurrences"], et.MAX_ENTRIES)
+
+
+class TestErrorStorm(unittest.TestCase):
+    """Benchmark: a crash-loop storm of 10k errors stays cheap."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.tracker = ErrorTracker(db_path=os.path.join(self.tmp, "tracker.json"))
+
+    def tearDown(self):
+        self.tracker.save()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_10k_storm(self):
+        templates = [
+            "Connection timed out after {n} ms on /tmp/page{n}.html",
+            "KeyError: 'field_{k}'",
+            "Unknown tool: tool_{k}",
+            "Element not found at 0x{n:x}",
+            "Something unexpected happened in step {k}",
+        ]
+        with mock.patch.object(self.tracker, "_write") as write:
+            start = time.perf_counter()
+            for i in range(10_000):
+                error = templates[i % len(templates)].format(n=1000 + i, k=i % 7)
+                self.tracker.record_error(error, context="storm", tool="browser")
+            elapsed = time.perf_counter() - start
+            write.assert_not_called()
+        self.assertEqual(self.tracker.get_stats()["total_occurrences"], 10_000)
+        self.assertLess(len(self.tracker._entries), 40)
+        self.assertLess(elapsed, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
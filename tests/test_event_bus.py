@@ -4,7 +4,7 @@
 ╚══════════════════════════════════════════╝
 
 Tests event emission, sync subscribers, stats tracking,
-history bounded deque, and thread safety.
+history bounded deque, thread safety, and stream delta coalescing.
 """
 
 import unittest
@@ -14,7 +14,7 @@ import sys
 import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from utils.event_bus import EventBus
+from utils.event_bus import EventBus, StreamCoalescer
 
 
 class TestEventEmission(unittest.TestCase):
@@ -185,5 +185,106 @@ class TestThreadSafety(unittest.TestCase):
         self.assertEqual(errors, [])
 
 
+
+class FakeClock:
+    """Deterministic clock for coalescer tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def mock_stream(text, chunk=4, interval=0.01, tool_call_at=None):
+    """Mock streaming provider: yields (delay, kind, payload) like LLM deltas."""
+    pieces = [text[i:i + chunk] for i in range(0, len(text), chunk)]
+    for i, piece in enumerate(pieces):
+        if tool_call_at is not None and i == tool_call_at:
+            yield 0.0, "tool_call", None
+        yield interval, "delta", piece
+
+
+class TestStreamCoalescer(unittest.TestCase):
+    """Test batching of streamed thinking deltas."""
+
+    def setUp(self):
+        self.bus = EventBus(max_history=10000)
+        self.clock = FakeClock()
+        self.events = []
+        self.bus.subscribe_sync("thinking", lambda d: self.events.append((self.clock.now, d)))
+
+    def _replay(self, coalescer, stream):
+        arrivals = []
+        for delay, kind, payload in stream:
+            self.clock.now += delay
+            if kind == "delta":
+                arrivals.append(self.clock.now)
+                coalescer.add(payload)
+            else:
+                coalescer.flush("tool_call")
+        return arrivals, coalescer.close()
+
+    def test_event_rate_reduced_and_text_preserved(self):
+        text = "The quick brown fox jumps over the lazy dog. " * 40
+        c = StreamCoalescer(self.bus, "thinking", {"model": "m"}, min_window=0.05, clock=self.clock)
+        _, stats = self._replay(c, mock_stream(text, chunk=4, interval=0.01))
+        self.assertEqual("".join(d["text"] for _, d in self.events), text)
+        self.assertEqual(stats["deltas"], len(text) // 4 + (1 if len(text) % 4 else 0))
+        # ~5 deltas per 50ms window → at least a 4x reduction
+        self.assertLess(stats["events"] * 4, stats["deltas"])
+        self.assertEqual(self.events[0][1]["model"], "m")
+
+    def test_display_latency_bounded_by_window(self):
+        c = StreamCoalescer(self.bus, "thinking", min_window=0.05, clock=self.clock)
+        _, stats = self._replay(c, mock_stream("x" * 400, chunk=2, interval=0.01))
+        # Flushes are checked on delta arrival: bound is window + one interval
+        self.assertLessEqual(stats["max_latency"], 0.05 + 0.01 + 1e-9)
+
+    def test_size_threshold_flushes(self):
+        c = StreamCoalescer(self.bus, "thinking", min_window=10.0, max_chars=100, clock=self.clock)
+        self._replay(c, mock_stream("y" * 1000, chunk=10, interval=0.0))
+        self.assertEqual(len(self.events), 10)
+        self.assertEqual(c.stats["flush_reasons"]["size"], 10)
+
+    def test_tool_call_boundary_flushes(self):
+        c = StreamCoalescer(self.bus, "thinking", min_window=10.0, clock=self.clock)
+        self._replay(c, mock_stream("abcdefgh" * 4, chunk=4, interval=0.0, tool_call_at=3))
+        self.assertEqual(self.events[0][1]["text"], "abcdefghabcd")
+        self.assertEqual(c.stats["flush_reasons"], {"tool_call": 1, "end": 1})
+
+    def test_end_flushes_tail(self):
+        c = StreamCoalescer(self.bus, "thinking", min_window=10.0, clock=self.clock)
+        c.add("partial")
+        self.assertEqual(self.events, [])
+        c.close()
+        self.assertEqual(self.events[0][1]["text"], "partial")
+
+    def test_window_widens_under_backpressure(self):
+        class SlowBus(EventBus):
+            pending_sends = 100
+
+        bus = SlowBus()
+        c = StreamCoalescer(bus, "thinking", min_window=0.05, max_window=0.4, clock=self.clock)
+        for _ in range(5):
+            c.add("z")
+            c.flush()
+        self.assertEqual(c.window, 0.4)
+
+    def test_window_relaxes_when_drained(self):
+        c = StreamCoalescer(self.bus, "thinking", min_window=0.05, max_window=0.4, clock=self.clock)
+        c.window = 0.4
+        for _ in range(20):
+            c.add("z")
+            c.flush()
+        self.assertAlmostEqual(c.window, 0.05)
+
+    def test_empty_delta_ignored(self):
+        c = StreamCoalescer(self.bus, "thinking", clock=self.clock)
+        c.add("")
+        c.close()
+        self.assertEqual(self.events, [])
+
+
 if __name__ == "__main__":
     unittest.main()
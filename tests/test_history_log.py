@@ -0,0 +1,179 @@
+"""
+╔══════════════════════════════════════════╗
+║     TARS — Test Suite: History Log        ║
+╚══════════════════════════════════════════╝
+
+Tests the indexed action history log: backward-seek tail reads,
+sparse timestamp index and range queries, compressed rotation,
+index recovery, and tail cost independent of file size.
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import glob
+import time
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from memory.history_log import HistoryLog
+
+BASE = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def _entry(i, pad=0):
+    return {"ts": (BASE + timedelta(seconds=i)).isoformat(), "action": f"action_{i}",
+            "input": "x" * pad, "result": "ok", "success": i % 3 != 0}
+
+
+class _Base(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "history.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def fill(self, log, n, pad=0):
+        for i in range(n):
+            log.append(_entry(i, pad))
+
+
+class TestTail(_Base):
+    """tail() matches the last lines of the file."""
+
+    def test_tail_matches_readlines(self):
+        log = HistoryLog(self.path, index_interval=512)
+        self.fill(log, 500, pad=40)
+        with open(self.path) as f:
+            expected = [json.loads(l)["action"] for l in f.readlines()[-25:]]
+        self.assertEqual([e["action"] for e in log.tail(25)], expected)
+
+    def test_tail_more_than_available(self):
+        log = HistoryLog(self.path)
+        self.fill(log, 3)
+        self.assertEqual(len(log.tail(10)), 3)
+
+    def test_tail_missing_file(self):
+        self.assertEqual(HistoryLog(self.path).tail(5), [])
+
+    def test_tail_skips_corrupt_lines(self):
+        log = HistoryLog(self.path)
+        self.fill(log, 3)
+        with open(self.path, "a") as f:
+            f.write("not json\n")
+        log.append(_entry(99))
+        self.assertEqual(log.tail(2)[-1]["action"], "action_99")
+
+    def test_tail_cost_independent_of_size(self):
+        small = HistoryLog(self.path)
+        self.fill(small, 20, pad=200)
+        big_path = os.path.join(self.tmp, "big.jsonl")
+        line = json.dumps(_entry(0, pad=200)) + "\n"
+        with open(big_path, "w") as f:
+            f.write(line * 40000)  # ~10MB
+        big = HistoryLog(big_path)
+
+        def best(log):
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                log.tail(10)
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        self.assertLess(best(big), best(small) * 5 + 0.002)
+
+
+class TestIndex(_Base):
+    """Sparse index drives range queries and survives restarts."""
+
+    def test_range_query(self):
+        log = HistoryLog(self.path, index_interval=1024)
+        self.fill(log, 1000, pad=50)
+        self.assertGreater(len(log._index), 10)
+        start, end = _entry(400)["ts"], _entry(409)["ts"]
+        got = [e["action"] for e in log.between(start, end)]
+        self.assertEqual(got, [f"action_{i}" for i in range(400, 410)])
+
+    def test_open_ended_ranges(self):
+        log = HistoryLog(self.path, index_interval=256)
+        self.fill(log, 50)
+        self.assertEqual(len(log.between(start=_entry(45)["ts"])), 5)
+        self.assertEqual(len(log.between(end=_entry(4)["ts"])), 5)
+
+    def test_index_persisted_and_reused(self):
+        log = HistoryLog(self.path, index_interval=512)
+        self.fill(log, 300, pad=20)
+        reopened = HistoryLog(self.path, index_interval=512)
+        self.assertEqual(reopened._index, log._index)
+
+    def test_index_rebuilt_when_stale(self):
+        log = HistoryLog(self.path, index_interval=512)
+        self.fill(log, 300, pad=20)
+        # History cleared and rewritten outside the log
+        with open(self.path, "w") as f:
+            for i in range(1000, 1100):
+                f.write(json.dumps(_entry(i, pad=20)) + "\n")
+        reopened = HistoryLog(self.path, index_interval=512)
+        got = reopened.between(_entry(1050)["ts"], _entry(1052)["ts"])
+        self.assertEqual([e["action"] for e in got], ["action_1050", "action_1051", "action_1052"])
+
+
+class TestRotation(_Base):
+    """Rotated segments are compressed and still queryable."""
+
+    def test_rotation_compresses_segments(self):
+        log = HistoryLog(self.path, max_bytes=20_000, index_interval=1024)
+        self.fill(log, 400, pad=100)
+        deadline = time.time() + 5
+        while glob.glob(self.path + ".[0-9]*[0-9]") and time.time() < deadline:
+            time.sleep(0.02)  # Background compression
+        segments = glob.glob(self.path + ".*.gz")
+        self.assertGreaterEqual(len(segments), 1)
+        self.assertLess(os.path.getsize(self.path), 25_000)
+
+        everything = log.between()
+        self.assertEqual([e["action"] for e in everything], [f"action_{i}" for i in range(400)])
+        self.assertEqual(log.tail(1)[0]["action"], "action_399")
+
+
+class TestMemoryManagerIntegration(_Base):
+    """MemoryManager reads recent history via tail()."""
+
+    def test_recent_history_uses_tail(self):
+        from memory.memory_manager import MemoryManager
+        config = {"memory": {
+            "context_file": os.path.join("memory", "context.md"),
+            "preferences_file": os.path.join("memory", "preferences.md"),
+            "history_file": os.path.join("memory", "history.jsonl"),
+            "projects_dir": os.path.join("memory", "projects"),
+            "max_history_context": 50,
+        }}
+        mm = MemoryManager(config, self.tmp)
+        for i in range(30):
+            mm.log_action(f"act_{i}", f"in_{i}", {"success": True})
+        real_open = open
+        import builtins
+
+        def no_readlines(path, *args, **kwargs):
+            f = real_open(path, *args, **kwargs)
+            if path == mm.history_file:
+                f.readlines = None
+            return f
+
+        builtins.open = no_readlines
+        try:
+            recent = mm._get_recent_history(3)
+        finally:
+            builtins.open = real_open
+        self.assertEqual(recent.count("\n"), 2)
+        self.assertIn("act_29", recent)
+        self.assertEqual(len(mm.get_history_range()), 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -160,6 +160,69 @@ class TestMemoryFileCap(unittest.TestCase):
         self.assertNotIn("bigkey_0", prefs)
 
 
+class TestRecallMany(unittest.TestCase):
+    """Test batched multi-query recall."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.mm = MemoryManager(_make_config(self.tmp), self.tmp)
+        self.mm.semantic = None  # Keyword path only
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_matches_any_query(self):
+        self.mm.save("preference", "editor", "vscode")
+        self.mm.save("project", "tars", "Autonomous Mac agent")
+        result = self.mm.recall_many(["editor", "autonomous agent"])
+        self.assertIn("vscode", result["content"])
+        self.assertIn("Project: tars.md", result["content"])
+
+    def test_results_deduplicated_across_queries(self):
+        self.mm.save("preference", "editor", "vscode dark theme")
+        result = self.mm.recall_many(["editor", "vscode", "dark theme"])
+        self.assertEqual(result["content"].count("[Preferences]"), 1)
+
+    def test_shared_result_budget(self):
+        for i in range(30):
+            self.mm.log_action("deploy", f"website build {i}", {"success": True})
+        result = self.mm.recall_many(["website", "deploy"], max_results=3)
+        self.assertEqual(result["content"].count("[History]"), 3)
+
+    def test_multi_hit_ranked_first(self):
+        self.mm.save("preference", "airline", "prefers Delta")
+        self.mm.save("learned", "flight_search", "Delta flights via Google Flights")
+        result = self.mm.recall_many(["delta", "flights"])
+        self.assertTrue(result["content"].startswith("[Learned]"))
+
+    def test_history_read_once(self):
+        self.mm.log_action("deploy", "website", {"success": True})
+        real_open = open
+        opened = []
+
+        def counting_open(path, *args, **kwargs):
+            if path == self.mm.history_file:
+                opened.append(path)
+            return real_open(path, *args, **kwargs)
+
+        import builtins
+        builtins.open = counting_open
+        try:
+            self.mm.recall_many(["website", "deploy", "something else", "more"])
+        finally:
+            builtins.open = real_open
+        self.assertEqual(len(opened), 1)
+
+    def test_no_matches(self):
+        result = self.mm.recall_many(["zzqxj nothing"])
+        self.assertTrue(result["success"])
+        self.assertIn("No memories found", result["content"])
+
+    def test_short_queries_ignored(self):
+        result = self.mm.recall_many(["", "a"])
+        self.assertIn("No memories found", result["content"])
+
+
 class TestHistoryLog(unittest.TestCase):
     """Test action history logging and rotation."""
 
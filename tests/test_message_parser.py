@@ -0,0 +1,161 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Message Coalescer    ║
+╚══════════════════════════════════════════╝
+
+Tests the MessageStreamParser coalescing engine with an injected
+clock: deadline handling, adaptive merge windows, max batch age,
+immediate acknowledgments, and the single long-lived worker.
+"""
+
+import unittest
+import threading
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.message_parser import MessageStreamParser
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class _Base(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.batches = []
+        self.parser = MessageStreamParser(
+            on_batch_ready=self.batches.append, clock=self.clock, start_worker=False)
+
+    def at(self, seconds):
+        """Advance the clock and let the parser act."""
+        self.clock.advance(seconds)
+        self.parser.poll()
+
+
+class TestDeadlines(_Base):
+    """Batches are emitted exactly when their deadline passes."""
+
+    def test_single_message_default_window(self):
+        self.parser.ingest("search flights to Tokyo next month")
+        self.at(self.parser.MERGE_WINDOW - 0.1)
+        self.assertEqual(self.batches, [])
+        self.at(0.1)
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(self.batches[0].batch_type, "single")
+
+    def test_burst_merges_into_one_batch(self):
+        self.parser.ingest("search flights to NYC")
+        self.at(1.0)
+        self.parser.ingest("actually make it Tokyo")
+        self.at(1.0)
+        self.parser.ingest("also book a hotel")
+        self.at(self.parser.MAX_MERGE_WINDOW)
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0].messages), 3)
+        self.assertIn("tokyo", self.batches[0].merged_text.lower())
+
+    def test_each_message_pushes_deadline(self):
+        self.parser.ingest("search flights to NYC")
+        for _ in range(3):
+            self.at(self.parser.MERGE_WINDOW - 0.5)
+            self.parser.ingest("also check hotels nearby")
+        self.assertEqual(self.batches, [])
+
+    def test_max_batch_age_caps_stream(self):
+        emitted_at = []
+        self.parser._on_batch_ready = lambda b: emitted_at.append(self.clock())
+        start = self.clock()
+        self.parser.ingest("start of a long stream and")
+        for _ in range(20):
+            self.at(1.0)
+            self.parser.ingest("more details and")
+        self.assertGreaterEqual(len(emitted_at), 1)
+        self.assertLessEqual(emitted_at[0] - start, self.parser.MAX_BATCH_AGE)
+
+    def test_acknowledgment_is_immediate(self):
+        self.parser.ingest("ok")
+        self.parser.poll()
+        self.assertEqual(len(self.batches), 1)
+
+    def test_force_flush(self):
+        self.parser.ingest("search flights to NYC")
+        self.parser.force_flush()
+        self.assertEqual(len(self.batches), 1)
+        self.at(10)
+        self.assertEqual(len(self.batches), 1)
+
+
+class TestAdaptiveWindow(_Base):
+    """Window shrinks for complete sentences and stretches for fragments."""
+
+    def test_complete_sentence_emits_early(self):
+        self.parser.ingest("Please research the best laptops under $1000.")
+        self.at(self.parser.MIN_MERGE_WINDOW)
+        self.assertEqual(len(self.batches), 1)
+
+    def test_fragment_waits_longer(self):
+        self.parser.ingest("book me a flight to")
+        self.at(self.parser.MERGE_WINDOW + 0.5)
+        self.assertEqual(self.batches, [])
+        self.parser.ingest("Tokyo on Friday")
+        self.at(self.parser.MERGE_WINDOW)
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0].messages), 2)
+
+    def test_window_classification(self):
+        from brain.message_parser import ParsedMessage
+        w = lambda text, intent="new": self.parser._merge_window(ParsedMessage(text, 0, intent))
+        self.assertEqual(w("Send the report to Sarah now."), self.parser.MIN_MERGE_WINDOW)
+        self.assertEqual(w("check the logs and"), self.parser.MAX_MERGE_WINDOW)
+        self.assertEqual(w("hmm,"), self.parser.MAX_MERGE_WINDOW)
+        self.assertEqual(w("search flights to NYC"), self.parser.MERGE_WINDOW)
+
+
+class TestWorker(unittest.TestCase):
+    """A single long-lived worker replaces per-message timers/threads."""
+
+    def test_burst_uses_one_thread(self):
+        batches = []
+        done = threading.Event()
+        parser = MessageStreamParser(on_batch_ready=lambda b: (batches.append(b), done.set()))
+        parser.MERGE_WINDOW = parser.MIN_MERGE_WINDOW = parser.MAX_MERGE_WINDOW = 0.05
+        before = threading.active_count()
+        for i in range(50):
+            parser.ingest(f"message number {i} about the trip")
+        self.assertLessEqual(threading.active_count(), before + 1)
+        self.assertTrue(done.wait(2.0))
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0].messages), 50)
+        parser.close()
+        self.assertFalse(parser._worker.is_alive())
+
+    def test_callback_error_does_not_kill_worker(self):
+        seen = []
+        ready = threading.Event()
+
+        def callback(batch):
+            seen.append(batch)
+            if len(seen) == 1:
+                raise RuntimeError("boom")
+            ready.set()
+
+        parser = MessageStreamParser(on_batch_ready=callback)
+        parser.ingest("ok")
+        time.sleep(0.05)
+        parser.ingest("thanks")
+        self.assertTrue(ready.wait(2.0))
+        parser.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Loop Detection       ║
+╚══════════════════════════════════════════╝
+
+Tests the incremental loop detector in MetaCognitionMonitor on
+replayed synthetic tool traces: exact repeats, near-duplicate
+arguments, periodic cycles, window expiry, false-positive rate
+on healthy traces, and per-record overhead.
+"""
+
+import unittest
+import random
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.metacognition import MetaCognitionMonitor, LoopDetector
+
+
+def replay(trace):
+    """Feed (tool, input) pairs to a fresh monitor; return the final state."""
+    mc = MetaCognitionMonitor()
+    for name, inp in trace:
+        mc.record_tool_call(name, inp, True, 0.1)
+    return mc.analyze()
+
+
+def healthy_trace(rng, length=12):
+    """A plausible productive task: diverse tools, distinct arguments."""
+    topics = ["tokyo flights", "hotel prices shinjuku", "jr pass cost", "weather april",
+              "visa rules", "sim card options", "airport transfer", "museum tickets",
+              "ramen guide", "currency rates", "travel insurance", "onsen day trips"]
+    rng.shuffle(topics)
+    trace = []
+    for i in range(length):
+        kind = i % 4
+        if kind == 0:
+            trace.append(("web_search", {"query": topics[i % len(topics)]}))
+        elif kind == 1:
+            trace.append(("deploy_research_agent", {"task": f"Compare {topics[i % len(topics)]}"}))
+        elif kind == 2:
+            trace.append(("think", {"thought": f"step {i}"}))
+        else:
+            trace.append(("quick_read_file", {"path": f"/tmp/notes_{i}.md"}))
+    return trace
+
+
+class TestSignals(unittest.TestCase):
+    """Each loop shape is caught and labelled."""
+
+    def test_exact_repeat(self):
+        state = replay([("web_search", {"query": "same thing"})] * 3)
+        self.assertTrue(state.is_looping)
+        self.assertEqual(state.loop_kind, "exact")
+
+    def test_near_duplicate_args(self):
+        trace = [
+            ("web_search", {"query": "Flights NYC March 3"}),
+            ("web_search", {"query": "flights nyc, march 4"}),
+            ("web_search", {"query": "NYC flights March 5"}),
+            ("web_search", {"query": "flights  NYC march 6!"}),
+        ]
+        state = replay(trace)
+        self.assertTrue(state.is_looping)
+        self.assertEqual(state.loop_kind, "near_duplicate")
+
+    def test_two_step_cycle(self):
+        a = ("deploy_browser_agent", {"task": "Log into the portal"})
+        b = ("verify_result", {"type": "browser", "check": "logged in"})
+        state = replay([a, b, a, b])
+        self.assertTrue(state.is_looping)
+        self.assertEqual(state.loop_kind, "cycle")
+        self.assertIn("→", state.loop_tool)
+
+    def test_three_step_cycle(self):
+        a = ("web_search", {"query": "x"})
+        b = ("quick_read_file", {"path": "/tmp/a"})
+        c = ("run_quick_command", {"command": "ls"})
+        state = replay([a, b, c, a, b, c])
+        self.assertEqual(state.loop_kind, "cycle")
+
+    def test_name_rut(self):
+        trace = [("send_imessage", {"message": f"update {w}"})
+                 for w in ("alpha", "bravo", "charlie", "delta")]
+        state = replay(trace)
+        self.assertTrue(state.is_looping)
+        self.assertEqual(state.loop_kind, "name")
+
+    def test_think_is_never_a_name_loop(self):
+        trace = [("think", {"thought": f"idea {w}"}) for w in "abcdefgh"]
+        self.assertFalse(replay(trace).is_looping)
+
+    def test_loop_expires_with_window(self):
+        mc = MetaCognitionMonitor()
+        for _ in range(3):
+            mc.record_tool_call("web_search", {"query": "same"}, True)
+        self.assertTrue(mc.analyze().is_looping)
+        for i in range(mc.LOOP_WINDOW):
+            mc.record_tool_call(f"tool_{i}", {"n": i}, True)
+        self.assertFalse(mc.analyze().is_looping)
+
+    def test_reset_clears_detector(self):
+        mc = MetaCognitionMonitor()
+        for _ in range(3):
+            mc.record_tool_call("web_search", {"query": "same"}, True)
+        mc.reset()
+        mc.record_tool_call("web_search", {"query": "same"}, True)
+        self.assertFalse(mc.analyze().is_looping)
+
+
+class TestTraceAccuracy(unittest.TestCase):
+    """Replay many synthetic traces: high recall, no false positives."""
+
+    def setUp(self):
+        self.rng = random.Random(42)
+
+    def test_no_false_positives_on_healthy_traces(self):
+        flagged = sum(replay(healthy_trace(self.rng)).is_looping for _ in range(200))
+        self.assertEqual(flagged, 0)
+
+    def test_injected_loops_are_caught(self):
+        caught = 0
+        for i in range(200):
+            trace = healthy_trace(self.rng, length=6)
+            shape = i % 3
+            if shape == 0:
+                trace += [("deploy_browser_agent", {"task": "Click the Submit button"})] * 3
+            elif shape == 1:
+                trace += [("web_search", {"query": f"best laptop {2020 + n}"}) for n in range(4)]
+            else:
+                a = ("run_quick_command", {"command": "git push"})
+                b = ("quick_read_file", {"path": "/tmp/err.log"})
+                trace += [a, b, a, b]
+            caught += replay(trace).is_looping
+        self.assertEqual(caught, 200)
+
+
+class TestOverhead(unittest.TestCase):
+    """Per-record cost is constant in window size."""
+
+    def _time_pushes(self, window, n=20000):
+        det = LoopDetector(window=window)
+        rng = random.Random(1)
+        items = [(f"tool_{rng.randrange(20)}", rng.randrange(50), rng.randrange(40)) for _ in range(n)]
+        start = time.perf_counter()
+        for name, exact, norm in items:
+            det.push(name, exact, norm)
+        return time.perf_counter() - start
+
+    def test_constant_per_record(self):
+        small = min(self._time_pushes(10) for _ in range(3))
+        large = min(self._time_pushes(1000) for _ in range(3))
+        self.assertLess(large, small * 3)
+
+    def test_monitor_record_and_analyze_fast(self):
+        mc = MetaCognitionMonitor()
+        trace = healthy_trace(random.Random(7), length=5000)
+        start = time.perf_counter()
+        for name, inp in trace:
+            mc.record_tool_call(name, inp, True)
+            mc.analyze()
+        self.assertLess((time.perf_counter() - start) / len(trace), 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+╔══════════════════════════════════════════╗
+║  TARS — Test Suite: Notification Outbox   ║
+╚══════════════════════════════════════════╝
+
+Tests the background notification sender: non-blocking posts,
+FIFO ordering, per-phone rate limiting, coalescing of progress
+updates, queue caps, and throughput with an in-memory sink.
+"""
+
+import unittest
+import threading
+import time
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.notify_outbox import NotificationOutbox, MemorySink
+import agents.base_agent as base_agent_module
+
+
+class _Gate:
+    """Sink that blocks until released, so messages pile up behind it."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.entered = threading.Event()
+        self.inner = MemorySink()
+
+    def __call__(self, phone, message):
+        self.entered.set()
+        self.release.wait(5)
+        self.inner(phone, message)
+
+
+class TestOrdering(unittest.TestCase):
+
+    def test_fifo_across_keys(self):
+        sink = MemorySink()
+        box = NotificationOutbox(sink=sink, min_interval=0)
+        for i in range(20):
+            box.post("+1", f"m{i}", key=f"agent{i % 3}")
+        self.assertTrue(box.flush(timeout=2))
+        self.assertEqual(sink.messages(), [f"m{i}" for i in range(20)])
+
+    def test_post_does_not_wait_for_sink(self):
+        box = NotificationOutbox(sink=MemorySink(delay=0.2), min_interval=0)
+        start = time.perf_counter()
+        for i in range(10):
+            box.post("+1", f"m{i}")
+        self.assertLess(time.perf_counter() - start, 0.05)
+        box.close(timeout=0)
+
+    def test_empty_phone_is_ignored(self):
+        box = NotificationOutbox(sink=MemorySink())
+        box.post("", "hi")
+        self.assertEqual(box.stats()["posted"], 0)
+
+
+class TestCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.gate = _Gate()
+        self.box = NotificationOutbox(sink=self.gate, min_interval=0)
+        self.box.post("+1", "blocker")
+        self.assertTrue(self.gate.entered.wait(2))
+
+    def tearDown(self):
+        self.gate.release.set()
+        self.box.close(timeout=2)
+
+    def _drain(self):
+        self.gate.release.set()
+        self.assertTrue(self.box.flush(timeout=2))
+        return self.gate.inner.messages()[1:]
+
+    def test_only_latest_progress_per_agent(self):
+        for step in range(1, 6):
+            self.box.post("+1", f"A step {step}", key="A", progress=True)
+            self.box.post("+1", f"B step {step}", key="B", progress=True)
+        self.assertEqual(self._drain(), ["A step 5", "B step 5"])
+        self.assertEqual(self.box.stats()["coalesced"], 8)
+
+    def test_final_messages_are_never_coalesced(self):
+        self.box.post("+1", "A step 3", key="A", progress=True)
+        self.box.post("+1", "A done", key="A")
+        self.box.post("+1", "A step 4", key="A", progress=True)
+        self.box.post("+1", "A step 5", key="A", progress=True)
+        self.assertEqual(self._drain(), ["A step 3", "A done", "A step 5"])
+
+    def test_cap_drops_progress_not_finals(self):
+        self.box.max_pending = 3
+        self.box.post("+1", "done 1", key="X")
+        for k in "ABCD":
+            self.box.post("+1", f"{k} progress", key=k, progress=True)
+        self.box.post("+1", "done 2", key="Y")
+        self.assertEqual(self._drain(), ["done 1", "D progress", "done 2"])
+        self.assertEqual(self.box.stats()["dropped"], 3)
+
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_min_interval_per_phone(self):
+        sink = MemorySink()
+        box = NotificationOutbox(sink=sink, min_interval=0.05)
+        for i in range(4):
+            box.post("+1", f"a{i}")
+        box.post("+2", "b0")
+        self.assertTrue(box.flush(timeout=2))
+        times = [t for p, _, t in sink.sent if p == "+1"]
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        self.assertTrue(all(g >= 0.045 for g in gaps), gaps)
+
+    def test_progress_coalesces_while_rate_limited(self):
+        sink = MemorySink()
+        box = NotificationOutbox(sink=sink, min_interval=0.2)
+        box.post("+1", "first")
+        time.sleep(0.05)
+        for step in range(10):
+            box.post("+1", f"step {step}", key="A", progress=True)
+        self.assertTrue(box.flush(timeout=2))
+        self.assertEqual(sink.messages(), ["first", "step 9"])
+
+    def test_sink_errors_are_counted_not_raised(self):
+        def broken(phone, message):
+            raise OSError("osascript missing")
+        box = NotificationOutbox(sink=broken, min_interval=0)
+        box.post("+1", "x")
+        self.assertTrue(box.flush(timeout=2))
+        self.assertEqual(box.stats()["failed"], 1)
+
+
+class TestThroughput(unittest.TestCase):
+    """Benchmark: many agents posting concurrently never block on delivery."""
+
+    def test_many_agents(self):
+        sink = MemorySink(delay=0.001)
+        box = NotificationOutbox(sink=sink, min_interval=0)
+        post_times = []
+        lock = threading.Lock()
+
+        def agent(n):
+            for step in range(50):
+                start = time.perf_counter()
+                box.post("+1", f"{n}:{step}", key=str(n), progress=True)
+                with lock:
+                    post_times.append(time.perf_counter() - start)
+            box.post("+1", f"{n}:done", key=str(n))
+
+        threads = [threading.Thread(target=agent, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(box.flush(timeout=5))
+        sent = sink.messages()
+        self.assertLess(max(post_times), 0.05)
+        for n in range(8):
+            mine = [m for m in sent if m.startswith(f"{n}:")]
+            self.assertEqual(mine[-1], f"{n}:done")
+            steps = [int(m.split(":")[1]) for m in mine[:-1]]
+            self.assertEqual(steps, sorted(steps))
+        stats = box.stats()
+        self.assertEqual(stats["sent"] + stats["coalesced"], stats["posted"])
+
+
+class TestAgentNotify(unittest.TestCase):
+    """BaseAgent progress goes through the outbox, keyed per agent."""
+
+    def test_agent_uses_outbox(self):
+        sink = MemorySink()
+        box = NotificationOutbox(sink=sink, min_interval=0)
+        with mock.patch.object(base_agent_module, "outbox", box):
+            base_agent_module._send_progress("+1", "hello", key="a", progress=True)
+            base_agent_module._send_progress(None, "nobody")
+            box.flush(timeout=2)
+        self.assertEqual(sink.sent[0][:2], ("+1", "hello"))
+        self.assertEqual(len(sink.sent), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
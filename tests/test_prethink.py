@@ -0,0 +1,207 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Pre-think Stages     ║
+╚══════════════════════════════════════════╝
+
+Tests the concurrent pre-think pipeline in TARSBrain.process():
+stage events, speculative decomposition, error isolation, and a
+time-to-first-action benchmark against a mock LLM provider.
+"""
+
+import unittest
+import tempfile
+import shutil
+import time
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.llm_client import ContentBlock, LLMResponse, Usage
+from brain.threads import ThreadManager
+from brain.decision_cache import DecisionCache
+from brain.tools import TARS_TOOLS
+from utils.event_bus import event_bus
+
+
+class _MockStream:
+    """Anthropic-like stream context manager returning a final text reply."""
+
+    def __init__(self, text):
+        self._text = text
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __iter__(self):
+        return iter([])
+
+    def get_final_message(self):
+        return LLMResponse(
+            content=[ContentBlock("text", text=self._text)],
+            stop_reason="end_turn",
+            usage=Usage(input_tokens=10, output_tokens=5),
+        )
+
+
+class MockLLMClient:
+    """Stands in for LLMClient; records when the first LLM call starts."""
+
+    first_call_at = None
+
+    def __init__(self, provider, api_key, **kwargs):
+        self.provider = provider
+
+    def stream(self, model, max_tokens, system, tools, messages, temperature=None):
+        if MockLLMClient.first_call_at is None:
+            MockLLMClient.first_call_at = time.time()
+        return _MockStream("All done — the report has been generated and sent to you.")
+
+
+class SlowMemory:
+    """Memory manager stub whose recall() costs a fixed latency per query."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.recall_calls = 0
+
+    def recall(self, query):
+        self.recall_calls += 1
+        time.sleep(self.delay)
+        return {"success": True, "content": f"Remembered something useful about {query}"}
+
+    def get_context_summary(self):
+        return ""
+
+    def get_active_project(self):
+        return "None"
+
+
+class StubExecutor:
+    max_deployments = 15
+
+    def execute(self, name, inp):
+        return {"success": True, "content": "ok"}
+
+
+def _make_brain(tmp, recall_delay=0.0):
+    from brain.planner import TARSBrain
+    config = {
+        "llm": {"provider": "mock", "api_key": "x", "heavy_model": "mock-model"},
+        "safety": {"max_retries": 3},
+        "agent": {"humor_level": 50},
+    }
+    with mock.patch("brain.planner.LLMClient", MockLLMClient):
+        brain = TARSBrain(config, StubExecutor(), SlowMemory(recall_delay))
+    brain.threads = ThreadManager(persistence_dir=os.path.join(tmp, "threads"))
+    brain.decision_cache = DecisionCache(base_dir=tmp)
+    brain._session_state_path = os.path.join(tmp, "session_state.json")
+    return brain
+
+
+TASK_TEXT = ("Search for the best flights to Tokyo next month, then compile "
+             "a report comparing prices and email it to me")
+
+
+class TestPrethinkStages(unittest.TestCase):
+    """Stage events and result wiring."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.brain = _make_brain(self.tmp)
+        self.events = []
+        self._cb = lambda data: self.events.append(data)
+        event_bus.subscribe_sync("prethink_stage", self._cb)
+
+    def tearDown(self):
+        event_bus.unsubscribe_sync("prethink_stage", self._cb)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_each_stage_reports_wall_time(self):
+        intent = self.brain.intent_classifier.classify(TASK_TEXT, has_active_thread=False, batch_type="single")
+        self.brain._run_prethink_stages(TASK_TEXT, intent)
+        stages = {e["stage"] for e in self.events}
+        self.assertIn("tools", stages)
+        self.assertIn("decompose", stages)
+        for e in self.events:
+            self.assertGreaterEqual(e["duration"], 0)
+
+    def test_stage_failure_is_isolated(self):
+        intent = self.brain.intent_classifier.classify(TASK_TEXT, has_active_thread=False, batch_type="single")
+        intent.needs_memory = True
+        self.brain.memory.recall = mock.Mock(side_effect=RuntimeError("boom"))
+        self.brain._auto_recall_multi = mock.Mock(side_effect=RuntimeError("boom"))
+        result = self.brain._run_prethink_stages(TASK_TEXT, intent)
+        self.assertEqual(result["memory_context"], "")
+        self.assertTrue(any(e["stage"] == "recall" and e["status"] == "error" for e in self.events))
+
+    def test_tool_selection_failure_falls_back_to_all_tools(self):
+        intent = self.brain.intent_classifier.classify(TASK_TEXT, has_active_thread=False, batch_type="single")
+        with mock.patch("brain.planner.get_tools_for_intent", side_effect=RuntimeError("boom")):
+            result = self.brain._run_prethink_stages(TASK_TEXT, intent)
+        self.assertEqual(len(result["tools"]), len(TARS_TOOLS))
+        self.assertTrue(any(e["stage"] == "tools" and e["status"] == "error" for e in self.events))
+
+    def test_slow_speculative_decomposition_is_abandoned(self):
+        intent = self.brain.intent_classifier.classify(TASK_TEXT, has_active_thread=False, batch_type="single")
+        intent.complexity = "simple"
+        intent.subtasks = []
+        self.brain.prethink_speculative_grace = 0.01
+        self.brain._decompose_task = lambda text, it: time.sleep(0.2) or "late plan"
+        result = self.brain._run_prethink_stages(TASK_TEXT, intent)
+        self.assertEqual(result["subtask_plan"], "")
+        self.assertTrue(any(e["status"] == "abandoned" for e in self.events))
+
+    def test_complex_decomposition_is_awaited(self):
+        intent = self.brain.intent_classifier.classify(TASK_TEXT, has_active_thread=False, batch_type="single")
+        intent.complexity = "complex"
+        self.brain.prethink_speculative_grace = 0.0
+        self.brain._decompose_task = lambda text, it: time.sleep(0.05) or "full plan"
+        result = self.brain._run_prethink_stages(TASK_TEXT, intent)
+        self.assertEqual(result["subtask_plan"], "full plan")
+
+
+class TestTimeToFirstAction(unittest.TestCase):
+    """Benchmark: pre-think stages overlap instead of summing."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_stages_overlap(self):
+        brain = _make_brain(self.tmp, recall_delay=0.02)
+        stage_delay = 0.15
+        slow = lambda *a, **k: time.sleep(stage_delay) or ""
+        brain._decompose_task = slow
+        brain._lookup_decision_cache = lambda *a, **k: time.sleep(stage_delay)
+        brain._auto_recall_multi = slow
+
+        intent = brain.intent_classifier.classify(TASK_TEXT, has_active_thread=False, batch_type="single")
+        intent.needs_memory = True
+        intent.complexity = "complex"
+        intent.domain_hints = intent.domain_hints or ["research"]
+
+        start = time.time()
+        brain._run_prethink_stages(TASK_TEXT, intent)
+        elapsed = time.time() - start
+        # Sequential would be ~3 × stage_delay
+        self.assertLess(elapsed, 2 * stage_delay)
+
+    def test_process_reaches_first_llm_call(self):
+        brain = _make_brain(self.tmp, recall_delay=0.01)
+        MockLLMClient.first_call_at = None
+        start = time.time()
+        response = brain.process(TASK_TEXT)
+        self.assertIn("done", response.lower())
+        self.assertIsNotNone(MockLLMClient.first_call_at)
+        time_to_first_action = MockLLMClient.first_call_at - start
+        self.assertLess(time_to_first_action, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,272 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Provider Health      ║
+╚══════════════════════════════════════════╝
+
+Tests the shared LLM provider circuit breakers: error classes,
+tripping and half-open probes, retry-after, latency-aware routing,
+and BaseAgent failover against a mock provider that injects 429s,
+5xx errors and slow responses.
+"""
+
+import unittest
+import threading
+import time
+import os
+import sys
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.provider_health import (
+    ProviderHealth, CircuitOpenError, classify_error,
+    FAILURE_THRESHOLD, OPEN_SECONDS, FATAL_OPEN_SECONDS, SLOW_SECONDS,
+)
+import agents.base_agent as base_agent_module
+from agents.base_agent import BaseAgent
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MockProvider:
+    """LLM double that plays back a fault script, one entry per call:
+    "ok", "429", "503", "slow" (adds latency) or an Exception."""
+
+    def __init__(self, name, script=(), default="ok", latency=0.0, clock=None):
+        self.provider = name
+        self.script = list(script)
+        self.default = default
+        self.latency = latency
+        self.clock = clock
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            fault = self.script.pop(0) if self.script else self.default
+        if self.clock is not None:
+            self.clock.now += self.latency + (SLOW_SECONDS * 2 if fault == "slow" else 0)
+        elif self.latency:
+            time.sleep(self.latency)
+        if fault == "429":
+            raise RuntimeError("Error code: 429 - rate_limit_exceeded")
+        if fault == "503":
+            raise RuntimeError("Error code: 503 - Service Unavailable")
+        if isinstance(fault, Exception):
+            raise fault
+        done = SimpleNamespace(type="tool_use", name="done", id="d",
+                               input={"summary": f"Answered by {self.provider} provider."})
+        return SimpleNamespace(content=[done], stop_reason="tool_use")
+
+
+class TestClassify(unittest.TestCase):
+
+    def test_kinds(self):
+        self.assertEqual(classify_error(RuntimeError("429 rate_limit_exceeded")), "rate_limit")
+        self.assertEqual(classify_error(RuntimeError("503 Service Unavailable")), "server")
+        self.assertEqual(classify_error(TimeoutError()), "server")
+        self.assertEqual(classify_error(RuntimeError("spend limit reached")), "fatal")
+        self.assertEqual(classify_error(RuntimeError("tool_use_failed: bad xml")), "tool_use_failed")
+        self.assertEqual(classify_error(ValueError("context too long")), "other")
+
+    def test_bad_requests_are_not_provider_failures(self):
+        for msg in ("Error code: 400 - tool call validation failed: parameter account_id is missing",
+                    "Error code: 400 - prompt is too long: 215000 tokens > 150000 maximum",
+                    "Error code: 400 - max_tokens: 4096 > 2500",
+                    "prompt is too long: 215000 tokens > 150000 maximum",
+                    "max_tokens: 4096 > 2500"):
+            self.assertEqual(classify_error(RuntimeError(msg)), "other", msg)
+
+    def test_status_code_wins_over_message(self):
+        class APIError(Exception):
+            def __init__(self, msg, status):
+                super().__init__(msg)
+                self.status_code = status
+
+        self.assertEqual(classify_error(APIError("server said 503 once", 400)), "other")
+        self.assertEqual(classify_error(APIError("Overloaded", 529)), "server")
+        self.assertEqual(classify_error(APIError("slow down", 429)), "rate_limit")
+        self.assertEqual(classify_error(APIError("invalid x-api-key", 401)), "fatal")
+        self.assertEqual(classify_error(APIError("Your credit balance is too low", 400)), "fatal")
+        response_err = RuntimeError("upstream error")
+        response_err.response = SimpleNamespace(status_code=502)
+        self.assertEqual(classify_error(response_err), "server")
+
+
+class TestBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.health = ProviderHealth(clock=self.clock)
+        self.flaky = MockProvider("groq", default="503")
+
+    def _call(self, client):
+        return self.health.call(client, "m", lambda: client.create())
+
+    def test_trips_after_threshold_and_skips_without_calling(self):
+        for _ in range(FAILURE_THRESHOLD):
+            with self.assertRaises(RuntimeError):
+                self._call(self.flaky)
+        with self.assertRaises(CircuitOpenError):
+            self._call(self.flaky)
+        self.assertEqual(self.flaky.calls, FAILURE_THRESHOLD)
+        self.assertEqual(self.health.stats()["groq/m"]["state"], "open")
+
+    def test_half_open_probe_closes_on_success(self):
+        for _ in range(FAILURE_THRESHOLD):
+            with self.assertRaises(RuntimeError):
+                self._call(self.flaky)
+        self.clock.now += OPEN_SECONDS + 1
+        self.flaky.default = "ok"
+        breaker = self.health.breaker(self.flaky, "m")
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())       # One probe at a time
+        breaker.record_success(0.1)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_failed_probe_doubles_open_period(self):
+        for _ in range(FAILURE_THRESHOLD):
+            with self.assertRaises(RuntimeError):
+                self._call(self.flaky)
+        self.clock.now += OPEN_SECONDS + 1
+        with self.assertRaises(RuntimeError):
+            self._call(self.flaky)
+        self.assertAlmostEqual(self.health.breaker(self.flaky, "m").retry_in(), OPEN_SECONDS * 2)
+
+    def test_fatal_and_retry_after(self):
+        dead = MockProvider("openai", script=[RuntimeError("insufficient_quota")])
+        with self.assertRaises(RuntimeError):
+            self._call(dead)
+        self.assertAlmostEqual(self.health.breaker(dead, "m").retry_in(), FATAL_OPEN_SECONDS)
+
+        limited = MockProvider("together", script=[RuntimeError("429 rate limit, retry after 7s")])
+        with self.assertRaises(RuntimeError):
+            self._call(limited)
+        self.assertAlmostEqual(self.health.breaker(limited, "m").retry_in(), 7)
+
+    def test_request_errors_do_not_trip(self):
+        bad = MockProvider("groq", default=ValueError("context too long"))
+        for _ in range(FAILURE_THRESHOLD + 2):
+            with self.assertRaises(ValueError):
+                self._call(bad)
+        self.assertEqual(self.health.breaker(bad, "m").state, "closed")
+
+
+class TestRouting(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.health = ProviderHealth(clock=self.clock)
+
+    def test_open_providers_are_left_out(self):
+        a, b = MockProvider("a", default="503"), MockProvider("b")
+        for _ in range(FAILURE_THRESHOLD):
+            with self.assertRaises(RuntimeError):
+                self.health.call(a, "m", a.create)
+        routed = self.health.route([(a, "m", "primary"), (b, "m", "fallback")])
+        self.assertEqual([r[2] for r in routed], ["fallback"])
+
+    def test_slow_primary_goes_behind_fast_fallback(self):
+        slow = MockProvider("slow", default="slow", clock=self.clock)
+        fast = MockProvider("fast", latency=1.0, clock=self.clock)
+        self.health.call(slow, "m", slow.create)
+        self.health.call(fast, "m", fast.create)
+        routed = self.health.route([(slow, "m", "primary"), (fast, "m", "fallback")])
+        self.assertEqual([r[2] for r in routed], ["fallback", "primary"])
+
+    def test_preference_kept_when_latencies_are_close(self):
+        a = MockProvider("a", latency=2.0, clock=self.clock)
+        b = MockProvider("b", latency=1.5, clock=self.clock)
+        self.health.call(a, "m", a.create)
+        self.health.call(b, "m", b.create)
+        self.assertEqual([r[2] for r in self.health.route([(a, "m", "p"), (b, "m", "f")])], ["p", "f"])
+
+
+class _Agent(BaseAgent):
+    agent_name = "Probe Agent"
+    agent_emoji = "🧪"
+    system_prompt = "test"
+    tools = []
+
+    def _dispatch(self, name, inp):
+        return "ok"
+
+
+class TestAgentFailover(unittest.TestCase):
+    """BaseAgent routes through the shared breakers."""
+
+    def setUp(self):
+        self.health = ProviderHealth()
+        patcher = mock.patch.object(base_agent_module, "provider_health", self.health)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pause = mock.patch.object(BaseAgent, "_pause", return_value=False)
+        self.pause.start()
+        self.addCleanup(self.pause.stop)
+
+    def _agent(self, primary, fallback=None):
+        return _Agent(primary, "m", fallback_client=fallback, fallback_model="m" if fallback else None)
+
+    def test_brownout_is_discovered_once(self):
+        primary, fallback = MockProvider("primary", default="429"), MockProvider("fallback")
+        results = [self._agent(primary, fallback)._call_llm("s", [], [], "required") for _ in range(10)]
+        self.assertTrue(all(r[0] is not None for r in results))
+        # The first agents each spend one call finding the 429s; after the trip nobody calls it
+        self.assertEqual(primary.calls, FAILURE_THRESHOLD)
+        self.assertEqual(fallback.calls, 10)
+
+    def test_5xx_on_primary_fails_over_without_retrying_it(self):
+        primary, fallback = MockProvider("primary", script=["503"]), MockProvider("fallback")
+        agent = self._agent(primary, fallback)
+        response, err = agent._call_llm("s", [], [], "required")
+        self.assertIsNotNone(response)
+        self.assertEqual((primary.calls, fallback.calls), (1, 1))
+        self.assertTrue(agent._using_fallback)
+
+    def test_sole_provider_retries_transient_errors(self):
+        only = MockProvider("only", script=["429", "503"])
+        response, _ = self._agent(only)._call_llm("s", [], [], "required")
+        self.assertIsNotNone(response)
+        self.assertEqual(only.calls, 3)
+
+    def test_all_open_fails_fast(self):
+        only = MockProvider("only", default="503")
+        self.assertIsNone(self._agent(only)._call_llm("s", [], [], "required")[0])
+        start = time.monotonic()
+        response, err = self._agent(only)._call_llm("s", [], [], "required")
+        self.assertIsNone(response)
+        self.assertIsInstance(err, CircuitOpenError)
+        self.assertEqual(only.calls, FAILURE_THRESHOLD)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_run_reports_api_error_when_nothing_answers(self):
+        agent = self._agent(MockProvider("only", default=RuntimeError("insufficient_quota")))
+        result = agent.run("anything")
+        self.assertFalse(result["success"])
+        self.assertIn("insufficient_quota", result["content"])
+
+    def test_concurrent_agents_share_breaker(self):
+        primary, fallback = MockProvider("primary", default="503", latency=0.02), MockProvider("fallback")
+        threads = [threading.Thread(target=lambda: self._agent(primary, fallback)._call_llm("s", [], [], "r"))
+                   for _ in range(12)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(primary.calls, 12)
+        self.assertEqual(fallback.calls, 12)
+        self._agent(primary, fallback)._call_llm("s", [], [], "r")
+        self.assertEqual(fallback.calls, 13)
+        self.assertLessEqual(primary.calls, 12)     # Tripped: the 13th agent didn't try it
+        self.assertEqual(self.health.stats()["primary/m"]["state"], "open")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Research Cache       ║
+╚══════════════════════════════════════════╝
+
+Tests the shared search cache: query normalization, per-provider
+TTLs, LRU bound, search provider cool-downs, and that the brain's
+web_search and the research APIs share entries.
+"""
+
+import unittest
+import threading
+import logging
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import hands.research_apis as research_apis
+from hands.research_apis import (
+    ResearchCache, SearchProviderHealth, normalize_query,
+    FAILURES_BEFORE_COOLDOWN, COOLDOWN_SECONDS,
+)
+
+try:
+    import executor as executor_module
+    HAS_EXECUTOR = True
+except Exception:   # Optional deps / platform-only modules missing
+    executor_module = None
+    HAS_EXECUTOR = False
+
+SERPER_REPLY = {"organic": [{"title": "Tesla Q3", "link": "https://ir.tesla.com/q3", "snippet": "Revenue $25B"}]}
+DDG_HTML = ('<a class="result__a" href="x">Tesla results</a>'
+            '<a class="result__snippet">Revenue was $25B</a><a class="result__url">tesla.com</a>')
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Base(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResearchCache()
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+        self.clock = _Clock()
+        self.health = SearchProviderHealth(clock=self.clock)
+        patcher = mock.patch.object(research_apis, "search_health", self.health)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_near_identical_queries_match(self):
+        self.assertEqual(normalize_query("  Tesla  Q3 Revenue?? "), "tesla q3 revenue")
+        self.assertEqual(normalize_query("ＴＥＳＬＡ q3"), "tesla q3")
+        self.assertNotEqual(normalize_query("flights NYC to LA"), normalize_query("flights LA to NYC"))
+        self.assertNotEqual(normalize_query('"exact phrase"'), normalize_query("exact phrase"))
+
+
+class TestCache(_Base):
+
+    def test_normalized_hit_for_query_sources_only(self):
+        self.cache.put("ddg", "Tesla Q3 revenue", "r")
+        self.assertEqual(self.cache.get("ddg", "tesla  q3 REVENUE?"), "r")
+        self.cache.put("page", "https://ex.com/A", "page")
+        self.assertIsNone(self.cache.get("page", "https://ex.com/a"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_per_provider_ttl(self):
+        with mock.patch.object(research_apis.time, "time", return_value=0):
+            self.cache.put("yf_quote", "TSLA", "quote")
+            self.cache.put("wiki_summary", "Tesla", "wiki")
+        with mock.patch.object(research_apis.time, "time", return_value=600):
+            self.assertIsNone(self.cache.get("yf_quote", "TSLA"))
+            self.assertEqual(self.cache.get("wiki_summary", "Tesla"), "wiki")
+            self.assertEqual(self.cache.stats()["entries"], 1)
+
+    def test_lru_bound(self):
+        self.cache._max_entries = 10
+        self.addCleanup(setattr, self.cache, "_max_entries", research_apis.CACHE_MAX_ENTRIES)
+        for i in range(10):
+            self.cache.put("ddg", f"q{i}", i)
+        self.cache.get("ddg", "q0")                 # Touch: q0 is now most recent
+        self.cache.put("ddg", "q10", 10)
+        self.assertEqual(self.cache.get("ddg", "q0"), 0)
+        self.assertIsNone(self.cache.get("ddg", "q1"))
+        self.assertEqual(self.cache.stats()["entries"], 10)
+
+    def test_concurrent_access(self):
+        def worker(n):
+            for i in range(300):
+                self.cache.put("serper", f"q{n}-{i % 50}", i)
+                self.cache.get("serper", f"q{(n + 1) % 8}-{i % 50}")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertLessEqual(self.cache.stats()["entries"], research_apis.CACHE_MAX_ENTRIES)
+
+
+class TestCooldown(_Base):
+
+    def test_repeated_failures_skip_provider(self):
+        for _ in range(FAILURES_BEFORE_COOLDOWN):
+            self.assertTrue(self.health.available("ddg"))
+            self.health.record_failure("ddg", "timeout")
+        self.assertFalse(self.health.available("ddg"))
+        self.clock.now += COOLDOWN_SECONDS + 1
+        self.assertTrue(self.health.available("ddg"))
+        # Failing again right after a cool-down doubles the next one
+        for _ in range(FAILURES_BEFORE_COOLDOWN):
+            self.health.record_failure("ddg", "timeout")
+        self.assertEqual(self.health.stats()["ddg"]["cooling_down_for"], COOLDOWN_SECONDS * 2)
+
+    def test_success_resets(self):
+        self.health.record_failure("serper")
+        self.health.record_success("serper")
+        self.health.record_failure("serper")
+        self.assertTrue(self.health.available("serper"))
+
+    def test_failing_serper_is_not_called_again(self):
+        with mock.patch.object(research_apis, "_http_post_json", return_value=None) as post:
+            for i in range(5):
+                self.assertIsNone(research_apis.serper_search(f"q{i}", "key"))
+        self.assertEqual(post.call_count, FAILURES_BEFORE_COOLDOWN)
+        self.assertGreater(self.health.stats()["serper"]["skipped"], 0)
+
+    def test_ddg_captcha_counts_as_failure(self):
+        with mock.patch.object(research_apis, "_http_get", return_value="Please complete the security check") as get:
+            for i in range(4):
+                self.assertIsNone(research_apis.duckduckgo_search(f"q{i}"))
+        self.assertEqual(get.call_count, FAILURES_BEFORE_COOLDOWN)
+
+    def test_cache_still_served_while_cooling_down(self):
+        with mock.patch.object(research_apis, "_http_post_json", return_value=SERPER_REPLY):
+            first = research_apis.serper_search("Tesla Q3", "key")
+        for _ in range(FAILURES_BEFORE_COOLDOWN):
+            self.health.record_failure("serper")
+        self.assertEqual(research_apis.serper_search("tesla q3?", "key"), first)
+
+
+@unittest.skipUnless(HAS_EXECUTOR, "executor not importable here")
+class TestExecutorWebSearch(_Base):
+    """ToolExecutor.web_search shares the research cache and cool-downs."""
+
+    def setUp(self):
+        super().setUp()
+        self.ex = executor_module.ToolExecutor.__new__(executor_module.ToolExecutor)
+        self.ex.config = {"research": {"serper_api_key": "key"}}
+        self.ex.logger = logging.getLogger("test")
+
+    def test_research_agent_query_serves_brain(self):
+        with mock.patch.object(research_apis, "_http_post_json", return_value=SERPER_REPLY) as post:
+            research_apis.serper_search("Tesla Q3 revenue", "key")
+            result = self.ex._web_search("tesla q3 revenue?")
+        self.assertTrue(result["success"])
+        self.assertIn("ir.tesla.com", result["content"])
+        self.assertEqual(post.call_count, 1)
+
+    def test_dead_serper_goes_straight_to_ddg(self):
+        with mock.patch.object(research_apis, "_http_post_json", return_value=None) as post, \
+                mock.patch.object(research_apis, "_http_get", return_value=DDG_HTML):
+            for i in range(6):
+                self.assertTrue(self.ex._web_search(f"query {i}")["success"])
+        self.assertEqual(post.call_count, FAILURES_BEFORE_COOLDOWN)
+
+    def test_all_down_fails_fast_without_browser(self):
+        browser = mock.Mock(side_effect=TimeoutError())
+        with mock.patch.object(research_apis, "_http_post_json", return_value=None), \
+                mock.patch.object(research_apis, "_http_get", return_value=None), \
+                mock.patch.object(executor_module, "browser_google", browser):
+            results = [self.ex._web_search(f"q{i}") for i in range(4)]
+        self.assertFalse(any(r["success"] for r in results))
+        self.assertEqual(browser.call_count, FAILURES_BEFORE_COOLDOWN)
+        self.assertIn("all failing", results[-1]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
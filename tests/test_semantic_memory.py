@@ -0,0 +1,280 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Semantic Recall      ║
+╚══════════════════════════════════════════╝
+
+Tests recall over the three ChromaDB collections: concurrent
+per-collection queries, in-memory counts kept in step with
+writes, a unified relevance score, the per-embedding TTL cache,
+and a latency benchmark on a persistent store of synthetic
+vectors (TARS_SEMANTIC_BENCH_VECTORS, default 6000; set it to
+100000 for the full-size run).
+"""
+
+import unittest
+import tempfile
+import shutil
+import hashlib
+import random
+import re
+import time
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    from chromadb import EmbeddingFunction
+    HAS_CHROMADB = True
+except ImportError:
+    EmbeddingFunction = object
+    HAS_CHROMADB = False
+
+from memory import semantic_memory as sm
+
+DIM = 64
+BENCH_VECTORS = int(os.environ.get("TARS_SEMANTIC_BENCH_VECTORS", "6000"))
+
+
+class HashEmbedding(EmbeddingFunction):
+    """Offline bag-of-words embedding: each word hashes to one dimension."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, input):
+        self.calls += 1
+        vectors = []
+        for text in input:
+            vec = [0.0] * DIM
+            for word in re.findall(r"[a-z0-9]+", text.lower()):
+                vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1.0
+            if not any(vec):
+                vec[0] = 1.0
+            vectors.append(vec)
+        return vectors
+
+
+def _make(base_dir, embedder=None):
+    os.makedirs(os.path.join(base_dir, "memory"), exist_ok=True)
+    return sm.SemanticMemory(base_dir=base_dir, embedding_fn=embedder or HashEmbedding())
+
+
+@unittest.skipUnless(HAS_CHROMADB, "chromadb not installed")
+class TestCounts(unittest.TestCase):
+    """Collection counts live in memory and follow writes."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.mem = _make(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_counts_follow_adds_and_deletes(self):
+        self.mem.store_knowledge("color", "favorite color is blue")
+        self.mem.store_knowledge("color", "favorite color is green")  # Upsert, same id
+        self.mem.store_conversation("hello there", "hi")
+        self.assertEqual(self.mem.count("knowledge"), 1)
+        self.assertEqual(self.mem.count("conversations"), 1)
+
+        doc_id = hashlib.md5(b"knowledge:color").hexdigest()
+        self.assertEqual(self.mem.delete("knowledge", [doc_id, "missing"]), 1)
+        self.assertEqual(self.mem.count("knowledge"), 0)
+        self.assertEqual(self.mem.get_stats()["total_vectors"], 1)
+
+    def test_counts_loaded_from_store_on_startup(self):
+        path = os.path.join(self.tmp, "doc.txt")
+        with open(path, "w") as f:
+            f.write("Paragraph about rockets and orbits. " * 60)
+        self.mem.ingest_document(path, chunk_size=200, chunk_overlap=20)
+        chunks = self.mem.count("documents")
+        self.assertGreater(chunks, 1)
+
+        reopened = _make(self.tmp)
+        self.assertEqual(reopened.count("documents"), chunks)
+        self.assertEqual(reopened.count("documents"), reopened._collections["documents"].count())
+
+    def test_recall_does_not_count_collections(self):
+        self.mem.store_knowledge("k", "alpha beta gamma")
+        for col in self.mem._collections.values():
+            col.count = mock.Mock(side_effect=AssertionError("count() on the hot path"))
+        result = self.mem.recall("alpha beta")
+        self.assertIn("alpha beta gamma", result["content"])
+
+    def test_clear_all_resets_counts(self):
+        self.mem.store_knowledge("a", "one")
+        self.mem.store_conversation("two", "three")
+        self.mem.clear_all()
+        self.assertEqual(self.mem.count(), 0)
+        self.assertIn("No semantic matches", self.mem.recall("one")["content"])
+
+
+@unittest.skipUnless(HAS_CHROMADB, "chromadb not installed")
+class TestRecall(unittest.TestCase):
+    """Concurrent search and unified cross-collection ranking."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.embedder = HashEmbedding()
+        self.mem = _make(self.tmp, self.embedder)
+        self.mem.store_knowledge("tokyo", "tokyo weather is warm in summer")
+        self.mem.store_conversation("flights to paris", "found three flights to paris")
+        path = os.path.join(self.tmp, "notes.md")
+        with open(path, "w") as f:
+            f.write("Tokyo weather.")
+        self.mem.ingest_document(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_results_ranked_across_collections(self):
+        content = self.mem.recall("tokyo weather", n_results=3)["content"]
+        lines = [l for l in content.splitlines() if l.startswith("**[")]
+        scores = [float(re.search(r"relevance: ([\d.]+)", l).group(1)) for l in lines]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        # Exact match scores 1.0 instead of being dropped to 0
+        self.assertEqual(scores[0], 1.0)
+        self.assertIn("[document]", lines[0])
+
+    def test_collections_queried_concurrently(self):
+        with mock.patch.object(self.mem._pool, "submit", wraps=self.mem._pool.submit) as submit:
+            self.mem.recall("paris flights")
+        self.assertEqual(submit.call_count, 3)
+
+    def test_single_collection_runs_inline(self):
+        with mock.patch.object(self.mem._pool, "submit") as submit:
+            result = self.mem.recall("tokyo", collection="knowledge")
+        submit.assert_not_called()
+        self.assertIn("warm in summer", result["content"])
+
+    def test_relevance_scale(self):
+        self.assertEqual(sm._relevance(0.0, "cosine"), 1.0)
+        self.assertEqual(sm._relevance(1.5, "cosine"), 0.0)
+        self.assertEqual(sm._relevance(0.0, "l2"), 1.0)
+        self.assertAlmostEqual(sm._relevance(1.0, "l2"), 0.5)
+        self.assertEqual(sm._relevance(None, "cosine"), 0.0)
+
+    def test_recall_many_embeds_once(self):
+        self.embedder.calls = 0
+        result = self.mem.recall_many(["tokyo", "paris"], n_results=4)
+        self.assertEqual(self.embedder.calls, 1)
+        self.assertIn("tokyo", result["content"])
+        self.assertIn("paris", result["content"])
+
+
+@unittest.skipUnless(HAS_CHROMADB, "chromadb not installed")
+class TestRecallCache(unittest.TestCase):
+    """Results are cached per query embedding for a short TTL."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.embedder = HashEmbedding()
+        self.mem = _make(self.tmp, self.embedder)
+        self.mem.store_knowledge("pet", "the cat is named miso")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_repeat_query_hits_cache(self):
+        first = self.mem.recall("cat name")
+        with mock.patch.object(self.mem, "_query_collection") as query:
+            second = self.mem.recall("cat name")
+        query.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_same_embedding_different_text_shares_entry(self):
+        self.mem.recall("cat name")
+        with mock.patch.object(self.mem, "_query_collection") as query:
+            self.mem.recall("name cat")  # Same bag of words → same vector
+        query.assert_not_called()
+
+    def test_write_invalidates(self):
+        self.mem.recall("cat name")
+        self.mem.store_knowledge("pet2", "the other cat is named tofu")
+        self.assertIn("tofu", self.mem.recall("cat name")["content"])
+
+    def test_entries_expire(self):
+        now = [0.0]
+        cache = sm._TTLCache(ttl=30.0, size=4, clock=lambda: now[0])
+        cache.put("k", "v")
+        now[0] = 29.0
+        self.assertEqual(cache.get("k"), "v")
+        now[0] = 60.0
+        self.assertIsNone(cache.get("k"))
+
+    def test_cache_is_bounded(self):
+        cache = sm._TTLCache(ttl=30.0, size=3)
+        for i in range(10):
+            cache.put(i, i)
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(0))
+
+
+@unittest.skipUnless(HAS_CHROMADB, "chromadb not installed")
+class TestRecallBenchmark(unittest.TestCase):
+    """Benchmark: recall latency on a persistent store of synthetic vectors."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        seed = _make(cls.tmp)
+        rng = random.Random(7)
+        per_col = BENCH_VECTORS // len(sm.COLLECTIONS)
+        for name, col in seed._collections.items():
+            for start in range(0, per_col, 2000):
+                n = min(2000, per_col - start)
+                col.add(
+                    ids=[f"{name}_{start + i}" for i in range(n)],
+                    embeddings=[[rng.random() for _ in range(DIM)] for _ in range(n)],
+                    documents=[f"{name} synthetic record {start + i}" for i in range(n)],
+                    metadatas=[{"type": name} for _ in range(n)],
+                )
+        cls.per_col = per_col
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def setUp(self):
+        self.mem = _make(self.tmp)
+
+    def _sequential_recall(self, query, n_results=5):
+        """The pre-cache path: count() + query_texts per collection, in turn."""
+        hits = []
+        for col in self.mem._collections.values():
+            if col.count() == 0:
+                continue
+            res = col.query(query_texts=[query], n_results=min(n_results, col.count()))
+            hits.extend(res["distances"][0])
+        return sorted(hits)[:n_results]
+
+    def test_counts_from_startup(self):
+        self.assertEqual(self.mem.count(), self.per_col * len(sm.COLLECTIONS))
+
+    def test_recall_latency(self):
+        queries = [f"synthetic record {i}" for i in range(20)]
+
+        start = time.perf_counter()
+        for q in queries:
+            self._sequential_recall(q)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q in queries:
+            self.assertTrue(self.mem.recall(q)["success"])
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q in queries:
+            self.mem.recall(q)
+        warm = time.perf_counter() - start
+
+        self.assertLess(cold / len(queries), 0.5)
+        self.assertLess(cold, sequential * 1.5)
+        self.assertLess(warm, cold)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+╔══════════════════════════════════════════╗
+║    TARS — Test Suite: Site Knowledge      ║
+╚══════════════════════════════════════════╝
+
+Tests sharded per-domain site knowledge: lazy shard loading,
+LRU of hot domains, batched flushes, legacy-file migration,
+and get_site_context() touching only the visited domain.
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import time
+import threading
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from memory import site_knowledge as sk_mod
+from memory.site_knowledge import SiteKnowledge, INDEX_NAME
+
+
+class _Base(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.dir = os.path.join(self.tmp, "sites")
+        self.legacy = os.path.join(self.tmp, "site_knowledge.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def make(self):
+        return SiteKnowledge(base_dir=self.dir, legacy_file=self.legacy)
+
+
+class TestShards(_Base):
+    """One file per domain, index-only startup."""
+
+    def test_roundtrip(self):
+        sk = self.make()
+        sk.learn_page("https://example.com/signup", "signup_form", fields=["email"])
+        sk.learn_selector("example.com", "Email field", "#email")
+        sk.learn_flow("example.com", "signup", ["form", "verify"])
+        sk.flush()
+
+        fresh = self.make()
+        self.assertEqual(fresh.get_page("https://example.com/signup")["type"], "signup_form")
+        self.assertEqual(fresh.get_best_selector("example.com", "email field"), "#email")
+        self.assertEqual(fresh.get_flow("example.com", "signup"), ["form", "verify"])
+
+    def test_one_file_per_domain(self):
+        sk = self.make()
+        for d in ("a.com", "b.org", "c.net:8080"):
+            sk.learn_login_indicator(d, "url_pattern", "/home")
+        sk.flush()
+        files = set(os.listdir(self.dir))
+        self.assertIn(INDEX_NAME, files)
+        self.assertEqual(len(files), 4)
+
+    def test_startup_loads_no_shards(self):
+        sk = self.make()
+        for i in range(20):
+            sk.learn_page(f"https://site{i}.com/", "home")
+        sk.flush()
+        fresh = self.make()
+        self.assertEqual(fresh.get_stats()["hot_domains"], 0)
+        self.assertEqual(fresh.get_stats()["domains_known"], 20)
+        self.assertEqual(fresh.get_stats()["total_pages"], 20)
+
+    def test_unknown_domain_does_not_touch_disk(self):
+        sk = self.make()
+        with mock.patch("builtins.open") as opened:
+            self.assertEqual(sk.get_site_context("https://never-seen.com/"), "")
+            opened.assert_not_called()
+
+
+class TestBatching(_Base):
+    """learn_* calls coalesce into batched flushes."""
+
+    def test_learn_calls_do_not_write_synchronously(self):
+        sk = self.make()
+        with mock.patch.object(sk, "_write_json") as write:
+            for i in range(30):
+                sk.learn_selector("example.com", f"button {i}", f"#b{i}")
+            write.assert_not_called()
+            sk.flush()
+            # One shard + index
+            self.assertEqual(write.call_count, 2)
+
+    def test_flush_writes_only_dirty_shards(self):
+        sk = self.make()
+        for d in ("a.com", "b.com", "c.com"):
+            sk.learn_page(f"https://{d}/", "home")
+        sk.flush()
+        sk.learn_page("https://b.com/x", "other")
+        with mock.patch.object(sk, "_write_json") as write:
+            sk.flush()
+        names = [c.args[0] for c in write.call_args_list]
+        self.assertEqual(names, ["b.com.json", INDEX_NAME])
+
+    def test_timer_flush(self):
+        with mock.patch.object(sk_mod, "FLUSH_DELAY", 0.05):
+            sk = self.make()
+            sk.learn_page("https://example.com/", "home")
+            deadline = time.time() + 2.0
+            while not os.path.exists(os.path.join(self.dir, "example.com.json")) and time.time() < deadline:
+                time.sleep(0.02)
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "example.com.json")))
+
+
+class TestLRU(_Base):
+    """Hot domain cache stays bounded."""
+
+    def test_hot_set_is_bounded(self):
+        with mock.patch.object(sk_mod, "HOT_DOMAINS", 5):
+            sk = self.make()
+            for i in range(12):
+                sk.learn_page(f"https://site{i}.com/", "home")
+            self.assertLessEqual(len(sk._hot), 5)
+            sk.flush()
+            # Evicted domains are still readable from their shards
+            self.assertEqual(sk.get_page("https://site0.com/")["type"], "home")
+            self.assertEqual(sk.get_stats()["domains_known"], 12)
+
+    def test_failed_flush_lets_hot_set_grow(self):
+        blocker = os.path.join(self.tmp, "not_a_dir")
+        open(blocker, "w").close()
+        with mock.patch.object(sk_mod, "HOT_DOMAINS", 3):
+            sk = SiteKnowledge(base_dir=blocker, legacy_file=self.legacy)
+            for i in range(5):
+                sk.learn_page(f"https://site{i}.com/", "home")
+            # Nothing could be written, so nothing was dropped
+            self.assertEqual(len(sk._hot), 5)
+            self.assertEqual(sk.get_page("https://site0.com/")["type"], "home")
+
+    def test_concurrent_learning_loses_nothing(self):
+        with mock.patch.object(sk_mod, "HOT_DOMAINS", 3), mock.patch.object(sk_mod, "FLUSH_DELAY", 0.001):
+            sk = self.make()
+
+            def learner(n):
+                for i in range(40):
+                    sk.learn_page(f"https://site{(n + i) % 10}.com/{n}-{i}", "page")
+
+            threads = [threading.Thread(target=learner, args=(n,)) for n in range(6)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            sk.flush()
+            self.assertEqual(sk._dirty, set())
+        fresh = self.make()
+        for n in range(6):
+            for i in range(40):
+                self.assertIsNotNone(fresh.get_page(f"https://site{(n + i) % 10}.com/{n}-{i}"))
+
+    def test_context_loads_only_visited_domain(self):
+        sk = self.make()
+        for i in range(10):
+            sk.learn_page(f"https://site{i}.com/login", "login_form")
+        sk.flush()
+        fresh = self.make()
+        ctx = fresh.get_site_context("https://site3.com/login")
+        self.assertIn("site3.com", ctx)
+        self.assertEqual(list(fresh._hot), ["site3.com"])
+
+
+class TestMigration(_Base):
+    """The old monolithic file is split into shards once."""
+
+    def test_legacy_file_migrated(self):
+        legacy = {
+            "old.com": {
+                "pages": {"/": {"type": "home"}}, "selectors": {}, "flows": {},
+                "errors": {}, "login_indicators": {}, "overlay_dismissals": {},
+                "visit_count": 7,
+            },
+        }
+        with open(self.legacy, "w") as f:
+            json.dump(legacy, f)
+        sk = self.make()
+        self.assertEqual(sk.get_page("https://old.com/")["type"], "home")
+        self.assertFalse(os.path.exists(self.legacy))
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "old.com.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
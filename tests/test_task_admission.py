@@ -0,0 +1,189 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Task Admission       ║
+╚══════════════════════════════════════════╝
+
+Tests priority admission into the task worker pool: ordering
+across classes, aging, pool reuse, immediate wake on completion,
+queue-wait metrics, resizing and shutdown.
+"""
+
+import unittest
+import threading
+import time
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.task_admission import (
+    TaskAdmission, PRIORITY_EMERGENCY, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND,
+)
+
+
+class _Gate:
+    """Holds tasks running until released."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.started = threading.Semaphore(0)
+
+    def hold(self, *args):
+        self.started.release()
+        self.event.wait(5)
+
+
+class TestOrdering(unittest.TestCase):
+    """Higher classes are admitted first; FIFO within a class."""
+
+    def setUp(self):
+        self.pool = TaskAdmission(max_parallel=1)
+        self.gate = _Gate()
+        self.order = []
+        self.pool.submit("blocker", self.gate.hold)
+        self.assertTrue(self.gate.started.acquire(timeout=2))
+
+    def tearDown(self):
+        self.gate.event.set()
+        self.pool.close(timeout=2)
+
+    def _record(self, name):
+        self.order.append(name)
+
+    def test_emergency_jumps_background_and_interactive(self):
+        self.pool.submit("bg1", self._record, "bg1", priority=PRIORITY_BACKGROUND)
+        self.pool.submit("user1", self._record, "user1", priority=PRIORITY_INTERACTIVE)
+        self.pool.submit("bg2", self._record, "bg2", priority=PRIORITY_BACKGROUND)
+        self.pool.submit("sos", self._record, "sos", priority=PRIORITY_EMERGENCY)
+        self.pool.submit("user2", self._record, "user2", priority=PRIORITY_INTERACTIVE)
+        self.gate.event.set()
+        self.assertTrue(self.pool.join(timeout=2))
+        self.assertEqual(self.order, ["sos", "user1", "user2", "bg1", "bg2"])
+
+    def test_aging_promotes_long_waiters(self):
+        clock = [0.0]
+        pool = TaskAdmission(max_parallel=1, aging=10, clock=lambda: clock[0])
+        gate = _Gate()
+        pool.submit("blocker", gate.hold)
+        gate.started.acquire(timeout=2)
+        pool.submit("bg", self._record, "bg", priority=PRIORITY_BACKGROUND)
+        clock[0] = 25.0     # bg has aged two classes: background → emergency level
+        pool.submit("user", self._record, "user", priority=PRIORITY_INTERACTIVE)
+        gate.event.set()
+        pool.join(timeout=2)
+        pool.close()
+        self.assertEqual(self.order, ["bg", "user"])
+
+
+class TestPool(unittest.TestCase):
+    """Workers are reused and capacity is respected."""
+
+    def test_concurrency_never_exceeds_limit(self):
+        pool = TaskAdmission(max_parallel=3)
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        threads = set()
+
+        def work():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                threads.add(threading.get_ident())
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        for i in range(30):
+            pool.submit(f"t{i}", work)
+        self.assertTrue(pool.join(timeout=5))
+        pool.close()
+        self.assertEqual(peak[0], 3)
+        self.assertLessEqual(len(threads), 3)
+
+    def test_thread_named_after_task_while_running(self):
+        pool = TaskAdmission(max_parallel=1)
+        names = []
+        pool.submit("task_7", lambda: names.append(threading.current_thread().name))
+        pool.join(timeout=2)
+        pool.close()
+        self.assertEqual(names, ["tars-task_7"])
+
+    def test_task_exception_does_not_kill_worker(self):
+        pool = TaskAdmission(max_parallel=1)
+        done = []
+        pool.submit("bad", lambda: 1 / 0)
+        pool.submit("good", lambda: done.append(1))
+        self.assertTrue(pool.join(timeout=2))
+        stats = pool.stats()["classes"]["interactive"]
+        pool.close()
+        self.assertEqual(done, [1])
+        self.assertEqual((stats["completed"], stats["failed"]), (1, 1))
+
+    def test_resize_up_admits_waiting_tasks(self):
+        pool = TaskAdmission(max_parallel=1)
+        gate = _Gate()
+        for i in range(3):
+            pool.submit(f"t{i}", gate.hold)
+        gate.started.acquire(timeout=2)
+        self.assertEqual(pool.active_count(), 1)
+        pool.resize(3)
+        for _ in range(2):
+            self.assertTrue(gate.started.acquire(timeout=2))
+        self.assertEqual(pool.active_count(), 3)
+        gate.event.set()
+        pool.close()
+
+    def test_close_drops_queue_and_refuses_new_work(self):
+        pool = TaskAdmission(max_parallel=1)
+        gate = _Gate()
+        pool.submit("running", gate.hold)
+        gate.started.acquire(timeout=2)
+        pool.submit("queued", lambda: None)
+        gate.event.set()
+        self.assertEqual(pool.close(timeout=2), 1)
+        with self.assertRaises(RuntimeError):
+            pool.submit("late", lambda: None)
+
+
+class TestWaitMetrics(unittest.TestCase):
+    """Queue-wait time is recorded per ticket and per class."""
+
+    def test_wait_recorded(self):
+        pool = TaskAdmission(max_parallel=1)
+        gate = _Gate()
+        pool.submit("blocker", gate.hold)
+        gate.started.acquire(timeout=2)
+        ticket = pool.submit("waiter", lambda: None, priority=PRIORITY_BACKGROUND)
+        time.sleep(0.1)
+        gate.event.set()
+        pool.join(timeout=2)
+        stats = pool.stats()
+        pool.close()
+        self.assertGreaterEqual(ticket.wait, 0.09)
+        self.assertGreaterEqual(stats["classes"]["background"]["wait_max"], 0.09)
+        self.assertEqual(stats["classes"]["background"]["completed"], 1)
+        self.assertEqual(stats["active"], 0)
+
+
+class TestAdmissionLatency(unittest.TestCase):
+    """Benchmark: a queued task starts right after a slot frees, not on a poll tick."""
+
+    def test_wake_on_completion(self):
+        pool = TaskAdmission(max_parallel=1)
+        finished_at = []
+        started_at = []
+        delays = []
+        for i in range(20):
+            pool.submit(f"a{i}", lambda: (time.sleep(0.005), finished_at.append(time.perf_counter())))
+            pool.submit(f"b{i}", lambda: started_at.append(time.perf_counter()))
+            pool.join(timeout=2)
+            delays.append(started_at[-1] - finished_at[-1])
+        pool.close()
+        delays.sort()
+        # The old scheduler polled every 0.5s; median wake-up should be ~µs
+        self.assertLess(delays[len(delays) // 2], 0.01)
+        self.assertLess(delays[-1], 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Task Context         ║
+╚══════════════════════════════════════════╝
+
+Tests per-task executor state: isolated deployment logs and
+budgets, per-task kill switches, context propagation onto pool
+threads, and a stress run of many concurrent simulated tasks
+deploying stub agents.
+"""
+
+import unittest
+import threading
+import logging
+import random
+import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.task_context import TaskContext, TaskKillEvent
+
+try:
+    import executor as executor_module
+    HAS_EXECUTOR = True
+except Exception:   # Optional deps / platform-only modules missing
+    executor_module = None
+    HAS_EXECUTOR = False
+
+
+class TestTaskContext(unittest.TestCase):
+    """Budget, log and kill switch of a single context."""
+
+    def test_reserve_is_atomic_under_contention(self):
+        ctx = TaskContext("t")
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            attempts = list(pool.map(lambda _: ctx.reserve_deployment(10), range(200)))
+        granted = sorted(a for a in attempts if a)
+        self.assertEqual(granted, list(range(1, 11)))
+        self.assertEqual(ctx.deployments_used, 10)
+
+    def test_failures_and_checkpoint(self):
+        ctx = TaskContext("t")
+        ctx.record_deployment({"agent": "browser", "success": False, "checkpoint": {"domain": "a.com"}})
+        ctx.record_deployment({"agent": "coder", "success": True})
+        ctx.record_deployment({"agent": "browser", "success": False, "checkpoint": {"domain": "b.com"}})
+        self.assertEqual(len(ctx.failures()), 2)
+        self.assertEqual(len(ctx.deployments("browser")), 2)
+        self.assertEqual(ctx.last_checkpoint("browser"), {"domain": "b.com"})
+        self.assertIsNone(ctx.last_checkpoint("coder"))
+
+    def test_kill_switch_follows_parent(self):
+        parent = threading.Event()
+        a, b = TaskContext("a", parent_kill=parent), TaskContext("b", parent_kill=parent)
+        a.cancel()
+        self.assertTrue(a.kill_event.is_set())
+        self.assertFalse(b.kill_event.is_set())
+        parent.set()
+        self.assertTrue(b.cancelled)
+        parent.clear()
+        self.assertFalse(b.cancelled)
+        self.assertTrue(a.cancelled)
+
+    def test_kill_event_is_an_event(self):
+        self.assertIsInstance(TaskKillEvent(), threading.Event)
+
+
+class StubAgent:
+    """Agent double: sleeps briefly, fails when the task says so."""
+
+    live = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        self.kill_event = kwargs["kill_event"]
+
+    def run(self, task, context=None):
+        with StubAgent.lock:
+            StubAgent.live += 1
+            StubAgent.peak = max(StubAgent.peak, StubAgent.live)
+        try:
+            time.sleep(random.uniform(0.001, 0.01))
+            if self.kill_event.is_set():
+                return {"success": False, "steps": 1, "stuck": True, "stuck_reason": "killed", "content": ""}
+            if "fail" in task:
+                return {"success": False, "steps": 3, "stuck": True, "stuck_reason": f"stuck on {task}", "content": ""}
+            return {"success": True, "steps": 2, "content": f"done {task}"}
+        finally:
+            with StubAgent.lock:
+                StubAgent.live -= 1
+
+    def get_state_checkpoint(self):
+        return {"domain": "example.com", "visited_urls": [], "flow_steps": []}
+
+
+@unittest.skipUnless(HAS_EXECUTOR, "executor not importable here")
+class TestExecutorIsolation(unittest.TestCase):
+    """Concurrent tasks against a real ToolExecutor with stub agents."""
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(executor_module, "LLMClient"),
+            mock.patch.object(executor_module, "AgentMemory"),
+            mock.patch.object(executor_module, "SelfImproveEngine"),
+            mock.patch.object(executor_module, "agent_comms"),
+            mock.patch.object(executor_module, "error_tracker"),
+            mock.patch.object(executor_module, "AGENT_CLASSES", {"coder": StubAgent, "system": StubAgent}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        executor_module.agent_comms.get_handoff_context.return_value = None
+        self.kill = threading.Event()
+        config = {
+            "llm": {"provider": "stub", "api_key": "k", "heavy_model": "m"},
+            "imessage": {"owner_phone": "+10000000000"},
+            "safety": {"max_deployments": 6},
+        }
+        self.ex = executor_module.ToolExecutor(
+            config, mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+            logging.getLogger("test"), kill_event=self.kill,
+        )
+        self.ex.self_improve.get_pre_task_advice.return_value = ""
+        self.ex.self_improve.run_post_task_review.return_value = None
+
+    def _task(self, n, tool_pool):
+        """One simulated task: deploys from its own thread and from a shared pool."""
+        ctx = self.ex.begin_task(f"task_{n}", source="dashboard" if n % 2 else "imessage")
+        try:
+            tasks = [f"t{n}-{i}" + ("-fail" if i % 3 == 0 else "") for i in range(4)]
+            self.ex._deploy_agent("coder", tasks[0])
+            futures = [tool_pool.submit(self.ex.execute, "deploy_system_agent", {"task": t}, ctx)
+                       for t in tasks[1:]]
+            [f.result() for f in futures]
+            summary = self.ex._get_failure_summary()
+            return n, ctx.deployments(), summary, self.ex.get_reply_source()
+        finally:
+            self.ex.end_task(f"task_{n}")
+
+    def test_many_concurrent_tasks_stay_isolated(self):
+        with ThreadPoolExecutor(max_workers=8, thread_name_prefix="tool") as tool_pool, \
+                ThreadPoolExecutor(max_workers=12, thread_name_prefix="task") as task_pool:
+            results = list(task_pool.map(lambda n: self._task(n, tool_pool), range(48)))
+
+        for n, log, summary, source in results:
+            self.assertEqual(len(log), 4)
+            self.assertTrue(all(d["task"].startswith(f"t{n}-") for d in log), log)
+            self.assertEqual(sum(1 for d in log if not d["success"]), 2)
+            self.assertIn(f"t{n}-0-fail", summary)
+            self.assertNotIn(f"t{(n + 1) % 48}-", summary)
+            self.assertEqual(source, "dashboard" if n % 2 else "imessage")
+        self.assertGreater(StubAgent.peak, 1)
+        self.assertEqual(self.ex.active_contexts(), [])
+
+    def test_parallel_deploys_respect_budget(self):
+        ctx = self.ex.begin_task("greedy")
+        try:
+            deploy = self.ex.bind_task_context(lambda i: self.ex._deploy_agent("coder", f"job {i}"))
+            with ThreadPoolExecutor(max_workers=10) as pool:
+                results = list(pool.map(deploy, range(20)))
+        finally:
+            self.ex.end_task("greedy")
+        self.assertEqual(sum(1 for r in results if r.get("success")), 6)
+        self.assertEqual(len(ctx.deployments()), 6)
+        self.assertTrue(all("LIMIT REACHED" in r["content"] for r in results if not r.get("success")))
+
+    def test_cancel_stops_only_that_task(self):
+        a = self.ex.begin_task("a")
+        b = TaskContext("b", parent_kill=self.kill)
+        self.assertTrue(self.ex.cancel_task("a"))
+        self.assertTrue(self.ex.kill_event.is_set())
+        result = self.ex._deploy_agent("coder", "after cancel")
+        self.assertFalse(result["success"])
+        self.assertTrue(self.ex._deploy_agent("coder", "other task", ctx=b)["success"])
+        self.ex.end_task("a")
+        self.assertFalse(self.ex.cancel_task("a"))
+        self.assertTrue(a.cancelled)
+
+    def test_global_kill_reaches_every_task(self):
+        ctx = self.ex.begin_task("x")
+        self.kill.set()
+        try:
+            self.assertTrue(ctx.cancelled)
+            self.assertFalse(self.ex._deploy_agent("coder", "anything")["success"])
+        finally:
+            self.kill.clear()
+            self.ex.end_task("x")
+
+
+if __name__ == "__main__":
+    unittest.main()
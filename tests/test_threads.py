@@ -0,0 +1,178 @@
+"""
+╔══════════════════════════════════════════╗
+║     TARS — Test Suite: Thread Journal     ║
+╚══════════════════════════════════════════╝
+
+Tests ThreadManager persistence: append-only journal per
+mutation, snapshot compaction, crash-safe replay (torn lines,
+crash mid-compaction), archiving instead of dropping, and
+loading legacy threads.json snapshots.
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.threads import ThreadManager
+
+
+class _Base(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.tmp, name)
+
+    def journal_lines(self):
+        if not os.path.exists(self.path(ThreadManager.JOURNAL_FILE)):
+            return []
+        with open(self.path(ThreadManager.JOURNAL_FILE)) as f:
+            return f.read().splitlines()
+
+    def populate(self, tm):
+        t = tm.route_message("search flights to NYC", "TASK", 0.9)
+        tm.set_task("search flights", "working")
+        tm.add_subtasks([{"description": "search", "agent": "browser"},
+                         {"description": "report", "agent": "research", "depends_on": [1]}])
+        tm.update_subtask(1, "completed", "found 3 flights")
+        tm.log_decision("deploy_browser_agent", "needs a browser", 85)
+        tm.update_decision_outcome("success")
+        tm.record_response("Found 3 flights")
+        tm.record_escalation()
+        tm.route_message("did it work?", "FOLLOW_UP", 0.8)
+        return t
+
+
+class TestJournal(_Base):
+    """Each mutation appends one journal record."""
+
+    def test_one_record_per_mutation(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        tm.route_message("search flights to NYC", "TASK", 0.9)
+        before = len(self.journal_lines())
+        for i in range(5):
+            tm.record_response(f"reply {i}")
+        self.assertEqual(len(self.journal_lines()), before + 5)
+
+    def test_no_snapshot_rewrite_per_message(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        for i in range(10):
+            tm.route_message(f"task number {i}", "TASK")
+        self.assertFalse(os.path.exists(self.path(ThreadManager.SNAPSHOT_FILE)))
+
+    def test_replay_restores_full_state(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        t = self.populate(tm)
+
+        restored = ThreadManager(persistence_dir=self.tmp)
+        r = restored._threads[t.id]
+        self.assertEqual(restored._active_thread_id, t.id)
+        self.assertEqual([m.text for m in r.messages], [m.text for m in t.messages])
+        self.assertEqual(r.active_task, "search flights")
+        self.assertEqual([s.status for s in r.subtasks], ["completed", "pending"])
+        self.assertEqual(r.subtasks[0].result, "found 3 flights")
+        self.assertEqual(r.subtasks[1].depends_on, [1])
+        self.assertEqual(r.decisions[-1].outcome, "success")
+        self.assertEqual(r.decisions[-1].reasoning, "needs a browser")
+        self.assertEqual(r.escalation_count, 1)
+
+    def test_torn_final_line_is_ignored(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        t = tm.route_message("search flights to NYC", "TASK")
+        with open(self.path(ThreadManager.JOURNAL_FILE), "a") as f:
+            f.write('{"op": "message", "id": "')
+        restored = ThreadManager(persistence_dir=self.tmp)
+        self.assertIn(t.id, restored._threads)
+
+
+class TestCompaction(_Base):
+    """Snapshots bound the journal; replay never double-applies."""
+
+    def test_compaction_truncates_journal(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        tm.COMPACT_EVERY = 10
+        t = tm.route_message("search flights to NYC", "TASK")
+        for i in range(25):
+            tm.record_response(f"reply {i}")
+        self.assertTrue(os.path.exists(self.path(ThreadManager.SNAPSHOT_FILE)))
+        self.assertLess(len(self.journal_lines()), 10)
+
+        restored = ThreadManager(persistence_dir=self.tmp)
+        self.assertEqual(restored._threads[t.id].message_count, 26)
+
+    def test_crash_between_snapshot_and_truncate(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        t = tm.route_message("search flights to NYC", "TASK")
+        tm.record_response("reply")
+        stale = self.journal_lines()
+        tm.compact()
+        # Simulate the journal surviving the snapshot (crash before truncation)
+        with open(self.path(ThreadManager.JOURNAL_FILE), "w") as f:
+            f.write("\n".join(stale) + "\n")
+        restored = ThreadManager(persistence_dir=self.tmp)
+        self.assertEqual(restored._threads[t.id].message_count, 2)
+
+    def test_startup_compacts_replayed_journal(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        self.populate(tm)
+        ThreadManager(persistence_dir=self.tmp)
+        self.assertEqual(self.journal_lines(), [])
+        self.assertTrue(os.path.exists(self.path(ThreadManager.SNAPSHOT_FILE)))
+
+
+class TestArchive(_Base):
+    """Threads beyond MAX_THREADS are archived, not dropped."""
+
+    def test_old_threads_archived(self):
+        tm = ThreadManager(persistence_dir=self.tmp)
+        tm.MAX_THREADS = 3
+        first = tm.route_message("research electric cars", "TASK")
+        tm.record_response("Here is the research")
+        for i in range(4):
+            tm.route_message(f"task number {i}", "TASK")
+        self.assertNotIn(first.id, tm._threads)
+        archived = tm.get_archived_thread(first.id)
+        self.assertIsNotNone(archived)
+        self.assertEqual(archived.message_count, 2)
+
+        restored = ThreadManager(persistence_dir=self.tmp)
+        self.assertNotIn(first.id, restored._threads)
+        self.assertEqual(len(restored._threads), 3)
+
+
+class TestLegacySnapshot(_Base):
+    """Pre-journal threads.json files still load."""
+
+    def test_v1_snapshot(self):
+        legacy = {
+            "active_thread_id": "abc12345",
+            "thread_order": ["abc12345"],
+            "threads": {
+                "abc12345": {
+                    "id": "abc12345", "created_at": 1.0, "last_activity": 2.0,
+                    "topic": "Old topic", "task_status": "completed",
+                    "active_task": None, "message_count": 1, "escalation_count": 0,
+                    "messages": [{"role": "user", "text": "hello", "intent": "CONVERSATION"}],
+                    "subtasks": [{"id": 1, "desc": "step", "status": "completed"}],
+                    "decisions": [{"action": "reply", "confidence": 50, "outcome": "done"}],
+                },
+            },
+        }
+        with open(self.path(ThreadManager.SNAPSHOT_FILE), "w") as f:
+            json.dump(legacy, f)
+        tm = ThreadManager(persistence_dir=self.tmp)
+        t = tm._threads["abc12345"]
+        self.assertEqual(t.topic, "Old topic")
+        self.assertEqual(t.messages[0].text, "hello")
+        self.assertEqual(t.subtasks[0].description, "step")
+
+
+if __name__ == "__main__":
+    unittest.main()
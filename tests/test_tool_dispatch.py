@@ -0,0 +1,251 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Tool Dispatch        ║
+╚══════════════════════════════════════════╝
+
+Tests the executor's tool registry and middleware chain:
+schema validation, result caching with invalidation, per-tool
+deadlines, retries for idempotent tools, structured errors,
+latency histograms, and dispatch overhead.
+"""
+
+import unittest
+import threading
+import time
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils import tool_dispatch as tr
+from utils.tool_dispatch import ToolDispatcher, LatencyHistogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRouting(unittest.TestCase):
+    """Lookup, validation and structured errors."""
+
+    def setUp(self):
+        self.errors = []
+        self.reg = ToolDispatcher(
+            schemas={"echo": {"required": ["text"]}},
+            on_error=lambda name, exc, inp: self.errors.append((name, type(exc).__name__)),
+        )
+        self.reg.register("echo", lambda i: {"success": True, "content": i["text"]})
+
+    def test_call_routes_to_handler(self):
+        self.assertEqual(self.reg.call("echo", {"text": "hi"})["content"], "hi")
+        self.assertIn("echo", self.reg)
+        self.assertEqual(self.reg.names(), ["echo"])
+
+    def test_unknown_tool_raises_keyerror(self):
+        with self.assertRaises(KeyError):
+            self.reg.call("nope", {})
+
+    def test_missing_required_param_is_structured_error(self):
+        result = self.reg.call("echo", {})
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error_type"], "invalid_input")
+        self.assertIn("'text'", result["content"])
+
+    def test_handler_exception_becomes_error_result(self):
+        self.reg.register("boom", lambda i: {}["missing"])
+        result = self.reg.call("boom", {})
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error_type"], "KeyError")
+        self.assertEqual(self.errors, [("boom", "KeyError")])
+
+    def test_non_dict_result_is_wrapped(self):
+        self.reg.register("plain", lambda i: "done")
+        self.assertEqual(self.reg.call("plain", {}), {"success": True, "content": "done"})
+
+    def test_non_dict_input_tolerated(self):
+        self.reg.register("noargs", lambda i: {"success": True, "content": str(i)})
+        self.assertEqual(self.reg.call("noargs", None)["content"], "{}")
+
+
+class TestCaching(unittest.TestCase):
+    """Idempotent reads are cached; writes invalidate them."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.reg = ToolDispatcher(clock=self.clock)
+        self.store = {"x": "1"}
+        self.reads = 0
+
+        def read(i):
+            self.reads += 1
+            return {"success": True, "content": self.store.get(i["key"], "")}
+
+        def write(i):
+            self.store[i["key"]] = i["value"]
+            return {"success": True, "content": "saved"}
+
+        self.reg.register("read", read, idempotent=True, cache_ttl=30)
+        self.reg.register("write", write, invalidates=("read",))
+
+    def test_repeat_read_hits_cache(self):
+        self.reg.call("read", {"key": "x"})
+        self.reg.call("read", {"key": "x"})
+        self.assertEqual(self.reads, 1)
+        self.assertEqual(self.reg.stats()["read"]["cached"], 1)
+
+    def test_key_is_order_insensitive(self):
+        self.reg.call("read", {"key": "x", "a": 1})
+        self.reg.call("read", {"a": 1, "key": "x"})
+        self.assertEqual(self.reads, 1)
+
+    def test_ttl_expiry(self):
+        self.reg.call("read", {"key": "x"})
+        self.clock.now += 31
+        self.reg.call("read", {"key": "x"})
+        self.assertEqual(self.reads, 2)
+
+    def test_write_invalidates(self):
+        self.reg.call("read", {"key": "x"})
+        self.reg.call("write", {"key": "x", "value": "2"})
+        self.assertEqual(self.reg.call("read", {"key": "x"})["content"], "2")
+
+    def test_failures_not_cached(self):
+        self.reg.register("flaky", lambda i: {"success": False, "content": "nope"}, idempotent=True, cache_ttl=30)
+        self.reg.call("flaky", {})
+        with mock.patch.object(self.reg.get("flaky"), "handler", return_value={"success": True, "content": "ok"}):
+            self.assertTrue(self.reg.call("flaky", {})["success"])
+
+    def test_non_idempotent_never_cached(self):
+        calls = []
+        self.reg.register("send", lambda i: calls.append(1) or {"success": True, "content": "sent"}, cache_ttl=30)
+        self.reg.call("send", {})
+        self.reg.call("send", {})
+        self.assertEqual(len(calls), 2)
+
+    def test_cached_result_is_a_copy(self):
+        first = self.reg.call("read", {"key": "x"})
+        first["content"] = "mutated"
+        self.assertEqual(self.reg.call("read", {"key": "x"})["content"], "1")
+
+
+class TestDeadlinesAndRetries(unittest.TestCase):
+    """Per-tool deadlines and retry policy."""
+
+    def test_slow_tool_times_out(self):
+        reg = ToolDispatcher()
+        reg.register("slow", lambda i: time.sleep(0.5) or {"success": True, "content": "late"}, timeout=0.05)
+        start = time.time()
+        result = reg.call("slow", {})
+        self.assertLess(time.time() - start, 0.4)
+        self.assertEqual(result["error_type"], "timeout")
+        self.assertEqual(reg.stats()["slow"]["timeout"], 1)
+
+    def test_queued_call_is_cancelled_not_left_to_run(self):
+        ran = []
+        reg = ToolDispatcher()
+        reg.register("slow", lambda i: time.sleep(0.3) or {"success": True, "content": "late"}, timeout=0.05)
+        reg.register("send", lambda i: ran.append(1) or {"success": True, "content": "sent"}, timeout=0.05)
+        with mock.patch.object(tr, "DEADLINE_WORKERS", 1):
+            first = reg.call("slow", {})            # Still holds the only worker
+            second = reg.call("send", {})
+        self.assertIn("Do NOT retry", first["content"])
+        self.assertIn("not started", second["content"])
+        self.assertEqual(second["error_type"], "timeout")
+        time.sleep(0.4)
+        self.assertEqual(ran, [])
+
+    def test_context_follows_call_onto_deadline_thread(self):
+        local = threading.local()
+        local.source = "dashboard"
+
+        def wrap(fn):
+            source = local.source
+            def run():
+                local.source = source
+                return fn()
+            return run
+
+        reg = ToolDispatcher(wrap_context=wrap)
+        reg.register("who", lambda i: {"success": True, "content": getattr(local, "source", "?")}, timeout=1)
+        self.assertEqual(reg.call("who", {})["content"], "dashboard")
+
+    def test_idempotent_tool_retried(self):
+        attempts = []
+
+        def flaky(i):
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise ConnectionError("reset")
+            return {"success": True, "content": "ok"}
+
+        reg = ToolDispatcher()
+        reg.register("search", flaky, idempotent=True, retries=2)
+        with mock.patch.object(tr, "RETRY_BACKOFF", 0.0):
+            self.assertTrue(reg.call("search", {})["success"])
+        self.assertEqual(len(attempts), 2)
+
+    def test_side_effecting_tool_not_retried(self):
+        attempts = []
+        reg = ToolDispatcher()
+        reg.register("send", lambda i: attempts.append(1) or 1 / 0, retries=3)
+        self.assertFalse(reg.call("send", {})["success"])
+        self.assertEqual(len(attempts), 1)
+
+
+class TestHistogram(unittest.TestCase):
+    """Latency histograms and percentiles."""
+
+    def test_percentiles(self):
+        h = LatencyHistogram()
+        for _ in range(90):
+            h.record(0.02)
+        for _ in range(10):
+            h.record(3.0)
+        self.assertEqual(h.percentile(50), 0.05)
+        self.assertEqual(h.percentile(95), 5)
+        snap = h.snapshot()
+        self.assertEqual(snap["count"], 100)
+        self.assertEqual(snap["buckets"], {"0.05": 90, "5": 10})
+
+    def test_overflow_bucket_reports_max(self):
+        h = LatencyHistogram()
+        h.record(900.0)
+        self.assertEqual(h.percentile(99), 900.0)
+
+    def test_registry_records_every_outcome(self):
+        clock = FakeClock()
+        reg = ToolDispatcher(clock=clock)
+
+        def work(i):
+            clock.now += 0.2
+            return {"success": i.get("ok", True), "content": ""}
+
+        reg.register("work", work)
+        reg.call("work", {})
+        reg.call("work", {"ok": False})
+        stats = reg.stats()["work"]
+        self.assertEqual((stats["count"], stats["ok"], stats["error"]), (2, 1, 1))
+        self.assertEqual(stats["p50"], 0.25)
+
+
+class TestDispatchOverhead(unittest.TestCase):
+    """Benchmark: a late tool costs a dict lookup, not a 50-way chain."""
+
+    def test_overhead_is_flat(self):
+        reg = ToolDispatcher()
+        for n in range(60):
+            reg.register(f"tool_{n}", lambda i: {"success": True, "content": ""})
+        for name in ("tool_0", "tool_59"):
+            start = time.perf_counter()
+            for _ in range(2000):
+                reg.call(name, {})
+            per_call = (time.perf_counter() - start) / 2000
+            self.assertLess(per_call, 0.0005, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
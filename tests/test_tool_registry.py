@@ -0,0 +1,129 @@
+"""
+╔══════════════════════════════════════════╗
+║     TARS — Test Suite: Tool Registry      ║
+╚══════════════════════════════════════════╝
+
+Tests precomputed tool subsets: selection parity with the old
+pruning rules, interning/fingerprints, token weights, budget
+fallback, and fingerprint-keyed schema conversion caching.
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.tools import (
+    TARS_TOOLS, _CORE_TOOLS, ToolSubset, ToolRegistry, get_tools_for_intent,
+)
+from brain.intent import Intent
+
+
+def _task(*hints):
+    return Intent(type="TASK", confidence=0.9, domain_hints=list(hints))
+
+
+class TestSubsetSelection(unittest.TestCase):
+    """Selection rules match the original get_tools_for_intent()."""
+
+    def test_none_returns_all_tools(self):
+        tools = get_tools_for_intent(None)
+        self.assertEqual(len(tools), len(TARS_TOOLS))
+
+    def test_conversation_returns_core(self):
+        tools = get_tools_for_intent(Intent(type="CONVERSATION", confidence=0.9))
+        self.assertEqual(set(tools.names), _CORE_TOOLS)
+
+    def test_task_with_domains_is_pruned(self):
+        tools = get_tools_for_intent(_task("coding", "web"))
+        self.assertLess(len(tools), len(TARS_TOOLS))
+        self.assertIn("deploy_coder_agent", tools.names)
+        self.assertIn("web_search", tools.names)
+        self.assertIn("verify_result", tools.names)
+
+    def test_task_without_hints_returns_all(self):
+        self.assertEqual(len(get_tools_for_intent(_task())), len(TARS_TOOLS))
+
+    def test_order_follows_tars_tools(self):
+        order = [t["name"] for t in TARS_TOOLS]
+        names = get_tools_for_intent(_task("research")).names
+        self.assertEqual(names, sorted(names, key=order.index))
+
+
+class TestSubsetCaching(unittest.TestCase):
+    """Subsets are built once per key and interned by fingerprint."""
+
+    def test_same_key_returns_same_object(self):
+        a = get_tools_for_intent(_task("web", "coding"))
+        b = get_tools_for_intent(_task("Coding", "web"))
+        self.assertIs(a, b)
+
+    def test_fingerprint_is_stable_and_distinct(self):
+        reg1, reg2 = ToolRegistry(), ToolRegistry()
+        self.assertEqual(reg1.full.fingerprint, reg2.full.fingerprint)
+        self.assertNotEqual(reg1.full.fingerprint, reg1.core.fingerprint)
+
+    def test_lookup_by_fingerprint(self):
+        reg = ToolRegistry()
+        subset = reg.subset_for(_task("files"))
+        self.assertIs(reg.get(subset.fingerprint), subset)
+
+    def test_subset_is_immutable(self):
+        subset = get_tools_for_intent(None)
+        self.assertIsInstance(subset, tuple)
+        with self.assertRaises(TypeError):
+            subset[0] = {}
+
+    def test_token_weight_reported(self):
+        reg = ToolRegistry()
+        self.assertGreater(reg.full.token_weight, reg.core.token_weight)
+        stats = reg.stats()
+        self.assertEqual(stats["subsets"][0]["label"], "core")
+
+
+class TestTokenBudget(unittest.TestCase):
+    """Budget-aware fallback to leaner subsets."""
+
+    def setUp(self):
+        self.reg = ToolRegistry()
+
+    def test_no_budget_keeps_preferred(self):
+        self.assertIs(self.reg.subset_for(None), self.reg.full)
+
+    def test_tight_budget_falls_back_to_core(self):
+        subset = self.reg.subset_for(None, token_budget=self.reg.core.token_weight)
+        self.assertIs(subset, self.reg.core)
+
+    def test_budget_prefers_domain_subset_over_core(self):
+        preferred = self.reg.subset_for(_task("web", "coding"))
+        subset = self.reg.subset_for(_task("web", "coding"), token_budget=preferred.token_weight)
+        self.assertIs(subset, preferred)
+
+
+class TestConversionCache(unittest.TestCase):
+    """LLM client converts each fingerprinted subset once."""
+
+    def test_openai_conversion_cached(self):
+        from brain.llm_client import _convert_tools_cached
+        calls = []
+
+        def convert(tools):
+            calls.append(1)
+            return [t["name"] for t in tools]
+
+        subset = ToolSubset(TARS_TOOLS[:3], label="test")
+        first = _convert_tools_cached("test", subset, convert)
+        second = _convert_tools_cached("test", subset, convert)
+        self.assertIs(first, second)
+        self.assertEqual(len(calls), 1)
+
+    def test_plain_list_not_cached(self):
+        from brain.llm_client import _convert_tools_cached
+        calls = []
+        _convert_tools_cached("test", TARS_TOOLS[:2], lambda t: calls.append(1))
+        _convert_tools_cached("test", TARS_TOOLS[:2], lambda t: calls.append(1))
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+╔══════════════════════════════════════════╗
+║   TARS — Test Suite: Tool Scheduler       ║
+╚══════════════════════════════════════════╝
+
+Tests resource-aware parallel tool execution in the brain:
+conflict model, ordering of conflicting calls, barriers,
+in-order results, and per-batch speedup metrics.
+"""
+
+import unittest
+import tempfile
+import shutil
+import threading
+import time
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from brain.tools import tool_resources, resources_conflict
+from brain.threads import ThreadManager
+from brain.llm_client import ContentBlock
+from utils.event_bus import event_bus
+
+
+class RecordingExecutor:
+    """Tool executor stub: sleeps per tool and records start/end order."""
+
+    max_deployments = 15
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.log = []
+        self._lock = threading.Lock()
+
+    def execute(self, name, inp):
+        with self._lock:
+            self.log.append(("start", name, inp.get("tag")))
+        time.sleep(self.delay)
+        with self._lock:
+            self.log.append(("end", name, inp.get("tag")))
+        return {"success": True, "content": f"{name}:{inp.get('tag')}"}
+
+
+def _block(name, tag, **inp):
+    inp["tag"] = tag
+    return ContentBlock("tool_use", name=name, input_data=inp, block_id=f"id_{tag}")
+
+
+def _make_brain(tmp, executor):
+    from brain.planner import TARSBrain
+    brain = TARSBrain.__new__(TARSBrain)
+    brain.tool_executor = executor
+    brain.threads = ThreadManager(persistence_dir=os.path.join(tmp, "threads"))
+    brain.max_retries = 3
+    brain._tool_pool = ThreadPoolExecutor(max_workers=8)
+    return brain
+
+
+class TestResourceModel(unittest.TestCase):
+    """Conflict rules between declared resources."""
+
+    def test_two_browser_deploys_conflict(self):
+        a = tool_resources("deploy_browser_agent")
+        self.assertTrue(resources_conflict(a, a))
+
+    def test_reads_of_same_file_dont_conflict(self):
+        a = tool_resources("quick_read_file", {"path": "/tmp/a"})
+        self.assertFalse(resources_conflict(a, a))
+
+    def test_file_read_conflicts_with_file_agent(self):
+        read = tool_resources("quick_read_file", {"path": "/tmp/a"})
+        write = tool_resources("deploy_file_agent", {"task": "edit"})
+        self.assertTrue(resources_conflict(read, write))
+
+    def test_unrelated_tools_dont_conflict(self):
+        self.assertFalse(resources_conflict(
+            tool_resources("web_search"), tool_resources("deploy_browser_agent")))
+        self.assertFalse(resources_conflict(
+            tool_resources("mac_mail"), tool_resources("deploy_browser_agent")))
+
+    def test_shell_commands_are_serialized_with_writers(self):
+        shell = tool_resources("run_quick_command", {"command": "ls"})
+        self.assertTrue(resources_conflict(shell, shell))
+        self.assertTrue(resources_conflict(shell, tool_resources("deploy_file_agent")))
+        self.assertTrue(resources_conflict(shell, tool_resources("generate_report")))
+        self.assertTrue(resources_conflict(shell, tool_resources("quick_read_file", {"path": "/tmp/a"})))
+
+    def test_unknown_tool_conflicts_with_everything(self):
+        self.assertTrue(resources_conflict(
+            tool_resources("mystery_tool"), tool_resources("recall_memory")))
+
+
+class TestScheduling(unittest.TestCase):
+    """Execution order and concurrency of a batch."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.executor = RecordingExecutor(delay=0.1)
+        self.brain = _make_brain(self.tmp, self.executor)
+        self.batches = []
+        self._cb = lambda data: self.batches.append(data)
+        event_bus.subscribe_sync("tool_batch", self._cb)
+
+    def tearDown(self):
+        event_bus.unsubscribe_sync("tool_batch", self._cb)
+        self.brain._tool_pool.shutdown(wait=True)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _run(self, blocks):
+        start = time.time()
+        results = self.brain._execute_tool_calls(blocks, 0, None, None)
+        return results, time.time() - start
+
+    def test_independent_calls_run_concurrently(self):
+        blocks = [
+            _block("web_search", "a", query="x"),
+            _block("deploy_browser_agent", "b", task="t"),
+            _block("mac_mail", "c", action="list"),
+        ]
+        _, elapsed = self._run(blocks)
+        self.assertLess(elapsed, 0.25)
+        self.assertTrue(self.batches[-1]["parallel"])
+        self.assertGreater(self.batches[-1]["speedup"], 1.5)
+
+    def test_one_conflict_does_not_serialize_batch(self):
+        blocks = [
+            _block("deploy_browser_agent", "a", task="t1"),
+            _block("deploy_browser_agent", "b", task="t2"),
+            _block("web_search", "c", query="x"),
+        ]
+        _, elapsed = self._run(blocks)
+        # Browser pair is serial (~0.2s); search overlaps with it
+        self.assertLess(elapsed, 0.28)
+        starts = [tag for kind, name, tag in self.executor.log if kind == "start" and name == "deploy_browser_agent"]
+        self.assertEqual(starts, ["a", "b"])
+        a_end = self.executor.log.index(("end", "deploy_browser_agent", "a"))
+        b_start = self.executor.log.index(("start", "deploy_browser_agent", "b"))
+        self.assertLess(a_end, b_start)
+
+    def test_dependent_tool_is_barrier(self):
+        blocks = [
+            _block("web_search", "a", query="x"),
+            _block("send_imessage", "b", message="Here are the final results you asked for: ..."),
+        ]
+        self._run(blocks)
+        a_end = self.executor.log.index(("end", "web_search", "a"))
+        b_start = self.executor.log.index(("start", "send_imessage", "b"))
+        self.assertLess(a_end, b_start)
+
+    def test_results_in_original_order(self):
+        self.executor.delay = 0.0
+        blocks = [_block("web_search", str(i), query=str(i)) for i in range(5)]
+        results, _ = self._run(blocks)
+        self.assertEqual([r["tool_use_id"] for r in results], [f"id_{i}" for i in range(5)])
+
+    def test_serial_batch_runs_inline(self):
+        blocks = [
+            _block("deploy_browser_agent", "a", task="t1"),
+            _block("deploy_screen_agent", "b", task="t2"),
+        ]
+        self._run(blocks)
+        self.assertFalse(self.batches[-1]["parallel"])
+
+    def test_executor_exception_becomes_error_result(self):
+        def boom(name, inp):
+            raise RuntimeError("kaput")
+        self.executor.execute = boom
+        results, _ = self._run([_block("web_search", "a", query="x"), _block("recall_memory", "b", query="y")])
+        self.assertIn("kaput", results[0]["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
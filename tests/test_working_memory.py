@@ -0,0 +1,190 @@
+"""
+╔══════════════════════════════════════════╗
+║  TARS — Test Suite: Agent Working Memory  ║
+╚══════════════════════════════════════════╝
+
+Tests budgeted transcript compaction for agents: fact extraction,
+eviction order, pinning of recent/small results, the Working Notes
+block, recall by ref, and tokens sent per step over a replayed
+40-step research run.
+"""
+
+import unittest
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from memory.working_memory import WorkingMemory, extract_facts, transcript_tokens
+from agents.base_agent import BaseAgent
+
+
+def _page(n, filler=400):
+    """A fetched page: one fact line buried in prose."""
+    prose = " ".join("lorem ipsum dolor sit amet consectetur" for _ in range(filler // 6))
+    return f"## Page {n}\n{prose}\nRevenue for segment {n}: ${n * 10}.5 million (2025)\n{prose}"
+
+
+def _transcript(mem, steps, size=400):
+    messages = [{"role": "user", "content": "Complete this task:\n\nresearch segment revenue"}]
+    for step in range(1, steps + 1):
+        tid = f"call_{step}"
+        messages.append({"role": "assistant", "content": [
+            SimpleNamespace(type="tool_use", name="browse", input={"url": f"https://ex.com/{step}"}, id=tid)]})
+        messages.append({"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": tid, "content": _page(step, size)}]})
+        mem.track(tid, step, "browse", {"url": f"https://ex.com/{step}"})
+    return messages
+
+
+class TestExtractFacts(unittest.TestCase):
+
+    def test_prefers_figures_urls_and_key_values(self):
+        text = ("Some intro text without much in it at all.\n"
+                "Price: $245.10\n"
+                "See https://example.com/report for details\n"
+                "More filler that is fairly generic.\n"
+                "Founded in 2003 by two engineers")
+        facts = extract_facts(text)
+        self.assertEqual(facts, ["Price: $245.10", "See https://example.com/report for details",
+                                 "Founded in 2003 by two engineers"])
+
+    def test_errors_kept_as_single_fact(self):
+        self.assertEqual(extract_facts("ERROR: timed out\nretry later 3x"), ["ERROR: timed out"])
+
+    def test_limit_keeps_best_in_order(self):
+        text = "\n".join(f"value {i}: {i}" for i in range(20))
+        self.assertEqual(len(extract_facts(text, limit=4)), 4)
+
+
+class TestCompaction(unittest.TestCase):
+
+    def test_under_budget_is_untouched(self):
+        mem = WorkingMemory(token_budget=10 ** 6)
+        messages = _transcript(mem, 5)
+        self.assertEqual(mem.compact(messages, step=6), 0)
+        self.assertEqual(mem.notes_block(), "")
+        self.assertFalse(mem.has_evicted)
+
+    def test_evicts_oldest_until_under_budget(self):
+        mem = WorkingMemory(token_budget=4000, keep_recent=2)
+        messages = _transcript(mem, 10)
+        evicted = mem.compact(messages, step=11)
+        self.assertGreater(evicted, 0)
+        self.assertLessEqual(transcript_tokens("", messages), 4000)
+        contents = [m["content"][0]["content"] for m in messages[2::2]]
+        self.assertTrue(contents[0].startswith("[r1 compacted"))
+        self.assertTrue(all("compacted" not in c for c in contents[-2:]))
+
+    def test_recent_results_are_pinned(self):
+        mem = WorkingMemory(token_budget=10, keep_recent=3)
+        messages = _transcript(mem, 3)
+        self.assertEqual(mem.compact(messages, step=4), 0)
+
+    def test_relevant_results_outlive_unrelated_ones(self):
+        mem = WorkingMemory(token_budget=4600, keep_recent=1)
+        messages = _transcript(mem, 5)
+        messages[2]["content"][0]["content"] += " quantum widget"
+        self.assertEqual(mem.compact(messages, step=6, focus="quantum widget"), 2)
+        compacted = ["compacted" in m["content"][0]["content"] for m in messages[2::2]]
+        self.assertEqual(compacted, [False, True, True, False, False])
+
+    def test_notes_and_recall(self):
+        mem = WorkingMemory(token_budget=2000, keep_recent=1)
+        messages = _transcript(mem, 6)
+        mem.compact(messages, step=6)
+        notes = mem.notes_block()
+        self.assertIn("[r1] browse(\"https://ex.com/1\"): ## Page 1 | Revenue", notes)
+        self.assertIn("Revenue for segment 1: $10.5 million (2025)", notes)
+        self.assertEqual(mem.recall("r1").split("\n", 1)[1], _page(1))
+        self.assertIn("still in the conversation", mem.recall("r6"))
+        self.assertTrue(mem.recall("r99").startswith("ERROR"))
+
+    def test_notes_block_is_bounded(self):
+        mem = WorkingMemory(token_budget=100, notes_budget=200, keep_recent=1)
+        messages = _transcript(mem, 30)
+        mem.compact(messages, step=30)
+        notes = mem.notes_block()
+        self.assertLess(transcript_tokens(notes, []), 320)
+        self.assertIn("[r28]", notes)
+        self.assertNotIn("[r1]", notes)
+        self.assertIn("Older: r1, r2", notes)
+
+    def test_screenshots_lose_their_image(self):
+        mem = WorkingMemory(token_budget=100, keep_recent=1)
+        messages = _transcript(mem, 3)
+        messages[2]["content"][0]["_image_base64"] = "aGVsbG8="
+        mem.compact(messages, step=3)
+        self.assertNotIn("_image_base64", messages[2]["content"][0])
+
+
+class _ReplayClient:
+    """Replays a research run: one browse per step, then recall, then done."""
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.calls = 0
+        self.systems = []
+        self.tool_names = []
+        self.last_results = []
+
+    def create(self, system, tools, messages, **kwargs):
+        self.calls += 1
+        self.systems.append(system)
+        self.tool_names.append({t["name"] for t in tools})
+        last = messages[-1]["content"]
+        if isinstance(last, list):
+            self.last_results = [r["content"] for r in last]
+        n = self.calls
+        if n <= self.steps:
+            block = SimpleNamespace(type="tool_use", name="browse", input={"url": f"https://ex.com/{n}"}, id=f"c{n}")
+        elif n == self.steps + 1:
+            block = SimpleNamespace(type="tool_use", name="recall_result", input={"ref": "r1"}, id="recall")
+        else:
+            block = SimpleNamespace(type="tool_use", name="done", input={"summary": "Collected revenue for every segment."}, id="done")
+        return SimpleNamespace(content=[block], stop_reason="tool_use")
+
+
+class _PageAgent(BaseAgent):
+    agent_name = "Page Agent"
+    agent_emoji = "📄"
+    system_prompt = "Read pages."
+    tools = [{"name": "browse"}, {"name": "done"}, {"name": "stuck"}]
+    CONTEXT_TOKEN_BUDGET = 6000
+    _loop_detection_repeats = 1000     # One tool, every step, by design
+
+    def _dispatch(self, name, inp):
+        return _page(int(inp["url"].rsplit("/", 1)[1]), filler=600)
+
+
+class TestReplayedRun(unittest.TestCase):
+    """Tokens sent per step stay flat over a long run, and facts survive."""
+
+    def test_long_run_stays_in_budget(self):
+        steps = 38
+        client = _ReplayClient(steps)
+        agent = _PageAgent(client, "stub-model", max_steps=steps + 2)
+        result = agent.run("research segment revenue")
+        self.assertTrue(result["success"])
+
+        stats = agent.working_memory.stats()
+        sent = agent.working_memory._sent
+        self.assertEqual(stats["steps"], steps + 2)
+        # Uncompacted, step k would resend all k pages fetched so far
+        page = transcript_tokens("", [{"role": "user", "content": _page(1, 600)}])
+        uncompacted = sum(page * k for k in range(steps))
+        self.assertLess(stats["tokens_sent"], uncompacted / 3)
+        # Uncompacted, steps 15→38 would add 23 more pages
+        self.assertLess(sent[steps - 1] - sent[14], 2 * page)
+        self.assertGreater(stats["evicted"], 30)
+
+        # Early facts still reach the model, and the recall tool is offered
+        self.assertIn("Revenue for segment 5: $50.5 million", client.systems[-1])
+        self.assertIn("recall_result", client.tool_names[-1])
+        self.assertNotIn("recall_result", client.tool_names[0])
+        self.assertEqual(client.last_results[0].split("\n", 1)[1], _page(1, 600))
+        self.assertEqual(stats["recalls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,6 +25,8 @@ class EventBus:
         self._sync_lock = threading.Lock()
         self.history = deque(maxlen=max_history)  # Recent events for new clients
         self._loop = None
+        self._pending_sends = 0        # WebSocket sends queued on the loop, not yet done
+        self._pending_lock = threading.Lock()
         self._stats = {
             "total_events": 0,
             "total_tokens_in": 0,
@@ -44,6 +46,15 @@ class EventBus:
     def stats(self):
         return self._stats
 
+    @property
+    def pending_sends(self):
+        """Undelivered WebSocket sends — a downstream backpressure signal."""
+        return self._pending_sends
+
+    def _send_done(self, _future):
+        with self._pending_lock:
+            self._pending_sends -= 1
+
     def emit(self, event_type, data=None):
         """Emit an event to all subscribers and history."""
         event = {
@@ -67,7 +78,10 @@ class EventBus:
             for ws_send in self.subscribers:
                 try:
                     if self._loop and self._loop.is_running():
-                        asyncio.run_coroutine_threadsafe(ws_send(message), self._loop)
+                        future = asyncio.run_coroutine_threadsafe(ws_send(message), self._loop)
+                        with self._pending_lock:
+                            self._pending_sends += 1
+                        future.add_done_callback(self._send_done)
                 except Exception:
                     dead.append(ws_send)
             for d in dead:
@@ -151,5 +165,94 @@ class EventBus:
         return stats
 
 
+class StreamCoalescer:
+    """Batches high-frequency stream deltas into fewer bus events.
+
+    Deltas are buffered and emitted as one event (data["text"] is the
+    concatenation) when the buffer reaches max_chars, when a new delta
+    arrives and the oldest buffered one is older than the current
+    window, or on flush() — called at tool-call boundaries and at
+    stream end. There is no timer: text buffered before the stream
+    stalls waits for the next delta or flush().
+
+    The window adapts to downstream backpressure: it doubles while the
+    bus has many undelivered WebSocket sends or emits are slow, and
+    decays back toward min_window once consumers catch up.
+    """
+
+    def __init__(self, bus, event_type, base_data=None, min_window=0.05,
+                 max_window=0.5, max_chars=1024, backpressure_high=32,
+                 clock=time.monotonic):
+        self._bus = bus
+        self.event_type = event_type
+        self._base = dict(base_data or {})
+        self.min_window = min_window
+        self.max_window = max_window
+        self.window = min_window
+        self.max_chars = max_chars
+        self.backpressure_high = backpressure_high
+        self._clock = clock
+        self._buffer = []
+        self._chars = 0
+        self._count = 0
+        self._first_ts = 0.0
+        self.stats = {
+            "deltas": 0,
+            "events": 0,
+            "max_latency": 0.0,
+            "total_latency": 0.0,
+            "flush_reasons": {},
+        }
+
+    def add(self, text):
+        """Buffer one delta; emits if the size or time threshold is hit."""
+        if not text:
+            return
+        now = self._clock()
+        if not self._buffer:
+            self._first_ts = now
+        self._buffer.append(text)
+        self._chars += len(text)
+        self._count += 1
+        self.stats["deltas"] += 1
+        if self._chars >= self.max_chars:
+            self.flush("size")
+        elif now - self._first_ts >= self.window:
+            self.flush("window")
+
+    def flush(self, reason="boundary"):
+        """Emit everything buffered as a single event."""
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        deltas = self._count
+        latency = self._clock() - self._first_ts
+        self._buffer = []
+        self._chars = 0
+        self._count = 0
+
+        emit_start = self._clock()
+        self._bus.emit(self.event_type, {**self._base, "text": text, "deltas": deltas})
+        self._adapt(self._clock() - emit_start)
+
+        self.stats["events"] += 1
+        self.stats["total_latency"] += latency
+        self.stats["max_latency"] = max(self.stats["max_latency"], latency)
+        reasons = self.stats["flush_reasons"]
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    def close(self):
+        """Flush the tail at stream end and return stats."""
+        self.flush("end")
+        return self.stats
+
+    def _adapt(self, emit_cost):
+        pending = getattr(self._bus, "pending_sends", 0)
+        if pending >= self.backpressure_high or emit_cost > self.window / 4:
+            self.window = min(self.max_window, self.window * 2)
+        elif pending == 0:
+            self.window = max(self.min_window, self.window * 0.75)
+
+
 # Singleton
 event_bus = EventBus()
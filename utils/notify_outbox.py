@@ -0,0 +1,228 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Notification Outbox           ║
+╚══════════════════════════════════════════╝
+
+Agent progress messages go through one background sender instead
+of an osascript subprocess on each agent's own thread.
+
+  - post() only queues the message and returns. Agents never wait
+    on iMessage.
+  - One sender thread delivers in FIFO order, with at least
+    MIN_INTERVAL seconds between sends to the same phone.
+  - Progress messages coalesce: if an agent's earlier progress
+    update is still queued, the new one replaces its text in place,
+    so only the latest is sent. Start/done/stuck messages never
+    coalesce and are never dropped for space.
+  - The sink is pluggable: OsascriptSink in production, MemorySink
+    for tests and Linux, or any callable(phone, message).
+"""
+
+import time
+import atexit
+import logging
+import threading
+import subprocess
+from collections import deque
+from dataclasses import dataclass
+
+logger = logging.getLogger("TARS")
+
+MIN_INTERVAL = 1.0          # Seconds between sends to one phone
+MAX_PENDING = 200           # Queue cap; oldest progress updates are dropped past it
+SEND_TIMEOUT = 10           # Seconds allowed per osascript send
+EXIT_FLUSH_SECONDS = 5.0    # On interpreter exit, wait this long for pending sends
+
+
+class OsascriptSink:
+    """Sends through Messages.app with osascript."""
+
+    # Use argv to avoid AppleScript injection — message never enters eval context
+    _SCRIPT = '''
+    on run argv
+        set msg to item 1 of argv
+        tell application "Messages"
+            set targetService to 1st account whose service type = iMessage
+            set targetBuddy to participant (item 2 of argv) of targetService
+            send msg to targetBuddy
+        end tell
+    end run
+    '''
+
+    def __call__(self, phone, message):
+        subprocess.run(["osascript", "-e", self._SCRIPT, message, phone],
+                       capture_output=True, text=True, timeout=SEND_TIMEOUT)
+
+
+class MemorySink:
+    """Records sends in memory — for tests and machines without Messages."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []              # [(phone, message, monotonic time)]
+        self._lock = threading.Lock()
+
+    def __call__(self, phone, message):
+        if self.delay:
+            time.sleep(self.delay)
+        with self._lock:
+            self.sent.append((phone, message, time.monotonic()))
+
+    def messages(self, phone=None):
+        with self._lock:
+            return [m for p, m, _ in self.sent if phone is None or p == phone]
+
+
+@dataclass
+class _Pending:
+    phone: str
+    message: str
+    key: str = ""
+    progress: bool = False
+    posted_at: float = 0.0
+
+
+class NotificationOutbox:
+    """Queue of outgoing notifications with a single sender thread.
+
+    Args:
+        sink: callable(phone, message) that delivers one message
+        min_interval: minimum seconds between sends to the same phone
+    """
+
+    def __init__(self, sink=None, min_interval=MIN_INTERVAL, max_pending=MAX_PENDING,
+                 clock=time.monotonic):
+        self._sink = sink or OsascriptSink()
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._progress = {}         # (phone, key) → queued progress _Pending
+        self._last_sent = {}        # phone → time of last send
+        self._sending = False
+        self._thread = None
+        self._closed = False
+        self._counts = {"posted": 0, "sent": 0, "coalesced": 0, "dropped": 0, "failed": 0}
+
+    def set_sink(self, sink):
+        """Swap the delivery function (e.g. MemorySink in tests)."""
+        with self._cond:
+            self._sink = sink
+
+    # ─── Posting ─────────────────────────────────────
+
+    def post(self, phone, message, key="", progress=False):
+        """Queue a message. Returns immediately.
+
+        progress=True marks a replaceable status update: a still-queued
+        update with the same (phone, key) gets the new text instead.
+        """
+        if not phone or not message:
+            return
+        with self._cond:
+            if self._closed:
+                return
+            self._counts["posted"] += 1
+            slot = (phone, key)
+            if progress and key:
+                queued = self._progress.get(slot)
+                if queued is not None:
+                    queued.message = message
+                    self._counts["coalesced"] += 1
+                    return
+            elif key:
+                # A final message seals the slot: later progress queues behind it
+                self._progress.pop(slot, None)
+            item = _Pending(phone, message, key, progress, self._clock())
+            self._queue.append(item)
+            if progress and key:
+                self._progress[slot] = item
+            self._trim()
+            self._ensure_sender()
+            self._cond.notify_all()
+
+    def _trim(self):
+        """Drop the oldest progress updates past max_pending (lock held)."""
+        excess = len(self._queue) - self.max_pending
+        if excess <= 0:
+            return
+        for item in list(self._queue):
+            if excess <= 0:
+                break
+            if item.progress:
+                self._queue.remove(item)
+                self._forget(item)
+                self._counts["dropped"] += 1
+                excess -= 1
+
+    def _forget(self, item):
+        slot = (item.phone, item.key)
+        if self._progress.get(slot) is item:
+            del self._progress[slot]
+
+    # ─── Sender ──────────────────────────────────────
+
+    def _ensure_sender(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="tars-notify", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                item = self._queue[0]
+                wait = self._last_sent.get(item.phone, float("-inf")) + self.min_interval - self._clock()
+                if wait > 0:
+                    # Progress for this item may still coalesce while we wait
+                    self._cond.wait(wait)
+                    continue
+                self._queue.popleft()
+                self._forget(item)
+                self._sending = True
+                sink = self._sink
+            try:
+                sink(item.phone, item.message)
+                ok = True
+            except Exception as e:
+                ok = False
+                logger.debug(f"Notification send failed: {e}")
+            with self._cond:
+                self._last_sent[item.phone] = self._clock()
+                self._counts["sent" if ok else "failed"] += 1
+                self._sending = False
+                self._cond.notify_all()
+
+    # ─── Lifecycle ───────────────────────────────────
+
+    def flush(self, timeout=None):
+        """Wait until everything queued has been sent. Returns True if drained."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._sending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout=EXIT_FLUSH_SECONDS):
+        """Deliver what's queued (up to timeout), then stop the sender."""
+        drained = self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        return drained
+
+    def stats(self):
+        with self._cond:
+            return {**self._counts, "pending": len(self._queue)}
+
+
+# Singleton — all agents share one sender
+outbox = NotificationOutbox()
+atexit.register(outbox.flush, EXIT_FLUSH_SECONDS)
@@ -0,0 +1,231 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Task Admission                ║
+╚══════════════════════════════════════════╝
+
+Admits queued tasks into a fixed pool of long-lived worker
+threads, at most `max_parallel` at a time.
+
+  - No polling: workers sleep on a condition and are woken the
+    moment a task is submitted or a running task finishes.
+  - Priority classes: emergency > interactive > background. Within
+    a class it's first-in, first-out. A waiting task climbs one
+    class every AGING_SECONDS so background work can't starve.
+  - Every ticket records how long it waited for a slot; per-class
+    wait percentiles are available from stats().
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+logger = logging.getLogger("TARS")
+
+PRIORITY_EMERGENCY = 0      # Urgent user intents ("stop", "it's down", "asap")
+PRIORITY_INTERACTIVE = 1    # Ordinary messages from a person
+PRIORITY_BACKGROUND = 2     # Scheduled and self-initiated work
+PRIORITY_NAMES = {
+    PRIORITY_EMERGENCY: "emergency",
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+}
+
+AGING_SECONDS = 120         # A waiting task is promoted one class per this many seconds
+WAIT_SAMPLES = 512          # Recent queue-wait samples kept per class
+
+
+@dataclass
+class Ticket:
+    """One submitted task and its admission timeline."""
+    task_id: str
+    priority: int
+    fn: Callable = field(repr=False)
+    args: tuple = field(default=(), repr=False)
+    label: str = ""
+    submitted_at: float = 0.0
+    admitted_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def wait(self):
+        """Seconds spent queued before a worker picked it up."""
+        return (self.admitted_at or self.submitted_at) - self.submitted_at
+
+    @property
+    def runtime(self):
+        if self.admitted_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.admitted_at
+
+
+class TaskAdmission:
+    """Priority admission into a reusable worker pool.
+
+    Args:
+        max_parallel: tasks allowed to run at once (= worker threads)
+        name: thread name prefix for the workers
+        aging: seconds of waiting that promote a task one priority class
+    """
+
+    def __init__(self, max_parallel=3, name="tars-worker", aging=AGING_SECONDS, clock=time.monotonic):
+        self.max_parallel = max(1, int(max_parallel))
+        self._name = name
+        self._aging = aging
+        self._clock = clock
+        self.lock = threading.Lock()
+        self._cond = threading.Condition(self.lock)
+        self._queues = {p: deque() for p in PRIORITY_NAMES}
+        self.active = {}            # {task_id: Ticket} — currently running
+        self._workers = []
+        self._running = True
+        self._waits = {p: deque(maxlen=WAIT_SAMPLES) for p in PRIORITY_NAMES}
+        self._counts = {p: {"submitted": 0, "completed": 0, "failed": 0} for p in PRIORITY_NAMES}
+
+    # ─── Submitting ──────────────────────────────────
+
+    def submit(self, task_id, fn, *args, priority=PRIORITY_INTERACTIVE, label=""):
+        """Queue fn(*args) to run once a slot is free. Returns its Ticket."""
+        if priority not in self._queues:
+            priority = PRIORITY_INTERACTIVE
+        ticket = Ticket(task_id=task_id, priority=priority, fn=fn, args=args,
+                        label=label, submitted_at=self._clock())
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("task admission is closed")
+            self._queues[priority].append(ticket)
+            self._counts[priority]["submitted"] += 1
+            self._spawn_workers()
+            self._cond.notify()
+        return ticket
+
+    def resize(self, max_parallel):
+        """Change the concurrency limit; extra workers exit once idle."""
+        with self._cond:
+            self.max_parallel = max(1, int(max_parallel))
+            self._spawn_workers()
+            self._cond.notify_all()
+
+    # ─── Workers ─────────────────────────────────────
+
+    def _spawn_workers(self):
+        """Start workers up to max_parallel (lock held)."""
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.max_parallel:
+            w = threading.Thread(target=self._worker, daemon=True,
+                                 name=f"{self._name}-{len(self._workers) + 1}")
+            self._workers.append(w)
+            w.start()
+
+    def _queued(self):
+        return sum(len(q) for q in self._queues.values())
+
+    def _next(self):
+        """Pop the most urgent ticket, counting aging (lock held)."""
+        now = self._clock()
+        best = None
+        for p, q in self._queues.items():
+            if not q:
+                continue
+            head = q[0]
+            effective = p - int((now - head.submitted_at) // self._aging) if self._aging else p
+            key = (effective, head.submitted_at)
+            if best is None or key < best[0]:
+                best = (key, p)
+        return self._queues[best[1]].popleft()
+
+    def _worker(self):
+        me = threading.current_thread()
+        base_name = me.name
+        while True:
+            with self._cond:
+                while self._running and not (self._queued() and len(self.active) < self.max_parallel):
+                    if len(self._workers) > self.max_parallel:
+                        self._workers.remove(me)
+                        return
+                    self._cond.wait()
+                if not self._running:
+                    return
+                ticket = self._next()
+                ticket.admitted_at = self._clock()
+                self.active[ticket.task_id] = ticket
+                self._waits[ticket.priority].append(ticket.wait)
+
+            me.name = f"tars-{ticket.task_id}"
+            failed = False
+            try:
+                ticket.fn(*ticket.args)
+            except Exception as e:
+                failed = True
+                logger.error(f"  ❌ [{ticket.task_id}] Unhandled task error: {e}")
+            finally:
+                me.name = base_name
+                with self._cond:
+                    ticket.finished_at = self._clock()
+                    self.active.pop(ticket.task_id, None)
+                    self._counts[ticket.priority]["failed" if failed else "completed"] += 1
+                    self._cond.notify_all()
+
+    # ─── State ───────────────────────────────────────
+
+    def active_count(self):
+        with self.lock:
+            return len(self.active)
+
+    def queued_count(self):
+        with self.lock:
+            return self._queued()
+
+    def get(self, task_id):
+        """The running ticket for task_id, if any."""
+        with self.lock:
+            return self.active.get(task_id)
+
+    def join(self, timeout=None):
+        """Block until nothing is queued or running. Returns True if idle."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued() or self.active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout=10):
+        """Stop admitting, drop queued tickets, and wait for running ones.
+
+        Returns the number of queued tickets that were dropped.
+        """
+        with self._cond:
+            self._running = False
+            dropped = self._queued()
+            for q in self._queues.values():
+                q.clear()
+            self._cond.notify_all()
+        self.join(timeout)
+        return dropped
+
+    def stats(self):
+        """Concurrency, queue depth and per-class queue-wait percentiles."""
+        with self.lock:
+            classes = {}
+            for p, name in PRIORITY_NAMES.items():
+                waits = sorted(self._waits[p])
+                n = len(waits)
+                classes[name] = {
+                    "queued": len(self._queues[p]),
+                    **self._counts[p],
+                    "wait_mean": round(sum(waits) / n, 4) if n else 0.0,
+                    "wait_p50": round(waits[int(0.50 * (n - 1))], 4) if n else 0.0,
+                    "wait_p95": round(waits[int(0.95 * (n - 1))], 4) if n else 0.0,
+                    "wait_max": round(waits[-1], 4) if n else 0.0,
+                }
+            return {
+                "max_parallel": self.max_parallel,
+                "active": len(self.active),
+                "queued": self._queued(),
+                "classes": classes,
+            }
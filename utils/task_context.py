@@ -0,0 +1,123 @@
+"""
+╔══════════════════════════════════════════╗
+║      TARS — Task Context                  ║
+╚══════════════════════════════════════════╝
+
+Execution state owned by one task: its deployment log (which
+doubles as failure history and browser checkpoint store), its
+deployment budget, and its own kill switch.
+
+The executor keeps one TaskContext per running task, so parallel
+tasks never see each other's deployments, failures or budgets,
+and one task can be stopped without stopping the others.
+"""
+
+import time
+import threading
+
+KILL_POLL_SECONDS = 0.1     # How quickly wait() notices a parent kill switch
+
+
+class TaskKillEvent(threading.Event):
+    """A task's kill switch.
+
+    is_set() is true when this task was cancelled OR the global kill
+    switch it was created under is set, so agents that only know
+    about "a kill event" honour both.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__()
+        self.parent = parent
+
+    def is_set(self):
+        return super().is_set() or (self.parent is not None and self.parent.is_set())
+
+    def wait(self, timeout=None):
+        """Like Event.wait, but also wakes (within KILL_POLL_SECONDS) when
+        the parent is set, since the parent's set() doesn't notify us."""
+        if self.parent is None:
+            return super().wait(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            left = KILL_POLL_SECONDS if deadline is None else min(deadline - time.monotonic(), KILL_POLL_SECONDS)
+            if left <= 0:
+                return False
+            super().wait(left)
+        return True
+
+
+class TaskContext:
+    """Deployment log, budget and kill switch for one task."""
+
+    def __init__(self, task_id="", source="imessage", parent_kill=None):
+        self.task_id = task_id
+        self.source = source
+        self.started_at = time.time()
+        self.kill_event = TaskKillEvent(parent_kill)
+        self._log = []          # [{agent, task, success, steps, reason, checkpoint?}]
+        self._reserved = 0      # Deployment slots claimed, including in-flight ones
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"TaskContext({self.task_id or 'anonymous'}, deployments={len(self._log)})"
+
+    # ─── Deployment budget ───────────────────────────
+
+    def reserve_deployment(self, limit):
+        """Claim a deployment slot. Returns the 1-based attempt number,
+        or 0 when the budget is spent. Safe across concurrent deploys."""
+        with self._lock:
+            if self._reserved >= limit:
+                return 0
+            self._reserved += 1
+            return self._reserved
+
+    @property
+    def deployments_used(self):
+        with self._lock:
+            return max(self._reserved, len(self._log))
+
+    # ─── Deployment log ──────────────────────────────
+
+    def record_deployment(self, entry):
+        with self._lock:
+            self._log.append(entry)
+
+    def deployments(self, agent=None):
+        """Snapshot of the log, optionally for one agent type."""
+        with self._lock:
+            return [d for d in self._log if agent is None or d["agent"] == agent]
+
+    def failures(self):
+        with self._lock:
+            return [d for d in self._log if not d["success"]]
+
+    def last_checkpoint(self, agent):
+        """Most recent saved state checkpoint from an agent type, if any."""
+        with self._lock:
+            for d in reversed(self._log):
+                if d["agent"] == agent and d.get("checkpoint"):
+                    return d["checkpoint"]
+        return None
+
+    # ─── Cancellation ────────────────────────────────
+
+    def cancel(self):
+        """Stop this task's brain loop and agents, leaving other tasks alone."""
+        self.kill_event.set()
+
+    @property
+    def cancelled(self):
+        return self.kill_event.is_set()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "task_id": self.task_id,
+                "source": self.source,
+                "age_seconds": round(time.time() - self.started_at, 1),
+                "deployments": max(self._reserved, len(self._log)),
+                "failures": sum(1 for d in self._log if not d["success"]),
+                "cancelled": self.kill_event.is_set(),
+            }
@@ -0,0 +1,306 @@
+"""
+╔══════════════════════════════════════════╗
+║       TARS — Tool Dispatcher              ║
+╚══════════════════════════════════════════╝
+
+Name → handler table for the executor's tools. Each ToolSpec
+declares its calling contract (schema, deadline, retries,
+idempotency, cacheability), and every call runs through one
+middleware chain:
+
+    errors → metrics → validate → cache → deadline → retry → handler
+
+Per-tool latency histograms are kept in memory and served by
+/api/health.
+"""
+
+import json
+import time
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger("TARS")
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, float("inf"))
+CACHE_SIZE = 256            # Cached tool results (LRU beyond this)
+RETRY_BACKOFF = 0.5         # Seconds before the first retry, doubled each time
+DEADLINE_WORKERS = 8        # Threads available to deadline-bounded tools
+
+
+@dataclass
+class ToolSpec:
+    """One tool's handler plus its calling contract."""
+    name: str
+    handler: Callable[[dict], dict]
+    schema: dict = field(default_factory=dict)   # JSON schema of the input
+    timeout: Optional[float] = None              # Per-call deadline (None = unbounded; meant for idempotent tools)
+    retries: int = 0                             # Retries on exceptions (idempotent tools only)
+    idempotent: bool = False                     # Safe to repeat with the same input
+    cache_ttl: float = 0.0                       # Seconds to reuse a successful result
+    invalidates: Tuple[str, ...] = ()            # Tools whose cached results this call voids
+
+    @property
+    def cacheable(self):
+        return self.idempotent and self.cache_ttl > 0
+
+    @property
+    def required(self):
+        return tuple(self.schema.get("required", ()))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with outcome counters."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.outcomes = {"ok": 0, "error": 0, "timeout": 0, "cached": 0}
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds, outcome="ok"):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile."""
+        n = self.count
+        if not n:
+            return 0.0
+        rank = p / 100 * n
+        seen = 0
+        for bound, c in zip(self.buckets, self.counts):
+            seen += c
+            if seen >= rank:
+                return bound if bound != float("inf") else self.max
+        return self.max
+
+    def snapshot(self):
+        n = self.count
+        return {
+            "count": n,
+            **self.outcomes,
+            "mean": round(self.total / n, 4) if n else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": round(self.max, 4),
+            "buckets": {("+inf" if b == float("inf") else str(b)): c
+                        for b, c in zip(self.buckets, self.counts) if c},
+        }
+
+
+def _error(content, error_type):
+    return {"success": False, "error": True, "content": content, "error_type": error_type}
+
+
+class ToolDispatcher:
+    """Maps tool names to ToolSpecs and runs calls through the middleware chain.
+
+    Args:
+        schemas: name → JSON input schema (e.g. from brain/tools.py TARS_TOOLS)
+        on_error: called as on_error(name, exc, inp) when a handler raises
+        wrap_context: wraps a callable before it runs on a deadline thread,
+            so thread-local state (like the reply source) follows the call
+    """
+
+    def __init__(self, schemas=None, on_error=None, wrap_context=None, clock=time.monotonic):
+        self._specs = {}
+        self._schemas = schemas or {}
+        self._on_error = on_error
+        self._wrap_context = wrap_context
+        self._clock = clock
+        self._histograms = {}
+        self._metrics_lock = threading.Lock()
+        self._cache = OrderedDict()     # (name, input key) → (expires_at, result)
+        self._cache_lock = threading.Lock()
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._chain = self._build_chain([
+            self._errors, self._metrics, self._validate, self._cached, self._deadline, self._retry,
+        ])
+
+    # ─── Registration ────────────────────────────────
+
+    def register(self, name, handler, **policy):
+        """Add (or replace) a tool. Policy keys are ToolSpec fields."""
+        policy.setdefault("schema", self._schemas.get(name, {}))
+        spec = ToolSpec(name=name, handler=handler, **policy)
+        self._specs[name] = spec
+        return spec
+
+    def get(self, name):
+        return self._specs.get(name)
+
+    def names(self):
+        return sorted(self._specs)
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def __len__(self):
+        return len(self._specs)
+
+    # ─── Calling ─────────────────────────────────────
+
+    def call(self, name, inp):
+        """Run a registered tool. Raises KeyError for unknown names."""
+        spec = self._specs[name]
+        return self._chain(spec, inp if isinstance(inp, dict) else {})
+
+    @staticmethod
+    def _build_chain(middleware):
+        def terminal(spec, inp):
+            return spec.handler(inp)
+        chain = terminal
+        for mw in reversed(middleware):
+            chain = (lambda m, nxt: lambda spec, inp: m(spec, inp, nxt))(mw, chain)
+        return chain
+
+    # ─── Middleware ──────────────────────────────────
+
+    def _errors(self, spec, inp, nxt):
+        """Turn exceptions into structured error results."""
+        try:
+            result = nxt(spec, inp)
+        except Exception as e:
+            if self._on_error:
+                try:
+                    self._on_error(spec.name, e, inp)
+                except Exception:
+                    pass
+            return _error(f"Tool execution error: {e}", type(e).__name__)
+        if not isinstance(result, dict):
+            return {"success": True, "content": str(result)}
+        return result
+
+    def _metrics(self, spec, inp, nxt):
+        """Record wall time and outcome into the tool's histogram."""
+        start = self._clock()
+        result = None
+        try:
+            result = nxt(spec, inp)
+            return result
+        finally:
+            if not isinstance(result, dict):
+                outcome = "error" if result is None else "ok"
+            elif result.get("_cached"):
+                outcome = "cached"
+            elif result.get("error_type") == "timeout":
+                outcome = "timeout"
+            else:
+                outcome = "ok" if result.get("success") else "error"
+            with self._metrics_lock:
+                hist = self._histograms.get(spec.name)
+                if hist is None:
+                    hist = self._histograms[spec.name] = LatencyHistogram()
+                hist.record(self._clock() - start, outcome)
+            if isinstance(result, dict):
+                result.pop("_cached", None)
+
+    def _validate(self, spec, inp, nxt):
+        """Reject calls missing a required parameter before the handler runs."""
+        for param in spec.required:
+            if inp.get(param) in (None, ""):
+                return _error(f"⚠️ Missing '{param}' parameter for {spec.name}. "
+                              f"Required: {', '.join(spec.required)}.", "invalid_input")
+        return nxt(spec, inp)
+
+    def _cached(self, spec, inp, nxt):
+        """Serve idempotent reads from cache; let writes invalidate them."""
+        key = None
+        if spec.cacheable:
+            key = (spec.name, json.dumps(inp, sort_keys=True, default=str))
+            now = self._clock()
+            with self._cache_lock:
+                hit = self._cache.get(key)
+                if hit and hit[0] > now:
+                    self._cache.move_to_end(key)
+                    return {**hit[1], "_cached": True}
+                if hit:
+                    del self._cache[key]
+
+        result = nxt(spec, inp)
+
+        if key is not None and result.get("success"):
+            with self._cache_lock:
+                self._cache[key] = (self._clock() + spec.cache_ttl, dict(result))
+                while len(self._cache) > CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        if spec.invalidates and result.get("success"):
+            self.invalidate(*spec.invalidates)
+        return result
+
+    def _deadline(self, spec, inp, nxt):
+        """Bound the call to spec.timeout seconds.
+
+        A call still queued for a worker is cancelled. Python can't kill a
+        thread, so one that already started keeps running in the
+        background; the caller just stops waiting for it.
+        """
+        if not spec.timeout:
+            return nxt(spec, inp)
+        fn = lambda: nxt(spec, inp)
+        if self._wrap_context:
+            fn = self._wrap_context(fn)
+        future = self._get_pool().submit(fn)
+        try:
+            return future.result(timeout=spec.timeout)
+        except FuturesTimeout:
+            pass
+        if future.cancel():
+            logger.warning(f"  ⏱️ {spec.name} waited {spec.timeout:.0f}s for a worker — not started")
+            return _error(f"⏱️ {spec.name} timed out after {spec.timeout:.0f}s waiting for a free worker and was "
+                          f"not started. It is safe to try again.", "timeout")
+        logger.warning(f"  ⏱️ {spec.name} exceeded its {spec.timeout:.0f}s deadline")
+        if not spec.idempotent:
+            return _error(f"⏱️ {spec.name} timed out after {spec.timeout:.0f}s but may still complete in the "
+                          f"background. Do NOT retry it — check whether it took effect first.", "timeout")
+        return _error(f"⏱️ {spec.name} timed out after {spec.timeout:.0f}s (it may still finish in the background). "
+                      f"Try a narrower request or a different tool.", "timeout")
+
+    def _retry(self, spec, inp, nxt):
+        """Retry idempotent tools that raised, with exponential backoff."""
+        attempts = 1 + (spec.retries if spec.idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                return nxt(spec, inp)
+            except Exception as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = RETRY_BACKOFF * (2 ** attempt)
+                logger.info(f"  🔁 {spec.name} raised {type(e).__name__}; retry {attempt + 1}/{spec.retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=DEADLINE_WORKERS, thread_name_prefix="tars-tool")
+            return self._pool
+
+    # ─── Cache & Stats ───────────────────────────────
+
+    def invalidate(self, *names):
+        """Drop cached results for the given tools (all tools if none given)."""
+        with self._cache_lock:
+            if not names:
+                self._cache.clear()
+                return
+            for key in [k for k in self._cache if k[0] in names]:
+                del self._cache[key]
+
+    def stats(self):
+        """Per-tool latency histograms and outcome counts."""
+        with self._metrics_lock:
+            return {name: hist.snapshot() for name, hist in sorted(self._histograms.items())}
@@ -29,8 +29,9 @@ class HealthWatchdog:
         3. Heartbeat — emits periodic health events for the dashboard
     
     Stale task recovery:
-        - Sets the kill_event to stop the brain's LLM loop
-        - Waits briefly, then clears the kill_event so new tasks work
+        - Cancels the stale task's own kill switch (other tasks keep running)
+        - Otherwise sets the global kill_event to stop the brain's LLM loop,
+          waits briefly, then clears it so new tasks work
         - Notifies the user via iMessage
     """
 
@@ -112,16 +113,24 @@ class HealthWatchdog:
                 "action": "force_kill",
             })
 
-        # Force-kill: set the kill event to break the brain's LLM loop
-        self._tars._kill_event.set()
-        logger.warning(f"  🐕 Kill event SET — stopping {len(stale_tasks)} stale task(s)")
-
-        # Wait for tasks to notice the kill event
-        time.sleep(5)
-
-        # Clear the kill event so new tasks can proceed
-        self._tars._kill_event.clear()
-        logger.info(f"  🐕 Kill event cleared — ready for new tasks")
+        # Force-kill: trip each stale task's own kill switch so healthy
+        # parallel tasks keep running
+        executor = getattr(self._tars, "executor", None)
+        cancelled = [tid for tid, _ in stale_tasks
+                     if executor is not None and hasattr(executor, "cancel_task") and executor.cancel_task(tid)]
+        if len(cancelled) == len(stale_tasks):
+            logger.warning(f"  🐕 Cancelled {len(cancelled)} stale task(s): {', '.join(cancelled)}")
+        else:
+            # Fallback: set the global kill event to break the brain's LLM loop
+            self._tars._kill_event.set()
+            logger.warning(f"  🐕 Kill event SET — stopping {len(stale_tasks)} stale task(s)")
+
+            # Wait for tasks to notice the kill event
+            time.sleep(5)
+
+            # Clear the kill event so new tasks can proceed
+            self._tars._kill_event.clear()
+            logger.info(f"  🐕 Kill event cleared — ready for new tasks")
 
         # Clean up stale entries
         with self._task_lock: